@@ -242,6 +242,25 @@ def create_app(config_class=Config):
             except Exception as e:
                 app.logger.warning('MessageModel.create_indexes failed: %s', e)
 
+            try:
+                from app.models.message_search import MessageSearchModel
+                MessageSearchModel.create_indexes()
+            except Exception as e:
+                app.logger.warning('MessageSearchModel.create_indexes failed: %s', e)
+
+            if app.config.get('SEMANTIC_SEARCH_ENABLED'):
+                try:
+                    from app.models.vector_index import VectorIndexModel
+                    VectorIndexModel.create_indexes()
+                except Exception as e:
+                    app.logger.warning('VectorIndexModel.create_indexes failed: %s', e)
+
+            try:
+                from app.models.purge_job import PurgeJobModel
+                PurgeJobModel.create_indexes()
+            except Exception as e:
+                app.logger.warning('PurgeJobModel.create_indexes failed: %s', e)
+
             try:
                 from app.models.folder import FolderModel
                 FolderModel.create_indexes()
@@ -266,6 +285,12 @@ def create_app(config_class=Config):
             except Exception as e:
                 app.logger.warning('KnowledgeItemModel.create_indexes failed: %s', e)
 
+            try:
+                from app.models.generated_image import GeneratedImageModel
+                GeneratedImageModel.create_indexes()
+            except Exception as e:
+                app.logger.warning('GeneratedImageModel.create_indexes failed: %s', e)
+
             try:
                 from app.models.routine import RoutineModel
                 RoutineModel.create_indexes()
@@ -360,11 +385,19 @@ def create_app(config_class=Config):
                 from app.models.project_group_access import ProjectGroupAccessModel
                 from app.models.credit_ledger import CreditLedgerModel
                 from app.models.usage_log import UsageLogModel
+                from app.models.usage_rollup import UsageRollupModel
+                from app.models.usage_archive import UsageArchiveModel
+                from app.models.activity_counter import ActivityCounterModel
+                from app.models.budget_counter import BudgetCounterModel
                 GroupModel.create_indexes()
                 GroupMemberModel.create_indexes()
                 ProjectGroupAccessModel.create_indexes()
                 CreditLedgerModel.create_indexes()
                 UsageLogModel.create_indexes()
+                UsageRollupModel.create_indexes()
+                UsageArchiveModel.create_indexes()
+                ActivityCounterModel.create_indexes()
+                BudgetCounterModel.create_indexes()
             except Exception as e:
                 app.logger.warning('Enterprise.create_indexes failed: %s', e)
 
@@ -385,4 +418,22 @@ def create_app(config_class=Config):
             except Exception as e:
                 app.logger.warning('DLPEventModel.create_indexes failed: %s', e)
 
+            try:
+                from app.models.dlp_stats import DLPStatsModel
+                DLPStatsModel.create_indexes()
+            except Exception as e:
+                app.logger.warning('DLPStatsModel.create_indexes failed: %s', e)
+
+            try:
+                from app.models.dlp_verdict_cache import DLPVerdictCacheModel
+                DLPVerdictCacheModel.create_indexes()
+            except Exception as e:
+                app.logger.warning('DLPVerdictCacheModel.create_indexes failed: %s', e)
+
+            try:
+                from app.services import holding_views
+                holding_views.create_indexes()
+            except Exception as e:
+                app.logger.warning('holding_views.create_indexes failed: %s', e)
+
     return app
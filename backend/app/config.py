@@ -28,6 +28,36 @@ class Config:
     MEETING_ALLOWED_AUDIO_EXTS = {'mp3', 'wav', 'm4a', 'webm', 'ogg', 'mp4'}
     MEETING_MAX_AUDIO_BYTES = 500 * 1024 * 1024  # 500MB cap; route streams past Flask's MAX_CONTENT_LENGTH
 
+    # Semantic search. Off by default: with EMBEDDINGS_PROVIDER=openrouter every
+    # message write becomes a (batched) paid embeddings call. 'hashing' is a
+    # local vectoriser; EMBEDDINGS_DIM only applies to it.
+    SEMANTIC_SEARCH_ENABLED = os.environ.get('SEMANTIC_SEARCH_ENABLED', 'false').lower() == 'true'
+    EMBEDDINGS_PROVIDER = os.environ.get('EMBEDDINGS_PROVIDER', 'hashing')
+    EMBEDDINGS_MODEL = os.environ.get('EMBEDDINGS_MODEL', 'openai/text-embedding-3-small')
+    EMBEDDINGS_DIM = int(os.environ.get('EMBEDDINGS_DIM', '512'))
+    # Users with at least this many vectors are searched through an IVF
+    # coarse quantiser instead of a full scan (0 disables it).
+    SEMANTIC_IVF_THRESHOLD = int(os.environ.get('SEMANTIC_IVF_THRESHOLD', '20000'))
+    # Background indexing thread; without it queued writes wait for
+    # semantic_search.drain().
+    SEMANTIC_INDEX_WORKER = True
+
+    # Deleted conversations' messages are removed in the background, in
+    # batches with a pause between them; conversations with at most
+    # CONVERSATION_PURGE_INLINE_LIMIT messages are still deleted inline.
+    CONVERSATION_PURGE_WORKER = True
+    CONVERSATION_PURGE_BATCH_SIZE = int(os.environ.get('CONVERSATION_PURGE_BATCH_SIZE', '500'))
+    CONVERSATION_PURGE_PAUSE = float(os.environ.get('CONVERSATION_PURGE_PAUSE', '0.1'))
+    CONVERSATION_PURGE_INLINE_LIMIT = 1000
+
+    # Large text fields (message content, meeting transcripts, workflow text
+    # outputs) at least FIELD_COMPRESSION_MIN_BYTES long are stored zlib-
+    # compressed. Off by default; reads decode either form, and
+    # scripts/compress_large_fields.py converts existing rows both ways.
+    FIELD_COMPRESSION = os.environ.get('FIELD_COMPRESSION', 'false').lower() == 'true'
+    FIELD_COMPRESSION_MIN_BYTES = int(os.environ.get('FIELD_COMPRESSION_MIN_BYTES', '8192'))
+    FIELD_COMPRESSION_LEVEL = int(os.environ.get('FIELD_COMPRESSION_LEVEL', '6'))
+
     # Rate limiting
     RATELIMIT_DEFAULT = "100 per minute"
     RATELIMIT_STORAGE_URL = "memory://"
@@ -0,0 +1,218 @@
+"""
+Activity counters — daily message / conversation / signup counts for the
+admin dashboard.
+
+``MessageModel.create``, ``ConversationModel.create`` and ``UserModel.create``
+bump today's counters with ``$inc`` upserts, so the admin analytics read a
+few dozen small documents instead of grouping the whole ``messages``
+collection by day on every page load.
+
+Document shapes:
+    {_id: "day:<YYYY-MM-DD>", kind: 'day', date: 'YYYY-MM-DD',
+     messages: int, conversations: int, signups: int}
+    {_id: "model:<YYYY-MM-DD>:<model id>", kind: 'model', date: 'YYYY-MM-DD',
+     model: str, messages: int}
+
+Counters count creations: deleting a conversation does not decrement the day
+it was created on, and the message copies a branch makes (rows with
+``copied_from``) are not new messages. Like the usage rollups, they only serve reads once
+:meth:`ActivityCounterModel.rebuild` has run (``scripts/
+backfill_activity_counters.py``) and left the ``meta:ready`` marker; until
+then reads group the raw collections.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.extensions import mongo
+
+logger = logging.getLogger(__name__)
+
+METRICS = {
+    'messages': 'messages',
+    'conversations': 'conversations',
+    'signups': 'users',
+}
+_READY_ID = 'meta:ready'
+# Branch copies repeat an existing message; they are not counted.
+_ORIGINALS = {'messages': {'copied_from': None}}
+
+# Per-process view of the ready marker, as in ``usage_rollup``: once seen it
+# stays set; a miss is re-read at most every ``_READY_RECHECK_SECONDS``.
+_READY_RECHECK_SECONDS = 60
+_ready_cache = {'ready': False, 'checked_at': 0.0}
+
+
+def invalidate_ready_cache() -> None:
+    """Forget the cached ready flag (tests that drop the collection)."""
+    _ready_cache.update(ready=False, checked_at=0.0)
+
+
+def _day(value: datetime) -> str:
+    return value.strftime('%Y-%m-%d')
+
+
+class ActivityCounterModel:
+    collection_name = 'activity_daily'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[ActivityCounterModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        ActivityCounterModel.get_collection().create_index(
+            [('kind', ASCENDING), ('date', ASCENDING)],
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def record(metric: str, created_at: Optional[datetime] = None,
+               model: Optional[str] = None) -> None:
+        """Count one created row. Never raises — counters are derived data."""
+        day = _day(created_at or datetime.utcnow())
+        ops = [UpdateOne(
+            {'_id': f'day:{day}'},
+            {'$inc': {metric: 1}, '$setOnInsert': {'kind': 'day', 'date': day}},
+            upsert=True,
+        )]
+        if metric == 'messages' and model:
+            ops.append(UpdateOne(
+                {'_id': f'model:{day}:{model}'},
+                {'$inc': {'messages': 1},
+                 '$setOnInsert': {'kind': 'model', 'date': day, 'model': model}},
+                upsert=True,
+            ))
+        try:
+            ActivityCounterModel.get_collection().bulk_write(ops, ordered=False)
+        except Exception as exc:
+            # Rebuilt by scripts/backfill_activity_counters.py.
+            logger.warning('activity counter update failed: %s', exc)
+
+    @staticmethod
+    def _raw_daily(metric: str, start: Optional[datetime]) -> dict[str, int]:
+        match = dict(_ORIGINALS.get(metric, {}))
+        if start is not None:
+            match['created_at'] = {'$gte': start}
+        pipeline = [{'$match': match}] if match else []
+        pipeline.append({'$group': {
+            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+            'count': {'$sum': 1},
+        }})
+        return {
+            row['_id']: row['count']
+            for row in mongo.db[METRICS[metric]].aggregate(pipeline, allowDiskUse=True)
+            if row['_id']
+        }
+
+    @staticmethod
+    def _raw_models(start: Optional[datetime]) -> list[dict]:
+        match = {'metadata.model_id': {'$nin': [None, '']}, **_ORIGINALS['messages']}
+        if start is not None:
+            match['created_at'] = {'$gte': start}
+        return list(mongo.db.messages.aggregate([
+            {'$match': match},
+            {'$group': {
+                '_id': {
+                    'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+                    'model': '$metadata.model_id',
+                },
+                'count': {'$sum': 1},
+            }},
+        ], allowDiskUse=True))
+
+    @staticmethod
+    def rebuild(since: Optional[datetime] = None) -> int:
+        """Recompute counters from the raw collections (all, or from
+        ``since``'s UTC day on) and mark them ready. Returns docs written."""
+        if since is not None:
+            since = since.replace(hour=0, minute=0, second=0, microsecond=0)
+        docs: dict[str, dict] = {}
+        for metric in METRICS:
+            for day, count in ActivityCounterModel._raw_daily(metric, since).items():
+                doc = docs.setdefault(f'day:{day}', {
+                    '_id': f'day:{day}', 'kind': 'day', 'date': day,
+                    **{m: 0 for m in METRICS},
+                })
+                doc[metric] = count
+        for row in ActivityCounterModel._raw_models(since):
+            day, model = row['_id'].get('date'), row['_id'].get('model')
+            if day:
+                docs[f'model:{day}:{model}'] = {
+                    '_id': f'model:{day}:{model}', 'kind': 'model', 'date': day,
+                    'model': model, 'messages': row['count'],
+                }
+
+        col = ActivityCounterModel.get_collection()
+        scope = {'kind': {'$in': ['day', 'model']}}
+        if since is not None:
+            scope['date'] = {'$gte': _day(since)}
+        col.delete_many(scope)
+        values = list(docs.values())
+        for start in range(0, len(values), 1000):
+            col.insert_many(values[start:start + 1000], ordered=False)
+        col.update_one(
+            {'_id': _READY_ID},
+            {'$set': {'rebuilt_at': datetime.utcnow(), 'since': since}},
+            upsert=True,
+        )
+        _ready_cache.update(ready=True, checked_at=time.monotonic())
+        return len(values)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_ready() -> bool:
+        if _ready_cache['ready']:
+            return True
+        now = time.monotonic()
+        if _ready_cache['checked_at'] and now - _ready_cache['checked_at'] < _READY_RECHECK_SECONDS:
+            return False
+        ready = ActivityCounterModel.get_collection().find_one({'_id': _READY_ID}, {'_id': 1}) is not None
+        _ready_cache.update(ready=ready, checked_at=now)
+        return ready
+
+    @staticmethod
+    def daily(metric: str, days: int, now: Optional[datetime] = None) -> dict[str, int]:
+        """``{'YYYY-MM-DD': count}`` for the last ``days`` UTC days (today
+        included). Missing days are absent, not zero."""
+        if metric not in METRICS:
+            raise ValueError(f'invalid metric: {metric}')
+        first = (now or datetime.utcnow()) - timedelta(days=days - 1)
+        first = first.replace(hour=0, minute=0, second=0, microsecond=0)
+        if not ActivityCounterModel.is_ready():
+            return ActivityCounterModel._raw_daily(metric, first)
+        return {
+            doc['date']: int(doc.get(metric) or 0)
+            for doc in ActivityCounterModel.get_collection().find(
+                {'kind': 'day', 'date': {'$gte': _day(first)}}, {'date': 1, metric: 1},
+            )
+        }
+
+    @staticmethod
+    def top_models(days: int, limit: int = 5, now: Optional[datetime] = None) -> list[dict]:
+        """Most used models by message count: ``[{'model', 'count'}]``."""
+        first = (now or datetime.utcnow()) - timedelta(days=days - 1)
+        first = first.replace(hour=0, minute=0, second=0, microsecond=0)
+        totals: dict[str, int] = {}
+        if not ActivityCounterModel.is_ready():
+            for row in ActivityCounterModel._raw_models(first):
+                model = row['_id'].get('model')
+                totals[model] = totals.get(model, 0) + row['count']
+        else:
+            for doc in ActivityCounterModel.get_collection().find(
+                {'kind': 'model', 'date': {'$gte': _day(first)}}, {'model': 1, 'messages': 1},
+            ):
+                totals[doc['model']] = totals.get(doc['model'], 0) + int(doc.get('messages') or 0)
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], str(item[0])))
+        return [{'model': model, 'count': count} for model, count in ranked[:limit]]
@@ -20,6 +20,8 @@ class AuditLogModel:
         collection.create_index('target_id')
         collection.create_index('created_at')
         collection.create_index([('created_at', -1)])
+        # Keyset order of the streaming exports (app.services.exports).
+        collection.create_index([('created_at', 1), ('_id', 1)])
 
     @staticmethod
     def create(action, admin_id, target_id=None, target_type=None, details=None, ip_address=None):
@@ -0,0 +1,256 @@
+"""
+Budget counters — month-to-date spend per workspace and per project.
+
+``UsageLogModel.create`` bumps one workspace counter and (when attributed) one
+project counter per row with ``$inc`` upserts, so a budget check is one point
+read instead of an aggregation over the month's ``usage_logs``. That makes it
+cheap enough for :meth:`BudgetCounterModel.check` to run before every LLM
+call (see ``OpenRouterService.chat_completion``).
+
+Document shape:
+    {
+      _id: "<workspace|project>:<owner_id>:<YYYY-MM>",
+      scope: 'workspace' | 'project',
+      owner_id: ObjectId,           # the workspace or project
+      workspace_id: ObjectId | None,
+      month: 'YYYY-MM',             # UTC
+      spend_usd: float,
+      updated_at: datetime,
+      reconciled_at: datetime,      # last drift correction
+    }
+
+Months roll over by key: the first usage row of a month upserts a fresh
+counter at zero, so nothing has to be reset at the boundary. Counters can
+drift from ``usage_logs`` (rows written by scripts, a failed ``$inc``);
+:meth:`reconcile` recomputes the month from the usage rollups and is run
+periodically by the scheduler (``scheduler.jobs.budget_counters``).
+
+Budgets themselves live on the owner: ``workspaces.budget_mtd_usd`` and
+``projects.budget_mtd_usd``. ``0`` / ``None`` means no budget.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+
+from app.extensions import mongo
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ('workspace', 'project')
+# Counters of older months are pruned by ``reconcile``.
+_KEEP_MONTHS = 3
+# Drift below this is float noise from summing in a different order.
+_EPSILON = 1e-6
+
+
+def _to_oid(value) -> Optional[ObjectId]:
+    if value is None or isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(str(value))
+    except Exception:
+        return None
+
+
+def _month(value: datetime) -> str:
+    return value.strftime('%Y-%m')
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _shift_month(month: str, delta: int) -> str:
+    year, mon = (int(part) for part in month.split('-'))
+    index = year * 12 + (mon - 1) + delta
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+class BudgetCounterModel:
+    collection_name = 'budget_counters'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[BudgetCounterModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        col = BudgetCounterModel.get_collection()
+        col.create_index([('month', ASCENDING), ('scope', ASCENDING)])
+        col.create_index('workspace_id')
+
+    @staticmethod
+    def _key(scope: str, owner_id, month: str) -> str:
+        return f'{scope}:{owner_id}:{month}'
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _owners(workspace_id, project_id) -> list[tuple[str, ObjectId]]:
+        owners = []
+        for scope, owner in (('workspace', workspace_id), ('project', project_id)):
+            owner = _to_oid(owner)
+            if owner is not None:
+                owners.append((scope, owner))
+        return owners
+
+    @staticmethod
+    def record(row: dict) -> None:
+        """Add one freshly inserted ``usage_logs`` row to its month's counters."""
+        cost = float(row.get('cost_usd') or 0)
+        owners = BudgetCounterModel._owners(row.get('workspace_id'), row.get('project_id'))
+        if not cost or not owners:
+            return
+        created_at = row.get('created_at') or datetime.utcnow()
+        month = _month(created_at)
+        workspace_id = _to_oid(row.get('workspace_id'))
+        ops = [
+            UpdateOne(
+                {'_id': BudgetCounterModel._key(scope, owner, month)},
+                {
+                    '$inc': {'spend_usd': cost},
+                    '$set': {'updated_at': datetime.utcnow()},
+                    '$setOnInsert': {
+                        'scope': scope, 'owner_id': owner,
+                        'workspace_id': workspace_id, 'month': month,
+                    },
+                },
+                upsert=True,
+            )
+            for scope, owner in owners
+        ]
+        BudgetCounterModel.get_collection().bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def reconcile(now: Optional[datetime] = None) -> dict:
+        """Reset the current month's counters to the spend in ``usage_logs``.
+
+        Reads through the usage rollups, so it costs one small aggregation per
+        scope. Rows recorded between the aggregation and the write can be
+        off by one row until the next run. Also prunes counters older than
+        ``_KEEP_MONTHS``. Returns ``{'month', 'corrected', 'pruned'}``.
+        """
+        from app.models.usage_rollup import UsageRollupModel
+
+        now = now or datetime.utcnow()
+        month = _month(now)
+        col = BudgetCounterModel.get_collection()
+
+        truth: dict[str, tuple] = {}
+        for scope in SCOPES:
+            field = f'{scope}_id'
+            rows = UsageRollupModel.aggregate(
+                {field: {'$ne': None}}, group_by=field, start=_month_start(now), end=now,
+            )
+            for row in rows:
+                truth[BudgetCounterModel._key(scope, row['_id'], month)] = (
+                    scope, row['_id'], float(row['total_cost'] or 0),
+                )
+
+        # Project counters carry their workspace for cascade deletes.
+        project_ids = [owner for scope, owner, _ in truth.values() if scope == 'project']
+        project_ws = {}
+        if project_ids:
+            for project in mongo.db.projects.find(
+                {'_id': {'$in': project_ids}}, {'workspace_id': 1},
+            ):
+                project_ws[project['_id']] = project.get('workspace_id')
+
+        current = {doc['_id']: doc for doc in col.find({'month': month})}
+        reconciled_at = datetime.utcnow()
+        ops = []
+        for key, (scope, owner, spend) in truth.items():
+            doc = current.get(key)
+            if doc is not None and abs(float(doc.get('spend_usd') or 0) - spend) < _EPSILON:
+                continue
+            ops.append(UpdateOne(
+                {'_id': key},
+                {
+                    '$set': {'spend_usd': spend, 'reconciled_at': reconciled_at},
+                    '$setOnInsert': {
+                        'scope': scope, 'owner_id': owner, 'month': month,
+                        'workspace_id': owner if scope == 'workspace' else project_ws.get(owner),
+                    },
+                },
+                upsert=True,
+            ))
+        for key, doc in current.items():
+            if key not in truth and float(doc.get('spend_usd') or 0):
+                ops.append(UpdateOne(
+                    {'_id': key},
+                    {'$set': {'spend_usd': 0.0, 'reconciled_at': reconciled_at}},
+                ))
+        if ops:
+            col.bulk_write(ops, ordered=False)
+            logger.info('budget counters: corrected %d drifted counter(s) for %s', len(ops), month)
+
+        pruned = col.delete_many(
+            {'month': {'$lt': _shift_month(month, -(_KEEP_MONTHS - 1))}},
+        ).deleted_count
+        return {'month': month, 'corrected': len(ops), 'pruned': pruned}
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def spend(scope: str, owner_id, now: Optional[datetime] = None) -> float:
+        """Month-to-date spend for one workspace or project."""
+        doc = BudgetCounterModel.get_collection().find_one(
+            {'_id': BudgetCounterModel._key(scope, _to_oid(owner_id), _month(now or datetime.utcnow()))},
+            {'spend_usd': 1},
+        )
+        return float((doc or {}).get('spend_usd') or 0)
+
+    @staticmethod
+    def check(workspace_id, project_id=None, now: Optional[datetime] = None) -> Optional[dict]:
+        """Pre-flight budget check.
+
+        Returns ``None`` when the call may proceed, else
+        ``{'scope', 'owner_id', 'budget_usd', 'spend_usd'}`` for the first
+        exhausted budget (workspace before project). At most two point reads
+        for the budgets and one for the counters.
+        """
+        owners = BudgetCounterModel._owners(workspace_id, project_id)
+        if not owners:
+            return None
+
+        budgets = {}
+        for scope, owner in owners:
+            doc = mongo.db[f'{scope}s'].find_one({'_id': owner}, {'budget_mtd_usd': 1})
+            budget = float((doc or {}).get('budget_mtd_usd') or 0)
+            if budget > 0:
+                budgets[scope] = budget
+        if not budgets:
+            return None
+
+        month = _month(now or datetime.utcnow())
+        keys = {
+            BudgetCounterModel._key(scope, owner, month): (scope, owner)
+            for scope, owner in owners if scope in budgets
+        }
+        spend = {
+            keys[doc['_id']]: float(doc.get('spend_usd') or 0)
+            for doc in BudgetCounterModel.get_collection().find(
+                {'_id': {'$in': list(keys)}}, {'spend_usd': 1},
+            )
+        }
+        for scope, owner in owners:
+            if scope not in budgets:
+                continue
+            spent = spend.get((scope, owner), 0.0)
+            if spent >= budgets[scope]:
+                return {
+                    'scope': scope,
+                    'owner_id': str(owner),
+                    'budget_usd': budgets[scope],
+                    'spend_usd': spent,
+                }
+        return None
@@ -2,6 +2,8 @@ from datetime import datetime
 from bson import ObjectId
 from pymongo.errors import OperationFailure
 from app.extensions import mongo
+from app.models.activity_counter import ActivityCounterModel
+from app.utils import pagination
 
 
 # Sentinel string the route layer translates `?project_id=null` into. Lets
@@ -53,6 +55,13 @@ class ConversationModel:
         collection.create_index(
             [('user_id', 1), ('project_id', 1), ('last_message_at', -1)]
         )
+        # Keyset pages of the sidebar list: equality prefix, then the sort
+        # key with its ``_id`` tiebreaker (app/utils/pagination.py).
+        collection.create_index(
+            [('user_id', 1), ('is_archived', 1), ('last_message_at', -1), ('_id', -1)]
+        )
+        # Newest-write lookups for conditional GETs (app/utils/http_cache.py).
+        collection.create_index([('user_id', 1), ('updated_at', -1)])
 
     @staticmethod
     def create(user_id, config_id, title='New conversation', folder_id=None,
@@ -99,6 +108,7 @@ class ConversationModel:
 
         result = ConversationModel.get_collection().insert_one(conversation_doc)
         conversation_doc['_id'] = result.inserted_id
+        ActivityCounterModel.record('conversations', conversation_doc['created_at'])
         return conversation_doc
 
     @staticmethod
@@ -111,9 +121,13 @@ class ConversationModel:
     @staticmethod
     def find_by_user(user_id, folder_id=None, archived=False, search=None,
                      skip=0, limit=20, sort_by='last_message_at',
-                     project_id=None):
+                     project_id=None, cursor=None):
         """Find conversations for a user.
 
+        ``cursor`` (from :func:`app.utils.pagination.encode_cursor` over
+        ``pagination.sort_spec(sort_by)``) replaces ``skip`` with a keyset
+        range; a bad token raises ``pagination.CursorError``.
+
         project_id semantics:
             None              -> no project filter (legacy behavior preserved)
             NULL_PROJECT_SENTINEL ('__null__') -> filter where project_id is null/missing
@@ -142,12 +156,13 @@ class ConversationModel:
         if search:
             query['$text'] = {'$search': search}
 
-        sort_order = -1  # descending
-        cursor = ConversationModel.get_collection().find(query).sort(
-            sort_by, sort_order
-        ).skip(skip).limit(limit)
+        sort = pagination.sort_spec(sort_by, -1)  # descending
+        query = pagination.apply_cursor(query, sort, cursor)
+        results = ConversationModel.get_collection().find(query).sort(sort)
+        if not cursor:
+            results = results.skip(skip)
 
-        return list(cursor)
+        return list(results.limit(limit))
 
     @staticmethod
     def update(conversation_id, update_data):
@@ -186,7 +201,7 @@ class ConversationModel:
             conversation_id = ObjectId(conversation_id)
         return ConversationModel.get_collection().update_one(
             {'_id': conversation_id},
-            {'$addToSet': {'tags': tag}}
+            {'$addToSet': {'tags': tag}, '$set': {'updated_at': datetime.utcnow()}}
         )
 
     @staticmethod
@@ -196,7 +211,7 @@ class ConversationModel:
             conversation_id = ObjectId(conversation_id)
         return ConversationModel.get_collection().update_one(
             {'_id': conversation_id},
-            {'$pull': {'tags': tag}}
+            {'$pull': {'tags': tag}, '$set': {'updated_at': datetime.utcnow()}}
         )
 
     @staticmethod
@@ -238,6 +253,22 @@ class ConversationModel:
             conversation_id = ObjectId(conversation_id)
         return ConversationModel.get_collection().delete_one({'_id': conversation_id})
 
+    @staticmethod
+    def bulk_update(conversation_ids, update_data):
+        """Apply one ``$set`` to many conversations in a single round trip."""
+        ids = [ObjectId(c) if isinstance(c, str) else c for c in conversation_ids]
+        update_data = {**update_data, 'updated_at': datetime.utcnow()}
+        return ConversationModel.get_collection().update_many(
+            {'_id': {'$in': ids}}, {'$set': update_data}
+        )
+
+    @staticmethod
+    def bulk_delete(conversation_ids):
+        """Delete many conversation documents (not their messages — see
+        ``app/services/conversation_purge.py``)."""
+        ids = [ObjectId(c) if isinstance(c, str) else c for c in conversation_ids]
+        return ConversationModel.get_collection().delete_many({'_id': {'$in': ids}})
+
     @staticmethod
     def count_by_user(user_id, archived=False, project_id=None):
         """Count conversations for a user.
@@ -262,14 +293,16 @@ class ConversationModel:
         return ConversationModel.get_collection().count_documents(query)
 
     @staticmethod
-    def get_by_user_for_admin(user_id, skip=0, limit=50):
+    def get_by_user_for_admin(user_id, skip=0, limit=50, cursor=None):
         """Get all conversations for a user (admin view)"""
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
-        cursor = ConversationModel.get_collection().find(
-            {'user_id': user_id}
-        ).sort('last_message_at', -1).skip(skip).limit(limit)
-        return list(cursor)
+        sort = pagination.sort_spec('last_message_at', -1)
+        query = pagination.apply_cursor({'user_id': user_id}, sort, cursor)
+        results = ConversationModel.get_collection().find(query).sort(sort)
+        if not cursor:
+            results = results.skip(skip)
+        return list(results.limit(limit))
 
     @staticmethod
     def add_branch(conversation_id, branch_data):
@@ -285,6 +318,11 @@ class ConversationModel:
             'branch_point_message_id': branch_data.get('branch_point_message_id'),
             'created_at': datetime.utcnow()
         }
+        # Copy-on-write branches read their prefix from the parent up to the
+        # fork point instead of holding copies (MessageModel._lineage).
+        if branch_data.get('fork_at') is not None:
+            branch['fork_at'] = branch_data['fork_at']
+            branch['fork_seq'] = branch_data.get('fork_seq')
 
         result = ConversationModel.get_collection().update_one(
             {'_id': conversation_id},
@@ -349,7 +387,7 @@ class ConversationModel:
 
         result = ConversationModel.get_collection().update_one(
             {'_id': conversation_id, 'branches.id': branch_id},
-            {'$set': {'branches.$.name': new_name}}
+            {'$set': {'branches.$.name': new_name, 'updated_at': datetime.utcnow()}}
         )
         return result.modified_count > 0
 
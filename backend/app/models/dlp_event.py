@@ -7,6 +7,11 @@ Document shape:
       source: 'chat' | 'arena' | 'workflow' | 'helper' | 'image_prompt' | 'meeting' | 'debate' | 'automate' | 'bot' | 'routine',
       source_ref: { conversation_id?, message_id?, workflow_id?, run_id?, node_id? },
       matches: [{ rule_id, rule_name, severity, action_taken, snippet, offset_start, offset_end }],
+      match_summaries?: [{ rule_id, rule_name, severity, action, total, omitted }],
+          # present only when a rule exceeded the per-rule match cap
+      leaked_spans?: [{ rule_id, offset_start, offset_end }],
+          # egress events only: stretches of a match that went out unmasked
+      leaked_count?: int,  # when leaked_spans was cut at _LEAKED_SPANS_MAX
       highest_action: 'warn' | 'require_confirm' | 'block',
       was_sent: bool,
       user_acknowledged: bool,
@@ -28,6 +33,7 @@ from bson import ObjectId
 from pymongo import ASCENDING, DESCENDING
 
 from app.extensions import mongo
+from app.models.dlp_stats import DLPStatsModel
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +118,28 @@ def _sanitize_source_ref(d: Optional[dict]) -> dict:
 
     return clean
 
+# Egress events list the stretches of a match that reached the client
+# unmasked. A stream leaks at most a handful; past this many only the count
+# (``leaked_count``) is kept.
+_LEAKED_SPANS_MAX = 20
+
+
+def _bound_leaked_spans(spans: Optional[list]) -> list[dict]:
+    """Coerce ``leaked_spans`` to ``{rule_id, offset_start, offset_end}``
+    dicts and keep the first ``_LEAKED_SPANS_MAX``."""
+    out: list[dict] = []
+    for span in (spans or [])[:_LEAKED_SPANS_MAX]:
+        try:
+            out.append({
+                'rule_id': str(span['rule_id'])[:64],
+                'offset_start': int(span['offset_start']),
+                'offset_end': int(span['offset_end']),
+            })
+        except (KeyError, TypeError, ValueError):
+            logger.debug("DLP leaked_spans: dropping malformed span %r", span)
+    return out
+
+
 VALID_STATUSES = {'open', 'reviewed', 'dismissed', 'escalated'}
 VALID_SOURCES = {
     'chat',
@@ -175,6 +203,8 @@ class DLPEventModel:
         col.create_index('source_ref.conversation_id', sparse=True)
         col.create_index('source_ref.workflow_id', sparse=True)
         col.create_index('source_ref.run_id', sparse=True)
+        # Keyset order of the streaming exports (app.services.exports)
+        col.create_index([('created_at', ASCENDING), ('_id', ASCENDING)])
 
     # Dedup window — pre-flight `/dlp/scan` + downstream chokepoint (chat_stream
     # etc.) both call create() for the same single user action with the same
@@ -182,6 +212,144 @@ class DLPEventModel:
     # writing a second one.
     _DEDUP_WINDOW_SECONDS = 60
 
+    @staticmethod
+    def _validate(source: str, highest_action: str, status: str) -> None:
+        if source not in VALID_SOURCES:
+            raise ValueError(f"Invalid source: {source!r}. Must be one of {VALID_SOURCES}")
+        if highest_action not in VALID_ACTIONS:
+            raise ValueError(f"Invalid highest_action: {highest_action!r}")
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status!r}")
+
+    @staticmethod
+    def _dedup_key(user_id, workspace_id, source: str, text_sha256: str) -> tuple:
+        return (_to_oid(user_id), _to_oid(workspace_id), source, str(text_sha256))
+
+    @staticmethod
+    def _ref_key(source_ref: Optional[dict]) -> str:
+        """Stable form of a sanitised ``source_ref`` for batch dedup."""
+        return json.dumps(_sanitize_source_ref(source_ref), sort_keys=True, default=str)
+
+    @staticmethod
+    def _merged_fields(existing: dict, *, highest_action: str, was_sent: bool,
+                       user_acknowledged: bool,
+                       leaked_spans: Optional[list[dict]] = None) -> dict:
+        """Fields of ``existing`` that change when a repeat hit merges in."""
+        # Merge permissively: was_sent True wins over False, ack True wins
+        # over False. highest_action takes the stronger of the two so
+        # downstream dashboards reflect the actual escalation. Matches
+        # untouched — the pre-flight match list is already the canonical
+        # snapshot for this text.
+        new_was_sent = bool(existing.get('was_sent', False)) or bool(was_sent)
+        new_ack = (
+            bool(existing.get('user_acknowledged', False))
+            or bool(user_acknowledged)
+        )
+
+        action_rank = {'allow': 0, 'warn': 1, 'require_confirm': 2, 'block': 3}
+        existing_action = existing.get('highest_action', 'allow')
+        new_action = highest_action if (
+            action_rank.get(highest_action, 0) > action_rank.get(existing_action, 0)
+        ) else existing_action
+
+        updates: dict = {}
+        if new_was_sent != existing.get('was_sent'):
+            updates['was_sent'] = new_was_sent
+        if new_ack != existing.get('user_acknowledged'):
+            updates['user_acknowledged'] = new_ack
+        if new_action != existing_action:
+            updates['highest_action'] = new_action
+        if leaked_spans and not existing.get('leaked_spans'):
+            updates.update(DLPEventModel._leak_fields(leaked_spans))
+        return updates
+
+    @staticmethod
+    def _leak_fields(leaked_spans: Optional[list[dict]]) -> dict:
+        """``leaked_spans`` (bounded) and, when it was cut, ``leaked_count``."""
+        if not leaked_spans:
+            return {}
+        fields: dict = {'leaked_spans': _bound_leaked_spans(leaked_spans)}
+        if len(leaked_spans) > _LEAKED_SPANS_MAX:
+            fields['leaked_count'] = len(leaked_spans)
+        return fields
+
+    @staticmethod
+    def _merge_into(existing: dict, *, highest_action: str, was_sent: bool,
+                    user_acknowledged: bool,
+                    leaked_spans: Optional[list[dict]] = None) -> dict:
+        """Merge a repeat hit into an existing row (see ``create``)."""
+        existing_action = existing.get('highest_action', 'allow')
+        updates = DLPEventModel._merged_fields(
+            existing,
+            highest_action=highest_action,
+            was_sent=was_sent,
+            user_acknowledged=user_acknowledged,
+            leaked_spans=leaked_spans,
+        )
+        if updates:
+            DLPEventModel.get_collection().update_one(
+                {'_id': existing['_id']}, {'$set': updates},
+            )
+            if 'highest_action' in updates:
+                DLPEventModel._update_stats(
+                    DLPStatsModel.shift_action, existing, existing_action,
+                    updates['highest_action'],
+                )
+            existing.update(updates)
+        return existing
+
+    @staticmethod
+    def _update_stats(fn, *args) -> None:
+        """Apply a stats-rollup write. Rollups are derived data — a failure
+        is logged and never fails the event write (rebuild with
+        ``scripts/backfill_dlp_stats.py``)."""
+        try:
+            fn(*args)
+        except Exception as exc:
+            logger.warning("DLP stats rollup update failed: %s", exc)
+
+    @staticmethod
+    def _build_doc(
+        *,
+        user_id,
+        workspace_id,
+        project_id,
+        source: str,
+        source_ref: dict,
+        matches: list[dict],
+        highest_action: str,
+        was_sent: bool,
+        text_sha256: str,
+        text_length: int,
+        user_acknowledged: bool = False,
+        status: str = 'open',
+        match_summaries: Optional[list[dict]] = None,
+        leaked_spans: Optional[list[dict]] = None,
+    ) -> dict:
+        doc = {
+            'user_id': _to_oid(user_id),
+            'workspace_id': _to_oid(workspace_id),
+            'project_id': _to_oid(project_id),  # None is valid
+            'source': source,
+            'source_ref': _sanitize_source_ref(source_ref),
+            'matches': matches or [],
+            'highest_action': highest_action,
+            'was_sent': bool(was_sent),
+            'user_acknowledged': bool(user_acknowledged),
+            'text_sha256': str(text_sha256),
+            'text_length': int(text_length),
+            'status': status,
+            'reviewed_by': None,
+            'reviewed_at': None,
+            'review_note': None,
+            'created_at': datetime.utcnow(),
+        }
+
+        if match_summaries:
+            doc['match_summaries'] = match_summaries
+        doc.update(DLPEventModel._leak_fields(leaked_spans))
+        return doc
+
     @staticmethod
     def create(
         *,
@@ -197,6 +365,8 @@ class DLPEventModel:
         text_length: int,
         user_acknowledged: bool = False,
         status: str = 'open',
+        match_summaries: Optional[list[dict]] = None,
+        leaked_spans: Optional[list[dict]] = None,
     ) -> dict:
         """Insert a new DLP event and return the inserted document.
 
@@ -207,12 +377,7 @@ class DLPEventModel:
         "pre-flight only"). ``user_acknowledged`` is OR-merged for the same
         reason. The existing row is returned (with merged fields applied).
         """
-        if source not in VALID_SOURCES:
-            raise ValueError(f"Invalid source: {source!r}. Must be one of {VALID_SOURCES}")
-        if highest_action not in VALID_ACTIONS:
-            raise ValueError(f"Invalid highest_action: {highest_action!r}")
-        if status not in VALID_STATUSES:
-            raise ValueError(f"Invalid status: {status!r}")
+        DLPEventModel._validate(source, highest_action, status)
 
         col = DLPEventModel.get_collection()
 
@@ -229,58 +394,113 @@ class DLPEventModel:
         }
         existing = col.find_one(dedup_query, sort=[('created_at', DESCENDING)])
         if existing is not None:
-            # Merge permissively: was_sent True wins over False, ack True wins
-            # over False. highest_action takes the stronger of the two so
-            # downstream dashboards reflect the actual escalation. Matches
-            # untouched — the pre-flight match list is already the canonical
-            # snapshot for this text.
-            new_was_sent = bool(existing.get('was_sent', False)) or bool(was_sent)
-            new_ack = (
-                bool(existing.get('user_acknowledged', False))
-                or bool(user_acknowledged)
+            return DLPEventModel._merge_into(
+                existing,
+                highest_action=highest_action,
+                was_sent=was_sent,
+                user_acknowledged=user_acknowledged,
+                leaked_spans=leaked_spans,
             )
 
-            action_rank = {'allow': 0, 'warn': 1, 'require_confirm': 2, 'block': 3}
-            existing_action = existing.get('highest_action', 'allow')
-            new_action = highest_action if (
-                action_rank.get(highest_action, 0) > action_rank.get(existing_action, 0)
-            ) else existing_action
-
-            updates: dict = {}
-            if new_was_sent != existing.get('was_sent'):
-                updates['was_sent'] = new_was_sent
-            if new_ack != existing.get('user_acknowledged'):
-                updates['user_acknowledged'] = new_ack
-            if new_action != existing_action:
-                updates['highest_action'] = new_action
-            if updates:
-                col.update_one({'_id': existing['_id']}, {'$set': updates})
-                existing.update(updates)
-            return existing
-
-        doc = {
-            'user_id': _to_oid(user_id),
-            'workspace_id': _to_oid(workspace_id),
-            'project_id': _to_oid(project_id),  # None is valid
-            'source': source,
-            'source_ref': _sanitize_source_ref(source_ref),
-            'matches': matches or [],
-            'highest_action': highest_action,
-            'was_sent': bool(was_sent),
-            'user_acknowledged': bool(user_acknowledged),
-            'text_sha256': str(text_sha256),
-            'text_length': int(text_length),
-            'status': status,
-            'reviewed_by': None,
-            'reviewed_at': None,
-            'review_note': None,
-            'created_at': datetime.utcnow(),
-        }
-
+        doc = DLPEventModel._build_doc(
+            user_id=user_id,
+            workspace_id=workspace_id,
+            project_id=project_id,
+            source=source,
+            source_ref=source_ref,
+            matches=matches,
+            highest_action=highest_action,
+            was_sent=was_sent,
+            text_sha256=text_sha256,
+            text_length=text_length,
+            user_acknowledged=user_acknowledged,
+            status=status,
+            match_summaries=match_summaries,
+            leaked_spans=leaked_spans,
+        )
         result = col.insert_one(doc)
         doc['_id'] = result.inserted_id
+        DLPEventModel._update_stats(DLPStatsModel.record_events, [doc])
         return doc
 
+    @staticmethod
+    def create_many(events: list[dict]) -> list[dict]:
+        """Persist a batch of events (``create`` kwargs each) in one round trip.
+
+        Used by ``dlp_gate.gate_many``, whose items are distinct places of
+        one action (workflow nodes, meeting artifacts) that may share a text.
+        Dedup is therefore per item: an item merges into a row inside the
+        dedup window with the same ``(user_id, workspace_id, source,
+        text_sha256)`` *and* the same ``source_ref`` — a retried run, or a
+        repeat of the item within the batch — and otherwise gets its own row
+        with its own ``source_ref``. One ``find`` covers the dedup check for
+        the whole batch, one ``insert_many`` writes the new rows. Returns docs
+        in input order (merged items share their row).
+        """
+        if not events:
+            return []
+        for ev in events:
+            DLPEventModel._validate(
+                ev['source'], ev['highest_action'], ev.get('status', 'open'),
+            )
+
+        col = DLPEventModel.get_collection()
+        cutoff = datetime.utcnow() - timedelta(seconds=DLPEventModel._DEDUP_WINDOW_SECONDS)
+        keys = {
+            DLPEventModel._dedup_key(
+                ev['user_id'], ev['workspace_id'], ev['source'], ev['text_sha256'],
+            )
+            for ev in events
+        }
+        existing_by_key: dict[tuple, dict] = {}  # dedup key + ref key -> row
+        cursor = col.find(
+            {
+                '$or': [
+                    {'user_id': u, 'workspace_id': w, 'source': s, 'text_sha256': sha}
+                    for u, w, s, sha in keys
+                ],
+                'created_at': {'$gte': cutoff},
+            },
+            sort=[('created_at', DESCENDING)],
+        )
+        for row in cursor:
+            key = DLPEventModel._dedup_key(
+                row.get('user_id'), row.get('workspace_id'),
+                row.get('source'), row.get('text_sha256'),
+            ) + (DLPEventModel._ref_key(row.get('source_ref')),)
+            existing_by_key.setdefault(key, row)  # newest wins, as in create()
+
+        out: list[dict] = []
+        pending: dict[tuple, dict] = {}  # dedup key -> doc not yet inserted
+        for ev in events:
+            key = DLPEventModel._dedup_key(
+                ev['user_id'], ev['workspace_id'], ev['source'], ev['text_sha256'],
+            ) + (DLPEventModel._ref_key(ev.get('source_ref')),)
+            merge = dict(
+                highest_action=ev['highest_action'],
+                was_sent=ev['was_sent'],
+                user_acknowledged=ev.get('user_acknowledged', False),
+                leaked_spans=ev.get('leaked_spans'),
+            )
+            existing = existing_by_key.get(key)
+            if existing is not None:
+                out.append(DLPEventModel._merge_into(existing, **merge))
+            elif key in pending:
+                doc = pending[key]
+                doc.update(DLPEventModel._merged_fields(doc, **merge))
+                out.append(doc)
+            else:
+                pending[key] = DLPEventModel._build_doc(**ev)
+                out.append(pending[key])
+
+        if pending:
+            docs = list(pending.values())
+            result = col.insert_many(docs, ordered=True)
+            for doc, inserted_id in zip(docs, result.inserted_ids):
+                doc['_id'] = inserted_id
+            DLPEventModel._update_stats(DLPStatsModel.record_events, docs)
+        return out
+
     @staticmethod
     def find_by_id(event_id) -> Optional[dict]:
         return DLPEventModel.get_collection().find_one({'_id': _to_oid(event_id)})
@@ -412,6 +632,9 @@ class DLPEventModel:
         """
         Returns aggregation stats for a workspace over the last `days` days.
 
+        Scans raw events; the stats endpoint reads the ``DLPStatsModel``
+        rollups instead. Kept as the reference the rollups are checked against.
+
         Shape:
         {
             total: int,
@@ -0,0 +1,277 @@
+"""
+DLP stats rollups — per-workspace, per-day counters behind the DLP dashboards.
+
+``DLPEventModel.create`` / ``create_many`` bump these with ``$inc`` as events
+are written, so the stats endpoints read at most ``days`` small documents per
+workspace instead of re-aggregating raw ``dlp_events``.
+
+Document shape:
+    {
+      _id: "<workspace_id|none>:<YYYY-MM-DD>",
+      workspace_id: ObjectId | None,
+      day: 'YYYY-MM-DD',                 # UTC
+      total: int,                        # events
+      by_source:   {<source>: int},      # events
+      by_action:   {<highest_action>: int},
+      by_user:     {<user_id>: int},
+      by_severity: {<severity>: int},    # stored matches
+      by_rule:     {<rule_id>: int},     # stored matches
+      updated_at: datetime,
+    }
+
+Rule ids are user-defined for custom patterns, so map keys are escaped
+(``.`` and a leading ``$`` are not legal in field names).
+
+Backfill / rebuild from raw events: ``scripts/backfill_dlp_stats.py``.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+
+from app.extensions import mongo
+
+_MAP_FIELDS = ('by_source', 'by_action', 'by_user', 'by_severity', 'by_rule')
+
+
+def _to_oid(value) -> Optional[ObjectId]:
+    if value is None or isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(str(value))
+    except Exception:
+        return None
+
+
+def _escape_key(key) -> str:
+    key = str(key).replace('%', '%25').replace('.', '%2E')
+    if key.startswith('$'):
+        key = '%24' + key[1:]
+    return key
+
+
+def _unescape_key(key: str) -> str:
+    return key.replace('%24', '$').replace('%2E', '.').replace('%25', '%')
+
+
+def _day(value: datetime) -> str:
+    return value.strftime('%Y-%m-%d')
+
+
+class DLPStatsModel:
+    collection_name = 'dlp_stats_daily'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[DLPStatsModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        col = DLPStatsModel.get_collection()
+        col.create_index([('workspace_id', ASCENDING), ('day', ASCENDING)])
+        col.create_index('day')
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bucket_id(workspace_id, day: str) -> str:
+        return f"{workspace_id or 'none'}:{day}"
+
+    @staticmethod
+    def _increments(event: dict) -> dict:
+        """The ``$inc`` document one event contributes to its day bucket."""
+        inc: Counter = Counter()
+        inc['total'] += 1
+        inc[f"by_source.{_escape_key(event.get('source'))}"] += 1
+        inc[f"by_action.{_escape_key(event.get('highest_action'))}"] += 1
+        inc[f"by_user.{_escape_key(event.get('user_id'))}"] += 1
+        for m in event.get('matches') or []:
+            if m.get('severity'):
+                inc[f"by_severity.{_escape_key(m['severity'])}"] += 1
+            if m.get('rule_id'):
+                inc[f"by_rule.{_escape_key(m['rule_id'])}"] += 1
+        return dict(inc)
+
+    @staticmethod
+    def _update(event: dict, inc: dict) -> UpdateOne:
+        created_at = event.get('created_at') or datetime.utcnow()
+        day = _day(created_at)
+        workspace_id = _to_oid(event.get('workspace_id'))
+        return UpdateOne(
+            {'_id': DLPStatsModel._bucket_id(workspace_id, day)},
+            {
+                '$inc': inc,
+                '$set': {'updated_at': datetime.utcnow()},
+                '$setOnInsert': {'workspace_id': workspace_id, 'day': day},
+            },
+            upsert=True,
+        )
+
+    @staticmethod
+    def record_events(events: Iterable[dict]) -> None:
+        """Count freshly inserted event docs into their day buckets."""
+        ops = [
+            DLPStatsModel._update(ev, DLPStatsModel._increments(ev))
+            for ev in events
+        ]
+        if ops:
+            DLPStatsModel.get_collection().bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def shift_action(event: dict, old_action: str, new_action: str) -> None:
+        """Move one event between ``by_action`` counters (dedup-merge upgrade)."""
+        if old_action == new_action:
+            return
+        DLPStatsModel.get_collection().bulk_write([DLPStatsModel._update(event, {
+            f"by_action.{_escape_key(old_action)}": -1,
+            f"by_action.{_escape_key(new_action)}": 1,
+        })])
+
+    @staticmethod
+    def rebuild(since: Optional[datetime] = None) -> int:
+        """Recompute buckets from raw ``dlp_events`` (all, or from ``since``).
+
+        Buckets on or after ``since``'s day are replaced wholesale, so the
+        rebuild is idempotent. Each bucket is swapped in place (upsert), and
+        buckets left without events are removed afterwards, so dashboards
+        never read a half-empty range while it runs. Returns the number of
+        buckets written.
+        """
+        events = mongo.db['dlp_events']
+        query: dict = {}
+        if since is not None:
+            since = datetime(since.year, since.month, since.day)
+            query['created_at'] = {'$gte': since}
+
+        buckets: dict[str, dict] = {}
+        projection = {
+            'workspace_id': 1, 'user_id': 1, 'source': 1, 'highest_action': 1,
+            'created_at': 1, 'matches.severity': 1, 'matches.rule_id': 1,
+        }
+        for ev in events.find(query, projection):
+            created_at = ev.get('created_at') or datetime.utcnow()
+            workspace_id = ev.get('workspace_id')
+            key = DLPStatsModel._bucket_id(workspace_id, _day(created_at))
+            bucket = buckets.setdefault(key, {
+                '_id': key,
+                'workspace_id': workspace_id,
+                'day': _day(created_at),
+                'total': 0,
+                **{f: {} for f in _MAP_FIELDS},
+            })
+            for path, n in DLPStatsModel._increments(ev).items():
+                if path == 'total':
+                    bucket['total'] += n
+                    continue
+                field, sub = path.split('.', 1)
+                bucket[field][sub] = bucket[field].get(sub, 0) + n
+
+        col = DLPStatsModel.get_collection()
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)  # BSON precision
+        # Every field is set, so each bucket is replaced as one write.
+        ops = [
+            UpdateOne(
+                {'_id': key},
+                {'$set': {**{k: v for k, v in b.items() if k != '_id'}, 'updated_at': now}},
+                upsert=True,
+            )
+            for key, b in buckets.items()
+        ]
+        for start in range(0, len(ops), 1000):
+            col.bulk_write(ops[start:start + 1000], ordered=False)
+        # Whatever wasn't rewritten (or bumped live since) has no events left.
+        stale: dict = {'updated_at': {'$not': {'$gte': now}}}
+        if since is not None:
+            stale['day'] = {'$gte': _day(since)}
+        col.delete_many(stale)
+        return len(ops)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _merge(query: dict, days: int) -> tuple[dict, list[dict]]:
+        since_day = _day(datetime.utcnow() - timedelta(days=days))
+        query = {**query, 'day': {'$gte': since_day}}
+        totals: dict = {f: Counter() for f in _MAP_FIELDS}
+        totals['total'] = 0
+        per_workspace: Counter = Counter()
+        daily: Counter = Counter()
+        for doc in DLPStatsModel.get_collection().find(query):
+            totals['total'] += doc.get('total', 0)
+            daily[doc['day']] += doc.get('total', 0)
+            per_workspace[doc.get('workspace_id')] += doc.get('total', 0)
+            for field in _MAP_FIELDS:
+                for key, n in (doc.get(field) or {}).items():
+                    totals[field][_unescape_key(key)] += n
+        totals['per_workspace'] = per_workspace
+        return totals, [
+            {'date': day, 'count': count}
+            for day, count in sorted(daily.items()) if count
+        ]
+
+    @staticmethod
+    def _shape(totals: dict, daily: list[dict]) -> dict:
+        from app.models.dlp_event import VALID_SEVERITIES, VALID_SOURCES
+
+        return {
+            'total': totals['total'],
+            'by_severity': {s: totals['by_severity'].get(s, 0) for s in VALID_SEVERITIES},
+            'by_source': {s: totals['by_source'].get(s, 0) for s in VALID_SOURCES},
+            'top_users': [
+                {'user_id': uid, 'count': n}
+                for uid, n in totals['by_user'].most_common(10) if n > 0
+            ],
+            'top_rules': [
+                {'rule_id': rid, 'count': n}
+                for rid, n in totals['by_rule'].most_common(10) if n > 0
+            ],
+            'daily': daily,
+        }
+
+    @staticmethod
+    def workspace_stats(workspace_id, days: int = 7) -> dict:
+        """Same shape as ``DLPEventModel.aggregate_workspace_stats``.
+
+        Day-granular: the window covers whole UTC days back to ``days`` ago.
+        """
+        totals, daily = DLPStatsModel._merge(
+            {'workspace_id': _to_oid(workspace_id)}, days,
+        )
+        return DLPStatsModel._shape(totals, daily)
+
+    @staticmethod
+    def global_stats(days: int = 7) -> dict:
+        """Same shape as ``DLPEventModel.aggregate_global_stats``."""
+        totals, daily = DLPStatsModel._merge({}, days)
+        out = DLPStatsModel._shape(totals, daily)
+        out['by_action'] = {
+            a: totals['by_action'].get(a, 0)
+            for a in ('block', 'require_confirm', 'warn')
+        }
+
+        top = [(wid, n) for wid, n in totals['per_workspace'].most_common(10) if n > 0]
+        names = {
+            ws['_id']: ws.get('name', '')
+            for ws in mongo.db['workspaces'].find(
+                {'_id': {'$in': [wid for wid, _ in top if wid is not None]}},
+                {'name': 1},
+            )
+        }
+        out['top_workspaces'] = [
+            {'workspace_id': str(wid), 'name': names.get(wid, ''), 'count': n}
+            for wid, n in top
+        ]
+        # Key order matches aggregate_global_stats.
+        return {k: out[k] for k in (
+            'total', 'by_severity', 'by_source', 'by_action',
+            'top_users', 'top_rules', 'daily', 'top_workspaces',
+        )}
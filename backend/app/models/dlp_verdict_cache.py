@@ -0,0 +1,69 @@
+"""
+DLP smart-scan verdict cache — shared across gunicorn workers, the bot and
+the scheduler so the same text is classified once per policy + language.
+
+Document shape:
+    {
+      _id: str,            # "<text_sha256>:<policy_hash>:<lang>"
+      text_sha256: str,
+      policy_hash: str,
+      lang: str,
+      verdict: { category, reason },
+      expires_at: datetime,   # TTL index — Mongo reaps expired rows
+      created_at: datetime,
+    }
+
+The in-process LRU in ``dlp_service`` fronts this collection; callers treat
+every failure here as a cache miss (smart scan is fail-open).
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.extensions import mongo
+
+
+class DLPVerdictCacheModel:
+    collection_name = 'dlp_verdict_cache'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[DLPVerdictCacheModel.collection_name]
+
+    @staticmethod
+    def create_indexes():
+        col = DLPVerdictCacheModel.get_collection()
+        col.create_index('expires_at', expireAfterSeconds=0)  # TTL
+
+    @staticmethod
+    def make_key(text_sha256: str, policy_hash: str, lang: str) -> str:
+        return f"{text_sha256}:{policy_hash}:{lang}"
+
+    @staticmethod
+    def get(key: str) -> Optional[dict]:
+        """Return the cached verdict, or None when missing or expired.
+
+        The TTL monitor only runs about once a minute, so expiry is also
+        checked here.
+        """
+        doc = DLPVerdictCacheModel.get_collection().find_one(
+            {'_id': key, 'expires_at': {'$gt': datetime.utcnow()}},
+            {'verdict': 1},
+        )
+        return doc.get('verdict') if doc else None
+
+    @staticmethod
+    def set(key: str, verdict: dict, *, ttl_seconds: int) -> None:
+        text_sha256, policy_hash, lang = (key.split(':', 2) + ['', ''])[:3]
+        now = datetime.utcnow()
+        DLPVerdictCacheModel.get_collection().update_one(
+            {'_id': key},
+            {'$set': {
+                'text_sha256': text_sha256,
+                'policy_hash': policy_hash,
+                'lang': lang,
+                'verdict': verdict,
+                'expires_at': now + timedelta(seconds=ttl_seconds),
+                'created_at': now,
+            }},
+            upsert=True,
+        )
@@ -26,6 +26,8 @@ class FolderModel:
         # Project-scoped compound indexes.
         collection.create_index([('user_id', 1), ('project_id', 1), ('parent_id', 1)])
         collection.create_index([('user_id', 1), ('project_id', 1), ('order', 1)])
+        # Newest-write lookups for conditional GETs (app/utils/http_cache.py).
+        collection.create_index([('user_id', 1), ('updated_at', -1)])
 
     @staticmethod
     def create(user_id, name, color='#5c9aed', icon=None, parent_id=None,
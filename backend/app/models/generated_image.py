@@ -1,15 +1,24 @@
 from datetime import datetime
 from bson import ObjectId
 from app.extensions import mongo
+from app.utils import pagination
 
 
 class GeneratedImageModel:
     """Model for AI-generated images"""
 
+    SORT = pagination.sort_spec('created_at', -1)
+
     @staticmethod
     def get_collection():
         return mongo.db.generated_images
 
+    @staticmethod
+    def create_indexes():
+        GeneratedImageModel.get_collection().create_index(
+            [('user_id', 1), ('created_at', -1), ('_id', -1)]
+        )
+
     @staticmethod
     def create(user_id, prompt, model_id, image_data, negative_prompt='', settings=None, metadata=None):
         doc = {
@@ -35,11 +44,15 @@ class GeneratedImageModel:
         return GeneratedImageModel.get_collection().find_one({'_id': ObjectId(image_id)})
 
     @staticmethod
-    def find_by_user(user_id, skip=0, limit=20, favorites_only=False):
+    def find_by_user(user_id, skip=0, limit=20, favorites_only=False, cursor=None):
         query = {'user_id': ObjectId(user_id)}
         if favorites_only:
             query['is_favorite'] = True
-        return list(GeneratedImageModel.get_collection().find(query).sort('created_at', -1).skip(skip).limit(limit))
+        query = pagination.apply_cursor(query, GeneratedImageModel.SORT, cursor)
+        results = GeneratedImageModel.get_collection().find(query).sort(GeneratedImageModel.SORT)
+        if not cursor:
+            results = results.skip(skip)
+        return list(results.limit(limit))
 
     @staticmethod
     def count_by_user(user_id, favorites_only=False):
@@ -52,6 +52,8 @@ class KnowledgeFolderModel:
         collection.create_index([('user_id', 1), ('order', 1)])
         # Project-scoped index for project listings.
         collection.create_index([('project_id', 1), ('order', 1)])
+        # Newest-write lookups for conditional GETs (app/utils/http_cache.py).
+        collection.create_index([('user_id', 1), ('updated_at', -1)])
 
         # Drop legacy UNIQUE (user_id, name) if it still exists. The new
         # constraint lives on (scope_key, name).
@@ -2,6 +2,8 @@ from datetime import datetime
 from bson import ObjectId
 from pymongo.errors import OperationFailure
 from app.extensions import mongo
+from app.services import semantic_search
+from app.utils import pagination
 
 
 # Sentinel string the route layer translates `?project_id=null` into. Lets
@@ -14,6 +16,7 @@ class KnowledgeItemModel:
     """Model for Knowledge Vault items - saved snippets from chat/arena/debate."""
 
     collection_name = 'knowledge_items'
+    SORT = pagination.sort_spec('created_at', -1)
 
     @staticmethod
     def get_collection():
@@ -25,12 +28,16 @@ class KnowledgeItemModel:
         collection = KnowledgeItemModel.get_collection()
         # Compound index for user queries sorted by date
         collection.create_index([('user_id', 1), ('created_at', -1)])
+        # Same order with the ``_id`` tiebreaker keyset cursors page on.
+        collection.create_index([('user_id', 1), ('created_at', -1), ('_id', -1)])
         # Compound index for tag filtering
         collection.create_index([('user_id', 1), ('tags', 1)])
         # Compound index for folder filtering
         collection.create_index([('user_id', 1), ('folder_id', 1), ('created_at', -1)])
         # Project-scoped index — additive, legacy ones above untouched.
         collection.create_index([('project_id', 1), ('created_at', -1)])
+        # Newest-write lookups for conditional GETs (app/utils/http_cache.py).
+        collection.create_index([('user_id', 1), ('updated_at', -1)])
         # Text index for full-text search.
         # Pin language to 'none' so Persian docs (which may carry
         # language='fa'/'fas') don't trip Mongo's "language override unsupported"
@@ -163,12 +170,14 @@ class KnowledgeItemModel:
 
         result = KnowledgeItemModel.get_collection().insert_one(doc)
         doc['_id'] = result.inserted_id
+        semantic_search.enqueue('knowledge', doc['_id'])
         return doc
 
     @staticmethod
     def find_by_user(user_id: str, page: int = 1, limit: int = 20,
                      tag: str = None, favorite_only: bool = False,
-                     folder_id: str = None, project_id=None) -> tuple:
+                     folder_id: str = None, project_id=None,
+                     cursor: str = None, with_total: bool = True) -> tuple:
         """
         List user's knowledge items with pagination and filtering.
 
@@ -186,6 +195,8 @@ class KnowledgeItemModel:
             favorite_only: If True, only return favorites
             folder_id: Optional folder ID to filter by ('root' for unfiled items)
             project_id: Optional project filter
+            cursor: Keyset cursor over ``SORT``; replaces ``page``
+            with_total: Count matching items (``None`` total when False)
 
         Returns:
             Tuple of (items list, total count)
@@ -216,12 +227,15 @@ class KnowledgeItemModel:
             query['project_id'] = project_id
 
         collection = KnowledgeItemModel.get_collection()
-        total = collection.count_documents(query)
+        total = collection.count_documents(query) if with_total else None
 
-        skip = (page - 1) * limit
-        cursor = collection.find(query).sort('created_at', -1).skip(skip).limit(limit)
+        results = collection.find(
+            pagination.apply_cursor(query, KnowledgeItemModel.SORT, cursor)
+        ).sort(KnowledgeItemModel.SORT)
+        if not cursor:
+            results = results.skip((page - 1) * limit)
 
-        return list(cursor), total
+        return list(results.limit(limit)), total
 
     @staticmethod
     def find_by_id(item_id: str) -> dict:
@@ -279,6 +293,8 @@ class KnowledgeItemModel:
             {'_id': item_id, 'user_id': user_id},
             {'$set': update_data}
         )
+        if result.modified_count and ('title' in update_data or 'notes' in update_data):
+            semantic_search.enqueue('knowledge', item_id)
 
         return result.modified_count > 0
 
@@ -302,6 +318,8 @@ class KnowledgeItemModel:
         result = KnowledgeItemModel.get_collection().delete_one(
             {'_id': item_id, 'user_id': user_id}
         )
+        if result.deleted_count:
+            semantic_search.remove([item_id])
 
         return result.deleted_count > 0
 
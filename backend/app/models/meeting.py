@@ -7,6 +7,8 @@ _id: UUID4 string (NOT ObjectId — matches upstream schema for cross-system ref
 Document schema:
   _id                 str   (UUID4)
   owner_id            ObjectId
+  workspace_id        ObjectId | None   (owner's active workspace at upload;
+                                         DLP policy + event attribution)
   title               str | None
   status              'uploaded' | 'transcribing' | 'summarizing' | 'done' | 'failed'
   original_filename   str
@@ -85,7 +87,8 @@ class MeetingModel:
 
         Required data keys: original_filename, audio_path.
         Optional: title, status, language, duration_s, num_speakers, meeting_brief,
-                  series_id, speakers, _id (UUID4 string — auto-generated if absent).
+                  series_id, speakers, workspace_id,
+                  _id (UUID4 string — auto-generated if absent).
 
         Returns the inserted _id (UUID4 string).
         """
@@ -109,6 +112,9 @@ class MeetingModel:
         doc = {
             '_id': meeting_id,
             'owner_id': ObjectId(owner_id),
+            'workspace_id': (
+                ObjectId(str(data['workspace_id'])) if data.get('workspace_id') else None
+            ),
             'title': data.get('title'),
             'status': status,
             'original_filename': data['original_filename'],
@@ -13,15 +13,20 @@ Document schema:
   words_json   list[{text, start, end, type, speaker_id}]
   language_code str  default 'fas'
   created_at   datetime (UTC, aware)
+  compressed   {field: codec}  (only when one of the three text/JSON fields
+               is stored compressed — see app/utils/field_compression.py;
+               reads through this model decode them)
 """
 
 from datetime import datetime, timezone
 
 from app.extensions import mongo
+from app.utils import field_compression
 
 
 class MeetingTranscriptModel:
     collection_name = 'meeting_transcripts'
+    COMPRESSED_FIELDS = ('raw_json', 'plain_text', 'words_json')
 
     @staticmethod
     def get_collection():
@@ -59,7 +64,7 @@ class MeetingTranscriptModel:
         }
         MeetingTranscriptModel.get_collection().replace_one(
             {'_id': meeting_id},
-            doc,
+            field_compression.pack(doc, MeetingTranscriptModel.COMPRESSED_FIELDS),
             upsert=True,
         )
         return meeting_id
@@ -68,7 +73,10 @@ class MeetingTranscriptModel:
     def find_by_id(meeting_id: str) -> dict | None:
         if not meeting_id:
             return None
-        return MeetingTranscriptModel.get_collection().find_one({'_id': meeting_id})
+        return field_compression.inflate(
+            MeetingTranscriptModel.get_collection().find_one({'_id': meeting_id}),
+            MeetingTranscriptModel.COMPRESSED_FIELDS,
+        )
 
     @staticmethod
     def find_by_meeting(meeting_id: str) -> dict | None:
@@ -82,7 +90,7 @@ class MeetingTranscriptModel:
             return False
         result = MeetingTranscriptModel.get_collection().update_one(
             {'_id': meeting_id},
-            {'$set': data},
+            field_compression.pack_update({'$set': dict(data)}, MeetingTranscriptModel.COMPRESSED_FIELDS),
         )
         return result.matched_count > 0
 
@@ -1,36 +1,137 @@
-from datetime import datetime
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
 from bson import ObjectId
-from pymongo import ReturnDocument
 from pymongo.errors import OperationFailure
 from app.extensions import mongo
+from app.models.activity_counter import ActivityCounterModel
+from app.models.message_search import MessageSearchModel
+from app.services import semantic_search
+from app.utils import field_compression, pagination
+
+# Marker (and resume checkpoint) of the legacy ``branch_id`` backfill, see
+# :meth:`MessageModel.backfill_branch_ids`.
+_MIGRATIONS = 'migrations'
+_BRANCH_BACKFILL_ID = 'messages.branch_id'
+# Per-process view of the marker: once seen it stays set; a miss is re-read
+# at most every ``_BRANCH_RECHECK_SECONDS``.
+_BRANCH_RECHECK_SECONDS = 60
+_branch_backfill_cache = {'done': False, 'checked_at': 0.0}
+
+
+def invalidate_branch_backfill_cache() -> None:
+    """Forget the cached backfill flag (tests that drop the collection)."""
+    _branch_backfill_cache.update(done=False, checked_at=0.0)
+
+
+# ``seq`` of rows written before every message carried one; it sorts them
+# first within their millisecond, as a missing ``seq`` does (see :func:`_order`
+# and :meth:`MessageModel.backfill_seq`).
+LEGACY_SEQ = -1
+_SEQ_BACKFILL_ID = 'messages.seq'
+
+# Hybrid logical clock for message positions. ``created_at`` is the wall
+# clock in whole milliseconds, never behind the last one this process
+# handed out; ``seq`` orders messages inside one millisecond:
+#
+#     seq = logical << _NODE_BITS | node
+#
+# ``logical`` counts messages this process stamped in that millisecond and
+# ``node`` is a random per-process id, so two workers writing to the same
+# conversation in the same millisecond still get distinct, stable positions
+# (``_id`` breaks the remaining 1-in-65536 tie). Nothing is read or written
+# to allocate one.
+_NODE_BITS = 16
+_clock_lock = threading.Lock()
+_clock = {'ms': 0, 'logical': 0, 'node': None, 'pid': None}
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _tick():
+    """Next ``(created_at, seq)`` from this process's clock."""
+    now_ms = time.time_ns() // 1_000_000
+    with _clock_lock:
+        if _clock['pid'] != os.getpid():  # forked worker: fresh node id
+            _clock.update(pid=os.getpid(), node=random.getrandbits(_NODE_BITS))
+        if now_ms > _clock['ms']:
+            _clock.update(ms=now_ms, logical=0)
+        else:  # same millisecond, or the wall clock stepped back
+            _clock['logical'] += 1
+        ms, logical, node = _clock['ms'], _clock['logical'], _clock['node']
+    return _EPOCH + timedelta(milliseconds=ms), logical << _NODE_BITS | node
+
+
+def _order(position):
+    """Sort key for a ``(created_at, seq)`` position; a missing ``seq``
+    sorts first, as it does in Mongo."""
+    at, seq = position
+    return at, -1 if seq is None else seq
 
 
 class MessageModel:
     collection_name = 'messages'
+    # Reading order; ``_id`` makes it total for keyset cursors.
+    SORT = [('created_at', 1), ('seq', 1), ('_id', 1)]
+    # Stored compressed when large (app/utils/field_compression.py); the
+    # text index reads SEARCH_FIELD for those rows.
+    COMPRESSED_FIELDS = ('content',)
+    SEARCH_FIELD = 'search_terms'
 
     @staticmethod
     def get_collection():
         return mongo.db[MessageModel.collection_name]
 
+    @staticmethod
+    def _pack(doc):
+        """``doc`` with large fields compressed for storage (when enabled)."""
+        return field_compression.pack(doc, MessageModel.COMPRESSED_FIELDS, MessageModel.SEARCH_FIELD)
+
+    @staticmethod
+    def inflate(doc):
+        """Decode a stored message in place; every read that hands
+        ``content`` on goes through this."""
+        return field_compression.inflate(doc, MessageModel.COMPRESSED_FIELDS, MessageModel.SEARCH_FIELD)
+
+    @staticmethod
+    def pack_update(update):
+        """``update`` with any new ``content`` stored the way :meth:`_pack`
+        would store it."""
+        return field_compression.pack_update(
+            update, MessageModel.COMPRESSED_FIELDS, MessageModel.SEARCH_FIELD,
+        )
+
     @staticmethod
     def create_indexes():
         """Create necessary indexes"""
         collection = MessageModel.get_collection()
         collection.create_index([('conversation_id', 1), ('created_at', 1)])
-        collection.create_index([('conversation_id', 1), ('branch_id', 1), ('created_at', 1)])
-        # P1.29: secondary deterministic ordering by ``seq`` (monotonic
-        # per-conversation counter) so same-millisecond inserts in branched
-        # threads sort consistently across machines.
+        # Branch reads are an equality on ``branch_id`` plus the reading
+        # order, so this one index serves them without a blocking sort; it
+        # supersedes the older ``(conversation_id, branch_id, created_at)``.
+        collection.create_index([
+            ('conversation_id', 1), ('branch_id', 1), ('created_at', 1), ('seq', 1), ('_id', 1),
+        ])
+        try:
+            collection.drop_index('conversation_id_1_branch_id_1_created_at_1')
+        except OperationFailure:
+            pass
+        # P1.29: secondary deterministic ordering by ``seq`` (see
+        # :func:`_tick`) so same-millisecond inserts in branched threads
+        # sort consistently across machines.
         collection.create_index([
             ('conversation_id', 1), ('created_at', 1), ('seq', 1),
         ])
         # Text index: pin language to 'none' so Persian docs (which may carry
         # language='fa'/'fas') don't trip Mongo's "language override unsupported"
         # error — Mongo ships no Persian stemmer. See meeting.py for the same
-        # pattern. IndexOptionsConflict (85) is recovered by drop-and-recreate.
+        # pattern. IndexOptionsConflict (85) is recovered by drop-and-recreate,
+        # which also replaces the older content-only index.
+        text_keys = [('content', 'text'), (MessageModel.SEARCH_FIELD, 'text')]
         try:
             collection.create_index(
-                [('content', 'text')],
+                text_keys,
                 default_language='none',
                 language_override='_no_lang_',
             )
@@ -43,39 +144,13 @@ class MessageModel:
                         collection.drop_index(idx['name'])
                         break
                 collection.create_index(
-                    [('content', 'text')],
+                    text_keys,
                     default_language='none',
                     language_override='_no_lang_',
                 )
             else:
                 raise
 
-    @staticmethod
-    def _next_seq(conversation_id) -> int:
-        """Allocate the next per-conversation ``seq`` integer.
-
-        P1.29: same-millisecond inserts (and edits/regenerates that touch
-        many rows back-to-back) gave Mongo no stable tiebreaker beyond
-        document ``_id``. We piggyback on ``ConversationModel``'s
-        ``message_count`` $inc using a thin standalone increment that does
-        NOT touch ``token_count`` or ``last_message_at`` (those are still
-        updated by ``increment_message_count`` at message-creation
-        completion).
-        """
-        if isinstance(conversation_id, str):
-            conversation_id = ObjectId(conversation_id)
-        # findAndModify returning post-image so we get the new counter atomically.
-        res = mongo.db['conversations'].find_one_and_update(
-            {'_id': conversation_id},
-            {'$inc': {'seq_counter': 1}},
-            return_document=ReturnDocument.AFTER,
-            upsert=False,
-            projection={'seq_counter': 1},
-        )
-        if not res:
-            return 0
-        return int(res.get('seq_counter') or 0)
-
     @staticmethod
     def create(conversation_id, role, content, attachments=None, metadata=None, branch_id='main'):
         """Create a new message"""
@@ -88,15 +163,21 @@ class MessageModel:
             'content': content,
             'attachments': attachments or [],
             'metadata': metadata or {},
-            'branch_id': branch_id,
+            # Every row names its branch: reads match 'main' exactly once
+            # the legacy backfill has run (see :meth:`_own_clause`).
+            'branch_id': branch_id or 'main',
             'is_error': False,
             'error_message': None,
-            'created_at': datetime.utcnow(),
-            'seq': MessageModel._next_seq(conversation_id),
         }
+        message_doc['created_at'], message_doc['seq'] = _tick()
 
-        result = MessageModel.get_collection().insert_one(message_doc)
+        result = MessageModel.get_collection().insert_one(MessageModel._pack(dict(message_doc)))
         message_doc['_id'] = result.inserted_id
+        ActivityCounterModel.record(
+            'messages', message_doc['created_at'], model=message_doc['metadata'].get('model_id'),
+        )
+        MessageSearchModel.index_messages([message_doc])
+        semantic_search.enqueue('message', message_doc['_id'])
         return message_doc
 
     @staticmethod
@@ -145,82 +226,98 @@ class MessageModel:
             'content': '',
             'attachments': [],
             'metadata': {'model_id': model_id},
-            'branch_id': branch_id,
+            'branch_id': branch_id or 'main',
             'is_error': True,
             'error_message': error_message,
-            'created_at': datetime.utcnow()
         }
+        message_doc['created_at'], message_doc['seq'] = _tick()
 
         result = MessageModel.get_collection().insert_one(message_doc)
         message_doc['_id'] = result.inserted_id
+        ActivityCounterModel.record('messages', message_doc['created_at'], model=model_id)
         return message_doc
 
     @staticmethod
-    def find_by_conversation(conversation_id, skip=0, limit=100, branch_id=None):
+    def find_by_conversation(conversation_id, skip=0, limit=100, branch_id=None, cursor=None):
         """Get messages for a conversation, optionally filtered by branch.
 
+        A branch's view includes the prefix it inherits from its parent
+        branches (see :meth:`_lineage`).
+
         P1.29: secondary sort by ``seq`` so same-millisecond inserts in
         branched threads order deterministically. Legacy rows without
         ``seq`` sort first (Mongo treats missing as -infinity for asc).
+
+        ``cursor`` (over :attr:`SORT`) replaces ``skip`` with a keyset range.
         """
         if isinstance(conversation_id, str):
             conversation_id = ObjectId(conversation_id)
 
-        query = {'conversation_id': conversation_id}
         if branch_id is not None:
-            # Match messages with this branch_id OR messages without branch_id (legacy)
-            # Legacy messages (without branch_id) are treated as 'main' branch
-            if branch_id == 'main':
-                query['$or'] = [
-                    {'branch_id': 'main'},
-                    {'branch_id': {'$exists': False}}
-                ]
-            else:
-                query['branch_id'] = branch_id
+            query = MessageModel._lineage_query(conversation_id, branch_id)
+        else:
+            query = {'conversation_id': conversation_id}
+        query = pagination.apply_cursor(query, MessageModel.SORT, cursor)
 
-        cursor = (
+        results = MessageModel.get_collection().find(query).sort(MessageModel.SORT)
+        if not cursor:
+            results = results.skip(skip)
+
+        return [MessageModel.inflate(m) for m in results.limit(limit)]
+
+    @staticmethod
+    def iter_by_conversation(conversation_id, branch_id='main', projection=None, batch_size=200):
+        """Cursor over ``branch_id``'s view in reading order, fetched
+        ``batch_size`` documents at a time — for exports, which must not
+        hold a whole conversation in memory. Rows come back as stored; pass
+        each through :meth:`inflate`."""
+        query = MessageModel._lineage_query(conversation_id, branch_id)
+        return (
             MessageModel.get_collection()
-            .find(query)
-            .sort([('created_at', 1), ('seq', 1)])
-            .skip(skip)
-            .limit(limit)
+            .find(query, projection)
+            .sort(MessageModel.SORT)
+            .batch_size(batch_size)
         )
 
-        return list(cursor)
-
     @staticmethod
     def find_by_id(message_id):
         """Find message by ID"""
         if isinstance(message_id, str):
             message_id = ObjectId(message_id)
-        return MessageModel.get_collection().find_one({'_id': message_id})
+        return MessageModel.inflate(MessageModel.get_collection().find_one({'_id': message_id}))
 
     @staticmethod
     def update_content(message_id, content):
         """Update message content (for streaming)"""
         if isinstance(message_id, str):
             message_id = ObjectId(message_id)
-        return MessageModel.get_collection().update_one(
+        result = MessageModel.get_collection().update_one(
             {'_id': message_id},
-            {'$set': {'content': content}}
+            MessageModel.pack_update({'$set': {'content': content}})
         )
+        MessageSearchModel.reindex([message_id])
+        semantic_search.enqueue('message', message_id)
+        return result
 
     @staticmethod
     def update_with_edit_history(message_id, content, edit_history):
         """Update message content and store edit history"""
         if isinstance(message_id, str):
             message_id = ObjectId(message_id)
-        return MessageModel.get_collection().update_one(
+        result = MessageModel.get_collection().update_one(
             {'_id': message_id},
-            {
+            MessageModel.pack_update({
                 '$set': {
                     'content': content,
                     'edit_history': edit_history,
                     'is_edited': True,
                     'edited_at': datetime.utcnow()
                 }
-            }
+            })
         )
+        MessageSearchModel.reindex([message_id])
+        semantic_search.enqueue('message', message_id)
+        return result
 
     @staticmethod
     def update_metadata(message_id, metadata):
@@ -237,6 +334,8 @@ class MessageModel:
         """Delete a message"""
         if isinstance(message_id, str):
             message_id = ObjectId(message_id)
+        MessageSearchModel.remove([message_id])
+        semantic_search.remove([message_id])
         return MessageModel.get_collection().delete_one({'_id': message_id})
 
     @staticmethod
@@ -244,6 +343,8 @@ class MessageModel:
         """Delete all messages in a conversation"""
         if isinstance(conversation_id, str):
             conversation_id = ObjectId(conversation_id)
+        MessageSearchModel.remove_conversations([conversation_id])
+        semantic_search.remove_conversations([conversation_id])
         return MessageModel.get_collection().delete_many({'conversation_id': conversation_id})
 
     @staticmethod
@@ -259,16 +360,11 @@ class MessageModel:
         if isinstance(conversation_id, str):
             conversation_id = ObjectId(conversation_id)
 
-        query = {'conversation_id': conversation_id, 'is_error': False}
         if branch_id is not None:
-            # Match messages with this branch_id OR messages without branch_id (legacy)
-            if branch_id == 'main':
-                query['$or'] = [
-                    {'branch_id': 'main'},
-                    {'branch_id': {'$exists': False}}
-                ]
-            else:
-                query['branch_id'] = branch_id
+            query = MessageModel._lineage_query(conversation_id, branch_id)
+        else:
+            query = {'conversation_id': conversation_id}
+        query['is_error'] = False
 
         # Get last N messages — P1.29: secondary sort by ``seq`` for deterministic
         # ordering when many messages share a millisecond timestamp.
@@ -279,7 +375,7 @@ class MessageModel:
             .limit(limit)
         )
 
-        messages = list(cursor)
+        messages = [MessageModel.inflate(m) for m in cursor]
         messages.reverse()  # Return in chronological order
         return messages
 
@@ -339,7 +435,7 @@ class MessageModel:
         ]
 
         results = list(MessageModel.get_collection().aggregate(pipeline))
-        return results
+        return [MessageModel.inflate(r) for r in results]
 
     @staticmethod
     def delete_after_message(conversation_id, message_id, branch_id=None):
@@ -354,27 +450,30 @@ class MessageModel:
         if not message:
             return 0
 
-        query = {
-            'conversation_id': conversation_id,
-            'created_at': {'$gt': message['created_at']}
-        }
+        position = MessageModel._position(message)
+        query = {'conversation_id': conversation_id, **MessageModel._after(position)}
         if branch_id is not None:
-            # Match messages with this branch_id OR messages without branch_id (legacy)
-            if branch_id == 'main':
-                query['$or'] = [
-                    {'branch_id': 'main'},
-                    {'branch_id': {'$exists': False}}
-                ]
-            else:
-                query['branch_id'] = branch_id
+            # Cutting into an inherited prefix: copy it in first so the
+            # rows to drop are the branch's own (the parent keeps its own).
+            lineage = MessageModel._lineage(conversation_id, branch_id)
+            if any(_order(position) < _order(bound) for _, bound in lineage[1:]):
+                MessageModel.materialize_branch(conversation_id, branch_id)
+            query.update(MessageModel._own_clause(branch_id))
+            # Branches forked from the rows about to go keep their copy.
+            MessageModel.detach_children(conversation_id, branch_id, since=position, inclusive=False)
 
         # Delete all messages after this one
-        result = MessageModel.get_collection().delete_many(query)
+        collection = MessageModel.get_collection()
+        doomed = [doc['_id'] for doc in collection.find(query, {'_id': 1})]
+        MessageSearchModel.remove(doomed)
+        semantic_search.remove(doomed)
+        result = collection.delete_many(query)
         return result.deleted_count
 
     @staticmethod
     def find_up_to(conversation_id, message_id, branch_id='main'):
-        """Get all messages up to and including a specific message in a branch"""
+        """Get all messages up to and including a specific message in a branch
+        (inherited prefix included)"""
         if isinstance(conversation_id, str):
             conversation_id = ObjectId(conversation_id)
         if isinstance(message_id, str):
@@ -385,18 +484,12 @@ class MessageModel:
         if not message:
             return []
 
-        # Build query with legacy support for main branch
-        query = {
-            'conversation_id': conversation_id,
-            'created_at': {'$lte': message['created_at']}
-        }
-        if branch_id == 'main':
-            query['$or'] = [
-                {'branch_id': 'main'},
-                {'branch_id': {'$exists': False}}
-            ]
-        else:
-            query['branch_id'] = branch_id
+        position = MessageModel._position(message)
+        lineage = [
+            (branch, position if bound is None or _order(position) < _order(bound) else bound)
+            for branch, bound in MessageModel._lineage(conversation_id, branch_id)
+        ]
+        query = MessageModel._lineage_query(conversation_id, branch_id, lineage=lineage)
 
         cursor = (
             MessageModel.get_collection()
@@ -404,28 +497,28 @@ class MessageModel:
             .sort([('created_at', 1), ('seq', 1)])
         )
 
-        return list(cursor)
+        return [MessageModel.inflate(m) for m in cursor]
 
     @staticmethod
-    def copy_to_branch(message, new_branch_id):
-        """Copy a message to a new branch.
+    def _branch_copy(message, new_branch_id):
+        """Document for a copy of ``message`` on ``new_branch_id``.
 
         P1.29: copied messages inherit the source ``seq`` so a branch
         retains the same relative order it had in its parent branch.
-        New messages appended to the branch will get fresh seqs from
-        ``_next_seq``.
+        New messages appended to the branch get fresh positions from
+        :func:`_tick`.
         """
-        # Create a copy of the message with the new branch_id
         message_doc = {
             'conversation_id': message['conversation_id'],
             'role': message['role'],
             'content': message['content'],
             'attachments': message.get('attachments', []),
             'metadata': message.get('metadata', {}),
-            'branch_id': new_branch_id,
+            'branch_id': new_branch_id or 'main',
             'is_error': message.get('is_error', False),
             'error_message': message.get('error_message'),
             'created_at': message['created_at'],  # Preserve original timestamp
+            'copied_from': message.get('copied_from') or message['_id'],
         }
         if 'seq' in message:
             message_doc['seq'] = message['seq']
@@ -437,19 +530,363 @@ class MessageModel:
             message_doc['edit_history'] = message['edit_history']
         if message.get('edited_at'):
             message_doc['edited_at'] = message['edited_at']
+        # A row copied as stored keeps its compressed content searchable.
+        for key in (field_compression.FLAG, MessageModel.SEARCH_FIELD):
+            if key in message:
+                message_doc[key] = message[key]
+        return message_doc
 
-        result = MessageModel.get_collection().insert_one(message_doc)
+    @staticmethod
+    def copy_to_branch(message, new_branch_id):
+        """Copy a message to a new branch."""
+        message_doc = MessageModel._branch_copy(message, new_branch_id)
+        result = MessageModel.get_collection().insert_one(MessageModel._pack(dict(message_doc)))
         message_doc['_id'] = result.inserted_id
+        MessageSearchModel.index_messages([message_doc])
         return message_doc
 
+    @staticmethod
+    def copy_to_conversation(messages, conversation_id, branch_id='main'):
+        """Copy ``messages`` (in order) onto ``branch_id`` of another
+        conversation, one ``insert_many`` and one search-index call per
+        batch of 500. Copies keep their source's position and
+        ``copied_from``, as branch copies do. Returns the copies."""
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        collection = MessageModel.get_collection()
+        copies = []
+        for start in range(0, len(messages), 500):
+            batch = [
+                {**MessageModel._branch_copy(m, branch_id), 'conversation_id': conversation_id}
+                for m in messages[start:start + 500]
+            ]
+            result = collection.insert_many([MessageModel._pack(dict(doc)) for doc in batch])
+            for doc, inserted_id in zip(batch, result.inserted_ids):
+                doc['_id'] = inserted_id
+            MessageSearchModel.index_messages(batch)
+            copies.extend(batch)
+        return copies
+
+    # ------------------------------------------------------------------
+    # Copy-on-write branches
+    #
+    # A branch created by ``create_branch`` stores only its fork point —
+    # ``parent_branch`` plus ``fork_at`` / ``fork_seq`` of the branch-point
+    # message — on its entry in ``conversation.branches``. Reads resolve the
+    # lineage and fetch the branch's own rows together with each ancestor's
+    # rows up to the fork point in one indexed ``$or`` query, so branching
+    # writes nothing to ``messages``.
+    #
+    # Branches from before this change (no ``fork_at``) hold a full copy of
+    # their prefix; their lineage stops at themselves and they read exactly
+    # as before. Writes that would change a prefix other branches still share
+    # copy it into those branches first (:meth:`detach_children`,
+    # :meth:`claim_for_write`), turning them into that same self-contained
+    # format.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _position(message):
+        """``(created_at, seq)`` of ``message`` — its place in the
+        ``created_at, seq`` order, at Mongo's millisecond precision."""
+        created_at = message['created_at']
+        created_at = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+        return created_at, message.get('seq')
+
+    @staticmethod
+    def _not_after(position):
+        """Filter for rows at or before ``position``."""
+        at, seq = position
+        if seq is None:
+            return {'created_at': {'$lte': at}}
+        # Rows without ``seq`` sort first within their millisecond.
+        return {'$or': [
+            {'created_at': {'$lt': at}},
+            {'created_at': at, 'seq': {'$lte': seq}},
+            {'created_at': at, 'seq': None},
+        ]}
+
+    @staticmethod
+    def _after(position):
+        """Filter for rows after ``position`` (complement of :meth:`_not_after`)."""
+        at, seq = position
+        if seq is None:
+            return {'created_at': {'$gt': at}}
+        return {'$or': [
+            {'created_at': {'$gt': at}},
+            {'created_at': at, 'seq': {'$gt': seq}},
+        ]}
+
+    @staticmethod
+    def fork_point(message):
+        """Fork fields for a branch created at ``message``."""
+        fork_at, fork_seq = MessageModel._position(message)
+        return {'fork_at': fork_at, 'fork_seq': fork_seq}
+
+    @staticmethod
+    def _own_clause(branch_id):
+        """Rows stored on ``branch_id`` (legacy rows without one are 'main'
+        until :meth:`backfill_branch_ids` has stamped them)."""
+        if branch_id == 'main' and not MessageModel.branch_ids_backfilled():
+            return {'branch_id': {'$in': ['main', None]}}
+        return {'branch_id': branch_id}
+
+    @staticmethod
+    def _branches(conversation_id):
+        conversation = mongo.db['conversations'].find_one(
+            {'_id': conversation_id}, {'branches': 1},
+        )
+        return (conversation or {}).get('branches') or []
+
+    @staticmethod
+    def _lineage(conversation_id, branch_id, branches=None):
+        """``[(branch_id, upper bound position or None), ...]`` from the
+        branch itself up through every copy-on-write ancestor."""
+        if branch_id == 'main':
+            return [('main', None)]
+        if branches is None:
+            branches = MessageModel._branches(conversation_id)
+        by_id = {b.get('id'): b for b in branches}
+        lineage, bound, seen = [], None, set()
+        current = branch_id
+        while current is not None and current not in seen:
+            seen.add(current)
+            lineage.append((current, bound))
+            branch = by_id.get(current) or {}
+            if branch.get('fork_at') is None:
+                break
+            fork = (branch['fork_at'], branch.get('fork_seq'))
+            bound = fork if bound is None else min(bound, fork, key=_order)
+            current = branch.get('parent_branch')
+        return lineage
+
+    @staticmethod
+    def _segment(branch_id, bound):
+        clause = MessageModel._own_clause(branch_id)
+        if bound is not None:
+            clause.update(MessageModel._not_after(bound))
+        return clause
+
+    @staticmethod
+    def _lineage_query(conversation_id, branch_id, lineage=None):
+        """Filter for every message visible on ``branch_id``."""
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        if lineage is None:
+            lineage = MessageModel._lineage(conversation_id, branch_id)
+        segments = [MessageModel._segment(b, bound) for b, bound in lineage]
+        if len(segments) == 1:
+            return {'conversation_id': conversation_id, **segments[0]}
+        return {'conversation_id': conversation_id, '$or': segments}
+
+    @staticmethod
+    def is_visible_on(conversation_id, branch_id, message):
+        """Whether ``message`` is part of ``branch_id``'s view."""
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        physical = message.get('branch_id') or 'main'
+        for ancestor, bound in MessageModel._lineage(conversation_id, branch_id):
+            if ancestor == physical:
+                return bound is None or _order(MessageModel._position(message)) <= _order(bound)
+        return False
+
+    @staticmethod
+    def materialize_branch(conversation_id, branch_id):
+        """Copy the prefix ``branch_id`` inherits into the branch itself and
+        drop its fork point. Returns the number of messages copied."""
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        lineage = MessageModel._lineage(conversation_id, branch_id)
+        if len(lineage) < 2:
+            return 0
+        collection = MessageModel.get_collection()
+        inherited = {
+            'conversation_id': conversation_id,
+            '$or': [MessageModel._segment(b, bound) for b, bound in lineage[1:]],
+        }
+        copied, batch = 0, []
+        for message in collection.find(inherited).sort([('created_at', 1), ('seq', 1)]):
+            batch.append(MessageModel._branch_copy(message, branch_id))
+            if len(batch) >= 500:
+                collection.insert_many(batch)
+                MessageSearchModel.index_messages(batch)
+                copied, batch = copied + len(batch), []
+        if batch:
+            collection.insert_many(batch)
+            MessageSearchModel.index_messages(batch)
+            copied += len(batch)
+        # Copies first, then the pointer: a concurrent read sees the prefix
+        # twice for a moment rather than not at all.
+        mongo.db['conversations'].update_one(
+            {'_id': conversation_id, 'branches.id': branch_id},
+            {'$unset': {'branches.$.fork_at': '', 'branches.$.fork_seq': ''}},
+        )
+        return copied
+
+    @staticmethod
+    def detach_children(conversation_id, branch_id, since=None, inclusive=True):
+        """Materialize every copy-on-write branch forked from ``branch_id``
+        at (unless ``inclusive`` is False) or after position ``since`` — all
+        of them when ``since`` is None. Call it before editing or deleting
+        rows of ``branch_id``."""
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        copied = 0
+        for branch in MessageModel._branches(conversation_id):
+            if branch.get('parent_branch') != branch_id or branch.get('fork_at') is None:
+                continue
+            fork = (branch['fork_at'], branch.get('fork_seq'))
+            if since is None or _order(fork) > _order(since) or (
+                    inclusive and _order(fork) == _order(since)):
+                copied += MessageModel.materialize_branch(conversation_id, branch['id'])
+        return copied
+
+    @staticmethod
+    def claim_for_write(conversation_id, message, branch_id=None):
+        """Return the row to mutate when ``message`` is edited or deleted
+        while viewing ``branch_id``.
+
+        A message ``branch_id`` only inherits is first copied into it (so
+        the parent keeps the original) and the copy is returned; branches
+        that inherit the message are detached from it.
+        """
+        if isinstance(conversation_id, str):
+            conversation_id = ObjectId(conversation_id)
+        physical = message.get('branch_id') or 'main'
+        if branch_id and branch_id != physical and MessageModel.is_visible_on(
+                conversation_id, branch_id, message):
+            MessageModel.materialize_branch(conversation_id, branch_id)
+            copy = MessageModel.inflate(MessageModel.get_collection().find_one({
+                'conversation_id': conversation_id,
+                'branch_id': branch_id,
+                'copied_from': message.get('copied_from') or message['_id'],
+            }))
+            if copy:
+                message, physical = copy, branch_id
+        MessageModel.detach_children(conversation_id, physical, since=MessageModel._position(message))
+        return message
+
     @staticmethod
     def delete_by_branch(conversation_id, branch_id):
         """Delete all messages in a specific branch"""
         if isinstance(conversation_id, str):
             conversation_id = ObjectId(conversation_id)
 
-        result = MessageModel.get_collection().delete_many({
-            'conversation_id': conversation_id,
-            'branch_id': branch_id
-        })
+        # Branches forked from this one still read its rows.
+        MessageModel.detach_children(conversation_id, branch_id)
+
+        query = {'conversation_id': conversation_id, 'branch_id': branch_id}
+        collection = MessageModel.get_collection()
+        doomed = [doc['_id'] for doc in collection.find(query, {'_id': 1})]
+        MessageSearchModel.remove(doomed)
+        semantic_search.remove(doomed)
+        result = collection.delete_many(query)
         return result.deleted_count
+
+    # ------------------------------------------------------------------
+    # Legacy ``branch_id`` backfill
+    #
+    # Messages written before branching carry no ``branch_id``; reads had
+    # to match main as ``{'$in': ['main', None]}``, which the
+    # ``(conversation_id, branch_id, ...)`` index answers with two bounds
+    # plus a fetch to tell null from missing. Once every row is stamped the
+    # backfill leaves a marker and main is matched exactly.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def branch_ids_backfilled() -> bool:
+        if _branch_backfill_cache['done']:
+            return True
+        now = time.monotonic()
+        if (_branch_backfill_cache['checked_at']
+                and now - _branch_backfill_cache['checked_at'] < _BRANCH_RECHECK_SECONDS):
+            return False
+        marker = mongo.db[_MIGRATIONS].find_one({'_id': _BRANCH_BACKFILL_ID}, {'completed_at': 1})
+        done = bool(marker and marker.get('completed_at'))
+        _branch_backfill_cache.update(done=done, checked_at=now)
+        return done
+
+    @staticmethod
+    def _backfill(marker_id, missing, update, batch_size, max_batches, pause) -> dict:
+        """Apply ``update`` to every row matching ``missing``, walking ``_id``
+        in batches. Resumable: the last ``_id`` done is checkpointed in the
+        ``marker_id`` migrations doc after each batch, so an interrupted run
+        (or one stopped by ``max_batches``) picks up where it left off. Marks
+        the migration complete once no matching row is left.
+
+        Returns ``{'updated', 'batches', 'complete'}``.
+        """
+        collection = MessageModel.get_collection()
+        state = mongo.db[_MIGRATIONS]
+        marker = state.find_one({'_id': marker_id}) or {}
+        if marker.get('completed_at'):
+            return {'updated': 0, 'batches': 0, 'complete': True}
+        last_id = marker.get('last_id')
+        updated = batches = 0
+        while max_batches is None or batches < max_batches:
+            query = dict(missing)
+            if last_id is not None:
+                query['_id'] = {'$gt': last_id}
+            ids = [doc['_id'] for doc in collection.find(query, {'_id': 1}).sort('_id', 1).limit(batch_size)]
+            if not ids:
+                break
+            result = collection.update_many({'_id': {'$in': ids}, **missing}, update)
+            updated += result.modified_count
+            batches += 1
+            last_id = ids[-1]
+            state.update_one(
+                {'_id': marker_id},
+                {'$set': {'last_id': last_id, 'updated_at': datetime.utcnow()},
+                 '$inc': {'updated': result.modified_count}},
+                upsert=True,
+            )
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        else:
+            return {'updated': updated, 'batches': batches, 'complete': False}
+
+        # Rows can only be missed if something wrote one behind the
+        # checkpoint; start over rather than mark the migration complete.
+        if collection.find_one(missing, {'_id': 1}) is not None:
+            state.update_one({'_id': marker_id}, {'$unset': {'last_id': ''}})
+            return {'updated': updated, 'batches': batches, 'complete': False}
+        state.update_one(
+            {'_id': marker_id},
+            {'$set': {'completed_at': datetime.utcnow()}},
+            upsert=True,
+        )
+        return {'updated': updated, 'batches': batches, 'complete': True}
+
+    @staticmethod
+    def backfill_branch_ids(batch_size=1000, max_batches=None, pause=0.0) -> dict:
+        """Stamp ``branch_id: 'main'`` on legacy rows (see :meth:`_backfill`)."""
+        result = MessageModel._backfill(
+            _BRANCH_BACKFILL_ID, {'branch_id': None}, {'$set': {'branch_id': 'main'}},
+            batch_size, max_batches, pause,
+        )
+        if result['complete']:
+            _branch_backfill_cache.update(done=True, checked_at=time.monotonic())
+        return result
+
+    @staticmethod
+    def backfill_seq(batch_size=1000, max_batches=None, pause=0.0) -> dict:
+        """Stamp :data:`LEGACY_SEQ` on rows written without a ``seq`` (error
+        rows, and everything before P1.29), then drop the retired
+        ``conversations.seq_counter``.
+
+        Positions don't move: such rows already sorted first within their
+        millisecond, and existing ``seq`` values are left alone — they only
+        ever share a millisecond with other legacy rows. Branch fork points
+        recorded without a ``fork_seq`` keep meaning "the whole millisecond".
+        """
+        result = MessageModel._backfill(
+            _SEQ_BACKFILL_ID, {'seq': None}, {'$set': {'seq': LEGACY_SEQ}},
+            batch_size, max_batches, pause,
+        )
+        if result['complete']:
+            mongo.db['conversations'].update_many(
+                {'seq_counter': {'$exists': True}}, {'$unset': {'seq_counter': ''}},
+            )
+        return result
@@ -0,0 +1,354 @@
+"""
+Per-user inverted index over chat messages.
+
+``MessageModel`` feeds it as messages are written, edited and deleted, and
+``GET /conversations/search/messages`` ranks hits with BM25 instead of
+running ``$text`` over every conversation the user owns. Text analysis
+(Persian/Arabic normalisation, English stemming, query syntax, snippets)
+lives in :mod:`app.services.text_search`.
+
+Collections:
+    message_search_postings  one row per (message, term)
+        {user_id, term, message_id, conversation_id, origin, tf, dl, pos}
+        ``origin`` is the message a branch copy was made from, so a message
+        shared by several branches is returned once; ``dl`` is the
+        message's length in terms; ``pos`` its term positions (phrases).
+    message_search_docs      one row per indexed message
+        {_id: message_id, user_id, conversation_id, length}
+    message_search_stats     one row per user: {_id: user_id, docs, tokens}
+
+Like the usage rollups, searches only use the index once
+:meth:`MessageSearchModel.rebuild` has run (``scripts/
+backfill_message_search.py``) and left the ready marker; until then the
+route falls back to the ``$text`` search.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from app.extensions import mongo
+from app.services import text_search
+from app.utils import field_compression
+
+logger = logging.getLogger(__name__)
+
+_DOCS = 'message_search_docs'
+_STATS = 'message_search_stats'
+_READY_ID = 'meta:ready'
+# Most frequent postings read per term: a term in every other message adds
+# little to BM25 beyond its highest-tf rows.
+MAX_POSTINGS_PER_TERM = 2000
+# Most terms a ``prefix*`` expands to (the most common ones win).
+MAX_PREFIX_EXPANSIONS = 50
+MAX_POSITIONS = 256
+
+_READY_RECHECK_SECONDS = 60
+_ready_cache = {'ready': False, 'checked_at': 0.0}
+
+
+def invalidate_ready_cache() -> None:
+    """Forget the cached ready flag (tests that drop the collection)."""
+    _ready_cache.update(ready=False, checked_at=0.0)
+
+
+def _oid(value):
+    return ObjectId(value) if isinstance(value, str) else value
+
+
+class MessageSearchModel:
+    collection_name = 'message_search_postings'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[MessageSearchModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        postings = MessageSearchModel.get_collection()
+        # Term lookups, prefix ranges and the highest-tf-first read.
+        postings.create_index([('user_id', ASCENDING), ('term', ASCENDING), ('tf', DESCENDING)])
+        postings.create_index([('message_id', ASCENDING)])
+        postings.create_index([('conversation_id', ASCENDING)])
+        mongo.db[_DOCS].create_index([('conversation_id', ASCENDING)])
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _owners(conversation_ids: Iterable) -> dict:
+        ids = list({cid for cid in conversation_ids if cid is not None})
+        return {
+            c['_id']: c.get('user_id')
+            for c in mongo.db['conversations'].find({'_id': {'$in': ids}}, {'user_id': 1})
+        }
+
+    @staticmethod
+    def _entries(message: dict, user_id) -> tuple[Optional[dict], list[dict]]:
+        content = field_compression.decode(message.get('content'))
+        if message.get('is_error') or not content:
+            return None, []
+        tokens = text_search.terms(content)
+        if not tokens:
+            return None, []
+        positions: dict[str, list[int]] = defaultdict(list)
+        for index, term in enumerate(tokens):
+            positions[term].append(index)
+        base = {
+            'user_id': user_id,
+            'message_id': message['_id'],
+            'conversation_id': message['conversation_id'],
+            'origin': message.get('copied_from') or message['_id'],
+            'dl': len(tokens),
+        }
+        postings = [
+            {**base, 'term': term, 'tf': len(pos), 'pos': pos[:MAX_POSITIONS]}
+            for term, pos in positions.items()
+        ]
+        doc = {
+            '_id': message['_id'], 'user_id': user_id,
+            'conversation_id': message['conversation_id'], 'length': len(tokens),
+        }
+        return doc, postings
+
+    @staticmethod
+    def _write(messages: list[dict], replace: bool) -> int:
+        if replace:
+            MessageSearchModel._drop({'_id': {'$in': [m['_id'] for m in messages]}})
+        owners = MessageSearchModel._owners(m.get('conversation_id') for m in messages)
+        docs, postings = [], []
+        for message in messages:
+            user_id = owners.get(message.get('conversation_id'))
+            if user_id is None:
+                continue
+            doc, rows = MessageSearchModel._entries(message, user_id)
+            if doc is not None:
+                docs.append(doc)
+                postings.extend(rows)
+        if not docs:
+            return 0
+        MessageSearchModel.get_collection().insert_many(postings, ordered=False)
+        mongo.db[_DOCS].insert_many(docs, ordered=False)
+        totals: dict = defaultdict(lambda: [0, 0])
+        for doc in docs:
+            totals[doc['user_id']][0] += 1
+            totals[doc['user_id']][1] += doc['length']
+        for user_id, (count, tokens) in totals.items():
+            mongo.db[_STATS].update_one(
+                {'_id': user_id}, {'$inc': {'docs': count, 'tokens': tokens}}, upsert=True,
+            )
+        return len(docs)
+
+    @staticmethod
+    def _drop(doc_filter: dict) -> int:
+        docs = list(mongo.db[_DOCS].find(doc_filter, {'user_id': 1, 'length': 1}))
+        if not docs:
+            return 0
+        ids = [d['_id'] for d in docs]
+        MessageSearchModel.get_collection().delete_many({'message_id': {'$in': ids}})
+        mongo.db[_DOCS].delete_many({'_id': {'$in': ids}})
+        totals: dict = defaultdict(lambda: [0, 0])
+        for doc in docs:
+            totals[doc['user_id']][0] += 1
+            totals[doc['user_id']][1] += doc.get('length') or 0
+        for user_id, (count, tokens) in totals.items():
+            mongo.db[_STATS].update_one({'_id': user_id}, {'$inc': {'docs': -count, 'tokens': -tokens}})
+        return len(docs)
+
+    @staticmethod
+    def index_messages(messages: list[dict], replace: bool = False) -> int:
+        """Add ``messages`` to their owners' indexes (``replace`` drops any
+        existing entries first, for edits). Never raises — the index is
+        derived data, rebuilt by ``scripts/backfill_message_search.py``."""
+        if not messages:
+            return 0
+        try:
+            return MessageSearchModel._write(messages, replace)
+        except Exception as exc:
+            logger.warning('message search indexing failed: %s', exc)
+            return 0
+
+    @staticmethod
+    def reindex(message_ids: Iterable) -> int:
+        """Re-read ``message_ids`` and replace their entries."""
+        ids = [_oid(m) for m in message_ids]
+        messages = list(mongo.db['messages'].find({'_id': {'$in': ids}}))
+        try:
+            MessageSearchModel._drop({'_id': {'$in': ids}})
+        except Exception as exc:
+            logger.warning('message search removal failed: %s', exc)
+        return MessageSearchModel.index_messages(messages)
+
+    @staticmethod
+    def remove(message_ids: Iterable) -> int:
+        ids = [_oid(m) for m in message_ids]
+        if not ids:
+            return 0
+        try:
+            return MessageSearchModel._drop({'_id': {'$in': ids}})
+        except Exception as exc:
+            logger.warning('message search removal failed: %s', exc)
+            return 0
+
+    @staticmethod
+    def remove_conversations(conversation_ids: Iterable) -> int:
+        ids = [_oid(c) for c in conversation_ids]
+        if not ids:
+            return 0
+        try:
+            return MessageSearchModel._drop({'conversation_id': {'$in': ids}})
+        except Exception as exc:
+            logger.warning('message search removal failed: %s', exc)
+            return 0
+
+    @staticmethod
+    def rebuild(batch_size: int = 1000) -> int:
+        """Re-index every message from scratch and mark the index ready.
+        Returns the number of messages indexed."""
+        MessageSearchModel.get_collection().delete_many({})
+        mongo.db[_DOCS].delete_many({})
+        mongo.db[_STATS].delete_many({})
+        indexed, batch = 0, []
+        projection = {'conversation_id': 1, 'content': 1, 'is_error': 1, 'copied_from': 1}
+        for message in mongo.db['messages'].find({}, projection).sort('_id', 1):
+            batch.append(message)
+            if len(batch) >= batch_size:
+                indexed += MessageSearchModel._write(batch, replace=False)
+                batch = []
+        if batch:
+            indexed += MessageSearchModel._write(batch, replace=False)
+        mongo.db[_STATS].update_one(
+            {'_id': _READY_ID}, {'$set': {'rebuilt_at': datetime.utcnow()}}, upsert=True,
+        )
+        _ready_cache.update(ready=True, checked_at=time.monotonic())
+        return indexed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_ready() -> bool:
+        if _ready_cache['ready']:
+            return True
+        now = time.monotonic()
+        if _ready_cache['checked_at'] and now - _ready_cache['checked_at'] < _READY_RECHECK_SECONDS:
+            return False
+        ready = mongo.db[_STATS].find_one({'_id': _READY_ID}, {'_id': 1}) is not None
+        _ready_cache.update(ready=ready, checked_at=now)
+        return ready
+
+    @staticmethod
+    def _doc_freqs(user_id, term_filter, limit: Optional[int] = None) -> dict[str, int]:
+        pipeline = [
+            {'$match': {'user_id': user_id, 'term': term_filter}},
+            {'$group': {'_id': '$term', 'df': {'$sum': 1}}},
+        ]
+        if limit:
+            pipeline += [{'$sort': {'df': -1}}, {'$limit': limit}]
+        return {row['_id']: row['df'] for row in MessageSearchModel.get_collection().aggregate(pipeline)}
+
+    @staticmethod
+    def _postings(user_id, term, message_ids=None, with_positions=False) -> list[dict]:
+        query = {'user_id': user_id, 'term': term}
+        if message_ids is not None:
+            query['message_id'] = {'$in': list(message_ids)}
+        projection = {'message_id': 1, 'origin': 1, 'tf': 1, 'dl': 1, '_id': 0}
+        if with_positions:
+            projection['pos'] = 1
+        cursor = MessageSearchModel.get_collection().find(query, projection)
+        if message_ids is None:
+            cursor = cursor.sort('tf', DESCENDING).limit(MAX_POSTINGS_PER_TERM)
+        return list(cursor)
+
+    @staticmethod
+    def search(user_id, raw_query: str, limit: int = 50) -> list[dict]:
+        """Best-first ``[{'message_id', 'score'}]`` for ``raw_query`` over
+        ``user_id``'s messages.
+
+        Bare terms and expanded prefixes add their BM25 score; every quoted
+        phrase must occur, in order, and adds the score of its words.
+        """
+        user_id = _oid(user_id)
+        query = text_search.parse_query(raw_query)
+        if not query:
+            return []
+        stats = mongo.db[_STATS].find_one({'_id': user_id}) or {}
+        doc_count = max(int(stats.get('docs') or 0), 1)
+        avg_len = (stats.get('tokens') or 0) / doc_count
+
+        weights: dict[str, float] = {}
+        scored_terms = set(query.terms)
+        for prefix in query.prefixes:
+            expanded = MessageSearchModel._doc_freqs(
+                user_id, {'$gte': prefix, '$lt': prefix + '\U0010ffff'}, MAX_PREFIX_EXPANSIONS,
+            )
+            for term, df in expanded.items():
+                weights.setdefault(term, text_search.idf(doc_count, df))
+        phrase_words = {w for phrase in query.phrases for w in phrase}
+        exact = scored_terms | phrase_words
+        if exact:
+            for term, df in MessageSearchModel._doc_freqs(user_id, {'$in': list(exact)}).items():
+                weights[term] = text_search.idf(doc_count, df)
+
+        scores: dict = defaultdict(float)
+        origins: dict = {}
+
+        def add(posting, term):
+            origins[posting['message_id']] = posting.get('origin') or posting['message_id']
+            scores[posting['message_id']] += text_search.bm25(
+                posting['tf'], posting.get('dl') or 1, avg_len, weights[term],
+            )
+
+        for term in weights:
+            if term in scored_terms or term not in phrase_words:
+                for posting in MessageSearchModel._postings(user_id, term):
+                    add(posting, term)
+
+        if query.phrases:
+            required = None
+            for phrase in query.phrases:
+                if any(word not in weights for word in phrase):
+                    return []
+                # Start from the rarest word, then only read the other
+                # words' postings for those candidate messages.
+                order = sorted(set(phrase), key=lambda w: -weights[w])
+                by_word = {order[0]: {
+                    p['message_id']: p for p in MessageSearchModel._postings(
+                        user_id, order[0], with_positions=True)
+                }}
+                candidates = set(by_word[order[0]])
+                for word in order[1:]:
+                    if not candidates:
+                        break
+                    by_word[word] = {
+                        p['message_id']: p for p in MessageSearchModel._postings(
+                            user_id, word, candidates, with_positions=True)
+                    }
+                    candidates &= set(by_word[word])
+                matched = {
+                    mid for mid in candidates
+                    if text_search.has_phrase([by_word[w][mid].get('pos') or [] for w in phrase])
+                }
+                for mid in matched:
+                    for word in set(phrase):
+                        if word not in scored_terms:
+                            add(by_word[word][mid], word)
+                required = matched if required is None else required & matched
+            scores = {mid: s for mid, s in scores.items() if mid in required}
+
+        # One hit per original message: branch copies share an origin.
+        best: dict = {}
+        for mid, score in scores.items():
+            origin = origins[mid]
+            if origin not in best or (score, mid) > best[origin]:
+                best[origin] = (score, mid)
+        ranked = sorted(best.values(), key=lambda item: (item[0], item[1]), reverse=True)
+        return [{'message_id': mid, 'score': round(score, 4)} for score, mid in ranked[:limit]]
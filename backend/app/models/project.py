@@ -74,6 +74,7 @@ class ProjectModel:
                 'tags': [],
                 'default_model': None,
                 'default_temperature': None,
+                'budget_mtd_usd': None,
                 'last_activity_at': now,
                 'created_by': created_by,
                 'created_at': now,
@@ -122,6 +123,7 @@ class ProjectModel:
             'name', 'color', 'icon', 'description', 'archived',
             'pinned', 'tags', 'last_activity_at',
             'default_model', 'default_temperature',
+            'budget_mtd_usd',
         }
         clean = {k: v for k, v in (update_data or {}).items() if k in allowed_fields}
         if not clean:
@@ -137,6 +139,16 @@ class ProjectModel:
                 raise ValueError('default_temperature must be between 0.0 and 2.0')
             clean['default_temperature'] = temp
 
+        # Validate budget_mtd_usd (None / 0 = no project budget).
+        if 'budget_mtd_usd' in clean and clean['budget_mtd_usd'] is not None:
+            try:
+                budget = float(clean['budget_mtd_usd'])
+            except (TypeError, ValueError):
+                raise ValueError('budget_mtd_usd must be a number')
+            if budget < 0:
+                raise ValueError('budget_mtd_usd must not be negative')
+            clean['budget_mtd_usd'] = budget
+
         clean['updated_at'] = datetime.utcnow()
 
         result = ProjectModel.get_collection().update_one(
@@ -0,0 +1,167 @@
+"""
+Purge jobs — background deletion of deleted conversations' messages.
+
+Deleting a conversation removes its document right away; its messages (and
+the inline attachments they carry) are handed to a job that
+``app/services/conversation_purge.py`` works through in small batches, so a
+user clearing hundreds of long chats doesn't hold a request worker or flood
+the primary with one huge ``delete_many``.
+
+Document shape:
+    {
+      _id: ObjectId,
+      user_id: ObjectId,
+      conversation_ids: [ObjectId],
+      status: 'pending' | 'running' | 'done' | 'failed',
+      total: int,                   # messages counted when the job was queued
+      deleted: int,                 # messages deleted so far
+      batches: int,
+      error: str | None,            # last failure, kept across retries
+      attempts: int,                # claims so far
+      retry_at: datetime | None,    # a failed attempt's job waits until then
+      lease_until: datetime | None, # a running job whose lease lapsed is
+                                    # picked up again (worker died mid-job)
+      created_at, updated_at, finished_at: datetime,
+      started_at: datetime          # set on first claim
+    }
+
+Every batch deletes by ``_id``, so re-running a job after a crash just
+carries on where it stopped. A failed attempt goes back to ``pending`` with a
+``retry_at`` until the service's attempt cap is reached; only then is the job
+``failed``.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from app.extensions import mongo
+
+STATUSES = ('pending', 'running', 'done', 'failed')
+
+
+def _to_oid(value):
+    return ObjectId(value) if isinstance(value, str) else value
+
+
+class PurgeJobModel:
+    collection_name = 'purge_jobs'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[PurgeJobModel.collection_name]
+
+    @staticmethod
+    def create_indexes():
+        col = PurgeJobModel.get_collection()
+        col.create_index([('status', ASCENDING), ('created_at', ASCENDING)])
+        col.create_index([('user_id', ASCENDING), ('created_at', DESCENDING)])
+
+    @staticmethod
+    def create(user_id, conversation_ids, total=0):
+        now = datetime.utcnow()
+        doc = {
+            'user_id': _to_oid(user_id),
+            'conversation_ids': [_to_oid(c) for c in conversation_ids],
+            'status': 'pending',
+            'total': int(total),
+            'deleted': 0,
+            'batches': 0,
+            'error': None,
+            'attempts': 0,
+            'retry_at': None,
+            'lease_until': None,
+            'created_at': now,
+            'updated_at': now,
+            'finished_at': None,
+        }
+        doc['_id'] = PurgeJobModel.get_collection().insert_one(doc).inserted_id
+        return doc
+
+    @staticmethod
+    def find_for_user(job_id, user_id):
+        return PurgeJobModel.get_collection().find_one(
+            {'_id': _to_oid(job_id), 'user_id': _to_oid(user_id)}
+        )
+
+    @staticmethod
+    def claim(lease_seconds: int) -> Optional[dict]:
+        """Atomically take the oldest pending job that is due (or a running
+        one whose lease lapsed) and mark it running under a fresh lease."""
+        now = datetime.utcnow()
+        return PurgeJobModel.get_collection().find_one_and_update(
+            {'$or': [
+                {'status': 'pending', 'retry_at': {'$not': {'$gt': now}}},
+                {'status': 'running', 'lease_until': {'$lt': now}},
+            ]},
+            {'$set': {
+                'status': 'running',
+                'lease_until': now + timedelta(seconds=lease_seconds),
+                'updated_at': now,
+            }, '$inc': {'attempts': 1}, '$min': {'started_at': now}},
+            sort=[('created_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    def record_batch(job_id, deleted: int, lease_seconds: int) -> None:
+        now = datetime.utcnow()
+        PurgeJobModel.get_collection().update_one(
+            {'_id': job_id},
+            {'$inc': {'deleted': int(deleted), 'batches': 1},
+             '$set': {'lease_until': now + timedelta(seconds=lease_seconds), 'updated_at': now}},
+        )
+
+    @staticmethod
+    def finish(job_id, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        PurgeJobModel.get_collection().update_one(
+            {'_id': job_id},
+            {'$set': {
+                'status': 'failed' if error else 'done',
+                'error': error,
+                'retry_at': None,
+                'lease_until': None,
+                'finished_at': now,
+                'updated_at': now,
+            }},
+        )
+
+    @staticmethod
+    def retry(job_id, error: str, delay_seconds: float) -> None:
+        """Put a failed attempt back in the queue, due in ``delay_seconds``."""
+        now = datetime.utcnow()
+        PurgeJobModel.get_collection().update_one(
+            {'_id': job_id},
+            {'$set': {
+                'status': 'pending',
+                'error': error,
+                'retry_at': now + timedelta(seconds=delay_seconds),
+                'lease_until': None,
+                'updated_at': now,
+            }},
+        )
+
+    @staticmethod
+    def to_dict(job: dict) -> dict:
+        """API shape, with ``progress`` in [0, 1]."""
+        total, deleted = job.get('total') or 0, job.get('deleted') or 0
+        if job.get('status') == 'done':
+            progress = 1.0
+        else:
+            progress = min(1.0, deleted / total) if total else 0.0
+        return {
+            'id': str(job['_id']),
+            'status': job.get('status'),
+            'conversation_count': len(job.get('conversation_ids') or []),
+            'total': total,
+            'deleted': deleted,
+            'progress': round(progress, 4),
+            'error': job.get('error'),
+            'attempts': job.get('attempts') or 0,
+            'created_at': job.get('created_at'),
+            'finished_at': job.get('finished_at'),
+        }
@@ -0,0 +1,307 @@
+"""
+Usage archive — cold storage for ``usage_logs`` rows past the hot window.
+
+``usage_logs`` gains one document per LLM call and was never pruned, so its
+indexes and every raw scan kept growing. :meth:`UsageArchiveModel.archive`
+(run nightly by ``scheduler.jobs.usage_archive``) moves whole UTC months older
+than ``HOT_MONTHS`` out of it:
+
+  1. the month's rollup buckets are recomputed from its raw rows (the fold),
+  2. the archive horizon moves past the month, freezing those buckets —
+     ``UsageRollupModel.rebuild`` never recomputes anything before it,
+  3. the rows are packed ``CHUNK_ROWS`` at a time into compressed columnar
+     chunks here and deleted from ``usage_logs``.
+
+Reads stay transparent: ``UsageRollupModel.aggregate`` (and therefore every
+``UsageLogModel.aggregate_*``) answers archived periods from the frozen
+buckets, and the partial edge hours that need row-level data from
+:meth:`aggregate` below.
+
+Chunk shape:
+    {
+      _id: "<YYYY-MM>:<first row _id>",
+      month: 'YYYY-MM',
+      ts_min, ts_max: datetime,       # created_at range of the rows
+      count: int,
+      workspace_ids: [ObjectId],      # distinct, for cascade deletes
+      codec: 'bson+zlib',
+      data: Binary,                   # zlib(BSON {'columns': {field: [values]}})
+    }
+
+Only ``ARCHIVED_FIELDS`` are kept: the raw ``response_usage`` payload and the
+legacy ``tokens`` sub-document (derivable from the token columns) are dropped.
+A crash between writing a chunk and deleting its rows is repaired by the next
+run, which rewrites the same chunk id.
+"""
+from __future__ import annotations
+
+import logging
+import time
+import zlib
+from datetime import datetime
+from typing import Optional
+
+import bson
+from bson import Binary
+from pymongo import ASCENDING
+
+from app.extensions import mongo
+
+logger = logging.getLogger(__name__)
+
+HOT_MONTHS = 6
+CHUNK_ROWS = 5000
+ARCHIVED_FIELDS = (
+    '_id', 'created_at', 'user_id', 'workspace_id', 'project_id', 'conversation_id',
+    'message_id', 'model', 'model_id', 'provider', 'feature', 'origin',
+    'prompt_tokens', 'completion_tokens', 'cached_tokens', 'cache_write_tokens',
+    'reasoning_tokens', 'cost_usd', 'upstream_cost_usd', 'is_streaming',
+    'finish_reason', 'generation_id',
+)
+_HORIZON_ID = 'meta:horizon'
+_USAGE_LOGS = 'usage_logs'
+# Per-process view of the horizon, re-read at most every
+# ``_HORIZON_RECHECK_SECONDS`` (it moves once a month).
+_HORIZON_RECHECK_SECONDS = 60
+_horizon_cache = {'horizon': None, 'checked_at': 0.0}
+
+
+def invalidate_horizon_cache() -> None:
+    """Forget the cached horizon (tests that drop the collection)."""
+    _horizon_cache.update(horizon=None, checked_at=0.0)
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, delta: int) -> datetime:
+    index = value.year * 12 + (value.month - 1) + delta
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _matches(row: dict, match: dict) -> bool:
+    """Evaluate the small filter subset the rollup reads use."""
+    for field, cond in match.items():
+        value = row.get(field)
+        if not isinstance(cond, dict):
+            if value != cond:
+                return False
+            continue
+        for op, arg in cond.items():
+            if op == '$ne':
+                ok = value != arg
+            elif op == '$in':
+                ok = value in arg
+            elif op == '$nin':
+                ok = value not in arg
+            elif op == '$exists':
+                ok = (value is not None) == bool(arg)
+            else:
+                raise ValueError(f'unsupported archive filter: {op}')
+            if not ok:
+                return False
+    return True
+
+
+def _in_range(value: datetime, bounds: dict) -> bool:
+    if '$gte' in bounds and value < bounds['$gte']:
+        return False
+    if '$lt' in bounds and value >= bounds['$lt']:
+        return False
+    if '$lte' in bounds and value > bounds['$lte']:
+        return False
+    return True
+
+
+class UsageArchiveModel:
+    collection_name = 'usage_logs_archive'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[UsageArchiveModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        col = UsageArchiveModel.get_collection()
+        col.create_index([('ts_min', ASCENDING), ('ts_max', ASCENDING)])
+        col.create_index('workspace_ids')
+
+    # ------------------------------------------------------------------
+    # Horizon
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def horizon() -> Optional[datetime]:
+        """Start of the hot window: everything before it is archived."""
+        now = time.monotonic()
+        if _horizon_cache['checked_at'] and now - _horizon_cache['checked_at'] < _HORIZON_RECHECK_SECONDS:
+            return _horizon_cache['horizon']
+        doc = UsageArchiveModel.get_collection().find_one({'_id': _HORIZON_ID})
+        horizon = (doc or {}).get('before')
+        _horizon_cache.update(horizon=horizon, checked_at=now)
+        return horizon
+
+    @staticmethod
+    def _set_horizon(before: datetime) -> None:
+        UsageArchiveModel.get_collection().update_one(
+            {'_id': _HORIZON_ID},
+            {'$set': {'before': before, 'updated_at': datetime.utcnow()}},
+            upsert=True,
+        )
+        _horizon_cache.update(horizon=before, checked_at=time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Chunks
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _pack(chunk_id: str, month: str, rows: list[dict]) -> dict:
+        columns = {field: [row.get(field) for row in rows] for field in ARCHIVED_FIELDS}
+        workspace_ids = {row.get('workspace_id') for row in rows} - {None}
+        return {
+            '_id': chunk_id,
+            'month': month,
+            'ts_min': min(row['created_at'] for row in rows),
+            'ts_max': max(row['created_at'] for row in rows),
+            'count': len(rows),
+            'workspace_ids': sorted(workspace_ids, key=str),
+            'codec': 'bson+zlib',
+            'data': Binary(zlib.compress(bson.encode({'columns': columns}), 9)),
+        }
+
+    @staticmethod
+    def unpack(chunk: dict) -> list[dict]:
+        """Rows of one chunk as dicts (only ``ARCHIVED_FIELDS``)."""
+        columns = bson.decode(zlib.decompress(chunk['data']))['columns']
+        fields = list(columns)
+        return [dict(zip(fields, values)) for values in zip(*(columns[f] for f in fields))]
+
+    @staticmethod
+    def _move(month: datetime, until: datetime) -> int:
+        raw = mongo.db[_USAGE_LOGS]
+        col = UsageArchiveModel.get_collection()
+        window = {'created_at': {'$gte': month, '$lt': until}}
+        moved = 0
+        while True:
+            rows = list(
+                raw.find(window).sort([('created_at', ASCENDING), ('_id', ASCENDING)]).limit(CHUNK_ROWS)
+            )
+            if not rows:
+                return moved
+            chunk_id = f"{month:%Y-%m}:{rows[0]['_id']}"
+            col.replace_one(
+                {'_id': chunk_id},
+                UsageArchiveModel._pack(chunk_id, f'{month:%Y-%m}', rows),
+                upsert=True,
+            )
+            raw.delete_many({'_id': {'$in': [row['_id'] for row in rows]}})
+            moved += len(rows)
+
+    @staticmethod
+    def archive(keep_months: int = HOT_MONTHS, now: Optional[datetime] = None) -> dict:
+        """Fold and move every ``usage_logs`` row older than ``keep_months``
+        whole months. Returns ``{'horizon', 'months', 'archived'}``.
+
+        Refuses to run until the rollups are ready: archived periods are only
+        readable through them.
+        """
+        from app.models.usage_rollup import UsageRollupModel
+
+        if not UsageRollupModel.is_ready():
+            logger.info('usage archive: rollups not built yet, skipping')
+            return {'horizon': None, 'months': [], 'archived': 0}
+
+        cutoff = _add_months(_month_start(now or datetime.utcnow()), -keep_months)
+        horizon = UsageArchiveModel.horizon()
+        oldest = mongo.db[_USAGE_LOGS].find_one(
+            {'created_at': {'$lt': cutoff}}, {'created_at': 1}, sort=[('created_at', ASCENDING)],
+        )
+        month = _month_start(oldest['created_at']) if oldest else cutoff
+        months, archived = [], 0
+        while month < cutoff:
+            following = _add_months(month, 1)
+            if horizon is None or month >= horizon:
+                # Late rows in an already-frozen month were counted into the
+                # buckets by ``UsageRollupModel.record``; only new months fold.
+                UsageRollupModel.rebuild(since=month, until=following)
+                UsageArchiveModel._set_horizon(following)
+                horizon = following
+            moved = UsageArchiveModel._move(month, following)
+            if moved:
+                months.append(f'{month:%Y-%m}')
+                archived += moved
+            month = following
+        if horizon is None or horizon < cutoff:
+            UsageArchiveModel._set_horizon(cutoff)
+            horizon = cutoff
+        if archived:
+            logger.info('usage archive: moved %d row(s) from %s', archived, ', '.join(months))
+        return {'horizon': horizon, 'months': months, 'archived': archived}
+
+    @staticmethod
+    def purge_workspace(workspace_id, session=None) -> int:
+        """Drop one workspace's archived rows (cascade delete). Returns rows removed."""
+        col = UsageArchiveModel.get_collection()
+        removed = 0
+        for chunk in list(col.find({'workspace_ids': workspace_id}, session=session)):
+            rows = UsageArchiveModel.unpack(chunk)
+            keep = [row for row in rows if row.get('workspace_id') != workspace_id]
+            removed += len(rows) - len(keep)
+            if keep:
+                col.replace_one(
+                    {'_id': chunk['_id']},
+                    UsageArchiveModel._pack(chunk['_id'], chunk['month'], keep),
+                    session=session,
+                )
+            else:
+                col.delete_one({'_id': chunk['_id']}, session=session)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def aggregate(match: dict, clauses: list, group_by: Optional[str]) -> list[dict]:
+        """Raw-row sums over archived rows, in ``UsageRollupModel._run`` shape.
+
+        ``clauses`` are the ``created_at`` ranges the rollup planner could not
+        serve from buckets (at most two partial hours); only the parts before
+        the horizon are read here.
+        """
+        horizon = UsageArchiveModel.horizon()
+        if horizon is None:
+            return []
+        col = UsageArchiveModel.get_collection()
+        merged: dict = {}
+        for clause in clauses:
+            bounds = clause.get('created_at') or {}
+            lo = bounds.get('$gte')
+            if lo is not None and lo >= horizon:
+                continue
+            hi = bounds.get('$lt', bounds.get('$lte'))
+            overlap = {'ts_min': {'$lte': hi}} if hi is not None else {}
+            if lo is not None:
+                overlap['ts_max'] = {'$gte': lo}
+            for chunk in col.find({'_id': {'$ne': _HORIZON_ID}, **overlap}):
+                for row in UsageArchiveModel.unpack(chunk):
+                    if not _in_range(row['created_at'], bounds) or not _matches(row, match):
+                        continue
+                    if group_by is None:
+                        key = None
+                    elif group_by == 'day':
+                        key = row['created_at'].strftime('%Y-%m-%d')
+                    elif group_by == 'model':
+                        key = row.get('model') or row.get('model_id')
+                    else:
+                        key = row.get(group_by)
+                    acc = merged.setdefault(key, {
+                        '_id': key, 'total_cost': 0.0, 'total_tokens': 0, 'count': 0,
+                    })
+                    acc['total_cost'] += float(row.get('cost_usd') or 0)
+                    acc['total_tokens'] += (
+                        int(row.get('prompt_tokens') or 0) + int(row.get('completion_tokens') or 0)
+                    )
+                    acc['count'] += 1
+        return list(merged.values())
@@ -4,11 +4,20 @@ Schema is additive — old field names (``model_id``, ``feature``, ``tokens.*``)
 are preserved alongside the new schema (``model``, ``provider``,
 ``workspace_id``, ``project_id``, ``cached_tokens``, ``cost_usd``, etc.) so
 existing aggregation queries continue to work.
+
+Spend aggregations read the hourly / daily ``usage_rollups`` buckets that
+``create`` maintains alongside each insert (see ``usage_rollup.py``); budget
+checks read the month-to-date ``budget_counters`` (``budget_counter.py``).
 """
 
+import logging
 from datetime import datetime, timedelta
 from bson import ObjectId
 from app.extensions import mongo
+from app.models.budget_counter import BudgetCounterModel
+from app.models.usage_rollup import UsageRollupModel
+
+logger = logging.getLogger(__name__)
 
 
 class UsageLogModel:
@@ -27,6 +36,8 @@ class UsageLogModel:
         collection.create_index('user_id')
         collection.create_index('model_id')
         collection.create_index('created_at')
+        # Keyset order of the streaming exports (app.services.exports).
+        collection.create_index([('created_at', 1), ('_id', 1)])
         collection.create_index([('user_id', 1), ('created_at', -1)])
         # New analytics indexes.
         collection.create_index([('workspace_id', 1), ('created_at', -1)])
@@ -198,10 +209,23 @@ class UsageLogModel:
 
         result = UsageLogModel.get_collection().insert_one(doc)
         doc['_id'] = result.inserted_id
+        try:
+            UsageRollupModel.record(doc)
+        except Exception as exc:
+            # Rollups are derived data — never fail the usage write over them
+            # (rebuild with ``scripts/backfill_usage_rollups.py``).
+            logger.warning('usage rollup update failed: %s', exc)
+        try:
+            BudgetCounterModel.record(doc)
+        except Exception as exc:
+            # Reconciled from usage_logs by the scheduler's drift correction.
+            logger.warning('budget counter update failed: %s', exc)
         return doc
 
     # ------------------------------------------------------------------
-    # Legacy aggregations (kept; admin dashboard relies on these).
+    # Legacy aggregations (kept; admin dashboard relies on these). They read
+    # the rollups too, so archived months (app/models/usage_archive.py) stay
+    # in the totals.
     # ------------------------------------------------------------------
 
     @staticmethod
@@ -211,22 +235,15 @@ class UsageLogModel:
             user_id = ObjectId(user_id)
 
         start_date = datetime.utcnow() - timedelta(days=days)
-
-        pipeline = [
-            {'$match': {
-                'user_id': user_id,
-                'created_at': {'$gte': start_date}
-            }},
-            {'$group': {
-                '_id': '$model_id',
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': '$tokens.total'},
-                'request_count': {'$sum': 1}
-            }},
-            {'$sort': {'total_cost': -1}}
+        results = [
+            {
+                '_id': r['_id'],
+                'total_cost': r['total_cost'],
+                'total_tokens': r['total_tokens'],
+                'request_count': r['count'],
+            }
+            for r in UsageRollupModel.aggregate({'user_id': user_id}, 'model_id', start_date)
         ]
-
-        results = list(UsageLogModel.get_collection().aggregate(pipeline))
         total_cost = sum(r['total_cost'] for r in results)
 
         return {
@@ -237,20 +254,11 @@ class UsageLogModel:
 
     @staticmethod
     def get_user_total_cost(user_id):
-        """Get total cost for a user (all time)."""
+        """Get total cost for a user (all time, archived months included)."""
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
 
-        pipeline = [
-            {'$match': {'user_id': user_id}},
-            {'$group': {
-                '_id': None,
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': '$tokens.total'}
-            }}
-        ]
-
-        results = list(UsageLogModel.get_collection().aggregate(pipeline))
+        results = UsageRollupModel.aggregate({'user_id': user_id})
         if results:
             return {
                 'total_cost_usd': results[0]['total_cost'],
@@ -263,29 +271,17 @@ class UsageLogModel:
         """Get daily cost breakdown."""
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        match_stage = {'created_at': {'$gte': start_date}}
+        match = {}
         if user_id:
             if isinstance(user_id, str):
                 user_id = ObjectId(user_id)
-            match_stage['user_id'] = user_id
-
-        pipeline = [
-            {'$match': match_stage},
-            {'$group': {
-                '_id': {
-                    '$dateToString': {
-                        'format': '%Y-%m-%d',
-                        'date': '$created_at'
-                    }
-                },
-                'cost': {'$sum': '$cost_usd'},
-                'tokens': {'$sum': '$tokens.total'},
-                'requests': {'$sum': 1}
-            }},
-            {'$sort': {'_id': 1}}
-        ]
+            match['user_id'] = user_id
 
-        return list(UsageLogModel.get_collection().aggregate(pipeline))
+        rows = UsageRollupModel.aggregate(match, 'day', start_date)
+        return [
+            {'_id': r['_id'], 'cost': r['total_cost'], 'tokens': r['total_tokens'], 'requests': r['count']}
+            for r in sorted(rows, key=lambda r: r['_id'])
+        ]
 
     @staticmethod
     def aggregate_by(group_by: str, user_id=None, from_=None, to=None):
@@ -301,42 +297,14 @@ class UsageLogModel:
             list[dict] with keys {key, total_cost, total_tokens, count},
             sorted descending by total_cost.
         """
+        fields = {'feature': 'feature', 'model': 'model_id', 'user': 'user_id', 'day': 'day'}
+        if group_by not in fields:
+            raise ValueError(f'invalid group_by: {group_by}')
         match = {}
         if user_id is not None:
             match['user_id'] = ObjectId(user_id) if isinstance(user_id, str) else user_id
-        if from_ or to:
-            match['created_at'] = {}
-            if from_:
-                match['created_at']['$gte'] = from_
-            if to:
-                match['created_at']['$lte'] = to
-
-        if group_by == 'feature':
-            group_id = '$feature'
-        elif group_by == 'model':
-            group_id = '$model_id'
-        elif group_by == 'user':
-            group_id = '$user_id'
-        elif group_by == 'day':
-            group_id = {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}}
-        else:
-            raise ValueError(f'invalid group_by: {group_by}')
 
-        pipeline = []
-        if match:
-            pipeline.append({'$match': match})
-        pipeline.append({'$group': {
-            '_id': group_id,
-            'total_cost': {'$sum': '$cost_usd'},
-            'total_tokens': {'$sum': {'$add': [
-                {'$ifNull': ['$prompt_tokens', 0]},
-                {'$ifNull': ['$completion_tokens', 0]},
-            ]}},
-            'count': {'$sum': 1},
-        }})
-        pipeline.append({'$sort': {'total_cost': -1}})
-
-        docs = list(UsageLogModel.get_collection().aggregate(pipeline))
+        docs = UsageRollupModel.aggregate(match, fields[group_by], from_, to)
         return [
             {
                 'key': str(d['_id']),
@@ -349,50 +317,29 @@ class UsageLogModel:
 
     # ------------------------------------------------------------------
     # Phase 1 — workspace-scoped aggregations.
+    #
+    # All of these read ``usage_rollups`` (see app/models/usage_rollup.py),
+    # falling back to a raw ``usage_logs`` scan until the rollups are built.
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _ws_match(workspace_id, start=None, end=None) -> dict:
+    def _ws_match(workspace_id) -> dict:
         if isinstance(workspace_id, str):
             workspace_id = ObjectId(workspace_id)
-        match = {'workspace_id': workspace_id}
-        if start or end:
-            match['created_at'] = {}
-            if start:
-                match['created_at']['$gte'] = start
-            if end:
-                match['created_at']['$lte'] = end
-        return match
+        return {'workspace_id': workspace_id}
 
     @staticmethod
     def aggregate_workspace_spend(workspace_id, start=None, end=None) -> float:
         """Sum cost_usd across all rows for a workspace within optional window."""
-        match = UsageLogModel._ws_match(workspace_id, start, end)
-        pipeline = [
-            {'$match': match},
-            {'$group': {'_id': None, 'total': {'$sum': '$cost_usd'}}},
-        ]
-        rows = list(UsageLogModel.get_collection().aggregate(pipeline))
-        return float(rows[0]['total']) if rows else 0.0
+        rows = UsageRollupModel.aggregate(UsageLogModel._ws_match(workspace_id), None, start, end)
+        return float(rows[0]['total_cost']) if rows else 0.0
 
     @staticmethod
     def aggregate_user_spend(workspace_id, start=None, end=None) -> list:
         """Group by user_id within a workspace; sum cost_usd, total_tokens, count."""
-        match = UsageLogModel._ws_match(workspace_id, start, end)
-        pipeline = [
-            {'$match': match},
-            {'$group': {
-                '_id': '$user_id',
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': {'$add': [
-                    {'$ifNull': ['$prompt_tokens', 0]},
-                    {'$ifNull': ['$completion_tokens', 0]},
-                ]}},
-                'count': {'$sum': 1},
-            }},
-            {'$sort': {'total_cost': -1}},
-        ]
-        rows = list(UsageLogModel.get_collection().aggregate(pipeline))
+        rows = UsageRollupModel.aggregate(
+            UsageLogModel._ws_match(workspace_id), 'user_id', start, end,
+        )
         return [
             {
                 'user_id': str(r['_id']) if r['_id'] else None,
@@ -406,21 +353,9 @@ class UsageLogModel:
     @staticmethod
     def aggregate_project_spend(workspace_id, start=None, end=None) -> list:
         """Group by project_id within a workspace."""
-        match = UsageLogModel._ws_match(workspace_id, start, end)
-        pipeline = [
-            {'$match': match},
-            {'$group': {
-                '_id': '$project_id',
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': {'$add': [
-                    {'$ifNull': ['$prompt_tokens', 0]},
-                    {'$ifNull': ['$completion_tokens', 0]},
-                ]}},
-                'count': {'$sum': 1},
-            }},
-            {'$sort': {'total_cost': -1}},
-        ]
-        rows = list(UsageLogModel.get_collection().aggregate(pipeline))
+        rows = UsageRollupModel.aggregate(
+            UsageLogModel._ws_match(workspace_id), 'project_id', start, end,
+        )
         return [
             {
                 'project_id': str(r['_id']) if r['_id'] else None,
@@ -434,21 +369,9 @@ class UsageLogModel:
     @staticmethod
     def aggregate_model_spend(workspace_id, start=None, end=None) -> list:
         """Group by model id within a workspace."""
-        match = UsageLogModel._ws_match(workspace_id, start, end)
-        pipeline = [
-            {'$match': match},
-            {'$group': {
-                '_id': {'$ifNull': ['$model', '$model_id']},
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': {'$add': [
-                    {'$ifNull': ['$prompt_tokens', 0]},
-                    {'$ifNull': ['$completion_tokens', 0]},
-                ]}},
-                'count': {'$sum': 1},
-            }},
-            {'$sort': {'total_cost': -1}},
-        ]
-        rows = list(UsageLogModel.get_collection().aggregate(pipeline))
+        rows = UsageRollupModel.aggregate(
+            UsageLogModel._ws_match(workspace_id), 'model', start, end,
+        )
         return [
             {
                 'model': r['_id'],
@@ -460,46 +383,31 @@ class UsageLogModel:
         ]
 
     @staticmethod
-    def aggregate_daily(workspace_id, days: int = 30) -> list:
-        """Daily buckets (chronological). Returns one row per UTC day."""
-        if isinstance(workspace_id, str):
-            workspace_id = ObjectId(workspace_id)
-        start = datetime.utcnow() - timedelta(days=days)
-        pipeline = [
-            {'$match': {
-                'workspace_id': workspace_id,
-                'created_at': {'$gte': start},
-            }},
-            {'$group': {
-                '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
-                'cost_usd': {'$sum': '$cost_usd'},
-                'total_tokens': {'$sum': {'$add': [
-                    {'$ifNull': ['$prompt_tokens', 0]},
-                    {'$ifNull': ['$completion_tokens', 0]},
-                ]}},
-                'messages': {'$sum': 1},
-            }},
-            {'$sort': {'_id': 1}},
-        ]
-        rows = list(UsageLogModel.get_collection().aggregate(pipeline))
+    def aggregate_daily(workspace_id, days: int = 30, start=None, end=None) -> list:
+        """Daily buckets (chronological). Returns one row per UTC day.
+
+        The window is the last ``days`` days unless ``start`` / ``end`` are
+        given.
+        """
+        if start is None:
+            start = datetime.utcnow() - timedelta(days=days)
+        rows = UsageRollupModel.aggregate(
+            UsageLogModel._ws_match(workspace_id), 'day', start, end,
+        )
         return [
             {
                 'date': r['_id'],
-                'cost_usd': r['cost_usd'],
+                'cost_usd': r['total_cost'],
                 'total_tokens': r['total_tokens'],
-                'messages': r['messages'],
+                'messages': r['count'],
             }
-            for r in rows
+            for r in sorted(rows, key=lambda r: r['_id'])
         ]
 
     @staticmethod
     def total_messages_this_month(workspace_id) -> int:
         """Total request count this calendar month (UTC)."""
-        if isinstance(workspace_id, str):
-            workspace_id = ObjectId(workspace_id)
         now = datetime.utcnow()
         start = datetime(now.year, now.month, 1)
-        return UsageLogModel.get_collection().count_documents({
-            'workspace_id': workspace_id,
-            'created_at': {'$gte': start},
-        })
+        rows = UsageRollupModel.aggregate(UsageLogModel._ws_match(workspace_id), None, start)
+        return rows[0]['count'] if rows else 0
@@ -0,0 +1,349 @@
+"""
+Usage rollups — hourly and daily spend buckets behind billing and analytics.
+
+``UsageLogModel.create`` bumps one hour bucket and one day bucket per row with
+``$inc`` upserts, keyed by the full attribution tuple (workspace, project,
+user, model, feature, origin). The ``aggregate_*`` reads on
+``UsageLogModel`` go through :meth:`UsageRollupModel.aggregate`, which stitches
+a window together from:
+
+  - day buckets for the whole UTC days inside it,
+  - hour buckets for the whole hours at either end,
+  - a raw ``usage_logs`` scan for the partial hours at the very edges,
+
+so results match a raw-scan aggregation exactly while touching at most two
+hours of raw rows.
+
+Document shape:
+    {
+      _id: "<hour|day>:<YYYYMMDDHH>:<sha1 of the dimension tuple>",
+      granularity: 'hour' | 'day',
+      ts: datetime,                 # bucket start, UTC
+      workspace_id, project_id, user_id: ObjectId | None,
+      model: str | None,            # ``model`` falling back to ``model_id``
+      model_id: str | None,
+      feature: str | None,
+      origin: str | None,
+      cost_usd: float,
+      total_tokens: int,            # prompt + completion
+      count: int,
+    }
+
+Rollups only serve reads once a full rebuild has run (``scripts/
+backfill_usage_rollups.py``) and left the ``meta:ready`` marker behind;
+until then every read falls back to the raw scan, so deploying this ahead of
+the backfill never under-reports history. The marker is never removed, so
+each process caches having seen it (``is_ready``).
+
+Buckets are also the folded copy of history whose raw rows the archive job
+has moved to ``usage_logs_archive`` (app/models/usage_archive.py): rebuilds
+stop at the archive horizon, and the partial edge hours before it are read
+from the archive instead of ``usage_logs``.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.extensions import mongo
+
+DIMENSIONS = (
+    'workspace_id', 'project_id', 'user_id', 'model', 'model_id', 'feature', 'origin',
+)
+_READY_ID = 'meta:ready'
+_USAGE_LOGS = 'usage_logs'
+# Per-process view of the ready marker: once seen it stays set; a miss is
+# re-read at most every ``_READY_RECHECK_SECONDS``.
+_READY_RECHECK_SECONDS = 60
+_ready_cache = {'ready': False, 'checked_at': 0.0}
+
+
+def invalidate_ready_cache() -> None:
+    """Forget the cached ready flag (tests that drop the collection)."""
+    _ready_cache.update(ready=False, checked_at=0.0)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil(value: datetime, floor, step: timedelta) -> datetime:
+    floored = floor(value)
+    return floored if floored == value else floored + step
+
+
+def _range(field: str, lo: Optional[datetime], hi: Optional[datetime], *,
+           inclusive_hi: bool = False) -> dict:
+    bounds = {}
+    if lo is not None:
+        bounds['$gte'] = lo
+    if hi is not None:
+        bounds['$lte' if inclusive_hi else '$lt'] = hi
+    return {field: bounds} if bounds else {}
+
+
+class UsageRollupModel:
+    collection_name = 'usage_rollups'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[UsageRollupModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        col = UsageRollupModel.get_collection()
+        col.create_index([('granularity', ASCENDING), ('workspace_id', ASCENDING), ('ts', ASCENDING)])
+        col.create_index([('granularity', ASCENDING), ('user_id', ASCENDING), ('ts', ASCENDING)])
+        col.create_index([('granularity', ASCENDING), ('ts', ASCENDING)])
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _dims(row: dict) -> dict:
+        dims = {d: row.get(d) for d in DIMENSIONS}
+        dims['model'] = row.get('model') or row.get('model_id')
+        return dims
+
+    @staticmethod
+    def _bucket_id(granularity: str, ts: datetime, dims: dict) -> str:
+        digest = hashlib.sha1(repr(tuple(dims[d] for d in DIMENSIONS)).encode('utf-8'))
+        return f"{granularity}:{ts:%Y%m%d%H}:{digest.hexdigest()}"
+
+    @staticmethod
+    def _metrics(row: dict) -> dict:
+        return {
+            'cost_usd': float(row.get('cost_usd') or 0),
+            'total_tokens': int(row.get('prompt_tokens') or 0) + int(row.get('completion_tokens') or 0),
+            'count': 1,
+        }
+
+    @staticmethod
+    def record(row: dict) -> None:
+        """Count one freshly inserted ``usage_logs`` row into its buckets."""
+        dims = UsageRollupModel._dims(row)
+        created_at = row.get('created_at') or datetime.utcnow()
+        inc = UsageRollupModel._metrics(row)
+        ops = []
+        for granularity, ts in (('hour', _floor_hour(created_at)), ('day', _floor_day(created_at))):
+            ops.append(UpdateOne(
+                {'_id': UsageRollupModel._bucket_id(granularity, ts, dims)},
+                {'$inc': inc, '$setOnInsert': {'granularity': granularity, 'ts': ts, **dims}},
+                upsert=True,
+            ))
+        UsageRollupModel.get_collection().bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def rebuild(since: Optional[datetime] = None, *, until: Optional[datetime] = None,
+                workspace_id=None) -> int:
+        """Recompute buckets from raw ``usage_logs`` (all, or from ``since``'s
+        UTC day on, up to ``until``'s) and mark the rollups ready for reads.
+
+        With ``workspace_id`` only that workspace's buckets are recomputed and
+        the ready marker is left alone — a partial rebuild cannot vouch for
+        the other workspaces' history. Use it after editing one workspace's
+        rows (seed scripts backdating demo usage). An ``until`` bound leaves
+        the marker alone for the same reason.
+
+        Buckets older than the usage archive horizon are never touched: their
+        raw rows have moved to ``usage_logs_archive`` and the buckets are the
+        only folded copy (see app/models/usage_archive.py).
+
+        Buckets in the rebuilt range are replaced wholesale, so the rebuild is
+        idempotent. Rows written in that range while it runs can be lost from
+        the rollups — run full rebuilds during a quiet period, and scope
+        everything else to the workspace / range that changed. Returns the
+        number of buckets written.
+        """
+        from app.models.usage_archive import UsageArchiveModel
+
+        horizon = UsageArchiveModel.horizon()
+        if horizon is not None and (since is None or since < horizon):
+            since = horizon
+        if since is not None:
+            since = _floor_day(since)
+        if until is not None:
+            until = _floor_day(until)
+            if since is not None and until <= since:
+                return 0
+        scope = {'workspace_id': workspace_id} if workspace_id is not None else {}
+        hour_expr = {'$dateToString': {'format': '%Y-%m-%dT%H', 'date': '$created_at'}}
+        pipeline = []
+        if since is not None or until is not None or scope:
+            pipeline.append({'$match': {**scope, **_range('created_at', since, until)}})
+        pipeline.append({'$group': {
+            '_id': {
+                **{d: f'${d}' for d in DIMENSIONS},
+                'model': {'$ifNull': ['$model', '$model_id']},
+                'hour': hour_expr,
+            },
+            'cost_usd': {'$sum': '$cost_usd'},
+            'total_tokens': {'$sum': {'$add': [
+                {'$ifNull': ['$prompt_tokens', 0]},
+                {'$ifNull': ['$completion_tokens', 0]},
+            ]}},
+            'count': {'$sum': 1},
+        }})
+
+        buckets: dict[str, dict] = {}
+        for row in mongo.db[_USAGE_LOGS].aggregate(pipeline, allowDiskUse=True):
+            if not row['_id'].get('hour'):
+                continue
+            hour = datetime.strptime(row['_id']['hour'], '%Y-%m-%dT%H')
+            dims = UsageRollupModel._dims(row['_id'])
+            for granularity, ts in (('hour', hour), ('day', _floor_day(hour))):
+                key = UsageRollupModel._bucket_id(granularity, ts, dims)
+                bucket = buckets.setdefault(key, {
+                    '_id': key, 'granularity': granularity, 'ts': ts, **dims,
+                    'cost_usd': 0.0, 'total_tokens': 0, 'count': 0,
+                })
+                bucket['cost_usd'] += float(row['cost_usd'] or 0)
+                bucket['total_tokens'] += int(row['total_tokens'] or 0)
+                bucket['count'] += int(row['count'])
+
+        col = UsageRollupModel.get_collection()
+        col.delete_many({'granularity': {'$exists': True}, **scope, **_range('ts', since, until)})
+        docs = list(buckets.values())
+        for start in range(0, len(docs), 1000):
+            col.insert_many(docs[start:start + 1000], ordered=False)
+        if not scope and until is None:
+            col.update_one(
+                {'_id': _READY_ID},
+                {'$set': {'rebuilt_at': datetime.utcnow(), 'since': since}},
+                upsert=True,
+            )
+            _ready_cache.update(ready=True, checked_at=time.monotonic())
+        return len(docs)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_ready() -> bool:
+        if _ready_cache['ready']:
+            return True
+        now = time.monotonic()
+        if _ready_cache['checked_at'] and now - _ready_cache['checked_at'] < _READY_RECHECK_SECONDS:
+            return False
+        ready = UsageRollupModel.get_collection().find_one({'_id': _READY_ID}, {'_id': 1}) is not None
+        _ready_cache.update(ready=ready, checked_at=now)
+        return ready
+
+    @staticmethod
+    def _plan(start: Optional[datetime], end: Optional[datetime]) -> tuple[list, list]:
+        """Split ``[start, end]`` into rollup clauses (on ``ts``) and raw
+        clauses (on ``created_at``). Either bound may be open."""
+        hour, day = timedelta(hours=1), timedelta(days=1)
+        lo = _ceil(start, _floor_hour, hour) if start is not None else None
+        hi = _floor_hour(end) if end is not None else None
+        if lo is not None and hi is not None and lo >= hi:
+            # Window spans at most two partial hours — cheaper to scan raw.
+            return [], [_range('created_at', start, end, inclusive_hi=True)]
+
+        raw = []
+        if start is not None and start < lo:
+            raw.append(_range('created_at', start, lo))
+        if end is not None:
+            raw.append(_range('created_at', hi, end, inclusive_hi=True))
+
+        day_lo = _ceil(lo, _floor_day, day) if lo is not None else None
+        day_hi = _floor_day(hi) if hi is not None else None
+        if day_lo is not None and day_hi is not None and day_lo >= day_hi:
+            return [{'granularity': 'hour', **_range('ts', lo, hi)}], raw
+
+        rollup = [{'granularity': 'day', **_range('ts', day_lo, day_hi)}]
+        if lo is not None and lo < day_lo:
+            rollup.append({'granularity': 'hour', **_range('ts', lo, day_lo)})
+        if hi is not None and day_hi < hi:
+            rollup.append({'granularity': 'hour', **_range('ts', day_hi, hi)})
+        return rollup, raw
+
+    @staticmethod
+    def _group_key(group_by: Optional[str], *, raw: bool):
+        if group_by is None:
+            return None
+        if group_by == 'day':
+            date = '$created_at' if raw else '$ts'
+            return {'$dateToString': {'format': '%Y-%m-%d', 'date': date}}
+        if group_by == 'model' and raw:
+            return {'$ifNull': ['$model', '$model_id']}
+        if group_by not in DIMENSIONS:
+            raise ValueError(f'invalid group_by: {group_by}')
+        return f'${group_by}'
+
+    @staticmethod
+    def _run(collection, match: dict, clauses: list, group_by: Optional[str], *, raw: bool) -> list:
+        if not clauses:
+            return []
+        if raw:
+            sums = {
+                'total_cost': {'$sum': '$cost_usd'},
+                'total_tokens': {'$sum': {'$add': [
+                    {'$ifNull': ['$prompt_tokens', 0]},
+                    {'$ifNull': ['$completion_tokens', 0]},
+                ]}},
+                'count': {'$sum': 1},
+            }
+        else:
+            sums = {
+                'total_cost': {'$sum': '$cost_usd'},
+                'total_tokens': {'$sum': '$total_tokens'},
+                'count': {'$sum': '$count'},
+            }
+        query = dict(match)
+        if len(clauses) == 1:
+            query.update(clauses[0])
+        else:
+            query['$or'] = clauses
+        return list(collection.aggregate([
+            {'$match': query},
+            {'$group': {'_id': UsageRollupModel._group_key(group_by, raw=raw), **sums}},
+        ]))
+
+    @staticmethod
+    def aggregate(match: dict, group_by: Optional[str] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None) -> list[dict]:
+        """Sum cost / tokens / row count over ``[start, end]`` (both inclusive).
+
+        ``match`` filters on dimension fields; ``group_by`` is a dimension
+        name, ``'day'`` (UTC date string) or ``None`` for a single total.
+        Returns ``[{_id, total_cost, total_tokens, count}]`` sorted by
+        ``total_cost`` descending — the same rows a raw ``usage_logs``
+        aggregation produces. Edge hours older than the archive horizon are
+        read from ``usage_logs_archive``.
+        """
+        from app.models.usage_archive import UsageArchiveModel
+
+        raw_col = mongo.db[_USAGE_LOGS]
+        if not UsageRollupModel.is_ready():
+            rows = UsageRollupModel._run(
+                raw_col, match, [_range('created_at', start, end, inclusive_hi=True)],
+                group_by, raw=True,
+            )
+        else:
+            rollup, raw = UsageRollupModel._plan(start, end)
+            merged: dict = {}
+            for row in (
+                UsageRollupModel._run(UsageRollupModel.get_collection(), match, rollup, group_by, raw=False)
+                + UsageRollupModel._run(raw_col, match, raw, group_by, raw=True)
+                + UsageArchiveModel.aggregate(match, raw, group_by)
+            ):
+                acc = merged.setdefault(row['_id'], {
+                    '_id': row['_id'], 'total_cost': 0.0, 'total_tokens': 0, 'count': 0,
+                })
+                acc['total_cost'] += row['total_cost']
+                acc['total_tokens'] += row['total_tokens']
+                acc['count'] += row['count']
+            rows = [r for r in merged.values() if r['count']]
+        rows.sort(key=lambda r: r['total_cost'], reverse=True)
+        return rows
@@ -2,6 +2,7 @@ from datetime import datetime
 from bson import ObjectId
 import bcrypt
 from app.extensions import mongo
+from app.models.activity_counter import ActivityCounterModel
 
 VALID_USER_ROLES = {'user', 'manager', 'admin'}
 
@@ -101,6 +102,7 @@ class UserModel:
 
         result = UserModel.get_collection().insert_one(user_doc)
         user_doc['_id'] = result.inserted_id
+        ActivityCounterModel.record('signups', user_doc['created_at'])
 
         # Auto-create personal workspace + owner membership.
         # Imports are inline to avoid circular imports at module load time.
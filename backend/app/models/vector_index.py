@@ -0,0 +1,184 @@
+"""
+Per-user vector shards for semantic search over messages and knowledge items.
+
+Vectors are stored as float16 bytes inside shard documents of up to about
+``SHARD_SIZE`` items, so a user's whole index loads in a handful of reads:
+
+    {_id, user_id, embedder: str, dim: int, count: int, updated_at,
+     items: [{id, kind: 'message'|'knowledge', conversation_id, v: Binary}]}
+
+Items are appended with ``$push`` to the user's open shard and removed with
+``$pull``; the ``embedder`` key keeps vectors from different models apart.
+
+Searches run in-process on a :class:`~app.services.vector_search.
+VectorMatrix` built from the shards and cached per user; the cache is
+checked against the shards' counts and ``updated_at`` on every search, so
+writes from other workers are picked up on the next query.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+from bson import Binary, ObjectId
+from pymongo import ASCENDING
+
+from app.extensions import mongo
+from app.services.vector_search import VectorMatrix
+
+SHARD_SIZE = 1024
+# Users whose matrices stay loaded in this process.
+CACHE_USERS = 64
+
+_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidate_cache() -> None:
+    """Drop every loaded matrix (tests that drop the collection)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _oid(value):
+    return ObjectId(value) if isinstance(value, str) else value
+
+
+class VectorIndexModel:
+    collection_name = 'vector_shards'
+
+    @staticmethod
+    def get_collection():
+        return mongo.db[VectorIndexModel.collection_name]
+
+    @staticmethod
+    def create_indexes() -> None:
+        col = VectorIndexModel.get_collection()
+        col.create_index([('user_id', ASCENDING), ('embedder', ASCENDING), ('count', ASCENDING)])
+        col.create_index([('items.id', ASCENDING)])
+        col.create_index([('items.conversation_id', ASCENDING)])
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def add(user_id, embedder: str, entries: list[dict], vectors: np.ndarray) -> int:
+        """Append ``entries`` (``{'id', 'kind', 'conversation_id'}``) with
+        their ``vectors`` rows to ``user_id``'s open shard."""
+        if not entries:
+            return 0
+        vectors = np.asarray(vectors, dtype=np.float16)
+        items = [
+            {
+                'id': entry['id'],
+                'kind': entry['kind'],
+                'conversation_id': entry.get('conversation_id'),
+                'v': Binary(vectors[row].tobytes()),
+            }
+            for row, entry in enumerate(entries)
+        ]
+        # A shard may overshoot SHARD_SIZE by one batch; that's fine.
+        VectorIndexModel.get_collection().update_one(
+            {'user_id': _oid(user_id), 'embedder': embedder, 'count': {'$lt': SHARD_SIZE}},
+            {
+                '$push': {'items': {'$each': items}},
+                '$inc': {'count': len(items)},
+                '$set': {'updated_at': datetime.utcnow()},
+                '$setOnInsert': {'dim': int(vectors.shape[1])},
+            },
+            upsert=True,
+        )
+        return len(items)
+
+    @staticmethod
+    def _pull(match: dict) -> int:
+        """Remove every item matching ``match`` (a filter on item fields)."""
+        col = VectorIndexModel.get_collection()
+        removed = 0
+        element = {f'items.{k}': v for k, v in match.items()}
+        for shard in col.find(element, {f'items.{k}': 1 for k in match}):
+            count = sum(
+                1 for item in shard.get('items', [])
+                if all(item.get(k) in v['$in'] for k, v in match.items())
+            )
+            col.update_one(
+                {'_id': shard['_id']},
+                {'$pull': {'items': match}, '$inc': {'count': -count},
+                 '$set': {'updated_at': datetime.utcnow()}},
+            )
+            removed += count
+        return removed
+
+    @staticmethod
+    def remove(item_ids: Iterable) -> int:
+        ids = [_oid(i) for i in item_ids]
+        return VectorIndexModel._pull({'id': {'$in': ids}}) if ids else 0
+
+    @staticmethod
+    def remove_conversations(conversation_ids: Iterable) -> int:
+        ids = [_oid(c) for c in conversation_ids]
+        return VectorIndexModel._pull({'conversation_id': {'$in': ids}}) if ids else 0
+
+    @staticmethod
+    def clear() -> None:
+        VectorIndexModel.get_collection().delete_many({})
+        invalidate_cache()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load(user_id, embedder: str, ivf_threshold: int) -> Optional[tuple]:
+        col = VectorIndexModel.get_collection()
+        query = {'user_id': user_id, 'embedder': embedder}
+        stamp = tuple(sorted(
+            (str(s['_id']), s.get('count'), s.get('updated_at'))
+            for s in col.find(query, {'count': 1, 'updated_at': 1})
+        ))
+        key = (user_id, embedder)
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                _cache.move_to_end(key)
+                return cached[1], cached[2]
+        if not stamp:
+            return None
+
+        refs, chunks, dim = [], [], None
+        for shard in col.find(query).sort('_id', 1):
+            dim = dim or shard.get('dim')
+            for item in shard.get('items', []):
+                refs.append({'id': item['id'], 'kind': item['kind'],
+                             'conversation_id': item.get('conversation_id')})
+                chunks.append(item['v'])
+        if not refs:
+            return None
+        matrix = np.frombuffer(b''.join(chunks), dtype=np.float16).reshape(len(refs), dim)
+        index = VectorMatrix(matrix, ivf_threshold=ivf_threshold)
+        with _cache_lock:
+            _cache[key] = (stamp, refs, index)
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_USERS:
+                _cache.popitem(last=False)
+        return refs, index
+
+    @staticmethod
+    def search(user_id, embedder: str, query_vector, limit: int = 20,
+               kinds: Optional[set] = None, ivf_threshold: int = 0) -> list[dict]:
+        """Best-first ``[{'id', 'kind', 'conversation_id', 'score'}]``."""
+        loaded = VectorIndexModel._load(_oid(user_id), embedder, ivf_threshold)
+        if loaded is None:
+            return []
+        refs, index = loaded
+        mask = None
+        if kinds:
+            mask = np.fromiter((r['kind'] in kinds for r in refs), dtype=bool, count=len(refs))
+        return [
+            {**refs[row], 'score': round(score, 4)}
+            for row, score in index.search(query_vector, limit, mask=mask)
+        ]
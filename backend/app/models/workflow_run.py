@@ -1,10 +1,14 @@
 from datetime import datetime
 from app.extensions import mongo
+from app.utils import field_compression
 from bson import ObjectId
 
 
 class WorkflowRunModel:
     collection = None
+    # Text outputs of a node result that may be stored compressed
+    # (app/utils/field_compression.py).
+    COMPRESSED_KEYS = ('text', 'text_variants')
 
     @classmethod
     def _get_collection(cls):
@@ -12,6 +16,22 @@ class WorkflowRunModel:
             cls.collection = mongo.db.workflow_runs
         return cls.collection
 
+    @classmethod
+    def compressed_paths(cls, run):
+        """Dotted paths of ``run``'s compressible node outputs."""
+        return [
+            f'node_results.{index}.{key}'
+            for index in range(len(run.get('node_results') or []))
+            for key in cls.COMPRESSED_KEYS
+        ]
+
+    @classmethod
+    def inflate(cls, run):
+        """Decode a stored run in place."""
+        if run:
+            field_compression.inflate(run, cls.compressed_paths(run))
+        return run
+
     @classmethod
     def create(cls, workflow_id, user_id, execution_mode, start_node_id=None):
         """Create a new workflow run
@@ -38,7 +58,7 @@ class WorkflowRunModel:
     @classmethod
     def get_by_id(cls, run_id):
         """Get workflow run by ID"""
-        return cls._get_collection().find_one({'_id': ObjectId(run_id)})
+        return cls.inflate(cls._get_collection().find_one({'_id': ObjectId(run_id)}))
 
     @classmethod
     def get_by_workflow(cls, workflow_id, user_id):
@@ -48,10 +68,10 @@ class WorkflowRunModel:
             workflow_id: Workflow ID
             user_id: User ID for ownership check
         """
-        runs = list(cls._get_collection().find({
+        runs = [cls.inflate(run) for run in cls._get_collection().find({
             'workflow_id': ObjectId(workflow_id),
             'user_id': ObjectId(user_id)
-        }).sort('started_at', -1))
+        }).sort('started_at', -1)]
         return runs
 
     @classmethod
@@ -108,7 +128,10 @@ class WorkflowRunModel:
 
             cls._get_collection().update_one(
                 {'_id': ObjectId(run_id)},
-                {'$set': update_query}
+                field_compression.pack_update(
+                    {'$set': update_query},
+                    [f'node_results.{node_index}.{key}' for key in cls.COMPRESSED_KEYS],
+                )
             )
         else:
             # Add new node result - start from a base doc then layer on any
@@ -132,7 +155,7 @@ class WorkflowRunModel:
 
             cls._get_collection().update_one(
                 {'_id': ObjectId(run_id)},
-                {'$push': {'node_results': node_result}}
+                {'$push': {'node_results': field_compression.pack(node_result, cls.COMPRESSED_KEYS)}}
             )
 
         return True
@@ -142,6 +142,12 @@ class WorkspaceModel:
         ).sort([('type', 1), ('name', 1)])
         return list(cursor)
 
+    @staticmethod
+    def _invalidate_overview(workspace_id) -> None:
+        """Drop the cached overview, which embeds the workspace and billing."""
+        from app.services.workspace_overview import invalidate
+        invalidate(workspace_id)
+
     @staticmethod
     def update(workspace_id, update_data: dict) -> bool:
         """
@@ -187,12 +193,50 @@ class WorkspaceModel:
         if 'enforce_2fa' in clean:
             clean['enforce_2fa'] = bool(clean['enforce_2fa'])
 
+        # Validate budget_mtd_usd (0 = no budget).
+        if 'budget_mtd_usd' in clean:
+            try:
+                budget = float(clean['budget_mtd_usd'] or 0)
+            except (TypeError, ValueError):
+                raise ValueError('budget_mtd_usd must be a number')
+            if budget < 0:
+                raise ValueError('budget_mtd_usd must not be negative')
+            clean['budget_mtd_usd'] = budget
+
+        # Replacing settings may replace settings.dlp — re-stamp the policy
+        # version so cached DLP detectors recompile.
+        if 'settings' in clean:
+            from app.services.dlp_service import dlp_policy_version, invalidate_detector_cache
+            raw_dlp = (clean['settings'] or {}).get('dlp')
+            clean['dlp_policy_version'] = dlp_policy_version(raw_dlp)
+            invalidate_detector_cache(workspace_id)
+
         clean['updated_at'] = datetime.utcnow()
 
         result = WorkspaceModel.get_collection().update_one(
             {'_id': workspace_id},
             {'$set': clean}
         )
+        WorkspaceModel._invalidate_overview(workspace_id)
+        return result.modified_count > 0
+
+    @staticmethod
+    def set_dlp_policy(workspace_id, dlp: dict) -> bool:
+        """Replace ``settings.dlp`` alone (other settings untouched) and
+        re-stamp the policy version so cached DLP detectors recompile."""
+        from app.services.dlp_service import dlp_policy_version, invalidate_detector_cache
+        if isinstance(workspace_id, str):
+            workspace_id = ObjectId(workspace_id)
+        result = WorkspaceModel.get_collection().update_one(
+            {'_id': workspace_id},
+            {'$set': {
+                'settings.dlp': dlp,
+                'dlp_policy_version': dlp_policy_version(dlp),
+                'updated_at': datetime.utcnow(),
+            }},
+        )
+        invalidate_detector_cache(workspace_id)
+        WorkspaceModel._invalidate_overview(workspace_id)
         return result.modified_count > 0
 
     @staticmethod
@@ -204,6 +248,7 @@ class WorkspaceModel:
         if isinstance(workspace_id, str):
             workspace_id = ObjectId(workspace_id)
         result = WorkspaceModel.get_collection().delete_one({'_id': workspace_id})
+        WorkspaceModel._invalidate_overview(workspace_id)
         return result.deleted_count > 0
 
     @staticmethod
@@ -217,6 +262,7 @@ class WorkspaceModel:
             {'_id': workspace_id},
             {'$set': {'owner_id': new_owner_id, 'updated_at': datetime.utcnow()}},
         )
+        WorkspaceModel._invalidate_overview(workspace_id)
         return result.modified_count > 0
 
     @staticmethod
@@ -18,6 +18,12 @@ BILLING_ROLES = {'owner'}
 ADMIN_ROLES = {'owner'}
 
 
+def _invalidate_overview(workspace_id) -> None:
+    # The cached workspace overview carries seat counts.
+    from app.services.workspace_overview import invalidate
+    invalidate(workspace_id)
+
+
 class WorkspaceMemberModel:
     """Model for workspace memberships - links users to workspaces with a role."""
 
@@ -82,9 +88,11 @@ class WorkspaceMemberModel:
             'status': status,
             'joined_at': now if status == 'active' else None,
             'created_at': now,
+            'updated_at': now,
         }
         result = collection.insert_one(doc)
         doc['_id'] = result.inserted_id
+        _invalidate_overview(workspace_id)
         return doc
 
     @staticmethod
@@ -144,6 +152,7 @@ class WorkspaceMemberModel:
             {'workspace_id': workspace_id, 'user_id': user_id},
             {'$set': {'role': role}},
         )
+        _invalidate_overview(workspace_id)
         return result.modified_count > 0
 
     @staticmethod
@@ -156,14 +165,16 @@ class WorkspaceMemberModel:
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
 
-        update = {'status': status}
+        now = datetime.utcnow()
+        update = {'status': status, 'updated_at': now}
         if status == 'active':
-            update['joined_at'] = datetime.utcnow()
+            update['joined_at'] = now
 
         result = WorkspaceMemberModel.get_collection().update_one(
             {'workspace_id': workspace_id, 'user_id': user_id},
             {'$set': update},
         )
+        _invalidate_overview(workspace_id)
         return result.modified_count > 0
 
     @staticmethod
@@ -177,6 +188,7 @@ class WorkspaceMemberModel:
             'workspace_id': workspace_id,
             'user_id': user_id,
         })
+        _invalidate_overview(workspace_id)
         return result.deleted_count > 0
 
     @staticmethod
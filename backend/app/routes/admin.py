@@ -8,7 +8,10 @@ from app.models.conversation import ConversationModel
 from app.models.message import MessageModel
 from app.models.llm_config import LLMConfigModel
 from app.models.audit_log import AuditLogModel
+from app.models.activity_counter import ActivityCounterModel
+from app.models.usage_rollup import UsageRollupModel
 from app.extensions import mongo
+from app.utils import downloads, pagination
 from app.utils.helpers import serialize_doc
 from app.utils.decorators import admin_required
 
@@ -41,19 +44,29 @@ def get_users():
             {'profile.display_name': {'$regex': escaped_search, '$options': 'i'}}
         ]
 
-    users = list(mongo.db.users.find(
-        query,
-        {'password_hash': 0}
-    ).sort('created_at', -1).skip(skip).limit(limit))
+    # ``?cursor=`` switches to keyset paging (app/utils/pagination.py).
+    cursor = pagination.cursor_arg(request.args)
+    sort = pagination.sort_spec('created_at', -1)
+    try:
+        paged_query = pagination.apply_cursor(query, sort, cursor)
+    except pagination.CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    results = mongo.db.users.find(paged_query, {'password_hash': 0}).sort(sort)
+    if not cursor:
+        results = results.skip(skip)
+    users, next_cursor = pagination.next_page(list(results.limit(limit + 1)), limit, sort)
 
-    total = mongo.db.users.count_documents(query)
+    total = None
+    if pagination.wants_total(request.args, cursor):
+        total = mongo.db.users.count_documents(query)
 
     return jsonify({
         'users': serialize_doc(users),
         'total': total,
         'page': page,
         'limit': limit,
-        'has_more': skip + len(users) < total
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
     }), 200
 
 
@@ -194,7 +207,16 @@ def get_user_history(user_id):
     limit = int(request.args.get('limit', 20))
     skip = (page - 1) * limit
 
-    conversations = ConversationModel.get_by_user_for_admin(user_id, skip=skip, limit=limit)
+    cursor = pagination.cursor_arg(request.args)
+    try:
+        conversations = ConversationModel.get_by_user_for_admin(
+            user_id, skip=skip, limit=limit + 1, cursor=cursor,
+        )
+    except pagination.CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    conversations, next_cursor = pagination.next_page(
+        conversations, limit, pagination.sort_spec('last_message_at', -1),
+    )
 
     # Get messages for each conversation if requested
     include_messages = request.args.get('include_messages', 'false').lower() == 'true'
@@ -205,6 +227,7 @@ def get_user_history(user_id):
 
     return jsonify({
         'conversations': serialize_doc(conversations),
+        'next_cursor': next_cursor,
         'user': {
             'id': str(user['_id']),
             'email': user['email'],
@@ -298,7 +321,11 @@ def delete_template(template_id):
 @jwt_required()
 @admin_required
 def get_analytics():
-    """Get usage analytics"""
+    """Get usage analytics.
+
+    Totals use ``estimated_document_count`` (collection metadata, no scan);
+    windowed counts read the daily activity counters and the usage rollups.
+    """
     # Time range
     days = int(request.args.get('days', 30))
     start_date = datetime.utcnow() - timedelta(days=days)
@@ -310,12 +337,10 @@ def get_analytics():
     })
 
     # Total conversations and messages
-    total_conversations = mongo.db.conversations.count_documents({})
-    recent_conversations = mongo.db.conversations.count_documents({
-        'created_at': {'$gte': start_date}
-    })
+    total_conversations = mongo.db.conversations.estimated_document_count()
+    recent_conversations = sum(ActivityCounterModel.daily('conversations', days).values())
 
-    total_messages = mongo.db.messages.count_documents({})
+    total_messages = mongo.db.messages.estimated_document_count()
 
     # Total tokens used
     pipeline = [
@@ -327,22 +352,13 @@ def get_analytics():
     result = list(mongo.db.users.aggregate(pipeline))
     total_tokens = result[0]['total_tokens'] if result else 0
 
-    # Usage by model (from usage_logs if available)
-    model_usage = []
-    try:
-        model_pipeline = [
-            {'$match': {'created_at': {'$gte': start_date}}},
-            {'$group': {
-                '_id': '$model_id',
-                'count': {'$sum': 1},
-                'total_tokens': {'$sum': '$tokens.total'}
-            }},
-            {'$sort': {'count': -1}},
-            {'$limit': 10}
-        ]
-        model_usage = list(mongo.db.usage_logs.aggregate(model_pipeline))
-    except Exception:
-        pass
+    # Usage by model
+    rows = UsageRollupModel.aggregate({}, 'model_id', start_date)
+    rows.sort(key=lambda r: r['count'], reverse=True)
+    model_usage = [
+        {'_id': r['_id'], 'count': r['count'], 'total_tokens': r['total_tokens']}
+        for r in rows[:10]
+    ]
 
     return jsonify({
         'analytics': {
@@ -374,136 +390,50 @@ def get_cost_analytics():
     days = int(request.args.get('days', 30))
     start_date = datetime.utcnow() - timedelta(days=days)
 
-    # Try to get costs from usage_logs
-    try:
-        pipeline = [
-            {'$match': {'created_at': {'$gte': start_date}}},
-            {'$group': {
-                '_id': '$model_id',
-                'total_cost': {'$sum': '$cost_usd'},
-                'total_requests': {'$sum': 1},
-                'total_tokens': {'$sum': '$tokens.total'}
-            }},
-            {'$sort': {'total_cost': -1}}
-        ]
-        costs = list(mongo.db.usage_logs.aggregate(pipeline))
-
-        total_cost = sum(c['total_cost'] for c in costs)
-
-        return jsonify({
-            'costs': {
-                'by_model': costs,
-                'total_cost_usd': total_cost,
-                'period_days': days
-            }
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'costs': {
-                'by_model': [],
-                'total_cost_usd': 0,
-                'period_days': days,
-                'note': 'Cost tracking not yet implemented'
-            }
-        }), 200
+    costs = [
+        {
+            '_id': r['_id'],
+            'total_cost': r['total_cost'],
+            'total_requests': r['count'],
+            'total_tokens': r['total_tokens'],
+        }
+        for r in UsageRollupModel.aggregate({}, 'model_id', start_date)
+    ]
+    total_cost = sum(c['total_cost'] for c in costs)
+
+    return jsonify({
+        'costs': {
+            'by_model': costs,
+            'total_cost_usd': total_cost,
+            'period_days': days
+        }
+    }), 200
 
 
 @admin_bp.route('/analytics/timeseries', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_timeseries_analytics():
-    """Get time-series analytics data for charts"""
+    """Get time-series analytics data for charts.
+
+    Reads the daily activity counters and usage rollups — never the raw
+    ``messages`` collection.
+    """
     days = int(request.args.get('days', 30))
     granularity = request.args.get('granularity', 'day')  # day, week, month
     start_date = datetime.utcnow() - timedelta(days=days)
 
-    # Get messages per day
-    messages_pipeline = [
-        {'$match': {'created_at': {'$gte': start_date}}},
-        {'$group': {
-            '_id': {
-                '$dateToString': {
-                    'format': '%Y-%m-%d',
-                    'date': '$created_at'
-                }
-            },
-            'count': {'$sum': 1}
-        }},
-        {'$sort': {'_id': 1}}
-    ]
-    messages_by_day = list(mongo.db.messages.aggregate(messages_pipeline))
-
-    # Get users per day (registrations)
-    users_pipeline = [
-        {'$match': {'created_at': {'$gte': start_date}}},
-        {'$group': {
-            '_id': {
-                '$dateToString': {
-                    'format': '%Y-%m-%d',
-                    'date': '$created_at'
-                }
-            },
-            'count': {'$sum': 1}
-        }},
-        {'$sort': {'_id': 1}}
-    ]
-    users_by_day = list(mongo.db.users.aggregate(users_pipeline))
+    messages_by_day = ActivityCounterModel.daily('messages', days)
+    users_by_day = ActivityCounterModel.daily('signups', days)
+    conversations_by_day = ActivityCounterModel.daily('conversations', days)
 
-    # Get conversations per day
-    conversations_pipeline = [
-        {'$match': {'created_at': {'$gte': start_date}}},
-        {'$group': {
-            '_id': {
-                '$dateToString': {
-                    'format': '%Y-%m-%d',
-                    'date': '$created_at'
-                }
-            },
-            'count': {'$sum': 1}
-        }},
-        {'$sort': {'_id': 1}}
-    ]
-    conversations_by_day = list(mongo.db.conversations.aggregate(conversations_pipeline))
-
-    # Get tokens per day from usage_logs (if available)
-    tokens_by_day = []
-    try:
-        tokens_pipeline = [
-            {'$match': {'created_at': {'$gte': start_date}}},
-            {'$group': {
-                '_id': {
-                    '$dateToString': {
-                        'format': '%Y-%m-%d',
-                        'date': '$created_at'
-                    }
-                },
-                'tokens': {'$sum': {'$add': ['$tokens.prompt', '$tokens.completion']}}
-            }},
-            {'$sort': {'_id': 1}}
-        ]
-        tokens_by_day = list(mongo.db.usage_logs.aggregate(tokens_pipeline))
-    except Exception:
-        pass
-
-    # Get popular models
-    popular_models = []
-    try:
-        model_pipeline = [
-            {'$match': {'created_at': {'$gte': start_date}, 'metadata.model_id': {'$exists': True}}},
-            {'$group': {
-                '_id': '$metadata.model_id',
-                'count': {'$sum': 1}
-            }},
-            {'$sort': {'count': -1}},
-            {'$limit': 5}
-        ]
-        popular_models = list(mongo.db.messages.aggregate(model_pipeline))
-    except Exception:
-        pass
+    tokens_by_day = sorted(
+        UsageRollupModel.aggregate({}, 'day', start_date), key=lambda r: r['_id'],
+    )
+    popular_models = ActivityCounterModel.top_models(days, limit=5)
 
     # Fill in missing days with zero values
-    def fill_dates(data, days):
-        date_map = {item['_id']: item['count'] for item in data}
+    def fill_dates(date_map, days):
         filled = []
         for i in range(days):
             date = (datetime.utcnow() - timedelta(days=days-i-1)).strftime('%Y-%m-%d')
@@ -518,8 +448,8 @@ def get_timeseries_analytics():
             'messages': fill_dates(messages_by_day, days),
             'users': fill_dates(users_by_day, days),
             'conversations': fill_dates(conversations_by_day, days),
-            'tokens': [{'date': t['_id'], 'value': t.get('tokens', 0)} for t in tokens_by_day],
-            'popular_models': [{'model': m['_id'], 'count': m['count']} for m in popular_models],
+            'tokens': [{'date': t['_id'], 'value': t['total_tokens']} for t in tokens_by_day],
+            'popular_models': popular_models,
             'period_days': days,
             'granularity': granularity
         }
@@ -578,100 +508,14 @@ def get_audit_logs():
 @jwt_required()
 @admin_required
 def list_all_companies():
-    """List every team workspace with aggregated stats. Super-admin only."""
-    days = int(request.args.get('days', 30))
-    cutoff = datetime.utcnow() - timedelta(days=days)
-
-    workspaces = list(mongo.db.workspaces.find({'type': 'team'}).sort('created_at', -1))
-    if not workspaces:
-        return jsonify({'companies': [], 'totals': _empty_totals()}), 200
-
-    wids = [w['_id'] for w in workspaces]
-
-    # Member counts
-    member_counts = {}
-    for row in mongo.db.workspace_members.aggregate([
-        {'$match': {'workspace_id': {'$in': wids}, 'status': 'active'}},
-        {'$group': {'_id': '$workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        member_counts[row['_id']] = row['count']
-
-    # Project counts (active only)
-    project_counts = {}
-    for row in mongo.db.projects.aggregate([
-        {'$match': {'workspace_id': {'$in': wids}, 'archived': {'$ne': True}}},
-        {'$group': {'_id': '$workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        project_counts[row['_id']] = row['count']
-
-    # Conversation counts
-    conv_counts = {}
-    for row in mongo.db.conversations.aggregate([
-        {'$lookup': {'from': 'projects', 'localField': 'project_id', 'foreignField': '_id', 'as': 'p'}},
-        {'$unwind': {'path': '$p', 'preserveNullAndEmptyArrays': False}},
-        {'$match': {'p.workspace_id': {'$in': wids}}},
-        {'$group': {'_id': '$p.workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        conv_counts[row['_id']] = row['count']
-
-    # Usage rollup over last `days` days: cost + tokens + call count
-    usage = {}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {
-            'workspace_id': {'$in': wids},
-            'created_at': {'$gte': cutoff},
-        }},
-        {'$group': {
-            '_id': '$workspace_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ]):
-        usage[row['_id']] = row
-
-    out = []
-    for w in workspaces:
-        wid = w['_id']
-        u = usage.get(wid, {})
-        out.append({
-            '_id': str(wid),
-            'name': w.get('name'),
-            'slug': w.get('slug'),
-            'domain': w.get('domain'),
-            'created_at': w.get('created_at'),
-            'owner_id': str(w.get('owner_id')) if w.get('owner_id') else None,
-            'plan_tier': w.get('plan_tier'),
-            'credits_balance_usd': float(w.get('credits_balance_usd', 0) or 0),
-            'member_count': member_counts.get(wid, 0),
-            'project_count': project_counts.get(wid, 0),
-            'conversation_count': conv_counts.get(wid, 0),
-            f'usage_{days}d': {
-                'cost_usd': round(float(u.get('cost_usd', 0) or 0), 4),
-                'tokens':   int(u.get('tokens', 0) or 0),
-                'calls':    int(u.get('calls', 0) or 0),
-            },
-        })
-
-    totals = {
-        'companies': len(workspaces),
-        'members':   sum(member_counts.values()),
-        'projects':  sum(project_counts.values()),
-        'conversations': sum(conv_counts.values()),
-        f'cost_{days}d':   round(sum(float(v.get('cost_usd', 0) or 0) for v in usage.values()), 4),
-        f'tokens_{days}d': sum(int(v.get('tokens', 0) or 0) for v in usage.values()),
-        f'calls_{days}d':  sum(int(v.get('calls', 0) or 0) for v in usage.values()),
-        'credits_balance_usd': round(sum(float(w.get('credits_balance_usd', 0) or 0) for w in workspaces), 2),
-    }
+    """List every team workspace with aggregated stats. Super-admin only.
 
-    return jsonify({'companies': serialize_doc(out), 'totals': totals, 'days': days}), 200
-
-
-def _empty_totals():
-    return {
-        'companies': 0, 'members': 0, 'projects': 0, 'conversations': 0,
-        'cost_30d': 0.0, 'tokens_30d': 0, 'calls_30d': 0, 'credits_balance_usd': 0.0,
-    }
+    Thin wrapper around `holding_analytics.list_companies` (materialised
+    views; the payload carries `refreshed_at`).
+    """
+    from app.services import holding_analytics
+    days = int(request.args.get('days', 30))
+    return jsonify(holding_analytics.list_companies(days=days)), 200
 
 
 @admin_bp.route('/companies/<wid>', methods=['GET'])
@@ -679,103 +523,15 @@ def _empty_totals():
 @admin_required
 def get_company_detail(wid):
     """Drill-down stats for one company. Super-admin only."""
+    from app.services import holding_analytics
     if not ObjectId.is_valid(wid):
         return jsonify({'error': 'invalid id'}), 400
 
     days = int(request.args.get('days', 30))
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    ws_id = ObjectId(wid)
-
-    workspace = mongo.db.workspaces.find_one({'_id': ws_id})
-    if not workspace:
+    payload = holding_analytics.company_detail(wid, days=days)
+    if payload is None:
         return jsonify({'error': 'not found'}), 404
-
-    # Per-project breakdown
-    projects = list(mongo.db.projects.find({'workspace_id': ws_id}))
-    project_ids = [p['_id'] for p in projects]
-    project_usage = {}
-    if project_ids:
-        for row in mongo.db.usage_logs.aggregate([
-            {'$match': {'project_id': {'$in': project_ids}, 'created_at': {'$gte': cutoff}}},
-            {'$group': {
-                '_id': '$project_id',
-                'cost_usd': {'$sum': '$cost_usd'},
-                'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-                'calls':    {'$sum': 1},
-            }},
-        ]):
-            project_usage[row['_id']] = row
-
-    project_rows = []
-    for p in projects:
-        u = project_usage.get(p['_id'], {})
-        project_rows.append({
-            '_id': str(p['_id']),
-            'name': p.get('name'),
-            'archived': bool(p.get('archived')),
-            'pinned': bool(p.get('pinned')),
-            'cost_usd': round(float(u.get('cost_usd', 0) or 0), 4),
-            'tokens': int(u.get('tokens', 0) or 0),
-            'calls': int(u.get('calls', 0) or 0),
-        })
-    project_rows.sort(key=lambda r: r['cost_usd'], reverse=True)
-
-    # Top users
-    top_users = []
-    user_rollup = list(mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$user_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 10},
-    ]))
-    if user_rollup:
-        uids = [r['_id'] for r in user_rollup if r.get('_id')]
-        users = {u['_id']: u for u in mongo.db.users.find({'_id': {'$in': uids}}, {'email': 1, 'profile.display_name': 1, 'role': 1})}
-        for r in user_rollup:
-            u = users.get(r['_id'], {})
-            top_users.append({
-                '_id': str(r['_id']),
-                'email': u.get('email'),
-                'name': (u.get('profile') or {}).get('display_name'),
-                'role': u.get('role'),
-                'cost_usd': round(float(r.get('cost_usd', 0) or 0), 4),
-                'calls': int(r.get('calls', 0) or 0),
-            })
-
-    # Top models
-    top_models = []
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$model',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 8},
-    ]):
-        top_models.append({
-            'model': row['_id'],
-            'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
-            'calls': int(row.get('calls', 0) or 0),
-        })
-
-    member_count = mongo.db.workspace_members.count_documents({'workspace_id': ws_id, 'status': 'active'})
-
-    return jsonify({
-        'workspace': serialize_doc(workspace),
-        'days': days,
-        'member_count': member_count,
-        'project_count': len([p for p in projects if not p.get('archived')]),
-        'projects': project_rows,
-        'top_users': top_users,
-        'top_models': top_models,
-    }), 200
-
+    return jsonify(payload), 200
 
 
 @admin_bp.route('/users-overview', methods=['GET'])
@@ -800,3 +556,60 @@ def users_overview():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     return jsonify(payload), 200
+
+
+# ----------------------------------------------------------------------------
+# Raw exports — streaming CSV / NDJSON
+# ----------------------------------------------------------------------------
+
+@admin_bp.route('/exports/<dataset>', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_dataset(dataset):
+    """Stream raw rows of usage_logs | dlp_events | audit_logs. Admin only.
+
+    Query params:
+      format      csv (default) | ndjson
+      from, to    ISO dates; half-open range on created_at
+      columns     comma-separated subset of the dataset's columns
+      after       last _id received — resume right after that row
+      limit       optional row cap (for chunked downloads)
+      batch_size  cursor batch size (default 1000, max 5000)
+      plus equality filters per dataset (workspace_id, user_id, action, ...)
+
+    The body is gzip-encoded when the client sends ``Accept-Encoding: gzip``.
+    """
+    from app.services import exports
+
+    spec = exports.DATASETS.get(dataset)
+    if spec is None:
+        return jsonify({'error': f'unknown dataset: {dataset}'}), 404
+
+    fmt = request.args.get('format', 'csv').lower()
+    gzip = bool(request.accept_encodings['gzip'])
+    try:
+        body = exports.stream(
+            dataset,
+            fmt=fmt,
+            columns=request.args.get('columns'),
+            start=downloads.parse_date(request.args.get('from')),
+            end=downloads.parse_date(request.args.get('to')),
+            after=request.args.get('after'),
+            filters={arg: request.args.get(arg) for arg in spec.filters if arg in request.args},
+            batch_size=int(request.args.get('batch_size', exports.DEFAULT_BATCH_SIZE)),
+            limit=int(request.args['limit']) if request.args.get('limit') else None,
+            gzip=gzip,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    extension = 'csv' if fmt == 'csv' else 'ndjson'
+    response = downloads.attachment(
+        body,
+        f'{dataset}-{datetime.utcnow():%Y%m%d%H%M%S}.{extension}',
+        'text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        headers={'Vary': 'Accept-Encoding'},
+    )
+    if gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -9,6 +9,7 @@ from app.services.openrouter_service import OpenRouterService
 from app.utils.helpers import serialize_doc, generate_conversation_title
 from app.utils.decorators import active_user_required
 from app.utils.config_resolver import resolve_config as resolve_chat_config
+from app.utils import pagination
 from datetime import datetime, timezone
 import time
 
@@ -181,15 +182,26 @@ def get_messages(conversation_id):
     # Get branch_id from query params, default to active branch
     branch_id = request.args.get('branch_id', conversation.get('active_branch', 'main'))
 
-    messages = MessageModel.find_by_conversation(conversation_id, skip=skip, limit=limit, branch_id=branch_id)
-    total = MessageModel.count_by_conversation(conversation_id)
+    # ``?cursor=`` switches to keyset paging (app/utils/pagination.py).
+    cursor = pagination.cursor_arg(request.args)
+    try:
+        messages = MessageModel.find_by_conversation(
+            conversation_id, skip=skip, limit=limit + 1, branch_id=branch_id, cursor=cursor,
+        )
+    except pagination.CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    messages, next_cursor = pagination.next_page(messages, limit, MessageModel.SORT)
+    total = None
+    if pagination.wants_total(request.args, cursor):
+        total = MessageModel.count_by_conversation(conversation_id)
 
     return jsonify({
         'messages': serialize_doc(messages),
         'total': total,
         'page': page,
         'limit': limit,
-        'branch_id': branch_id
+        'branch_id': branch_id,
+        'next_cursor': next_cursor,
     }), 200
 
 
@@ -210,7 +222,12 @@ def delete_message(message_id):
     if not conversation or str(conversation['user_id']) != user_id:
         return jsonify({'error': 'Message not found'}), 404
 
-    MessageModel.delete(message_id)
+    # A message the active branch only inherits is removed from that branch
+    # alone; branches sharing the row keep it.
+    message = MessageModel.claim_for_write(
+        conversation['_id'], message, request.args.get('branch_id') or conversation.get('active_branch'),
+    )
+    MessageModel.delete(message['_id'])
 
     return jsonify({'message': 'Message deleted'}), 200
 
@@ -247,7 +264,6 @@ def edit_message(message_id):
         return jsonify({'error': 'Conversation not found'}), 404
 
     conversation_id = str(conversation['_id'])
-    branch_id = message.get('branch_id', 'main')
 
     # Pre-flight config check BEFORE destructive ops (P0.1: prevent message loss on 404)
     config = None
@@ -256,6 +272,14 @@ def edit_message(message_id):
         if not config:
             return jsonify({'error': 'Config not found'}), 404
 
+    # Edit the viewed branch's own row: an inherited message is copied into
+    # it first, and branches that share the message keep the original.
+    message = MessageModel.claim_for_write(
+        conversation_id, message, data.get('branch_id') or conversation.get('active_branch'),
+    )
+    message_id = str(message['_id'])
+    branch_id = message.get('branch_id', 'main')
+
     # Store edit history.
     # P1.7: `edited_at` was recording the message's original `created_at`,
     # which is the timestamp of the message we are REPLACING — not when the
@@ -384,6 +408,10 @@ def regenerate_message(message_id):
 
     conversation_id = str(conversation['_id'])
     current_branch = message.get('branch_id', 'main')
+    # Regenerate on the branch being viewed when it inherits the message.
+    view_branch = data.get('branch_id') or conversation.get('active_branch')
+    if view_branch and MessageModel.is_visible_on(conversation_id, view_branch, message):
+        current_branch = view_branch
 
     # Get config
     config = LLMConfigModel.find_by_id(conversation['config_id'])
@@ -413,19 +441,17 @@ def regenerate_message(message_id):
     if create_branch:
         # Create a new branch from the user message
         new_branch_id = str(uuid.uuid4())[:12]
+        # The new branch shares everything up to and including the user
+        # message with the branch it was stored on (copy-on-write).
         branch_data = {
             'id': new_branch_id,
             'name': branch_name or 'Regeneration branch',
-            'parent_branch': current_branch,
-            'branch_point_message_id': str(target_user_msg['_id'])
+            'parent_branch': target_user_msg.get('branch_id', 'main'),
+            'branch_point_message_id': str(target_user_msg['_id']),
+            **MessageModel.fork_point(target_user_msg),
         }
         ConversationModel.add_branch(conversation_id, branch_data)
 
-        # Copy messages up to and including the user message to the new branch
-        messages_to_copy = MessageModel.find_up_to(conversation_id, str(target_user_msg['_id']), current_branch)
-        for msg in messages_to_copy:
-            MessageModel.copy_to_branch(msg, new_branch_id)
-
         target_branch = new_branch_id
         ConversationModel.set_active_branch(conversation_id, new_branch_id)
     else:
@@ -6,10 +6,18 @@ from flask_jwt_extended import jwt_required, get_current_user
 from bson import ObjectId
 from app.models.conversation import ConversationModel
 from app.models.message import MessageModel
+from app.models.message_search import MessageSearchModel
+from app.services import semantic_search
 from app.models.llm_config import LLMConfigModel
 from app.models.user import UserModel
 from app.services.openrouter_service import OpenRouterService
-from app.services.dlp_gate import DLPBlockedError, format_blocked_response, gate as dlp_gate
+from app.services.dlp_gate import (
+    DLPBlockedError,
+    egress_redactor,
+    format_blocked_response,
+    gate_optimistic as dlp_gate_optimistic,
+    record_egress,
+)
 from app.services import stream_state
 from app.utils.helpers import serialize_doc, generate_conversation_title
 from app.utils.config_resolver import resolve_config as resolve_chat_config
@@ -68,8 +76,11 @@ def stream_chat():
         or user.get('ai_preferences', {}).get('user_info', {}).get('language', 'en')
         or 'en'
     )[:2].lower()
+    # With optimistic smart scan enabled on the workspace the classifier runs
+    # alongside the upstream request; model output is held back below until
+    # the verdict lands. Otherwise this settles (and raises) right here.
     try:
-        dlp_gate(
+        dlp_pending = dlp_gate_optimistic(
             text=message_content,
             user_id=user['_id'],
             workspace_id=user.get('active_workspace_id'),
@@ -91,7 +102,28 @@ def stream_chat():
     # Capture app object BEFORE generator definition (Flask context is active here)
     app = current_app._get_current_object()
 
+    # Filled in by stream_events() as it goes; read by generate()'s cleanup.
+    dlp_state = {'sent_upstream': False, 'message_ids': []}
+
     def generate():
+        try:
+            yield from stream_events()
+        finally:
+            # Every exit — early returns, upstream errors, client disconnect
+            # (GeneratorExit) — settles the optimistic verdict so its event is
+            # persisted and a block still discards the saved messages.
+            if dlp_pending.pending:
+                try:
+                    dlp_pending.resolve(sent_upstream=dlp_state['sent_upstream'])
+                except DLPBlockedError:
+                    if dlp_state['message_ids']:
+                        MessageSearchModel.remove(dlp_state['message_ids'])
+                        semantic_search.remove(dlp_state['message_ids'])
+                        MessageModel.get_collection().delete_many({
+                            '_id': {'$in': dlp_state['message_ids']}
+                        })
+
+    def stream_events():
         nonlocal conversation_id
 
         # Create or get conversation
@@ -120,8 +152,9 @@ def stream_chat():
         # Get active branch
         branch_id = conversation.get('active_branch', 'main')
 
-        # Generate better title in background thread (only for new conversations)
-        if is_new_conversation:
+        # Generate better title in background thread (only for new conversations).
+        # Deferred until the DLP verdict when optimistic smart scan is pending.
+        def start_title_thread():
             title_ws_id = conversation.get('workspace_id') or user.get('active_workspace_id')
             title_proj_id = conversation.get('project_id')
 
@@ -148,6 +181,31 @@ def stream_chat():
             thread.daemon = True
             thread.start()
 
+        if is_new_conversation and not dlp_pending.pending:
+            start_title_thread()
+
+        def dlp_hold_back():
+            """Resolve the optimistic DLP verdict; return an SSE error or None."""
+            try:
+                dlp_pending.resolve(sent_upstream=True)
+            except DLPBlockedError as dlp_exc:
+                blocked = format_blocked_response(dlp_exc)
+                MessageSearchModel.remove([user_message['_id'], assistant_message['_id']])
+                semantic_search.remove([user_message['_id'], assistant_message['_id']])
+                MessageModel.get_collection().delete_many({
+                    '_id': {'$in': [user_message['_id'], assistant_message['_id']]}
+                })
+                return sse_event('message_error', {
+                    'message_id': message_id,
+                    'error': blocked['error'],
+                    'code': blocked['code'],
+                    'matches': blocked['matches'],
+                    'conversation_id': conversation_id
+                })
+            if is_new_conversation:
+                start_title_thread()
+            return None
+
         # Save user message
         user_message = MessageModel.create_user_message(
             conversation_id=conversation_id,
@@ -155,6 +213,7 @@ def stream_chat():
             attachments=attachments,
             branch_id=branch_id
         )
+        dlp_state['message_ids'].append(user_message['_id'])
 
         yield sse_event('message_saved', {
             'message': serialize_doc(user_message),
@@ -175,6 +234,7 @@ def stream_chat():
             branch_id=branch_id
         )
         message_id = str(assistant_message['_id'])
+        dlp_state['message_ids'].append(assistant_message['_id'])
 
         # Store generation task for cancellation (Mongo-backed for multi-worker reach — P0.2)
         stream_state.register(message_id, user_id=user_id)
@@ -189,6 +249,7 @@ def stream_chat():
         # Start streaming response
         start_time = time.time()
         full_content = ''
+        redactor = None
         prompt_tokens = 0
         completion_tokens = 0
         finish_reason = 'stop'
@@ -205,6 +266,10 @@ def stream_chat():
 
             ws_id = user.get('active_workspace_id')
             proj_id = conversation.get('project_id')
+            # Workspaces with egress redaction get model output scanned and
+            # masked before each chunk is emitted (bounded lookback).
+            redactor = egress_redactor(ws_id)
+            dlp_state['sent_upstream'] = True
             stream = OpenRouterService.chat_completion(
                 messages=formatted_messages,
                 model=config['model_id'],
@@ -224,6 +289,17 @@ def stream_chat():
             )
 
             for chunk in stream:
+                # Hold the first model output back until the optimistic DLP
+                # verdict is in — the upstream call and classifier overlap.
+                if dlp_pending.pending:
+                    blocked_event = dlp_hold_back()
+                    if blocked_event is not None:
+                        close = getattr(stream, 'close', None)
+                        if close is not None:
+                            close()
+                        yield blocked_event
+                        return
+
                 # Check for cancellation (cross-worker — reads from Mongo).
                 # P1.22: this is the chunk-level poll. It cancels promptly
                 # between chunks but cannot interrupt a blocked
@@ -261,6 +337,8 @@ def stream_chat():
                 if choices:
                     delta = choices[0].get('delta', {})
                     content = delta.get('content', '')
+                    if content and redactor is not None:
+                        content = redactor.push(content)
                     if content:
                         full_content += content
                         yield sse_event('message_chunk', {
@@ -291,13 +369,43 @@ def stream_chat():
             # Clean up generation task
             stream_state.clear(message_id)
 
+        if redactor is not None:
+            tail = redactor.flush()
+            if tail:
+                full_content += tail
+                yield sse_event('message_chunk', {
+                    'message_id': message_id,
+                    'content': tail,
+                    'conversation_id': conversation_id
+                })
+            record_egress(
+                redactor,
+                user_id=user['_id'],
+                workspace_id=ws_id,
+                project_id=proj_id,
+                source='chat',
+                source_ref={
+                    'conversation_id': conversation_id,
+                    'message_id': message_id,
+                    'phase': 'egress',
+                },
+            )
+
+        # Upstream produced no chunks — still settle the verdict before
+        # completing so the event is persisted and blocks are honoured.
+        if dlp_pending.pending:
+            blocked_event = dlp_hold_back()
+            if blocked_event is not None:
+                yield blocked_event
+                return
+
         # Calculate generation time
         generation_time_ms = int((time.time() - start_time) * 1000)
 
         # Update assistant message with full content
         MessageModel.get_collection().update_one(
             {'_id': ObjectId(message_id)},
-            {
+            MessageModel.pack_update({
                 '$set': {
                     'content': full_content,
                     'metadata': {
@@ -311,8 +419,10 @@ def stream_chat():
                         **({'intent': intent} if intent else {})
                     }
                 }
-            }
+            })
         )
+        MessageSearchModel.reindex([message_id])
+        semantic_search.enqueue('message', message_id)
 
         # Update stats
         ConversationModel.increment_message_count(
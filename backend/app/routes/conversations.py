@@ -1,17 +1,22 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_current_user
 from bson import ObjectId
 from datetime import datetime
-import json
 import uuid
 from app.models.conversation import ConversationModel, NULL_PROJECT_SENTINEL
+from app.models.folder import FolderModel
+from app.models.knowledge_item import KnowledgeItemModel
 from app.models.message import MessageModel
+from app.models.message_search import MessageSearchModel
 from app.models.project import ProjectModel
 from app.models.project_member import ProjectMemberModel
+from app.models.purge_job import PurgeJobModel
 from app.models.workspace_member import WorkspaceMemberModel
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.decorators import active_user_required
 from app.utils.permissions import check_project_access
+from app.utils import downloads, http_cache, pagination
+from app.services import conversation_export, conversation_purge, semantic_search, text_search
 
 
 def _accessible_project_ids(user_id):
@@ -94,9 +99,26 @@ def _fetch_owned_conversation(conversation_id: str, user_id: str,
     return conversation, None
 
 
+def _list_stamp():
+    """Version of the sidebar list: the caller's conversations and the
+    projects they can see. ``None`` for a project filter the view refuses."""
+    user_id = get_current_user()['_id']
+    project_filter, err = _resolve_project_filter(request.args.get('project_id'))
+    if err:
+        return None
+    if project_filter and project_filter != NULL_PROJECT_SENTINEL:
+        if not check_project_access(str(user_id), project_filter, 'viewer'):
+            return None
+    return (
+        http_cache.watermark(ConversationModel.collection_name, {'user_id': user_id}),
+        sorted(str(pid) for pid in _accessible_project_ids(user_id)),
+    )
+
+
 @conversations_bp.route('', methods=['GET'])
 @jwt_required()
 @active_user_required
+@http_cache.conditional(_list_stamp)
 def get_conversations():
     """Get user's conversations"""
     user = get_current_user()
@@ -118,16 +140,25 @@ def get_conversations():
             return jsonify({'error': 'Project access denied', 'status': 403}), 403
 
     skip = (page - 1) * limit
-
-    conversations = ConversationModel.find_by_user(
-        user_id=user_id,
-        folder_id=folder_id,
-        archived=archived,
-        search=search,
-        skip=skip,
-        limit=limit,
-        sort_by=sort_by,
-        project_id=project_filter
+    # ``?cursor=`` switches to keyset paging (app/utils/pagination.py).
+    cursor = pagination.cursor_arg(request.args)
+
+    try:
+        conversations = ConversationModel.find_by_user(
+            user_id=user_id,
+            folder_id=folder_id,
+            archived=archived,
+            search=search,
+            skip=skip,
+            limit=limit + 1,
+            sort_by=sort_by,
+            project_id=project_filter,
+            cursor=cursor,
+        )
+    except pagination.CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    conversations, next_cursor = pagination.next_page(
+        conversations, limit, pagination.sort_spec(sort_by, -1),
     )
 
     # P1.x: drop conversations whose project_id no longer maps to a project
@@ -138,16 +169,19 @@ def get_conversations():
     accessible = _accessible_project_ids(user_id)
     conversations = [c for c in conversations if _conv_is_accessible(c, accessible)]
 
-    total = ConversationModel.count_by_user(
-        user_id, archived=archived, project_id=project_filter
-    )
+    total = None
+    if pagination.wants_total(request.args, cursor):
+        total = ConversationModel.count_by_user(
+            user_id, archived=archived, project_id=project_filter
+        )
 
     return jsonify({
         'conversations': serialize_doc(conversations),
         'total': total,
         'page': page,
         'limit': limit,
-        'has_more': skip + len(conversations) < total
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
     }), 200
 
 
@@ -305,10 +339,21 @@ def delete_conversation(conversation_id):
     user = get_current_user()
     user_id = str(user['_id'])
 
-    _, err = _fetch_owned_conversation(conversation_id, user_id, 'editor')
+    conversation, err = _fetch_owned_conversation(conversation_id, user_id, 'editor')
     if err:
         return err
 
+    # Long conversations hand their messages to the background purger
+    # instead of one big delete_many inside the request.
+    limit = current_app.config.get('CONVERSATION_PURGE_INLINE_LIMIT', 1000)
+    if MessageModel.count_by_conversation(conversation['_id']) > limit:
+        ConversationModel.delete(conversation_id)
+        job = conversation_purge.start(user_id, [conversation['_id']])
+        return jsonify({
+            'message': 'Conversation deleted',
+            'job': serialize_doc(PurgeJobModel.to_dict(job)),
+        }), 202
+
     # Delete all messages
     MessageModel.delete_by_conversation(conversation_id)
 
@@ -340,6 +385,173 @@ def toggle_archive(conversation_id):
     }), 200
 
 
+# ----------------------------------------------------------------------------
+# Bulk operations
+# ----------------------------------------------------------------------------
+
+MAX_BULK_IDS = 500
+
+
+def _bulk_targets(user_id, data):
+    """Resolve ``conversation_ids`` from a bulk request body to the ones the
+    caller may modify (owner + editor on the project, as for the single-
+    conversation routes).
+
+    Returns ``(ids, skipped, error_response)``; ``skipped`` lists
+    ``{'id', 'reason'}`` for ids that were not found or not editable.
+    """
+    raw = data.get('conversation_ids')
+    if not isinstance(raw, list) or not raw:
+        return None, None, (jsonify({'error': 'conversation_ids must be a non-empty list'}), 400)
+    if len(raw) > MAX_BULK_IDS:
+        return None, None, (jsonify({'error': f'at most {MAX_BULK_IDS} conversation_ids per request'}), 400)
+    if not all(isinstance(i, str) and validate_object_id(i) for i in raw):
+        return None, None, (jsonify({'error': 'Invalid conversation id'}), 400)
+
+    requested = list(dict.fromkeys(ObjectId(i) for i in raw))
+    found = {
+        c['_id']: c.get('project_id') for c in ConversationModel.get_collection().find(
+            {'_id': {'$in': requested}, 'user_id': ObjectId(user_id)}, {'project_id': 1},
+        )
+    }
+    editable_projects = {}
+    ids, skipped = [], []
+    for cid in requested:
+        if cid not in found:
+            skipped.append({'id': str(cid), 'reason': 'not_found'})
+            continue
+        pid = found[cid]
+        if pid is not None:
+            if pid not in editable_projects:
+                editable_projects[pid] = check_project_access(user_id, str(pid), 'editor')
+            if not editable_projects[pid]:
+                skipped.append({'id': str(cid), 'reason': 'forbidden'})
+                continue
+        ids.append(cid)
+    return ids, skipped, None
+
+
+@conversations_bp.route('/bulk/delete', methods=['POST'])
+@jwt_required()
+@active_user_required
+def bulk_delete_conversations():
+    """Delete many conversations.
+
+    Body: { "conversation_ids": ["<hex>", ...] }
+
+    The conversations disappear immediately; their messages are removed by
+    a background purge job whose progress is at ``GET /bulk/jobs/<id>``.
+    """
+    user = get_current_user()
+    user_id = str(user['_id'])
+
+    ids, skipped, err = _bulk_targets(user_id, request.get_json(silent=True) or {})
+    if err:
+        return err
+    if not ids:
+        return jsonify({'deleted': 0, 'skipped': skipped, 'job': None}), 200
+
+    deleted = ConversationModel.bulk_delete(ids).deleted_count
+    job = conversation_purge.start(user_id, ids)
+    return jsonify({
+        'deleted': deleted,
+        'skipped': skipped,
+        'job': serialize_doc(PurgeJobModel.to_dict(job)),
+    }), 202
+
+
+@conversations_bp.route('/bulk/archive', methods=['POST'])
+@jwt_required()
+@active_user_required
+def bulk_archive_conversations():
+    """Archive (or with ``"archived": false`` unarchive) many conversations.
+
+    Body: { "conversation_ids": [...], "archived": true }
+    """
+    user = get_current_user()
+    user_id = str(user['_id'])
+
+    data = request.get_json(silent=True) or {}
+    archived = data.get('archived', True)
+    if not isinstance(archived, bool):
+        return jsonify({'error': 'archived must be a boolean'}), 400
+    ids, skipped, err = _bulk_targets(user_id, data)
+    if err:
+        return err
+
+    updated = ConversationModel.bulk_update(ids, {'is_archived': archived}).modified_count if ids else 0
+    return jsonify({'updated': updated, 'skipped': skipped, 'is_archived': archived}), 200
+
+
+@conversations_bp.route('/bulk/move', methods=['POST'])
+@jwt_required()
+@active_user_required
+def bulk_move_conversations():
+    """Move many conversations to a folder and/or a project.
+
+    Body: { "conversation_ids": [...],
+            "folder_id": "<hex>" | null,     (optional)
+            "project_id": "<hex>" | null }   (optional)
+
+    At least one of ``folder_id`` / ``project_id`` is required; ``null``
+    clears it. A target folder must be the caller's; a target project
+    needs editor access, as for ``POST /<id>/move``.
+    """
+    user = get_current_user()
+    user_id = str(user['_id'])
+
+    data = request.get_json(silent=True) or {}
+    if 'folder_id' not in data and 'project_id' not in data:
+        return jsonify({'error': 'folder_id or project_id is required'}), 400
+
+    update_fields = {}
+    if 'folder_id' in data:
+        raw = data.get('folder_id')
+        if raw:
+            if not validate_object_id(raw):
+                return jsonify({'error': 'Invalid folder_id'}), 400
+            folder = FolderModel.find_by_id(raw)
+            if not folder or str(folder.get('user_id')) != user_id:
+                return jsonify({'error': 'Folder not found'}), 404
+            update_fields['folder_id'] = folder['_id']
+        else:
+            update_fields['folder_id'] = None
+    if 'project_id' in data:
+        raw = data.get('project_id')
+        if raw:
+            if not validate_object_id(raw):
+                return jsonify({'error': 'Invalid project_id'}), 400
+            if not check_project_access(user_id, raw, 'editor'):
+                return jsonify({
+                    'error': 'Project access denied',
+                    'code': 'project_access_denied',
+                }), 403
+            update_fields['project_id'] = ObjectId(raw)
+        else:
+            update_fields['project_id'] = None
+
+    ids, skipped, err = _bulk_targets(user_id, data)
+    if err:
+        return err
+
+    updated = ConversationModel.bulk_update(ids, update_fields).modified_count if ids else 0
+    return jsonify({'updated': updated, 'skipped': skipped}), 200
+
+
+@conversations_bp.route('/bulk/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@active_user_required
+def get_bulk_job(job_id):
+    """Progress of a background purge job started by a delete."""
+    user = get_current_user()
+    if not validate_object_id(job_id):
+        return jsonify({'error': 'Invalid job id'}), 400
+    job = PurgeJobModel.find_for_user(job_id, user['_id'])
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job': serialize_doc(PurgeJobModel.to_dict(job))}), 200
+
+
 @conversations_bp.route('/search', methods=['GET'])
 @jwt_required()
 @active_user_required
@@ -371,7 +583,13 @@ def search_conversations():
 @jwt_required()
 @active_user_required
 def search_messages():
-    """Search within message content across all user's conversations"""
+    """Search within message content across all user's conversations.
+
+    Served from the per-user message search index once it has been built
+    (``scripts/backfill_message_search.py``): BM25 ranking, ``"phrases"``,
+    ``prefix*`` and Persian/Arabic-normalised matching. Each result carries
+    a ``snippet`` ``{text, highlights}`` around the matches.
+    """
     user = get_current_user()
     user_id = str(user['_id'])
 
@@ -380,12 +598,20 @@ def search_messages():
         return jsonify({'error': 'Search query required'}), 400
 
     limit = min(int(request.args.get('limit', 50)), 100)
+    accessible = _accessible_project_ids(user_id)
+
+    if MessageSearchModel.is_ready():
+        results = _search_indexed_messages(user['_id'], query, limit, accessible)
+        return jsonify({
+            'results': serialize_doc(results),
+            'query': query,
+            'total': len(results)
+        }), 200
 
     # Get all user's conversation IDs — but skip ones in projects the user
     # has lost access to, so message-text search doesn't leak content from
     # those past-project conversations.
     conversations = ConversationModel.find_by_user(user_id=user_id, limit=1000)
-    accessible = _accessible_project_ids(user_id)
     conversation_ids = [
         str(c['_id']) for c in conversations if _conv_is_accessible(c, accessible)
     ]
@@ -411,17 +637,141 @@ def search_messages():
     }), 200
 
 
+def _search_indexed_messages(user_oid, query, limit, accessible):
+    """Index hits resolved to messages, keeping the same visibility rules
+    as the ``$text`` path: the caller's own, unarchived conversations in
+    projects they can still see."""
+    # Over-fetch: some hits fall away to the visibility filter below.
+    hits = MessageSearchModel.search(user_oid, query, limit=limit * 2)
+    if not hits:
+        return []
+    messages = {
+        m['_id']: MessageModel.inflate(m) for m in MessageModel.get_collection().find(
+            {'_id': {'$in': [h['message_id'] for h in hits]}},
+            {'conversation_id': 1, 'role': 1, 'content': 1, 'created_at': 1, 'branch_id': 1},
+        )
+    }
+    conversations = {
+        c['_id']: c for c in ConversationModel.get_collection().find(
+            {'_id': {'$in': list({m['conversation_id'] for m in messages.values()})},
+             'user_id': user_oid, 'is_archived': False},
+            {'title': 1, 'project_id': 1},
+        )
+    }
+    parsed = text_search.parse_query(query)
+    results = []
+    for hit in hits:
+        message = messages.get(hit['message_id'])
+        conversation = message and conversations.get(message['conversation_id'])
+        if not conversation or not _conv_is_accessible(conversation, accessible):
+            continue
+        results.append({
+            **message,
+            'score': hit['score'],
+            'conversation_title': conversation.get('title'),
+            'snippet': text_search.snippet(message.get('content') or '', parsed),
+        })
+        if len(results) >= limit:
+            break
+    return results
+
+
+@conversations_bp.route('/search/semantic', methods=['GET'])
+@jwt_required()
+@active_user_required
+def search_semantic():
+    """Find messages and knowledge items by meaning rather than exact words.
+
+    Query params: ``q``, ``limit`` (max 50), ``kind`` (``message`` or
+    ``knowledge``; both by default). Message hits are limited to the
+    caller's unarchived conversations in projects they can still see, and
+    only the best hit per conversation is returned.
+    """
+    if not semantic_search.enabled():
+        return jsonify({'error': 'Semantic search is not enabled'}), 503
+
+    user = get_current_user()
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Search query required'}), 400
+    limit = min(int(request.args.get('limit', 20)), 50)
+    kind = request.args.get('kind')
+    if kind is not None and kind not in semantic_search.KINDS:
+        return jsonify({'error': 'Invalid kind'}), 400
+
+    try:
+        hits = semantic_search.search(
+            user['_id'], query, limit=limit * 3, kinds={kind} if kind else None,
+        )
+    except Exception as exc:
+        current_app.logger.warning('semantic search failed: %s', exc)
+        return jsonify({'error': 'Semantic search is unavailable'}), 503
+
+    message_ids = [h['id'] for h in hits if h['kind'] == 'message']
+    knowledge_ids = [h['id'] for h in hits if h['kind'] == 'knowledge']
+    messages = {
+        m['_id']: MessageModel.inflate(m) for m in MessageModel.get_collection().find(
+            {'_id': {'$in': message_ids}},
+            {'conversation_id': 1, 'role': 1, 'content': 1, 'created_at': 1, 'branch_id': 1},
+        )
+    } if message_ids else {}
+    conversations = {
+        c['_id']: c for c in ConversationModel.get_collection().find(
+            {'_id': {'$in': list({m['conversation_id'] for m in messages.values()})},
+             'user_id': user['_id'], 'is_archived': False},
+            {'title': 1, 'project_id': 1},
+        )
+    } if messages else {}
+    knowledge = {
+        k['_id']: k for k in KnowledgeItemModel.get_collection().find(
+            {'_id': {'$in': knowledge_ids}, 'user_id': user['_id']},
+            {'title': 1, 'content': 1, 'created_at': 1},
+        )
+    } if knowledge_ids else {}
+
+    accessible = _accessible_project_ids(str(user['_id']))
+    results, seen = [], set()
+    for hit in hits:
+        if hit['kind'] == 'knowledge':
+            item = knowledge.get(hit['id'])
+            if item:
+                results.append({'kind': 'knowledge', 'score': hit['score'], **item})
+        else:
+            message = messages.get(hit['id'])
+            conversation = message and conversations.get(message['conversation_id'])
+            if (not conversation or conversation['_id'] in seen
+                    or not _conv_is_accessible(conversation, accessible)):
+                continue
+            seen.add(conversation['_id'])
+            results.append({
+                'kind': 'message', 'score': hit['score'], **message,
+                'conversation_title': conversation.get('title'),
+            })
+        if len(results) >= limit:
+            break
+
+    return jsonify({
+        'results': serialize_doc(results),
+        'query': query,
+        'total': len(results)
+    }), 200
+
+
 @conversations_bp.route('/<conversation_id>/export', methods=['GET'])
 @jwt_required()
 @active_user_required
 def export_conversation(conversation_id):
-    """Export conversation in JSON or Markdown format.
+    """Export conversation in JSON, Markdown or NDJSON format.
 
     P1.28: previously ``messages = MessageModel.find_by_conversation(cid)``
     was called without ``branch_id``, so non-main branches silently
     exported as empty files. We now read ``?branch_id=`` from the query
-    (defaulting to ``main``) and scope messages to that branch. JSON +
-    Markdown both honour it.
+    (defaulting to ``main``) and scope messages to that branch. Every
+    format honours it.
+
+    The body is streamed from a message cursor (app/services/
+    conversation_export.py), so long conversations export in full without
+    being loaded into memory.
     """
     user = get_current_user()
     user_id = str(user['_id'])
@@ -430,8 +780,11 @@ def export_conversation(conversation_id):
     if err:
         return err
 
-    # Get format from query params (default to markdown)
+    # Get format from query params (default to markdown; unknown values
+    # keep falling back to it)
     export_format = request.args.get('format', 'markdown').lower()
+    if export_format not in conversation_export.FORMATS:
+        export_format = 'markdown'
     include_metadata = request.args.get('metadata', 'true').lower() == 'true'
 
     # P1.28: scope export to a branch (defaults to 'main', the legacy
@@ -439,143 +792,64 @@ def export_conversation(conversation_id):
     # currently active branch as a sensible fallback when caller omits.
     branch_id = request.args.get('branch_id') or conversation.get('active_branch') or 'main'
 
-    # Use a generous limit so very long branches export in full.
-    messages = MessageModel.find_by_conversation(
-        conversation_id, limit=10000, branch_id=branch_id,
+    body = conversation_export.stream(
+        conversation, export_format, include_metadata, branch_id=branch_id,
     )
-
-    if export_format == 'json':
-        return _export_as_json(conversation, messages, include_metadata)
-    else:
-        return _export_as_markdown(conversation, messages, include_metadata)
-
-
-def _safe_datetime_str(dt, fmt='iso'):
-    """Safely convert datetime to string."""
-    if dt is None:
-        return None
-    if isinstance(dt, datetime):
-        return dt.isoformat() if fmt == 'iso' else dt.strftime(fmt)
-    return str(dt) if dt else None
-
-
-def _sanitize_filename(name):
-    """Sanitize filename for HTTP headers (ASCII only)."""
-    import re
-    # Remove non-ASCII characters
-    ascii_name = name.encode('ascii', 'ignore').decode('ascii')
-    # Replace spaces and problematic characters
-    ascii_name = re.sub(r'[^\w\-.]', '_', ascii_name)
-    # Remove multiple underscores
-    ascii_name = re.sub(r'_+', '_', ascii_name)
-    # Strip leading/trailing underscores
-    ascii_name = ascii_name.strip('_')
-    return ascii_name if ascii_name else 'conversation'
-
-
-def _export_as_json(conversation, messages, include_metadata):
-    """Export conversation as JSON"""
-    export_data = {
-        'exported_at': datetime.utcnow().isoformat(),
-        'conversation': {
-            'id': str(conversation['_id']),
-            'title': conversation.get('title', 'Untitled'),
-            'created_at': _safe_datetime_str(conversation.get('created_at')),
-            'message_count': conversation.get('message_count', len(messages)),
-            'tags': conversation.get('tags', []),
-        },
-        'messages': []
-    }
-
-    for msg in messages:
-        message_data = {
-            'role': msg['role'],
-            'content': msg['content'],
-            'created_at': _safe_datetime_str(msg.get('created_at')),
-        }
-
-        if include_metadata and msg.get('metadata'):
-            message_data['metadata'] = {
-                'model': msg['metadata'].get('model_id'),
-                'tokens': msg['metadata'].get('tokens'),
-            }
-
-        if msg.get('is_edited'):
-            message_data['edited'] = True
-
-        export_data['messages'].append(message_data)
-
-    title_part = _sanitize_filename(conversation.get('title', 'export')[:30])
-    filename = f"conversation_{title_part}_{datetime.utcnow().strftime('%Y%m%d')}.json"
-
-    return Response(
-        json.dumps(export_data, indent=2, default=str),
-        mimetype='application/json',
-        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    return downloads.attachment(
+        body,
+        conversation_export.filename(conversation, export_format),
+        conversation_export.FORMATS[export_format][1],
     )
 
 
-def _export_as_markdown(conversation, messages, include_metadata):
-    """Export conversation as Markdown"""
-    title = conversation.get('title', 'Untitled Conversation')
-    created_at = conversation.get('created_at')
+@conversations_bp.route('/export', methods=['GET'])
+@jwt_required()
+@active_user_required
+def export_conversations_bulk():
+    """Stream a ZIP of many conversations, one file each plus a manifest.
+
+    Query params:
+      format      markdown (default) | json | ndjson
+      metadata    true (default) | false
+      folder_id   only conversations in this folder
+      project_id  only conversations in this project (viewer access required)
+      from, to    ISO dates; half-open range on created_at
+
+    Filters combine; archived conversations are included. Each
+    conversation is exported on its active branch. At most
+    ``MAX_BULK_CONVERSATIONS`` may match.
+    """
+    user = get_current_user()
+    user_id = str(user['_id'])
 
-    lines = [
-        f"# {title}",
-        "",
-    ]
+    export_format = request.args.get('format', 'markdown').lower()
+    if export_format not in conversation_export.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(conversation_export.FORMATS)}"}), 400
+    include_metadata = request.args.get('metadata', 'true').lower() == 'true'
 
-    if include_metadata:
-        lines.extend([
-            f"**Exported:** {datetime.utcnow().strftime('%B %d, %Y at %H:%M UTC')}",
-            f"**Messages:** {conversation.get('message_count', len(messages))}",
-        ])
-        created_str = _safe_datetime_str(created_at, '%B %d, %Y')
-        if created_str:
-            lines.append(f"**Created:** {created_str}")
-        if conversation.get('tags'):
-            lines.append(f"**Tags:** {', '.join(conversation['tags'])}")
-        lines.extend(["", "---", ""])
-
-    for msg in messages:
-        role = msg['role'].capitalize()
-        content = msg['content']
-        timestamp = msg.get('created_at')
-
-        if role == 'User':
-            lines.append(f"## User")
-        elif role == 'Assistant':
-            lines.append(f"## Assistant")
-        else:
-            lines.append(f"## {role}")
-
-        timestamp_str = _safe_datetime_str(timestamp, '%Y-%m-%d %H:%M')
-        if include_metadata and timestamp_str:
-            lines.append(f"*{timestamp_str}*")
-
-        lines.append("")
-        lines.append(content)
-        lines.append("")
-
-        if include_metadata and msg.get('metadata') and msg['metadata'].get('model_id'):
-            model_name = msg['metadata']['model_id'].split('/')[-1]
-            tokens = msg['metadata'].get('tokens', {})
-            if tokens.get('completion'):
-                lines.append(f"> *Model: {model_name} | Tokens: {tokens['completion']}*")
-            else:
-                lines.append(f"> *Model: {model_name}*")
-            lines.append("")
-
-        lines.append("---")
-        lines.append("")
-
-    title_part = _sanitize_filename(title[:30])
-    filename = f"conversation_{title_part}_{datetime.utcnow().strftime('%Y%m%d')}.md"
-
-    return Response(
-        '\n'.join(lines),
-        mimetype='text/markdown',
-        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    folder_id = request.args.get('folder_id')
+    project_id = request.args.get('project_id')
+    for name, value in (('folder_id', folder_id), ('project_id', project_id)):
+        if value and not validate_object_id(value):
+            return jsonify({'error': f'Invalid {name}'}), 400
+    if project_id and not check_project_access(user_id, project_id, 'viewer'):
+        return jsonify({'error': 'Project access denied', 'status': 403}), 403
+
+    try:
+        ids = conversation_export.select_conversations(
+            user_id, _accessible_project_ids(user_id),
+            folder_id=folder_id, project_id=project_id,
+            start=downloads.parse_date(request.args.get('from')),
+            end=downloads.parse_date(request.args.get('to')),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    body = conversation_export.bundle(ids, export_format, include_metadata)
+    return downloads.attachment(
+        body,
+        f"conversations_{datetime.utcnow().strftime('%Y%m%d')}.zip",
+        'application/zip',
     )
 
 
@@ -607,25 +881,21 @@ def create_branch(conversation_id, message_id):
     # Get the branch the message belongs to (source branch)
     source_branch = message.get('branch_id', 'main')
 
-    # Create branch data
+    # Create branch data. The branch shares the source branch's messages up
+    # to and including the branch point instead of copying them.
     branch_data = {
         'id': branch_id,
         'name': branch_name or f"Branch from message",
         'parent_branch': source_branch,
-        'branch_point_message_id': str(message['_id'])
+        'branch_point_message_id': str(message['_id']),
+        **MessageModel.fork_point(message),
     }
 
     # Add branch to conversation
     if not ConversationModel.add_branch(conversation_id, branch_data):
         return jsonify({'error': 'Failed to create branch'}), 500
 
-    # Copy all messages up to and including the branch point to the new branch
-    messages_to_copy = MessageModel.find_up_to(conversation_id, message_id, source_branch)
-
-    copied_messages = []
-    for msg in messages_to_copy:
-        copied_msg = MessageModel.copy_to_branch(msg, branch_id)
-        copied_messages.append(copied_msg)
+    branch_messages = MessageModel.find_up_to(conversation_id, message_id, branch_id)
 
     # Set the new branch as active
     ConversationModel.set_active_branch(conversation_id, branch_id)
@@ -636,7 +906,7 @@ def create_branch(conversation_id, message_id):
     return jsonify({
         'branch_id': branch_id,
         'branches': serialize_doc(updated_conversation.get('branches', [])),
-        'messages': serialize_doc(copied_messages),
+        'messages': serialize_doc(branch_messages),
         'active_branch': branch_id
     }), 201
 
@@ -681,17 +951,7 @@ def branch_to_new_conversation(conversation_id, message_id):
     new_conversation_id = new_conversation['_id']
 
     # Copy messages to the new conversation (all go to 'main' branch)
-    copied_messages = []
-    for msg in messages_to_copy:
-        new_msg = MessageModel.create(
-            conversation_id=new_conversation_id,
-            role=msg['role'],
-            content=msg['content'],
-            branch_id='main',
-            metadata=msg.get('metadata', {}),
-            attachments=msg.get('attachments', [])
-        )
-        copied_messages.append(new_msg)
+    copied_messages = MessageModel.copy_to_conversation(messages_to_copy, new_conversation_id)
 
     # Update message count on the new conversation
     ConversationModel.get_collection().update_one(
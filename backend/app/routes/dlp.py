@@ -34,9 +34,14 @@ from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_current_user
 
 from app.models.dlp_event import DLPEventModel, VALID_STATUSES
+from app.models.dlp_stats import DLPStatsModel
 from app.models.workspace import WorkspaceModel
 from app.services.dlp_rules import BUILTIN_RULES
-from app.services.dlp_service import DLPDetector, effective_policy
+from app.services.dlp_service import (
+    MAX_MATCHES_PER_RULE,
+    DLPDetector,
+    effective_policy,
+)
 from app.utils.decorators import active_user_required, admin_required, workspace_member
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.permissions import check_workspace_access
@@ -221,6 +226,7 @@ _ALLOWED_POLICY_KEYS = {
     'internal_hostname_suffixes',
     'llm_classifier',
     'notify_owners',
+    'egress_redaction',
 }
 
 _VALID_SEVERITIES = {'low', 'medium', 'high', 'critical'}
@@ -303,6 +309,8 @@ def _validate_llm_classifier(lc: Any) -> tuple[Optional[dict], Optional[str]]:
                 return None, f"llm_classifier.action_thresholds.restricted must be one of {sorted(_VALID_RESTRICTED_ACTIONS)}"
             clean_at['restricted'] = v
         clean['action_thresholds'] = clean_at
+    if 'optimistic' in lc:
+        clean['optimistic'] = bool(lc['optimistic'])
     return clean, None
 
 
@@ -397,6 +405,9 @@ def _build_policy_payload(body: dict) -> tuple[Optional[dict], Any]:
     if 'notify_owners' in body:
         clean['notify_owners'] = bool(body['notify_owners'])
 
+    if 'egress_redaction' in body:
+        clean['egress_redaction'] = bool(body['egress_redaction'])
+
     return clean, None
 
 
@@ -457,8 +468,12 @@ def dlp_scan():
         or 'en'
     )[:2].lower()
 
-    detector = DLPDetector.from_workspace(workspace_id)
-    result = detector.scan(text, user_lang=user_lang)
+    detector = DLPDetector.for_workspace(workspace_id)
+    result = detector.scan(
+        text,
+        user_lang=user_lang,
+        max_matches_per_rule=MAX_MATCHES_PER_RULE,
+    )
 
     event_id: Optional[ObjectId] = None
     # P2.27 — persist warn events too. Pre-flight has not yet sent the message,
@@ -477,6 +492,7 @@ def dlp_scan():
                 was_sent=False,
                 text_sha256=result.text_sha256,
                 text_length=result.text_length,
+                match_summaries=[asdict(s) for s in result.summaries],
             )
             event_id = inserted.get('_id') if isinstance(inserted, dict) else None
         except Exception:
@@ -539,7 +555,7 @@ def dlp_test():
         or 'en'
     )[:2].lower()
 
-    detector = DLPDetector.from_workspace(workspace_id)
+    detector = DLPDetector.for_workspace(workspace_id)
     result = detector.scan(text, user_lang=user_lang)
 
     return jsonify({'result': result.to_dict()}), 200
@@ -592,11 +608,7 @@ def update_dlp_policy(wid: str):
     existing_dlp = (workspace.get('settings') or {}).get('dlp') or {}
     merged_dlp = {**existing_dlp, **payload}
 
-    # Persist
-    WorkspaceModel.get_collection().update_one(
-        {'_id': ObjectId(wid)},
-        {'$set': {'settings.dlp': merged_dlp}},
-    )
+    WorkspaceModel.set_dlp_policy(wid, merged_dlp)
 
     return jsonify({'policy': effective_policy(merged_dlp)}), 200
 
@@ -723,7 +735,7 @@ def get_dlp_stats(wid: str):
         return jsonify({'error': 'days must be an integer'}), 400
     days = max(1, min(365, days))
 
-    stats = DLPEventModel.aggregate_workspace_stats(wid, days=days)
+    stats = DLPStatsModel.workspace_stats(wid, days=days)
     return jsonify(serialize_doc(stats)), 200
 
 
@@ -815,5 +827,5 @@ def admin_get_dlp_stats():
         return jsonify({'error': 'days must be an integer'}), 400
     days = max(1, min(365, days))
 
-    stats = DLPEventModel.aggregate_global_stats(days=days)
+    stats = DLPStatsModel.global_stats(days=days)
     return jsonify(serialize_doc(stats)), 200
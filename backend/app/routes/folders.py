@@ -5,6 +5,7 @@ from app.models.conversation import ConversationModel
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.decorators import active_user_required
 from app.utils.permissions import check_project_access
+from app.utils import http_cache
 
 folders_bp = Blueprint('folders', __name__)
 
@@ -29,9 +30,21 @@ def _resolve_project_filter(raw):
     return raw, None
 
 
+def _folders_stamp():
+    user_id = get_current_user()['_id']
+    project_filter, err = _resolve_project_filter(request.args.get('project_id'))
+    if err:
+        return None
+    if project_filter and project_filter != NULL_PROJECT_SENTINEL:
+        if not check_project_access(str(user_id), project_filter, 'viewer'):
+            return None
+    return http_cache.watermark(FolderModel.collection_name, {'user_id': user_id})
+
+
 @folders_bp.route('', methods=['GET'])
 @jwt_required()
 @active_user_required
+@http_cache.conditional(_folders_stamp, cache_body=True)
 def get_folders():
     """Get user's folders.
 
@@ -211,16 +224,18 @@ def delete_folder(folder_id):
     # Move all conversations in this folder to root
     from app.extensions import mongo
     from bson import ObjectId
+    from datetime import datetime
 
+    now = datetime.utcnow()
     mongo.db.conversations.update_many(
         {'folder_id': ObjectId(folder_id)},
-        {'$set': {'folder_id': None}}
+        {'$set': {'folder_id': None, 'updated_at': now}}
     )
 
     # Move child folders to root
     mongo.db.folders.update_many(
         {'parent_id': ObjectId(folder_id)},
-        {'$set': {'parent_id': None}}
+        {'$set': {'parent_id': None, 'updated_at': now}}
     )
 
     # Delete the folder
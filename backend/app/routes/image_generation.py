@@ -6,6 +6,7 @@ from app.models.user import UserModel
 from app.services.openrouter_service import OpenRouterService
 from app.services import dlp_gate
 from app.utils.helpers import serialize_doc
+from app.utils import pagination
 import time
 
 image_gen_bp = Blueprint('image_generation', __name__)
@@ -129,14 +130,25 @@ def get_history():
     favorites_only = request.args.get('favorites', 'false').lower() == 'true'
 
     skip = (page - 1) * limit
-    images = GeneratedImageModel.find_by_user(user_id, skip=skip, limit=limit, favorites_only=favorites_only)
-    total = GeneratedImageModel.count_by_user(user_id, favorites_only=favorites_only)
+    # ``?cursor=`` switches to keyset paging (app/utils/pagination.py).
+    cursor = pagination.cursor_arg(request.args)
+    try:
+        images = GeneratedImageModel.find_by_user(
+            user_id, skip=skip, limit=limit + 1, favorites_only=favorites_only, cursor=cursor,
+        )
+    except pagination.CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    images, next_cursor = pagination.next_page(images, limit, GeneratedImageModel.SORT)
+    total = None
+    if pagination.wants_total(request.args, cursor):
+        total = GeneratedImageModel.count_by_user(user_id, favorites_only=favorites_only)
 
     return jsonify({
         'images': [serialize_doc(img) for img in images],
         'total': total,
         'page': page,
-        'pages': (total + limit - 1) // limit
+        'pages': (total + limit - 1) // limit if total is not None else None,
+        'next_cursor': next_cursor,
     })
 
 
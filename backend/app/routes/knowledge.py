@@ -10,6 +10,7 @@ from app.models.workspace_member import WorkspaceMemberModel
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.decorators import active_user_required
 from app.utils.permissions import check_project_access
+from app.utils import pagination
 
 
 def _accessible_project_ids(user_id: str) -> set:
@@ -78,6 +79,8 @@ def list_knowledge_items():
 
     Query params:
         page: Page number (default 1)
+        cursor: Keyset cursor from ``next_cursor`` (empty for the first
+            page); replaces ``page`` and skips the count unless count=true
         limit: Items per page (default 20, max 100)
         tag: Filter by tag
         favorite: If 'true', only return favorites
@@ -132,24 +135,42 @@ def list_knowledge_items():
             {'score': {'$meta': 'textScore'}},
         ).sort([('score', {'$meta': 'textScore'})]).skip(skip).limit(limit)
         items = list(cursor)
+        has_more = (page * limit) < total
+        next_cursor = None
     else:
-        items, total = KnowledgeItemModel.find_by_user(
-            user_id,
-            page=page,
-            limit=limit,
-            tag=tag,
-            favorite_only=favorite_only,
-            folder_id=folder_id,
-            project_id=project_filter,
-        )
+        # ``?cursor=`` switches to keyset paging (app/utils/pagination.py);
+        # page-number requests keep their exact total.
+        cursor = pagination.cursor_arg(request.args)
+        try:
+            items, total = KnowledgeItemModel.find_by_user(
+                user_id,
+                page=page,
+                limit=limit if cursor is None else limit + 1,
+                tag=tag,
+                favorite_only=favorite_only,
+                folder_id=folder_id,
+                project_id=project_filter,
+                cursor=cursor,
+                with_total=cursor is None or pagination.wants_total(request.args, cursor),
+            )
+        except pagination.CursorError as e:
+            return jsonify({'error': str(e)}), 400
+        if cursor is None:
+            has_more = (page * limit) < total
+            next_cursor = (pagination.encode_cursor(items[-1], KnowledgeItemModel.SORT)
+                           if has_more and items else None)
+        else:
+            items, next_cursor = pagination.next_page(items, limit, KnowledgeItemModel.SORT)
+            has_more = next_cursor is not None
 
     return jsonify({
         'items': serialize_doc(items),
         'total': total,
         'page': page,
         'limit': limit,
-        'total_pages': (total + limit - 1) // limit,
-        'has_more': (page * limit) < total
+        'total_pages': (total + limit - 1) // limit if total is not None else None,
+        'has_more': has_more,
+        'next_cursor': next_cursor,
     }), 200
 
 
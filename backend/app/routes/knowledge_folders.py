@@ -6,6 +6,7 @@ from app.models.project import ProjectModel
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.decorators import active_user_required
 from app.utils.permissions import check_project_access
+from app.utils import http_cache
 
 knowledge_folders_bp = Blueprint('knowledge_folders', __name__)
 
@@ -30,9 +31,25 @@ def _resolve_project_filter(raw):
     return raw, None
 
 
+def _folders_stamp():
+    """Folders plus items: the listing carries per-folder item counts."""
+    user_id = get_current_user()['_id']
+    project_filter, err = _resolve_project_filter(request.args.get('project_id'))
+    if err:
+        return None
+    if project_filter and project_filter != NULL_PROJECT_SENTINEL:
+        if not check_project_access(str(user_id), project_filter, 'viewer'):
+            return None
+    return (
+        http_cache.watermark(KnowledgeFolderModel.collection_name, {'user_id': user_id}),
+        http_cache.watermark(KnowledgeItemModel.collection_name, {'user_id': user_id}),
+    )
+
+
 @knowledge_folders_bp.route('', methods=['GET'])
 @jwt_required()
 @active_user_required
+@http_cache.conditional(_folders_stamp, cache_body=True)
 def list_folders():
     """List knowledge folders for the current user.
 
@@ -212,6 +212,7 @@ def upload_meeting():
         'num_speakers': num_speakers,
         'meeting_brief': meeting_brief,
         'series_id': series_id,
+        'workspace_id': user.get('active_workspace_id'),
         'status': MEETING_STATUS['UPLOADED'],
         'speakers': [],
     }
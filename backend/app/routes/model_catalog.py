@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required
 
 from app.models.openrouter_model import OpenRouterModelDoc
 from app.services.model_registry_service import ModelRegistryService
+from app.utils import http_cache
 from app.utils.decorators import admin_required
 from app.utils.quick_models import QUICK_MODELS
 
@@ -11,6 +12,7 @@ model_catalog_bp = Blueprint('model_catalog', __name__)
 
 @model_catalog_bp.route('/quick-models', methods=['GET'])
 @jwt_required()
+@http_cache.conditional(lambda: 0, per_user=False)
 def list_quick_models():
     """Return the canonical quick-models registry (id + display name) for frontend boot."""
     return jsonify({
@@ -60,8 +62,14 @@ def refresh_catalog():
     return jsonify(result), 200
 
 
+def _catalog_stamp():
+    """A refresh re-stamps every row's ``last_synced_at``."""
+    return OpenRouterModelDoc.get_last_sync_at(), OpenRouterModelDoc.count()
+
+
 @model_catalog_bp.route('/catalog', methods=['GET'])
 @jwt_required()
+@http_cache.conditional(_catalog_stamp, per_user=False, cache_body=True)
 def list_catalog():
     """List models from the local registry with optional filtering and pagination.
 
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from app.services.openrouter_service import OpenRouterService
 from app.utils.decorators import active_user_required
+from app.utils import http_cache
 from functools import lru_cache
 import time
 
@@ -29,9 +30,16 @@ def get_cached_models():
     return _models_cache['data']
 
 
+def _models_stamp(*args, **kwargs):
+    """The list only changes when the cache above is refilled."""
+    get_cached_models()
+    return _models_cache['timestamp']
+
+
 @models_bp.route('', methods=['GET'])
 @jwt_required()
 @active_user_required
+@http_cache.conditional(_models_stamp, per_user=False, cache_body=True)
 def get_models():
     """Get list of available OpenRouter models"""
     models = get_cached_models()
@@ -108,6 +116,7 @@ def refresh_models():
 @models_bp.route('/categories', methods=['GET'])
 @jwt_required()
 @active_user_required
+@http_cache.conditional(_models_stamp, per_user=False, cache_body=True)
 def get_model_categories():
     """Get models grouped by provider/category"""
     models = get_cached_models()
@@ -16,6 +16,8 @@ Responses are FLAT JSON (no { project: ... } wrapping) — matches Phase 2A
 contract; do NOT change.
 """
 
+from datetime import datetime
+
 from bson import ObjectId
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_current_user, jwt_required
@@ -225,6 +227,9 @@ def update_project(pid: str):
     if 'default_temperature' in data:
         update_data['default_temperature'] = data['default_temperature']
 
+    if 'budget_mtd_usd' in data:
+        update_data['budget_mtd_usd'] = data['budget_mtd_usd']
+
     if not update_data:
         return jsonify({'error': 'No valid fields to update'}), 400
 
@@ -257,13 +262,14 @@ def delete_project(pid: str):
     ProjectMemberModel.get_collection().delete_many({'project_id': pid_obj})
 
     # Reset project_id on folders + conversations to NULL.
+    now = datetime.utcnow()
     mongo.db.folders.update_many(
         {'project_id': pid_obj},
-        {'$set': {'project_id': None}}
+        {'$set': {'project_id': None, 'updated_at': now}}
     )
     mongo.db.conversations.update_many(
         {'project_id': pid_obj},
-        {'$set': {'project_id': None}}
+        {'$set': {'project_id': None, 'updated_at': now}}
     )
 
     ProjectModel.delete(pid)
@@ -23,20 +23,20 @@ import logging
 from datetime import datetime
 
 from bson import ObjectId
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_current_user, jwt_required
 
 logger = logging.getLogger(__name__)
 
 from app.models.audit_log import AuditLogModel
 from app.models.credit_ledger import CreditLedgerModel
-from app.models.group import GroupModel
 from app.models.project import ProjectModel
 from app.models.usage_log import UsageLogModel
 from app.models.user import UserModel
 from app.models.workspace import WorkspaceModel
 from app.models.workspace_invite import WorkspaceInviteModel
 from app.models.workspace_member import ROLE_HIERARCHY, WorkspaceMemberModel
+from app.services import workspace_overview as workspace_overview_service
 from app.utils.decorators import active_user_required, manager_or_admin_required, workspace_member
 from app.utils.helpers import serialize_doc, validate_object_id
 from app.utils.permissions import get_workspace_role
@@ -186,7 +186,7 @@ def update_workspace(wid: str):
         update_data['settings'] = data['settings']
 
     # Policy / plan fields — surface to model, which validates further.
-    for field in ('ip_allowlist', 'enforce_2fa', 'plan_tier'):
+    for field in ('ip_allowlist', 'enforce_2fa', 'plan_tier', 'budget_mtd_usd'):
         if field in data:
             update_data[field] = data[field]
 
@@ -744,86 +744,16 @@ def workspace_overview(wid: str):
     if not ws:
         return jsonify({'error': 'Workspace not found'}), 404
 
-    wid_obj = ObjectId(wid)
-    month_start = _month_start_utc()
-
-    # Billing block.
-    spend_mtd = UsageLogModel.aggregate_workspace_spend(wid, start=month_start)
-    seats_used = WorkspaceMemberModel.get_collection().count_documents({
-        'workspace_id': wid_obj,
-        'status': 'active',
-    })
-    billing = {
-        'plan_tier': ws.get('plan_tier') or ws.get('plan') or 'free',
-        'credits_balance_usd': float(ws.get('credits_balance_usd') or 0),
-        'spend_mtd_usd': float(spend_mtd or 0),
-        'seats_used': seats_used,
-        'seats_total': int(ws.get('seats_total') or 0),
-        'budget_mtd_usd': float(ws.get('budget_mtd_usd') or 0),
-        'renews_at': ws['renews_at'].isoformat() if isinstance(ws.get('renews_at'), datetime) else ws.get('renews_at'),
-        'sso_enforced': bool(ws.get('sso_enforced')),
-        'scim_enabled': bool(ws.get('scim_enabled')),
-        'domain': ws.get('domain'),
-    }
-
-    # Top projects by spend MTD (limit 5).
-    project_rows = UsageLogModel.aggregate_project_spend(wid, start=month_start)[:5]
-    pid_objs = [ObjectId(r['project_id']) for r in project_rows if r.get('project_id')]
-    project_map = {}
-    if pid_objs:
-        cursor = ProjectModel.get_collection().find({'_id': {'$in': pid_objs}})
-        for p in cursor:
-            project_map[str(p['_id'])] = p
-    top_projects = []
-    for r in project_rows:
-        pid = r.get('project_id')
-        proj = project_map.get(pid) if pid else None
-        if not proj:
-            continue
-        top_projects.append({
-            'project_id': pid,
-            'name': proj.get('name'),
-            'color': proj.get('color'),
-            'pinned': bool(proj.get('pinned')),
-            'total_cost': r.get('total_cost', 0),
-            'message_count': r.get('count', 0),
-        })
-
-    # Recent activity from audit_log scoped to the workspace.
-    activity_cursor = AuditLogModel.get_collection().find({
-        '$or': [
-            {'details.workspace_id': str(wid_obj)},
-            {'details.workspace_id': wid_obj},
-            {'target_id': wid_obj, 'target_type': 'workspace'},
-        ]
-    }).sort('created_at', -1).limit(5)
-    recent_activity = [serialize_doc(a) for a in activity_cursor]
-
-    # Top groups (alphabetical, capped 5).
-    groups_cursor = GroupModel.find_by_workspace(wid)[:5]
-    groups_out = [serialize_doc(g) for g in groups_cursor]
-
-    # Daily 30-day usage.
-    daily = UsageLogModel.aggregate_daily(wid, days=30)
-
-    # Stats summary.
-    messages_mtd = UsageLogModel.total_messages_this_month(wid)
-    active_projects = ProjectModel.count_by_workspace(wid, archived=False)
-    members_active = seats_used
-
-    return jsonify({
-        'workspace': serialize_doc(ws),
-        'billing': billing,
-        'top_projects': top_projects,
-        'recent_activity': recent_activity,
-        'groups': groups_out,
-        'usage_30d': daily,
-        'stats': {
-            'messages_mtd': messages_mtd,
-            'active_projects': active_projects,
-            'members_active': members_active,
-        },
-    }), 200
+    # Every member sees the same payload, so the ETag is per workspace and
+    # a dashboard re-poll that changed nothing is answered with a bare 304.
+    payload, etag = workspace_overview_service.get(wid, ws)
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -850,31 +780,7 @@ def billing_usage(wid: str):
     by_project = UsageLogModel.aggregate_project_spend(wid, start=start, end=end)
     by_model = UsageLogModel.aggregate_model_spend(wid, start=start, end=end)
 
-    daily_cursor = UsageLogModel.get_collection().aggregate([
-        {'$match': {
-            'workspace_id': ObjectId(wid),
-            'created_at': {'$gte': start, '$lte': end},
-        }},
-        {'$group': {
-            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
-            'cost_usd': {'$sum': '$cost_usd'},
-            'total_tokens': {'$sum': {'$add': [
-                {'$ifNull': ['$prompt_tokens', 0]},
-                {'$ifNull': ['$completion_tokens', 0]},
-            ]}},
-            'messages': {'$sum': 1},
-        }},
-        {'$sort': {'_id': 1}},
-    ])
-    daily = [
-        {
-            'date': r['_id'],
-            'cost_usd': r['cost_usd'],
-            'total_tokens': r['total_tokens'],
-            'messages': r['messages'],
-        }
-        for r in daily_cursor
-    ]
+    daily = UsageLogModel.aggregate_daily(wid, start=start, end=end)
 
     totals = {
         'cost_usd': float(sum(r.get('total_cost', 0) for r in by_user)),
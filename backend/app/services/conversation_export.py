@@ -0,0 +1,330 @@
+"""
+Streaming conversation exports: JSON, Markdown and NDJSON, one conversation
+at a time or many bundled into a ZIP.
+
+Every encoder is a generator over a message cursor
+(:meth:`MessageModel.iter_by_conversation`) and yields a chunk per
+``batch_size`` messages, so a worker's memory stays flat however long the
+conversation is. The JSON encoder writes the ``messages`` array
+incrementally and produces exactly what ``json.dumps(doc, indent=2)`` of the
+whole document would.
+
+:func:`zip_stream` writes the archive into an unseekable in-memory sink that
+is emptied after every chunk: :mod:`zipfile` then emits each entry's sizes
+and CRC in a trailing data descriptor instead of seeking back, so nothing
+is spooled to a temp file and only one chunk of compressed output is held
+at a time.
+"""
+from __future__ import annotations
+
+import io
+import json
+import re
+import textwrap
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from bson import ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.message import MessageModel
+
+# format -> (file extension, mimetype)
+FORMATS = {
+    'json': ('json', 'application/json'),
+    'markdown': ('md', 'text/markdown'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+}
+DEFAULT_BATCH_SIZE = 200
+# Conversations per ZIP; a wider selection has to be narrowed by the caller.
+MAX_BULK_CONVERSATIONS = 2000
+
+_MESSAGE_FIELDS = {'role': 1, 'content': 1, 'created_at': 1, 'metadata': 1, 'is_edited': 1}
+
+
+class ExportError(ValueError):
+    """Bad export parameters (unknown format, id or range)."""
+
+
+def datetime_str(dt, fmt='iso'):
+    """Safely convert datetime to string."""
+    if dt is None:
+        return None
+    if isinstance(dt, datetime):
+        return dt.isoformat() if fmt == 'iso' else dt.strftime(fmt)
+    return str(dt) if dt else None
+
+
+def sanitize_filename(name):
+    """Sanitize filename for HTTP headers (ASCII only)."""
+    # Remove non-ASCII characters
+    ascii_name = name.encode('ascii', 'ignore').decode('ascii')
+    # Replace spaces and problematic characters
+    ascii_name = re.sub(r'[^\w\-.]', '_', ascii_name)
+    # Remove multiple underscores
+    ascii_name = re.sub(r'_+', '_', ascii_name)
+    # Strip leading/trailing underscores
+    ascii_name = ascii_name.strip('_')
+    return ascii_name if ascii_name else 'conversation'
+
+
+def filename(conversation: dict, fmt: str, now: Optional[datetime] = None) -> str:
+    now = now or datetime.utcnow()
+    title_part = sanitize_filename((conversation.get('title') or 'export')[:30])
+    return f"conversation_{title_part}_{now.strftime('%Y%m%d')}.{FORMATS[fmt][0]}"
+
+
+def _header(conversation: dict) -> dict:
+    return {
+        'id': str(conversation['_id']),
+        'title': conversation.get('title', 'Untitled'),
+        'created_at': datetime_str(conversation.get('created_at')),
+        'message_count': conversation.get('message_count', 0),
+        'tags': conversation.get('tags', []),
+    }
+
+
+def _record(msg: dict, include_metadata: bool) -> dict:
+    record = {
+        'role': msg['role'],
+        'content': msg.get('content') or '',
+        'created_at': datetime_str(msg.get('created_at')),
+    }
+    if include_metadata and msg.get('metadata'):
+        record['metadata'] = {
+            'model': msg['metadata'].get('model_id'),
+            'tokens': msg['metadata'].get('tokens'),
+        }
+    if msg.get('is_edited'):
+        record['edited'] = True
+    return record
+
+
+def _batched(parts: Iterable[str], batch_size: int) -> Iterator[str]:
+    pending = []
+    for part in parts:
+        pending.append(part)
+        if len(pending) >= batch_size:
+            yield ''.join(pending)
+            pending = []
+    if pending:
+        yield ''.join(pending)
+
+
+def encode_json(conversation: dict, messages: Iterable[dict], include_metadata: bool,
+                exported_at: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    head = json.dumps(
+        {'exported_at': exported_at.isoformat(), 'conversation': _header(conversation)},
+        indent=2, default=str,
+    )
+
+    def parts():
+        # ``head`` ends in "\n}"; reopen it for the messages array.
+        yield head[:-2] + ',\n  "messages": ['
+        first = True
+        for msg in messages:
+            body = textwrap.indent(json.dumps(_record(msg, include_metadata), indent=2, default=str), '    ')
+            yield ('\n' if first else ',\n') + body
+            first = False
+        yield ']\n}' if first else '\n  ]\n}'
+
+    return _batched(parts(), batch_size)
+
+
+def encode_markdown(conversation: dict, messages: Iterable[dict], include_metadata: bool,
+                    exported_at: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    title = conversation.get('title', 'Untitled Conversation')
+
+    def parts():
+        lines = [f"# {title}", ""]
+        if include_metadata:
+            lines.extend([
+                f"**Exported:** {exported_at.strftime('%B %d, %Y at %H:%M UTC')}",
+                f"**Messages:** {conversation.get('message_count', 0)}",
+            ])
+            created_str = datetime_str(conversation.get('created_at'), '%B %d, %Y')
+            if created_str:
+                lines.append(f"**Created:** {created_str}")
+            if conversation.get('tags'):
+                lines.append(f"**Tags:** {', '.join(conversation['tags'])}")
+            lines.extend(["", "---", ""])
+        yield '\n'.join(lines)
+
+        for msg in messages:
+            lines = [f"## {msg['role'].capitalize()}"]
+            timestamp_str = datetime_str(msg.get('created_at'), '%Y-%m-%d %H:%M')
+            if include_metadata and timestamp_str:
+                lines.append(f"*{timestamp_str}*")
+            lines.extend(["", msg.get('content') or '', ""])
+
+            if include_metadata and msg.get('metadata') and msg['metadata'].get('model_id'):
+                model_name = msg['metadata']['model_id'].split('/')[-1]
+                tokens = msg['metadata'].get('tokens') or {}
+                if tokens.get('completion'):
+                    lines.append(f"> *Model: {model_name} | Tokens: {tokens['completion']}*")
+                else:
+                    lines.append(f"> *Model: {model_name}*")
+                lines.append("")
+
+            lines.extend(["---", ""])
+            yield '\n' + '\n'.join(lines)
+
+    return _batched(parts(), batch_size)
+
+
+def encode_ndjson(conversation: dict, messages: Iterable[dict], include_metadata: bool,
+                  exported_at: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """A ``{"type": "conversation", ...}`` line, then one
+    ``{"type": "message", ...}`` line per message."""
+    def line(doc):
+        return json.dumps(doc, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+
+    def parts():
+        yield line({'type': 'conversation', 'exported_at': exported_at.isoformat(),
+                    **_header(conversation)})
+        for msg in messages:
+            yield line({'type': 'message', **_record(msg, include_metadata)})
+
+    return _batched(parts(), batch_size)
+
+
+_ENCODERS = {'json': encode_json, 'markdown': encode_markdown, 'ndjson': encode_ndjson}
+
+
+def stream(conversation: dict, fmt: str, include_metadata: bool = True,
+           branch_id: Optional[str] = None, exported_at: Optional[datetime] = None,
+           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """Lazy UTF-8 chunks of one conversation's export. Messages are read
+    from a cursor as the iterator is consumed."""
+    if fmt not in _ENCODERS:
+        raise ExportError(f"format must be one of {', '.join(FORMATS)}")
+    branch_id = branch_id or conversation.get('active_branch') or 'main'
+
+    def messages():
+        cursor = MessageModel.iter_by_conversation(
+            conversation['_id'], branch_id, projection=_MESSAGE_FIELDS, batch_size=batch_size,
+        )
+        try:
+            for msg in cursor:
+                yield MessageModel.inflate(msg)
+        finally:
+            cursor.close()
+
+    text = _ENCODERS[fmt](conversation, messages(), include_metadata,
+                          exported_at or datetime.utcnow(), batch_size)
+    return (chunk.encode('utf-8') for chunk in text if chunk)
+
+
+# ---------------------------------------------------------------------------
+# ZIP bundles
+# ---------------------------------------------------------------------------
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer that :func:`zip_stream` drains after
+    every write. ``tell``/``seek`` raise, which makes :mod:`zipfile` fall
+    back to data descriptors instead of rewriting local headers."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(entries: Iterable[tuple[str, datetime, Iterable[bytes]]]) -> Iterator[bytes]:
+    """Deflate ``(name, modified_at, chunks)`` entries into a ZIP, yielding
+    the archive as it is written."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, modified_at, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=(modified_at or datetime.utcnow()).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            # Sizes are unknown up front; zip64 headers keep >4 GiB entries legal.
+            with archive.open(info, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.take()
+                    if data:
+                        yield data
+            yield sink.take()
+    yield sink.take()
+
+
+def select_conversations(user_id, accessible: set, *, folder_id=None, project_id=None,
+                         start: Optional[datetime] = None, end: Optional[datetime] = None) -> list:
+    """Ids of the caller's conversations matching the bulk filters, oldest
+    first. ``accessible`` is the caller's viewable project ids; project
+    conversations outside it are left out."""
+    query = {'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id}
+    if folder_id:
+        query['folder_id'] = ObjectId(folder_id)
+    if project_id:
+        query['project_id'] = ObjectId(project_id)
+    if start or end:
+        created = {}
+        if start:
+            created['$gte'] = start
+        if end:
+            created['$lt'] = end
+        query['created_at'] = created
+    cursor = (
+        ConversationModel.get_collection()
+        .find(query, {'project_id': 1})
+        .sort([('created_at', 1), ('_id', 1)])
+        .limit(MAX_BULK_CONVERSATIONS + 1)
+    )
+    ids = [c['_id'] for c in cursor
+           if c.get('project_id') is None or c['project_id'] in accessible]
+    if len(ids) > MAX_BULK_CONVERSATIONS:
+        raise ExportError(
+            f'more than {MAX_BULK_CONVERSATIONS} conversations match; narrow the selection'
+        )
+    return ids
+
+
+def bundle(conversation_ids: list, fmt: str, include_metadata: bool = True,
+           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """ZIP of every conversation in ``conversation_ids`` (each on its
+    active branch) plus a ``manifest.json`` listing them."""
+    if fmt not in _ENCODERS:
+        raise ExportError(f"format must be one of {', '.join(FORMATS)}")
+    exported_at = datetime.utcnow()
+    manifest = []
+
+    def entries():
+        for cid in conversation_ids:
+            conversation = ConversationModel.find_by_id(cid)
+            if not conversation:  # deleted while the bundle was streaming
+                continue
+            title_part = sanitize_filename((conversation.get('title') or 'export')[:30])
+            created = conversation.get('created_at')
+            stamp = created.strftime('%Y%m%d') if isinstance(created, datetime) else 'undated'
+            name = f"{stamp}_{title_part}_{cid}.{FORMATS[fmt][0]}"
+            manifest.append({
+                'file': name,
+                'id': str(cid),
+                'title': conversation.get('title'),
+                'created_at': datetime_str(created),
+                'message_count': conversation.get('message_count', 0),
+            })
+            yield name, conversation.get('updated_at') or created, stream(
+                conversation, fmt, include_metadata,
+                exported_at=exported_at, batch_size=batch_size,
+            )
+        yield 'manifest.json', exported_at, [json.dumps(
+            {'exported_at': exported_at.isoformat(), 'conversations': manifest},
+            indent=2, ensure_ascii=False,
+        ).encode('utf-8')]
+
+    return zip_stream(entries())
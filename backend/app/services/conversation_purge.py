@@ -0,0 +1,136 @@
+"""
+Background deletion of deleted conversations' messages.
+
+:func:`start` records a :class:`~app.models.purge_job.PurgeJobModel` job and
+wakes a daemon worker; the worker claims jobs one at a time and deletes
+their messages ``CONVERSATION_PURGE_BATCH_SIZE`` at a time by ``_id``,
+sleeping ``CONVERSATION_PURGE_PAUSE`` seconds between batches so the
+primary (and its replicas) keep up. Jobs live in Mongo under a lease, so a
+job whose worker died is picked up again by any process.
+
+The in-process worker only exists once a request has queued something, so
+the scheduler also calls :func:`run_pending` every minute
+(``scheduler/jobs/conversation_purge.py``): jobs left behind by a restart —
+or queued with ``CONVERSATION_PURGE_WORKER`` off — still run. A failed
+attempt is retried with exponential backoff, up to ``MAX_ATTEMPTS`` claims.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+from flask import current_app
+
+from app.models.message import MessageModel
+from app.models.message_search import MessageSearchModel
+from app.models.purge_job import PurgeJobModel
+from app.services import semantic_search
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+# How long an idle worker sleeps before checking for jobs queued by other
+# processes.
+POLL_SECONDS = 30
+# Claims per job before it is marked failed, and the backoff between them
+# (doubling from RETRY_BASE_SECONDS, capped at RETRY_MAX_SECONDS).
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+
+_wake = threading.Event()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def start(user_id, conversation_ids: Iterable) -> dict:
+    """Queue message deletion for already-deleted ``conversation_ids``."""
+    conversation_ids = list(conversation_ids)
+    total = MessageModel.get_collection().count_documents(
+        {'conversation_id': {'$in': conversation_ids}}
+    )
+    job = PurgeJobModel.create(user_id, conversation_ids, total=total)
+    app = current_app._get_current_object()
+    if app.config.get('CONVERSATION_PURGE_WORKER', True):
+        _ensure_worker(app)
+        _wake.set()
+    return job
+
+
+def _ensure_worker(app) -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=_run, args=(app,), name='conversation-purge', daemon=True)
+        _worker.start()
+
+
+def _run(app) -> None:
+    while True:
+        _wake.clear()
+        try:
+            with app.app_context():
+                run_pending()
+        except Exception as exc:
+            logger.warning('conversation purge worker failed: %s', exc)
+        _wake.wait(POLL_SECONDS)
+
+
+def purge(job: dict) -> int:
+    """Delete ``job``'s messages batch by batch. Returns messages deleted."""
+    config = current_app.config
+    batch_size = int(config.get('CONVERSATION_PURGE_BATCH_SIZE') or 500)
+    pause = float(config.get('CONVERSATION_PURGE_PAUSE') or 0)
+    conversation_ids = job['conversation_ids']
+    col = MessageModel.get_collection()
+
+    deleted = 0
+    while True:
+        ids = [m['_id'] for m in col.find(
+            {'conversation_id': {'$in': conversation_ids}}, {'_id': 1},
+        ).limit(batch_size)]
+        if not ids:
+            break
+        count = col.delete_many({'_id': {'$in': ids}}).deleted_count
+        deleted += count
+        PurgeJobModel.record_batch(job['_id'], count, LEASE_SECONDS)
+        if pause:
+            time.sleep(pause)
+
+    # Derived indexes go last: search already hides conversations that no
+    # longer exist, so there's no hurry.
+    MessageSearchModel.remove_conversations(conversation_ids)
+    semantic_search.remove_conversations(conversation_ids)
+    return deleted
+
+
+def run_one() -> Optional[dict]:
+    """Claim and run the next job in the calling thread; ``None`` when
+    nothing is queued."""
+    job = PurgeJobModel.claim(LEASE_SECONDS)
+    if job is None:
+        return None
+    try:
+        purge(job)
+    except Exception as exc:
+        attempts = job.get('attempts') or 1
+        logger.warning('purge job %s failed (attempt %d): %s', job['_id'], attempts, exc)
+        if attempts < MAX_ATTEMPTS:
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            PurgeJobModel.retry(job['_id'], str(exc), delay)
+        else:
+            PurgeJobModel.finish(job['_id'], error=str(exc))
+    else:
+        PurgeJobModel.finish(job['_id'])
+    return job
+
+
+def run_pending() -> int:
+    """Run queued jobs until none are left. Returns jobs run."""
+    done = 0
+    while run_one() is not None:
+        done += 1
+    return done
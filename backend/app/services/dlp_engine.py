@@ -0,0 +1,224 @@
+"""
+DLP scan engine — compiles a rule catalog into a small number of passes.
+
+The naive scanner runs one ``finditer`` over the full text per rule. This
+engine instead:
+
+1. Anchored rules (``"anchors"`` in the rule dict) — one zero-width literal
+   alternation finds every position where any anchor starts. Only the rules
+   whose anchor sits at a candidate position are tried there, with
+   ``pattern.match(text, pos)``. Python's ``re`` has no Aho-Corasick, but an
+   alternation of literals runs in C and gives the same single-pass prefilter.
+2. Unanchored rules — their ``"hotspot"`` / ``"pre_filter"`` regexes are folded
+   into one named-group alternation that decides which rules are live for
+   this text. Only live rules get a full ``finditer`` pass.
+
+Output is identical to running each rule's ``finditer`` in catalog order:
+  - ``pattern.match(text, pos)`` sees the whole string, so ``\\b`` and
+    look-behinds evaluate exactly as they do during a search;
+  - non-overlap within a rule is preserved by skipping candidates that start
+    before the previous regex match ended (validator-rejected matches still
+    consume their span, as they do under ``finditer``);
+  - hits are returned grouped per rule in catalog order.
+
+Usage:
+    engine = DLPRuleEngine(BUILTIN_RULES)
+    for rule, m in engine.iter_matches(text, active_ids):
+        ...
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from app.services.dlp_rules import BUILTIN_RULES
+
+
+@lru_cache(maxsize=256)
+def _compile_hotspots(items: tuple[tuple[int, str], ...]) -> re.Pattern:
+    """Compile ``(index, hotspot_regex)`` pairs into one named alternation."""
+    return re.compile('|'.join(f'(?P<h{idx}>{src})' for idx, src in items))
+
+
+class DLPRuleEngine:
+    """
+    Precompiled multi-rule scanner over a DLP rule catalog.
+
+    The engine is policy-agnostic: callers pass the ids of the rules that are
+    active for the current policy (sensitivity / overrides already applied)
+    and get back the regex hits that survive ``min_len`` and ``validate``.
+    """
+
+    def __init__(self, rules: list[dict]) -> None:
+        self._rules: list[dict] = list(rules)
+        self._index: dict[str, int] = {r["id"]: i for i, r in enumerate(self._rules)}
+
+        # Rule indexes per gating strategy
+        self._anchored: set[int] = set()
+        self._gated: dict[int, str] = {}   # idx -> hotspot regex source
+
+        anchors: dict[str, set[int]] = {}
+        for idx, rule in enumerate(self._rules):
+            rule_anchors = rule.get("anchors")
+            if rule_anchors:
+                self._anchored.add(idx)
+                for anchor in rule_anchors:
+                    anchors.setdefault(anchor, set()).add(idx)
+                continue
+            gate: Optional[re.Pattern] = rule.get("pre_filter") or rule.get("hotspot")
+            if gate is not None:
+                self._gated[idx] = gate.pattern
+
+        # Dispatch table: captured literal -> rules to try. The alternation is
+        # longest-first, so the captured literal is the longest anchor at that
+        # position; every shorter anchor also present there is a prefix of it.
+        self._dispatch: dict[str, tuple[int, ...]] = {}
+        for literal in anchors:
+            hit = {
+                idx
+                for anchor, idxs in anchors.items()
+                if literal.startswith(anchor)
+                for idx in idxs
+            }
+            self._dispatch[literal] = tuple(sorted(hit))
+
+        self._anchor_re: Optional[re.Pattern] = None
+        if anchors:
+            ordered = sorted(anchors, key=len, reverse=True)
+            self._anchor_re = re.compile(
+                '(?=(' + '|'.join(re.escape(a) for a in ordered) + '))'
+            )
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _accept(rule: dict, matched_text: str) -> bool:
+        if len(matched_text) < rule.get("min_len", 0):
+            return False
+        validator = rule.get("validate")
+        return validator is None or validator(matched_text)
+
+    def _anchored_hits(
+        self,
+        text: str,
+        wanted: set[int],
+        limit: Optional[int] = None,
+        overflow: Optional[dict[str, list[tuple[int, int]]]] = None,
+    ) -> dict[int, list[re.Match]]:
+        """Try anchored rules only at positions where one of their anchors starts.
+
+        Past ``limit`` hits only the spans of a rule's further hits go into
+        ``overflow``, or — without an ``overflow`` dict — no longer tried.
+        """
+        hits: dict[int, list[re.Match]] = {}
+        if self._anchor_re is None or not wanted:
+            return hits
+        wanted = set(wanted)
+        last_end: dict[int, int] = {}
+        for cand in self._anchor_re.finditer(text):
+            if not wanted:
+                break
+            pos = cand.start()
+            for idx in self._dispatch[cand.group(1)]:
+                if idx not in wanted or pos < last_end.get(idx, 0):
+                    continue
+                rule = self._rules[idx]
+                m = rule["regex"].match(text, pos)
+                if m is None:
+                    continue
+                # Mirror finditer: the next search for this rule resumes at
+                # the end of this match, whether or not it validates.
+                last_end[idx] = m.end()
+                if not self._accept(rule, m.group(0)):
+                    continue
+                kept = hits.setdefault(idx, [])
+                if limit is None or len(kept) < limit:
+                    kept.append(m)
+                elif overflow is not None:
+                    overflow.setdefault(rule["id"], []).append(m.span())
+                if overflow is None and limit is not None and len(kept) >= limit:
+                    wanted.discard(idx)
+        return hits
+
+    def _live_gated(self, text: str, wanted: set[int]) -> set[int]:
+        """
+        Return the gated rules whose hotspot occurs somewhere in ``text``.
+
+        Each search restarts at the previous hit with that rule dropped from
+        the alternation, so a hotspot can never hide another one that starts
+        at the same position, and the text is walked roughly once overall.
+        """
+        pending = {idx: self._gated[idx] for idx in wanted}
+        live: set[int] = set()
+        pos = 0
+        while pending:
+            combined = _compile_hotspots(tuple(sorted(pending.items())))
+            m = combined.search(text, pos)
+            if m is None:
+                break
+            idx = int(m.lastgroup[1:])
+            live.add(idx)
+            pending.pop(idx)
+            pos = m.start()
+        return live
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def iter_matches(
+        self,
+        text: str,
+        active_ids: Iterable[str],
+        *,
+        limit_per_rule: Optional[int] = None,
+        overflow: Optional[dict[str, list[tuple[int, int]]]] = None,
+    ) -> Iterator[tuple[dict, re.Match]]:
+        """
+        Yield ``(rule, match)`` for every accepted hit of the active rules.
+
+        Hits are grouped per rule in catalog order, and in text order within
+        a rule — the same sequence the per-rule ``finditer`` loop produced.
+        Unknown ids are ignored.
+
+        With ``limit_per_rule`` only the first hits of each rule are yielded,
+        so match collection stays bounded on hit-dense input. Hits past the
+        limit are recorded into ``overflow`` (rule id -> ``(start, end)``
+        spans, no match objects) when a dict is passed; otherwise the rule's
+        scan stops at the limit.
+        """
+        wanted = {self._index[rid] for rid in active_ids if rid in self._index}
+        if not text or not wanted:
+            return
+
+        anchored = self._anchored_hits(
+            text, wanted & self._anchored, limit_per_rule, overflow,
+        )
+        live = self._live_gated(text, {i for i in wanted if i in self._gated})
+
+        for idx, rule in enumerate(self._rules):
+            if idx not in wanted:
+                continue
+            if idx in self._anchored:
+                for m in anchored.get(idx, ()):
+                    yield rule, m
+                continue
+            if idx in self._gated and idx not in live:
+                continue
+            yielded = 0
+            for m in rule["regex"].finditer(text):
+                full = limit_per_rule is not None and yielded >= limit_per_rule
+                if full and overflow is None:
+                    break
+                if not self._accept(rule, m.group(0)):
+                    continue
+                if full:
+                    overflow.setdefault(rule["id"], []).append(m.span())
+                else:
+                    yielded += 1
+                    yield rule, m
+
+
+# Module-level engine over the static catalog — compiled once at import.
+BUILTIN_ENGINE = DLPRuleEngine(BUILTIN_RULES)
@@ -14,11 +14,14 @@ unconfirmed) and emit a warning so operators can spot bypass attempts. The
 ``block`` posture is unaffected — still non-overridable.
 """
 import logging
-from dataclasses import asdict
-from typing import Any, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Optional
 
 from app.models.dlp_event import DLPEventModel
-from app.services.dlp_service import DLPDetector
+from app.services.dlp_service import MAX_MATCHES_PER_RULE, DLPDetector, DLPScanResult
+from app.services.dlp_stream import EgressRedactor, scan_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +29,12 @@ logger = logging.getLogger(__name__)
 class DLPBlockedError(Exception):
     """Raised when DLP scan returns block / require_confirm without confirmation."""
 
-    def __init__(self, code: str, matches: list[dict[str, Any]], message: str = "") -> None:
+    def __init__(self, code: str, matches: list[dict[str, Any]], message: str = "",
+                 source_ref: Optional[dict[str, Any]] = None) -> None:
         super().__init__(message or code)
         self.code = code  # 'dlp_blocked' | 'dlp_confirm_required'
         self.matches = matches  # list of serialized DLPMatch dicts
+        self.source_ref = source_ref  # the blocking item, set by gate_many
 
 
 def gate(
@@ -58,11 +63,83 @@ def gate(
     if not text or not workspace_id:
         return None
 
-    detector = DLPDetector.from_workspace(str(workspace_id))
-    result = detector.scan(text, user_lang=user_lang, user_id=user_id)
-    if not result.matches:
+    detector = DLPDetector.for_workspace(str(workspace_id))
+    result = detector.scan(
+        text,
+        user_lang=user_lang,
+        user_id=user_id,
+        max_matches_per_rule=MAX_MATCHES_PER_RULE,
+    )
+    return _finalize(
+        result,
+        user_id=user_id,
+        workspace_id=workspace_id,
+        project_id=project_id,
+        source=source,
+        source_ref=source_ref,
+        confirmed=confirmed,
+        dlp_confirm_token=dlp_confirm_token,
+    )
+
+
+def gate_chunks(
+    *,
+    chunks: Iterable[str],
+    user_id: Any,
+    workspace_id: Any,
+    project_id: Any = None,
+    source: str,
+    source_ref: dict[str, Any],
+    confirmed: bool = False,
+    dlp_confirm_token: Optional[str] = None,
+    user_lang: str = 'en',
+) -> Optional[dict[str, Any]]:
+    """
+    ``gate`` over an iterable of text chunks (transcripts, large artifacts).
+
+    The text is scanned window by window via ``dlp_stream.scan_chunks`` and
+    never joined in memory; match offsets refer to the concatenated chunks.
+    Same return value and raise semantics as ``gate``.
+    """
+    if not workspace_id:
+        return None
+
+    detector = DLPDetector.for_workspace(str(workspace_id))
+    result = scan_chunks(
+        detector,
+        chunks,
+        user_lang,
+        user_id=user_id,
+        max_matches_per_rule=MAX_MATCHES_PER_RULE,
+    )
+    if not result.text_length:
         return None
+    return _finalize(
+        result,
+        user_id=user_id,
+        workspace_id=workspace_id,
+        project_id=project_id,
+        source=source,
+        source_ref=source_ref,
+        confirmed=confirmed,
+        dlp_confirm_token=dlp_confirm_token,
+    )
+
+
+def _decide(
+    result: DLPScanResult,
+    *,
+    user_id: Any,
+    workspace_id: Any,
+    source: str,
+    confirmed: bool,
+    dlp_confirm_token: Optional[str],
+) -> tuple[list[dict[str, Any]], bool, Optional[str]]:
+    """Verify confirmation for a non-empty ``result``.
 
+    Returns ``(matches_dicts, was_sent, code)``; ``code`` is the
+    DLPBlockedError code to raise, or None when the text may pass.
+    """
     action = result.highest_action
     matches_dicts = [asdict(m) for m in result.matches]
 
@@ -97,6 +174,37 @@ def gate(
         else:
             was_sent = False
             code = "dlp_confirm_required"
+    return matches_dicts, was_sent, code
+
+
+def _finalize(
+    result: DLPScanResult,
+    *,
+    user_id: Any,
+    workspace_id: Any,
+    project_id: Any,
+    source: str,
+    source_ref: dict[str, Any],
+    confirmed: bool,
+    dlp_confirm_token: Optional[str],
+    sent_upstream: bool = False,
+) -> Optional[dict[str, Any]]:
+    """Verify confirmation, persist the event and raise on block/confirm.
+
+    ``sent_upstream`` records that the text already reached the provider
+    (optimistic smart scan), so ``was_sent`` stays True even when blocked.
+    """
+    if not result.matches:
+        return None
+
+    matches_dicts, was_sent, code = _decide(
+        result,
+        user_id=user_id,
+        workspace_id=workspace_id,
+        source=source,
+        confirmed=confirmed,
+        dlp_confirm_token=dlp_confirm_token,
+    )
 
     event = DLPEventModel.create(
         user_id=user_id,
@@ -105,10 +213,11 @@ def gate(
         source=source,
         source_ref=source_ref,
         matches=matches_dicts,
-        highest_action=action,
-        was_sent=was_sent,
+        highest_action=result.highest_action,
+        was_sent=was_sent or sent_upstream,
         text_sha256=result.text_sha256,
         text_length=result.text_length,
+        match_summaries=[asdict(s) for s in result.summaries],
     )
 
     if code is not None:
@@ -117,6 +226,322 @@ def gate(
     return event
 
 
+# ---------------------------------------------------------------------------
+# Batch gate
+# ---------------------------------------------------------------------------
+
+# Upper bound on concurrent scans per gate_many call. Regex passes hold the
+# GIL; the win is overlapping smart-scan LLM round trips.
+_GATE_MANY_WORKERS = 4
+
+
+@dataclass
+class DLPGateItem:
+    """One text to gate in a ``gate_many`` batch, with its own attribution."""
+    text: str
+    source_ref: dict[str, Any]
+
+
+def gate_many(
+    items: list[DLPGateItem],
+    *,
+    user_id: Any,
+    workspace_id: Any,
+    project_id: Any = None,
+    source: str,
+    confirmed: bool = False,
+    dlp_confirm_token: Optional[str] = None,
+    user_lang: str = 'en',
+    max_workers: int = _GATE_MANY_WORKERS,
+) -> list[Optional[dict[str, Any]]]:
+    """
+    ``gate`` over many texts from one user action (workflow nodes, meeting
+    summary artifacts).
+
+    Identical texts are scanned once. Distinct texts are scanned (regex +
+    smart scan) on up to ``max_workers`` threads. Events are written in a
+    single ``DLPEventModel.create_many``, one row per item with its own
+    ``source_ref`` (items over the same text included).
+
+    Returns the persisted event (or None) per item, in input order. When any
+    item blocks, all events are persisted first, then DLPBlockedError is
+    raised for the first blocking item in input order; its ``source_ref`` is
+    attached to the exception.
+    """
+    if not workspace_id or not items:
+        return [None] * len(items)
+
+    detector = DLPDetector.for_workspace(str(workspace_id))
+    unique_texts = list(dict.fromkeys(item.text for item in items if item.text))
+    results = _scan_many(detector, unique_texts, user_id=user_id,
+                         user_lang=user_lang, max_workers=max_workers)
+
+    events: list[dict[str, Any]] = []
+    event_slots: list[int] = []
+    blocked: Optional[DLPBlockedError] = None
+    for idx, item in enumerate(items):
+        result = results.get(item.text) if item.text else None
+        if result is None or not result.matches:
+            continue
+        matches_dicts, was_sent, code = _decide(
+            result,
+            user_id=user_id,
+            workspace_id=workspace_id,
+            source=source,
+            confirmed=confirmed,
+            dlp_confirm_token=dlp_confirm_token,
+        )
+        events.append({
+            'user_id': user_id,
+            'workspace_id': workspace_id,
+            'project_id': project_id,
+            'source': source,
+            'source_ref': item.source_ref,
+            'matches': matches_dicts,
+            'highest_action': result.highest_action,
+            'was_sent': was_sent,
+            'text_sha256': result.text_sha256,
+            'text_length': result.text_length,
+            'match_summaries': [asdict(s) for s in result.summaries],
+        })
+        event_slots.append(idx)
+        if code is not None and blocked is None:
+            blocked = DLPBlockedError(code=code, matches=matches_dicts,
+                                      source_ref=item.source_ref)
+
+    out: list[Optional[dict[str, Any]]] = [None] * len(items)
+    for idx, event in zip(event_slots, DLPEventModel.create_many(events)):
+        out[idx] = event
+
+    if blocked is not None:
+        raise blocked
+    return out
+
+
+def _scan_many(
+    detector: DLPDetector,
+    texts: list[str],
+    *,
+    user_id: Any,
+    user_lang: str,
+    max_workers: int,
+) -> dict[str, DLPScanResult]:
+    def _scan(text: str) -> DLPScanResult:
+        return detector.scan(
+            text,
+            user_lang=user_lang,
+            user_id=user_id,
+            max_matches_per_rule=MAX_MATCHES_PER_RULE,
+        )
+
+    if len(texts) <= 1 or max_workers <= 1:
+        return {text: _scan(text) for text in texts}
+
+    from flask import current_app, has_app_context
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def _job(text: str) -> DLPScanResult:
+        # Smart scan goes through OpenRouterService, which needs the app.
+        if app is None:
+            return _scan(text)
+        with app.app_context():
+            return _scan(text)
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(texts)),
+        thread_name_prefix='dlp-gate-many',
+    ) as pool:
+        return dict(zip(texts, pool.map(_job, texts)))
+
+
+# ---------------------------------------------------------------------------
+# Egress redaction
+# ---------------------------------------------------------------------------
+
+def egress_redactor(workspace_id: Any) -> Optional[EgressRedactor]:
+    """Return a redactor for streamed model output, or None when the
+    workspace has DLP or ``egress_redaction`` switched off."""
+    if not workspace_id:
+        return None
+    detector = DLPDetector.for_workspace(str(workspace_id))
+    if not detector.enabled or not detector.policy.get('egress_redaction'):
+        return None
+    return EgressRedactor(detector)
+
+
+def record_egress(
+    redactor: EgressRedactor,
+    *,
+    user_id: Any,
+    workspace_id: Any,
+    project_id: Any = None,
+    source: str,
+    source_ref: dict[str, Any],
+) -> Optional[dict[str, Any]]:
+    """Persist what ``redactor`` masked as a DLP event. Never raises.
+
+    The output is already redacted by the time this runs, so there is no
+    block / confirm step. ``was_sent`` is False unless part of a match went
+    out unmasked (a token longer than the redactor's ``max_hold``); those
+    stretches are stored in the event's ``leaked_spans``.
+    """
+    result = redactor.result()
+    if not result.matches:
+        return None
+    leaked = redactor.leaked()
+    try:
+        return DLPEventModel.create(
+            user_id=user_id,
+            workspace_id=workspace_id,
+            project_id=project_id,
+            source=source,
+            source_ref=source_ref,
+            matches=[asdict(m) for m in result.matches],
+            highest_action=result.highest_action,
+            was_sent=bool(leaked),
+            text_sha256=result.text_sha256,
+            text_length=result.text_length,
+            leaked_spans=leaked,
+        )
+    except Exception:
+        logger.warning("DLP egress: failed to persist event for source=%s", source,
+                       exc_info=True)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Optimistic smart scan
+# ---------------------------------------------------------------------------
+
+# Bounded pool for background smart-scan classifications. Each job is one
+# short (3s timeout) OpenRouter call, so a handful of threads is plenty.
+_SMART_SCAN_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dlp-smart-scan')
+
+# Upper bound on how long resolve() waits for a verdict before failing open,
+# matching llm_classify's own fail-open posture (3s HTTP timeout + slack).
+_SMART_SCAN_WAIT_SECONDS = 5.0
+
+
+class PendingDLPGate:
+    """
+    A gate whose regex pass already ran and whose smart-scan verdict may
+    still be in flight. ``resolve()`` waits for the verdict, then applies the
+    same confirm / persist / raise logic as ``gate``.
+    """
+
+    def __init__(self, detector: Optional[DLPDetector], result: Optional[DLPScanResult],
+                 future: Optional[Future], context: dict[str, Any]) -> None:
+        self._detector = detector
+        self._result = result
+        self._future = future
+        self._context = context
+        self._outcome: Optional[tuple[Optional[dict], Optional[DLPBlockedError]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """True when a smart-scan verdict is still outstanding."""
+        return self._future is not None and self._outcome is None
+
+    def resolve(self, *, sent_upstream: bool = False) -> Optional[dict[str, Any]]:
+        """Wait for the verdict; return the event or raise DLPBlockedError.
+
+        Idempotent — later calls replay the first outcome.
+        """
+        with self._lock:
+            if self._outcome is None:
+                self._outcome = self._resolve_once(sent_upstream)
+        event, err = self._outcome
+        if err is not None:
+            raise err
+        return event
+
+    def _resolve_once(self, sent_upstream: bool):
+        if self._result is None:
+            return None, None
+        if self._future is not None:
+            try:
+                verdict = self._future.result(timeout=_SMART_SCAN_WAIT_SECONDS)
+            except Exception as exc:
+                logger.warning("DLP optimistic smart-scan unavailable: %s — failing open", exc)
+                verdict = None
+            self._detector.apply_verdict(self._result, verdict)
+        try:
+            return _finalize(self._result, sent_upstream=sent_upstream, **self._context), None
+        except DLPBlockedError as err:
+            return None, err
+
+
+def gate_optimistic(
+    *,
+    text: str,
+    user_id: Any,
+    workspace_id: Any,
+    project_id: Any = None,
+    source: str,
+    source_ref: dict[str, Any],
+    confirmed: bool = False,
+    dlp_confirm_token: Optional[str] = None,
+    user_lang: str = 'en',
+) -> PendingDLPGate:
+    """
+    Like ``gate`` but lets the smart-scan classifier overlap the caller's
+    upstream LLM request.
+
+    The regex pass runs synchronously; when it alone decides the outcome
+    (smart scan disabled / not optimistic, or a high-severity regex hit that
+    the privacy gate keeps away from the classifier) this behaves exactly like
+    ``gate`` and raises immediately. Otherwise the classifier is submitted to
+    a bounded pool and a ``PendingDLPGate`` is returned — the caller starts
+    its upstream request and must call ``resolve()`` before emitting any model
+    output, so latency becomes max(classify, TTFT) instead of the sum.
+    """
+    context = dict(
+        user_id=user_id,
+        workspace_id=workspace_id,
+        project_id=project_id,
+        source=source,
+        source_ref=source_ref,
+        confirmed=confirmed,
+        dlp_confirm_token=dlp_confirm_token,
+    )
+    if not text or not workspace_id:
+        return PendingDLPGate(None, None, None, context)
+
+    detector = DLPDetector.for_workspace(str(workspace_id))
+    lc = detector.policy.get('llm_classifier') or {}
+    optimistic = bool(lc.get('enabled')) and bool(lc.get('optimistic'))
+
+    result = detector.scan(
+        text,
+        user_lang=user_lang,
+        user_id=user_id,
+        max_matches_per_rule=MAX_MATCHES_PER_RULE,
+        smart_scan=not optimistic,
+    )
+
+    future: Optional[Future] = None
+    if optimistic and detector.enabled and detector.needs_smart_scan(result):
+        from flask import current_app, has_app_context
+
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def _classify():
+            if app is None:
+                return detector.llm_classify(text, user_lang=user_lang, user_id=user_id)
+            with app.app_context():
+                return detector.llm_classify(text, user_lang=user_lang, user_id=user_id)
+
+        future = _SMART_SCAN_POOL.submit(_classify)
+
+    pending = PendingDLPGate(detector, result, future, context)
+    if future is None:
+        # Regex-only outcome — settle now so blocks surface before any send.
+        pending.resolve()
+    return pending
+
+
 def format_blocked_response(err: DLPBlockedError) -> dict[str, Any]:
     """Shape the JSON body returned to clients on DLP block / confirm-required."""
     return {
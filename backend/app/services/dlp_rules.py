@@ -178,6 +178,29 @@ _IPV4_PRIVATE_RE = re.compile(
 _HIGH_ENTROPY_RE = re.compile(r'\b[A-Za-z0-9_/+=-]{24,512}\b')
 
 
+# ---------------------------------------------------------------------------
+# Scan-engine metadata (consumed by dlp_engine.DLPRuleEngine)
+# ---------------------------------------------------------------------------
+#
+# "anchors": literal prefixes every match of the rule starts with. The engine
+#   finds all anchor positions in one pass and only tries the rule regex there.
+#   Each anchor must be a literal the regex is forced to begin with — a match
+#   starting anywhere else would be missed.
+#
+# "hotspot": a cheap regex that is a NECESSARY condition for the rule to match
+#   anywhere in the text (unlike "pre_filter", which is a heuristic skip). The
+#   engine folds all hotspots into one alternation to decide which of the
+#   remaining rules are worth a full finditer pass.
+
+_AWS_SECRET_HOTSPOT_RE = re.compile(r'[A-Za-z0-9/+=]{40}')
+_IBAN_HOTSPOT_RE = re.compile(r'[A-Z]{2}\d{2}')
+_SSN_HOTSPOT_RE = re.compile(r'\d{3}-\d{2}-\d{4}')
+_EMAIL_HOTSPOT_RE = re.compile(r'@')
+_PHONE_HOTSPOT_RE = re.compile(r'\d{3}')
+_IPV4_HOTSPOT_RE = re.compile(r'1(?:0|72|92)\.')
+_HIGH_ENTROPY_HOTSPOT_RE = re.compile(r'[A-Za-z0-9_/+=-]{24}')
+
+
 # ---------------------------------------------------------------------------
 # BUILTIN_RULES catalog
 # ---------------------------------------------------------------------------
@@ -191,6 +214,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like an AWS access-key ID — leaking this can grant full account access.",
         "regex": _AWS_ACCESS_RE,
+        "anchors": ("AKIA",),
         "validate": None,
         "min_len": 20,
     },
@@ -202,6 +226,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like an AWS secret access key — pairs with the access ID to control your cloud.",
         "regex": _AWS_SECRET_RE,
+        "hotspot": _AWS_SECRET_HOTSPOT_RE,
         # Filter false-positives: require high entropy
         "validate": is_high_entropy,
         "min_len": 40,
@@ -214,6 +239,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like an Anthropic API key — exposes paid API access tied to your account.",
         "regex": _ANTHROPIC_RE,
+        "anchors": ("sk-ant-api", "sk-ant-admin"),
         "validate": None,
         "min_len": 20,
     },
@@ -225,6 +251,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like an OpenAI API key — exposes paid API access tied to your account.",
         "regex": _OPENAI_RE,
+        "anchors": ("sk-",),
         "validate": None,
         "min_len": 20,
     },
@@ -236,6 +263,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a GitHub personal access token — can read or push to your repositories.",
         "regex": _GITHUB_PAT_RE,
+        "anchors": ("ghp_", "gho_", "ghs_", "ghu_", "ghr_"),
         "validate": None,
         "min_len": 30,
     },
@@ -247,6 +275,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a Google Cloud API key — can be billed or abused if leaked.",
         "regex": _GOOGLE_API_RE,
+        "anchors": ("AIza",),
         "validate": None,
         "min_len": 35,
     },
@@ -258,6 +287,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a Slack token — can read messages and post on behalf of a workspace.",
         "regex": _SLACK_RE,
+        "anchors": ("xoxa-", "xoxb-", "xoxp-", "xoxr-", "xoxs-"),
         "validate": None,
         "min_len": 10,
     },
@@ -269,6 +299,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a Stripe secret key — exposes payment-processing access to your account.",
         "regex": _STRIPE_RE,
+        "anchors": ("sk_live_", "sk_test_", "rk_live_", "rk_test_"),
         "validate": None,
         "min_len": 20,
     },
@@ -280,6 +311,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a PEM-formatted private key — never paste cryptographic private keys.",
         "regex": _PRIVATE_KEY_RE,
+        "anchors": ("-----BEGIN ",),
         "validate": None,
         "min_len": 0,
     },
@@ -291,6 +323,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a JSON Web Token — can be replayed to impersonate a logged-in session.",
         "regex": _JWT_RE,
+        "anchors": ("eyJ",),
         "validate": None,
         "min_len": 30,
     },
@@ -316,6 +349,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "financial",
         "description": "Looks like an IBAN — exposing bank-account identifiers can enable financial abuse.",
         "regex": _IBAN_RE,
+        "hotspot": _IBAN_HOTSPOT_RE,
         "validate": iban_mod97,
         "min_len": 5,
     },
@@ -327,6 +361,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "identity",
         "description": "Looks like a US Social Security number — sensitive identifier used for identity theft.",
         "regex": _SSN_RE,
+        "hotspot": _SSN_HOTSPOT_RE,
         "validate": None,
         "min_len": 11,
     },
@@ -352,6 +387,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "pii",
         "description": "Looks like an email address — sharing personal contact info may violate privacy rules.",
         "regex": _EMAIL_RE,
+        "hotspot": _EMAIL_HOTSPOT_RE,
         "validate": None,
         "min_len": 5,
     },
@@ -363,6 +399,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "pii",
         "description": "Looks like a phone number — personal contact info that may breach privacy policy.",
         "regex": _PHONE_INTL_RE,
+        "hotspot": _PHONE_HOTSPOT_RE,
         "validate": None,
         "min_len": 7,
     },
@@ -374,6 +411,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "network",
         "description": "Looks like an internal IP address — could expose internal network structure.",
         "regex": _IPV4_PRIVATE_RE,
+        "hotspot": _IPV4_HOTSPOT_RE,
         "validate": None,
         "min_len": 7,
     },
@@ -387,6 +425,7 @@ BUILTIN_RULES: list[dict] = [
         "category": "secrets",
         "description": "Looks like a high-entropy secret or token — may be a credential.",
         "regex": _HIGH_ENTROPY_RE,
+        "hotspot": _HIGH_ENTROPY_HOTSPOT_RE,
         "validate": is_high_entropy,
         "min_len": 24,
     },
@@ -9,16 +9,23 @@ Usage:
 Or, fetching from DB:
     detector = DLPDetector.from_workspace(workspace_id_str)
     result = detector.scan(user_text)
+
+Hot paths (the DLP gate) use the per-process compiled-detector cache:
+    detector = DLPDetector.for_workspace(workspace_id_str)
 """
 import hashlib
 import json
 import logging
 import re
+import threading
 import time
 from collections import OrderedDict
-from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Optional
+
+from bson import ObjectId
 
+from app.services.dlp_engine import BUILTIN_ENGINE
 from app.services.dlp_rules import BUILTIN_RULES
 
 logger = logging.getLogger(__name__)
@@ -48,6 +55,15 @@ _SENSITIVITY_MIN_RANK: dict[str, int] = {
     "strict": SEVERITY_RANK["low"],
 }
 
+# Per-rule match cap used by the persisting chokepoints (gate, /dlp/scan).
+# Log dumps with thousands of emails/IPs otherwise bloat dlp_events.matches.
+MAX_MATCHES_PER_RULE = 25
+
+# Capped scans collect this many times the cap per rule before overlap dedup,
+# so a few representatives lost to higher-severity overlaps still leave
+# ``cap`` survivors. Hits past that are only counted.
+_COLLECT_FACTOR = 2
+
 
 # ---------------------------------------------------------------------------
 # Data classes
@@ -68,12 +84,37 @@ class DLPMatch:
     source: str = 'builtin'
 
 
+@dataclass
+class DLPRuleSummary:
+    """Per-rule overflow count when a scan runs with ``max_matches_per_rule``."""
+    rule_id: str
+    rule_name: str
+    severity: str
+    action: str
+    total: int            # matches after overlap dedup
+    omitted: int          # total minus the representative matches kept
+
+
+class _Span:
+    """A hit collection only recorded as a span (past the per-rule limit).
+    Carries just what ``_dedup_overlapping`` looks at, so overflow hits are
+    deduplicated with the rest without building full matches."""
+    __slots__ = ('rule_id', 'severity', 'offset_start', 'offset_end')
+
+    def __init__(self, rule_id: str, severity: str, start: int, end: int):
+        self.rule_id = rule_id
+        self.severity = severity
+        self.offset_start = start
+        self.offset_end = end
+
+
 @dataclass
 class DLPScanResult:
     matches: list[DLPMatch] = field(default_factory=list)
     highest_action: str = "allow"
     text_sha256: str = ""
     text_length: int = 0
+    summaries: list[DLPRuleSummary] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         out_matches: list[dict] = []
@@ -93,12 +134,15 @@ class DLPScanResult:
             if m.description is not None:
                 entry["description"] = m.description
             out_matches.append(entry)
-        return {
+        out: dict = {
             "matches": out_matches,
             "highest_action": self.highest_action,
             "text_sha256": self.text_sha256,
             "text_length": self.text_length,
         }
+        if self.summaries:
+            out["summaries"] = [asdict(s) for s in self.summaries]
+        return out
 
 
 # ---------------------------------------------------------------------------
@@ -119,8 +163,15 @@ _POLICY_DEFAULTS: dict[str, Any] = {
             "confidential": "warn",
             "restricted": "require_confirm",
         },
+        # Run the classifier concurrently with the upstream chat request and
+        # hold the stream until the verdict lands. The provider sees the
+        # prompt before the verdict, so this is opt-in per workspace.
+        "optimistic": False,
     },
     "notify_owners": True,
+    # Redact active-rule matches in streamed assistant output before it is
+    # emitted (see dlp_stream.EgressRedactor). Opt-in per workspace.
+    "egress_redaction": False,
 }
 
 
@@ -167,6 +218,18 @@ def effective_policy(raw_dlp: Optional[dict]) -> dict:
     return merged
 
 
+def dlp_policy_version(raw_dlp: Optional[dict]) -> str:
+    """
+    Stable short hash of a workspace's raw ``settings.dlp`` value.
+
+    Stored on the workspace as ``dlp_policy_version`` whenever the policy is
+    written, so the detector cache can tell a stale compiled detector apart
+    without re-deriving the whole policy.
+    """
+    canonical = json.dumps(raw_dlp or {}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
 # ---------------------------------------------------------------------------
 # Language resolution for smart-scan reason output
 # ---------------------------------------------------------------------------
@@ -207,44 +270,91 @@ def _resolve_lang_name(user_lang: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Smart-scan LLM verdict cache (module-level, in-memory)
+# Smart-scan LLM verdict cache (in-process LRU in front of Mongo)
 # ---------------------------------------------------------------------------
 
-# sha256 -> (verdict_dict, expires_at_epoch)
-# OrderedDict gives O(1) FIFO eviction via popitem(last=False) — the previous
+# cache key -> (verdict_dict, expires_at_epoch)
+# OrderedDict gives O(1) LRU eviction via popitem(last=False) — the previous
 # `min(..., key=...)` scan was O(n) on every insert past the cap.
+# Misses fall through to the shared ``dlp_verdict_cache`` collection so other
+# workers, the bot and the scheduler reuse each other's verdicts.
 _LLM_CACHE: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
 _LLM_CACHE_TTL = 24 * 3600  # 24 hours
 _LLM_CACHE_MAX = 2000
 
 
+# Smart scans run on the gate's thread pools, so every access takes the lock —
+# an unlocked get/move_to_end can race an eviction and raise KeyError.
+_LLM_CACHE_LOCK = threading.Lock()
+
+
 def _llm_cache_get(key: str) -> Optional[dict]:
     """Return cached verdict if present and not expired, else None."""
-    entry = _LLM_CACHE.get(key)
-    if entry is None:
-        return None
-    verdict, expires_at = entry
-    if time.time() > expires_at:
-        _LLM_CACHE.pop(key, None)
-        return None
-    return verdict
+    with _LLM_CACHE_LOCK:
+        entry = _LLM_CACHE.pop(key, None)
+        if entry is None:
+            return None
+        verdict, expires_at = entry
+        if time.time() > expires_at:
+            return None
+        # Re-insert at the tail: most recently used.
+        _LLM_CACHE[key] = entry
+        return verdict
 
 
 def _llm_cache_set(key: str, verdict: dict) -> None:
-    """Insert a verdict into the cache, evicting the oldest entry when full.
-
-    Uses ``OrderedDict.popitem(last=False)`` for O(1) FIFO eviction — the
-    earliest insert wins eviction. Since TTL is fixed, earliest-insert ==
-    earliest-expires, so this matches the prior semantics with better cost.
+    """Insert a verdict into the cache, evicting the least recently used
+    entry when full (``OrderedDict.popitem(last=False)``, O(1)).
     """
-    # If the key already exists, drop it first so re-insert appends to the tail
-    # (otherwise the original insertion order would be preserved and the entry
-    # could be evicted soon after a refresh).
-    if key in _LLM_CACHE:
+    with _LLM_CACHE_LOCK:
+        # If the key already exists, drop it first so re-insert appends to the
+        # tail (otherwise the original insertion order would be preserved and
+        # the entry could be evicted soon after a refresh).
         _LLM_CACHE.pop(key, None)
-    while len(_LLM_CACHE) >= _LLM_CACHE_MAX:
-        _LLM_CACHE.popitem(last=False)
-    _LLM_CACHE[key] = (verdict, time.time() + _LLM_CACHE_TTL)
+        while len(_LLM_CACHE) >= _LLM_CACHE_MAX:
+            _LLM_CACHE.popitem(last=False)
+        _LLM_CACHE[key] = (verdict, time.time() + _LLM_CACHE_TTL)
+
+
+def _shared_cache_get(key: str) -> Optional[dict]:
+    """Mongo-backed verdict lookup. Any failure (no app context, DB down) is a miss."""
+    try:
+        from app.models.dlp_verdict_cache import DLPVerdictCacheModel
+        return DLPVerdictCacheModel.get(key)
+    except Exception as exc:
+        logger.debug("DLP verdict cache read skipped: %s", exc)
+        return None
+
+
+def _shared_cache_set(key: str, verdict: dict) -> None:
+    try:
+        from app.models.dlp_verdict_cache import DLPVerdictCacheModel
+        DLPVerdictCacheModel.set(key, verdict, ttl_seconds=_LLM_CACHE_TTL)
+    except Exception as exc:
+        logger.debug("DLP verdict cache write skipped: %s", exc)
+
+
+# ---------------------------------------------------------------------------
+# Per-workspace compiled detector cache (module-level, per process)
+# ---------------------------------------------------------------------------
+
+# workspace_id -> (policy_version, detector, last_checked_epoch)
+# Within _DETECTOR_RECHECK_SECONDS a hit costs no DB read and no regex compile.
+# After that we re-read only the workspace's version field (plus settings.dlp
+# for legacy rows without one) and keep the compiled detector if it matches.
+# Writes from this process call invalidate_detector_cache() for immediate effect;
+# other workers pick the change up on their next recheck.
+_DETECTOR_CACHE: "OrderedDict[str, tuple[str, DLPDetector, float]]" = OrderedDict()
+_DETECTOR_RECHECK_SECONDS = 30
+_DETECTOR_CACHE_MAX = 1000
+
+
+def invalidate_detector_cache(workspace_id: Any = None) -> None:
+    """Drop one workspace's cached detector, or all of them when id is None."""
+    if workspace_id is None:
+        _DETECTOR_CACHE.clear()
+    else:
+        _DETECTOR_CACHE.pop(str(workspace_id), None)
 
 
 # ---------------------------------------------------------------------------
@@ -273,8 +383,35 @@ class DLPDetector:
             "internal_hostname_suffixes", []
         ) or []
 
-        # Compiled custom pattern cache: {regex_str: compiled | None (bad regex)}
+        # Compiled custom patterns: {regex_str: compiled | None (bad regex)}.
+        # Built once here so a cached detector never recompiles on scan.
         self._custom_compiled: dict[str, Optional[re.Pattern]] = {}
+        for custom in self._custom_patterns:
+            regex_str = custom.get("regex", "")
+            if not regex_str or regex_str in self._custom_compiled:
+                continue
+            try:
+                self._custom_compiled[regex_str] = re.compile(regex_str)
+            except re.error as exc:
+                logger.warning(
+                    "DLPDetector: invalid custom regex %r skipped: %s",
+                    regex_str, exc
+                )
+                self._custom_compiled[regex_str] = None
+
+        # Dynamic internal_hostname rule — escaped suffix alternation.
+        self._hostname_re: Optional[re.Pattern] = None
+        if self._hostname_suffixes:
+            escaped = [re.escape(suffix) for suffix in self._hostname_suffixes]
+            self._hostname_re = re.compile(
+                r'\b[\w.-]+(?:' + '|'.join(escaped) + r')\b',
+                re.IGNORECASE,
+            )
+
+    @property
+    def policy(self) -> dict:
+        """The effective policy this detector was built from (read-only use)."""
+        return self._policy
 
     # ------------------------------------------------------------------
     # Class method factory
@@ -307,6 +444,50 @@ class DLPDetector:
         policy = effective_policy(raw_dlp)
         return cls(policy, workspace_id=workspace_id)
 
+    @classmethod
+    def for_workspace(cls, workspace_id: str) -> "DLPDetector":
+        """
+        Cached variant of ``from_workspace`` for hot paths (the DLP gate).
+
+        Returns the compiled detector for ``workspace_id`` from the per-process
+        cache, revalidating against the workspace's ``dlp_policy_version`` at
+        most every ``_DETECTOR_RECHECK_SECONDS``. Invalid or missing workspaces
+        are not cached and fall through to ``from_workspace``.
+        """
+        from app.models.workspace import WorkspaceModel
+        from app.utils.helpers import validate_object_id
+
+        if not workspace_id or not validate_object_id(workspace_id):
+            return cls.from_workspace(workspace_id)
+
+        key = str(workspace_id)
+        now = time.time()
+        entry = _DETECTOR_CACHE.get(key)
+        if entry is not None and now - entry[2] < _DETECTOR_RECHECK_SECONDS:
+            return entry[1]
+
+        workspace = WorkspaceModel.get_collection().find_one(
+            {'_id': ObjectId(key)},
+            {'dlp_policy_version': 1, 'settings.dlp': 1},
+        )
+        if workspace is None:
+            _DETECTOR_CACHE.pop(key, None)
+            return cls.from_workspace(key)
+
+        raw_dlp = (workspace.get("settings") or {}).get("dlp")
+        version = workspace.get("dlp_policy_version") or dlp_policy_version(raw_dlp)
+
+        if entry is not None and entry[0] == version:
+            detector = entry[1]
+        else:
+            detector = cls(effective_policy(raw_dlp), workspace_id=key)
+
+        _DETECTOR_CACHE.pop(key, None)
+        while len(_DETECTOR_CACHE) >= _DETECTOR_CACHE_MAX:
+            _DETECTOR_CACHE.popitem(last=False)
+        _DETECTOR_CACHE[key] = (version, detector, now)
+        return detector
+
     # ------------------------------------------------------------------
     # Snippet helper
     # ------------------------------------------------------------------
@@ -336,11 +517,17 @@ class DLPDetector:
         When two matches overlap in the text, keep the one with the highest
         severity (ties broken by earlier offset_start).
 
-        Implementation: each candidate is compared against the current ``kept``
-        list. When an overlap is found, we decide which match wins and rebuild
-        ``kept`` as a fresh list instead of mutating it during a loop. The
-        previous version relied on ``break`` immediately after ``kept.remove``
-        — safe, but fragile to anyone editing the loop body.
+        Interval sweep, O(n log n) for the sort and O(n) after it. Candidates
+        are visited by (offset_start, severity desc); the surviving non-empty
+        matches are pairwise disjoint and sorted by start, hence also by end,
+        so the only ones a candidate can overlap form a suffix of ``active``
+        with ``offset_end > candidate.offset_start``. Semantics match the
+        original pairwise loop exactly:
+          - every overlapped survivor the candidate strictly outranks is dropped;
+          - the candidate is kept only if it outranked all survivors it overlapped;
+          - output keeps insertion order.
+        Empty matches (start == end) can never overlap a later candidate, so
+        they are kept out of ``active``.
         """
         if not matches:
             return matches
@@ -351,41 +538,81 @@ class DLPDetector:
             key=lambda m: (m.offset_start, -SEVERITY_RANK.get(m.severity, 0))
         )
 
-        kept: list[DLPMatch] = []
+        order: list[DLPMatch] = []        # insertion order, with tombstones
+        alive: list[bool] = []
+        active: list[int] = []            # indexes into ``order`` of live non-empty matches
+
         for candidate in sorted_matches:
             cand_rank = SEVERITY_RANK.get(candidate.severity, 0)
-            new_kept: list[DLPMatch] = []
-            placed = False
-            overlapped = False
+            start, end = candidate.offset_start, candidate.offset_end
 
-            for kept_match in kept:
-                overlap = (
-                    candidate.offset_start < kept_match.offset_end
-                    and candidate.offset_end > kept_match.offset_start
-                )
-                if overlap:
-                    overlapped = True
-                    kept_rank = SEVERITY_RANK.get(kept_match.severity, 0)
-                    if cand_rank > kept_rank:
-                        # Drop the existing match; the candidate will land in
-                        # ``new_kept`` after we finish scanning.
-                        continue
-                    # Existing match wins — keep it, candidate is shadowed.
-                    new_kept.append(kept_match)
-                    placed = True
+            # Walk the overlapping suffix of ``active``.
+            overlapped = False
+            placed = False
+            survivors: list[int] = []
+            while active and order[active[-1]].offset_end > start:
+                idx = active.pop()
+                kept_match = order[idx]
+                if start == end and kept_match.offset_start >= start:
+                    # Empty candidate only overlaps matches strictly around it.
+                    survivors.append(idx)
+                    continue
+                overlapped = True
+                if cand_rank > SEVERITY_RANK.get(kept_match.severity, 0):
+                    alive[idx] = False
                 else:
-                    new_kept.append(kept_match)
+                    survivors.append(idx)
+                    placed = True
+            active.extend(reversed(survivors))
+
+            if not overlapped or not placed:
+                order.append(candidate)
+                alive.append(True)
+                if end > start:
+                    active.append(len(order) - 1)
 
-            if not overlapped:
-                new_kept.append(candidate)
-            elif not placed:
-                # Candidate overlapped one or more entries and outranked every
-                # one of them (those were dropped above) — add it now.
-                new_kept.append(candidate)
+        return [m for m, ok in zip(order, alive) if ok]
 
-            kept = new_kept
+    @staticmethod
+    def _cap_per_rule(
+        matches: list[DLPMatch],
+        cap: int,
+        overflow: Optional[dict[str, int]] = None,
+    ) -> tuple[list[DLPMatch], list[DLPRuleSummary]]:
+        """
+        Keep the first ``cap`` matches of every rule (at least one) and
+        summarise the overflow per rule. Order of kept matches is preserved.
 
-        return kept
+        ``overflow`` holds per-rule counts of the overflow hits that survived
+        overlap dedup (see ``resolve_matches``); they add to the totals.
+        """
+        cap = max(1, int(cap))
+        counts: dict[str, int] = {}
+        first: dict[str, DLPMatch] = {}
+        kept: list[DLPMatch] = []
+        for m in matches:
+            seen = counts.get(m.rule_id, 0)
+            counts[m.rule_id] = seen + 1
+            first.setdefault(m.rule_id, m)
+            if seen < cap:
+                kept.append(m)
+        for rule_id, extra in (overflow or {}).items():
+            if rule_id in counts:
+                counts[rule_id] += extra
+
+        summaries = [
+            DLPRuleSummary(
+                rule_id=rule_id,
+                rule_name=first[rule_id].rule_name,
+                severity=first[rule_id].severity,
+                action=first[rule_id].action,
+                total=total,
+                omitted=total - cap,
+            )
+            for rule_id, total in counts.items()
+            if total > cap
+        ]
+        return kept, summaries
 
     # ------------------------------------------------------------------
     # Core scan
@@ -397,6 +624,8 @@ class DLPDetector:
         user_lang: str = 'en',
         *,
         user_id: Any = None,
+        max_matches_per_rule: Optional[int] = None,
+        smart_scan: bool = True,
     ) -> DLPScanResult:
         """
         Scan text against all active rules. Returns a DLPScanResult.
@@ -409,6 +638,16 @@ class DLPDetector:
             user_id: The user whose request triggered the scan, propagated to
                 the smart-scan LLM call so ``usage_logs`` rows attribute the
                 cost to the right user (workspace is already on the detector).
+            max_matches_per_rule: When set, keep at most this many matches per
+                rule (the earliest ones, as representative snippets) and
+                report the rest in ``result.summaries`` as counts only.
+                ``highest_action`` is unaffected — every rule that fired keeps
+                at least one match. Collection itself is bounded: past
+                ``_COLLECT_FACTOR`` times the cap only the spans of a rule's hits are kept,
+                not materialised.
+            smart_scan: Set False to run the regex pass only; the caller then
+                drives ``llm_classify`` + ``apply_verdict`` itself (see
+                ``dlp_gate.gate_optimistic``).
         """
         result = DLPScanResult()
 
@@ -421,9 +660,66 @@ class DLPDetector:
         if not self.enabled:
             return result
 
+        overflow: Optional[dict[str, int]] = None
+        limit: Optional[int] = None
+        if max_matches_per_rule is not None:
+            overflow = {}
+            limit = max(1, int(max_matches_per_rule)) * _COLLECT_FACTOR
+        self.resolve_matches(
+            result,
+            self.collect_matches(text, limit_per_rule=limit, overflow=overflow),
+            text,
+            max_matches_per_rule=max_matches_per_rule,
+            overflow=overflow,
+        )
+
+        # --- Smart scan augmentation (LLM second pass) ---
+        if smart_scan and self.needs_smart_scan(result):
+            verdict = self.llm_classify(text, user_lang=user_lang, user_id=user_id)
+            self.apply_verdict(result, verdict)
+
+        return result
+
+    def collect_matches(
+        self,
+        text: str,
+        *,
+        limit_per_rule: Optional[int] = None,
+        overflow: Optional[dict[str, list[tuple[int, int]]]] = None,
+    ) -> list[DLPMatch]:
+        """
+        Raw regex pass: every builtin, custom and hostname hit in ``text``.
+
+        Matches overlap and carry no snippet yet — ``resolve_matches`` dedups,
+        caps and fills snippets. Split out so ``dlp_stream`` can run the same
+        pass over windows of a larger text.
+
+        ``limit_per_rule`` / ``overflow`` bound the list as in
+        ``DLPRuleEngine.iter_matches``: only the first hits of each rule become
+        ``DLPMatch`` objects, the rest are recorded as spans (or not scanned
+        for).
+        """
         all_matches: list[DLPMatch] = []
+        taken: dict[str, int] = {}
+
+        def take(rule_id: str, m: re.Match) -> Optional[bool]:
+            """True to keep the hit, False to record its span, None to stop the rule."""
+            if limit_per_rule is None:
+                return True
+            seen = taken.get(rule_id, 0)
+            if seen < limit_per_rule:
+                taken[rule_id] = seen + 1
+                return True
+            if overflow is None:
+                return None
+            overflow.setdefault(rule_id, []).append(m.span())
+            return False
 
         # --- Builtin rules ---
+        # Resolve which rules are active for this policy, then let the
+        # compiled engine find their hits in a couple of passes instead of one
+        # finditer per rule.
+        rule_actions: dict[str, str] = {}
         for rule in BUILTIN_RULES:
             rule_id: str = rule["id"]
             severity: str = rule["severity"]
@@ -438,43 +734,23 @@ class DLPDetector:
                 continue
 
             # Determine effective action
-            action = override_action if override_action else rule["default_action"]
-
-            pattern: re.Pattern = rule["regex"]
-            validator: Optional[Callable[[str], bool]] = rule.get("validate")
-
-            # Cheap pre-filter: rules like credit-card and Iran-ID run an
-            # O(n) validator on every match, so on text with no digit clusters
-            # we can skip the heavy regex+validator pass entirely.
-            pre_filter: Optional[re.Pattern] = rule.get("pre_filter")
-            if pre_filter is not None and not pre_filter.search(text):
-                continue
-
-            for m in pattern.finditer(text):
-                matched_text = m.group(0)
-
-                # Optional length filter
-                min_len = rule.get("min_len", 0)
-                if len(matched_text) < min_len:
-                    continue
-
-                # Optional validator (Luhn, IBAN mod-97, etc.)
-                if validator is not None and not validator(matched_text):
-                    continue
-
-                snippet = self._make_snippet(text, m.start(), m.end())
-                all_matches.append(DLPMatch(
-                    rule_id=rule_id,
-                    rule_name=rule["name"],
-                    severity=severity,
-                    action=action,
-                    snippet=snippet,
-                    offset_start=m.start(),
-                    offset_end=m.end(),
-                    category=rule.get("category"),
-                    description=rule.get("description"),
-                    source='builtin',
-                ))
+            rule_actions[rule_id] = override_action if override_action else rule["default_action"]
+
+        for rule, m in BUILTIN_ENGINE.iter_matches(
+            text, rule_actions, limit_per_rule=limit_per_rule, overflow=overflow,
+        ):
+            all_matches.append(DLPMatch(
+                rule_id=rule["id"],
+                rule_name=rule["name"],
+                severity=rule["severity"],
+                action=rule_actions[rule["id"]],
+                snippet='',  # filled in after dedup/capping
+                offset_start=m.start(),
+                offset_end=m.end(),
+                category=rule.get("category"),
+                description=rule.get("description"),
+                source='builtin',
+            ))
 
         # --- Custom patterns from policy ---
         for custom in self._custom_patterns:
@@ -482,16 +758,6 @@ class DLPDetector:
             if not regex_str:
                 continue
 
-            if regex_str not in self._custom_compiled:
-                try:
-                    self._custom_compiled[regex_str] = re.compile(regex_str)
-                except re.error as exc:
-                    logger.warning(
-                        "DLPDetector: invalid custom regex %r skipped: %s",
-                        regex_str, exc
-                    )
-                    self._custom_compiled[regex_str] = None
-
             compiled = self._custom_compiled.get(regex_str)
             if compiled is None:
                 continue
@@ -506,27 +772,25 @@ class DLPDetector:
                 continue
 
             for m in compiled.finditer(text):
-                snippet = self._make_snippet(text, m.start(), m.end())
+                keep = take(custom_id, m)
+                if keep is None:
+                    break
+                if not keep:
+                    continue
                 all_matches.append(DLPMatch(
                     rule_id=custom_id,
                     rule_name=custom_name,
                     severity=custom_severity,
                     action=custom_action,
-                    snippet=snippet,
+                    snippet='',  # filled in after dedup/capping
                     offset_start=m.start(),
                     offset_end=m.end(),
                     source='custom',
                 ))
 
         # --- Dynamic internal_hostname rule ---
-        if self._hostname_suffixes:
-            # Escape suffixes and build alternation
-            escaped = [re.escape(suffix) for suffix in self._hostname_suffixes]
-            hostname_pattern = re.compile(
-                r'\b[\w.-]+(?:' + '|'.join(escaped) + r')\b',
-                re.IGNORECASE,
-            )
-            for m in hostname_pattern.finditer(text):
+        if self._hostname_re is not None:
+            for m in self._hostname_re.finditer(text):
                 # Sensitivity: medium
                 if SEVERITY_RANK["medium"] < self._min_severity_rank:
                     continue
@@ -534,13 +798,17 @@ class DLPDetector:
                 if override_action == "allow":
                     continue
                 action = override_action if override_action else "warn"
-                snippet = self._make_snippet(text, m.start(), m.end())
+                keep = take("internal_hostname", m)
+                if keep is None:
+                    break
+                if not keep:
+                    continue
                 all_matches.append(DLPMatch(
                     rule_id="internal_hostname",
                     rule_name="Internal Hostname",
                     severity="medium",
                     action=action,
-                    snippet=snippet,
+                    snippet='',  # filled in after dedup/capping
                     offset_start=m.start(),
                     offset_end=m.end(),
                     category='network',
@@ -548,8 +816,70 @@ class DLPDetector:
                     source='hostname',
                 ))
 
+        return all_matches
+
+    def resolve_matches(
+        self,
+        result: DLPScanResult,
+        all_matches: list[DLPMatch],
+        text: Optional[str],
+        *,
+        max_matches_per_rule: Optional[int] = None,
+        overflow: Optional[dict[str, list[tuple[int, int]]]] = None,
+    ) -> None:
+        """
+        Dedup, cap and rank ``all_matches`` into ``result``.
+
+        Snippets are built from ``text``; pass None when the caller already
+        filled them (chunked scans no longer hold the full text).
+        ``overflow`` carries the spans collection did not materialise; they
+        are deduplicated together with ``all_matches`` and only the
+        survivors are counted.
+        """
         # --- Dedup overlapping matches ---
-        deduplicated = self._dedup_overlapping(all_matches)
+        protos: dict[str, DLPMatch] = {}
+        for m in all_matches:
+            protos.setdefault(m.rule_id, m)
+        spans = [
+            _Span(rule_id, protos[rule_id].severity, start, end)
+            for rule_id, rule_spans in (overflow or {}).items() if rule_id in protos
+            for start, end in rule_spans
+        ]
+        survivors = self._dedup_overlapping(all_matches + spans)
+
+        # Surviving overflow hits fill up rules whose collected hits were
+        # shadowed (up to the cap, so every rule that fired keeps a match);
+        # the rest only count.
+        room = max(1, int(max_matches_per_rule or 1))
+        kept: dict[str, int] = {}
+        for m in survivors:
+            if not isinstance(m, _Span):
+                kept[m.rule_id] = kept.get(m.rule_id, 0) + 1
+        deduplicated: list[DLPMatch] = []
+        extra: dict[str, int] = {}
+        for m in survivors:
+            if not isinstance(m, _Span):
+                deduplicated.append(m)
+            elif kept.get(m.rule_id, 0) < room:
+                kept[m.rule_id] = kept.get(m.rule_id, 0) + 1
+                deduplicated.append(replace(
+                    protos[m.rule_id], snippet="",
+                    offset_start=m.offset_start, offset_end=m.offset_end,
+                ))
+            else:
+                extra[m.rule_id] = extra.get(m.rule_id, 0) + 1
+
+        # --- Cap-and-summarise ---
+        if max_matches_per_rule is not None:
+            deduplicated, result.summaries = self._cap_per_rule(
+                deduplicated, max_matches_per_rule, extra
+            )
+
+        # Snippets are only built for matches that survive, so a paste with
+        # thousands of hits doesn't allocate thousands of context strings.
+        if text is not None:
+            for m in deduplicated:
+                m.snippet = self._make_snippet(text, m.offset_start, m.offset_end)
 
         result.matches = deduplicated
 
@@ -563,46 +893,52 @@ class DLPDetector:
                     result.highest_action = action_str
                     break
 
-        # --- Smart scan augmentation (LLM second pass) ---
-        # Privacy gate: never ship critical/high regex matches to an external LLM.
-        has_high_severity = any(
+    @staticmethod
+    def needs_smart_scan(result: DLPScanResult) -> bool:
+        """Privacy gate: never ship critical/high regex matches to an external LLM."""
+        return not any(
             SEVERITY_RANK.get(m.severity, 0) >= SEVERITY_RANK['high']
             for m in result.matches
         )
 
-        if not has_high_severity:
-            verdict = self.llm_classify(text, user_lang=user_lang, user_id=user_id)
-            if verdict is not None and verdict.get('category') != 'public':
-                thresholds = (self._policy.get('llm_classifier') or {}).get(
-                    'action_thresholds') or {}
-                category = verdict['category']
-                default_action = 'warn' if category == 'confidential' else 'require_confirm'
-                llm_action = thresholds.get(category, default_action)
-
-                synthetic = DLPMatch(
-                    rule_id='ai_smart_scan',
-                    rule_name='Smart scan',
-                    severity='medium' if category == 'confidential' else 'high',
-                    action=llm_action,
-                    snippet='',
-                    offset_start=0,
-                    offset_end=0,
-                    category=category,
-                    description=verdict.get('reason', ''),
-                    source='llm',
-                )
-                result.matches.append(synthetic)
+    def apply_verdict(self, result: DLPScanResult, verdict: Optional[dict]) -> None:
+        """
+        Merge a smart-scan verdict into ``result`` as a synthetic match.
 
-                # Raise highest_action only — never lower.
-                current_rank = ACTION_RANK.get(result.highest_action, 0)
-                llm_rank = ACTION_RANK.get(llm_action, 0)
-                if llm_rank > current_rank:
-                    for action_str, rank in ACTION_RANK.items():
-                        if rank == llm_rank:
-                            result.highest_action = action_str
-                            break
+        No-op for ``None`` or ``public`` verdicts. ``highest_action`` is only
+        ever raised, never lowered.
+        """
+        if verdict is None or verdict.get('category') == 'public':
+            return
+
+        thresholds = (self._policy.get('llm_classifier') or {}).get(
+            'action_thresholds') or {}
+        category = verdict['category']
+        default_action = 'warn' if category == 'confidential' else 'require_confirm'
+        llm_action = thresholds.get(category, default_action)
+
+        synthetic = DLPMatch(
+            rule_id='ai_smart_scan',
+            rule_name='Smart scan',
+            severity='medium' if category == 'confidential' else 'high',
+            action=llm_action,
+            snippet='',
+            offset_start=0,
+            offset_end=0,
+            category=category,
+            description=verdict.get('reason', ''),
+            source='llm',
+        )
+        result.matches.append(synthetic)
 
-        return result
+        # Raise highest_action only — never lower.
+        current_rank = ACTION_RANK.get(result.highest_action, 0)
+        llm_rank = ACTION_RANK.get(llm_action, 0)
+        if llm_rank > current_rank:
+            for action_str, rank in ACTION_RANK.items():
+                if rank == llm_rank:
+                    result.highest_action = action_str
+                    break
 
     # ------------------------------------------------------------------
     # LLM classifier stub
@@ -642,14 +978,21 @@ class DLPDetector:
         guidance = (lc.get('guidance_prompt') or '').strip()
         model = lc.get('model') or 'google/gemini-3.1-flash-lite'
 
-        # Cache key includes model + lang + guidance + text so any change
-        # invalidates prior verdicts.
-        cache_key = hashlib.sha256(
-            f"{model}|{user_lang}|{guidance}|{text}".encode('utf-8')
-        ).hexdigest()
+        # Cache key = text hash + policy hash (model + guidance) + lang, so any
+        # change invalidates prior verdicts. Local LRU first, then the shared
+        # Mongo cache (which back-fills the LRU).
+        text_sha = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        policy_hash = hashlib.sha256(
+            f"{model}|{guidance}".encode('utf-8')
+        ).hexdigest()[:16]
+        cache_key = f"{text_sha}:{policy_hash}:{user_lang}"
         cached = _llm_cache_get(cache_key)
         if cached is not None:
             return cached
+        cached = _shared_cache_get(cache_key)
+        if cached is not None:
+            _llm_cache_set(cache_key, cached)
+            return cached
 
         # Resolve UI language to a full English name the model can ground its
         # response language on. `user_lang` arrives as a 2-char prefix from the
@@ -742,4 +1085,5 @@ class DLPDetector:
             return None
 
         _llm_cache_set(cache_key, verdict)
+        _shared_cache_set(cache_key, verdict)
         return verdict
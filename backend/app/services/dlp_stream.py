@@ -0,0 +1,337 @@
+"""
+Chunked and streaming DLP scanning.
+
+``DLPDetector.scan`` needs the whole text in memory. The helpers here run the
+same regex pass over a stream of chunks instead:
+
+    scanner = ChunkedScanner(detector)
+    for part in parts:              # any iterable / generator of str
+        scanner.feed(part)
+    result = scanner.finish()       # same DLPScanResult shape as scan()
+
+    result = scan_chunks(detector, parts)   # one-shot wrapper
+
+Chunks are buffered into windows of ``window`` chars. Each window is scanned
+with ``overlap`` chars of context on both sides, and only matches that start
+inside the window are kept, so ``\\b``, look-behinds and tokens that straddle
+a chunk boundary behave as they do on the joined text. Offsets are absolute
+(relative to the joined text). Matches longer than ``overlap`` may be
+reported truncated — the default comfortably covers every builtin rule.
+
+Egress mode redacts model output before it reaches the client:
+
+    redactor = EgressRedactor(detector)
+    for delta in stream:
+        safe = redactor.push(delta)      # may be '' while text is held back
+        if safe:
+            emit(safe)
+    emit(redactor.flush())
+    result = redactor.result()           # what was redacted, for dlp_events
+
+At least ``lookback`` chars are held back at any time. A token still growing
+at the end of the buffer — a match touching the end, or just an unbroken run
+of token characters such as a JWT whose signature has not arrived yet — is
+held back whole, up to ``max_hold`` chars. Past that the hold is forced open;
+the released head stays in the scan context (up to ``4 * max_hold`` chars) so
+a match that completes later is still found and reported by ``leaked()``.
+"""
+import hashlib
+import re
+from typing import Iterable, Optional
+
+from app.services.dlp_service import DLPDetector, DLPMatch, DLPScanResult
+
+DEFAULT_OVERLAP = 1024
+DEFAULT_WINDOW = 64 * 1024
+
+# The smart-scan classifier truncates to 2000 chars anyway, so the chunked
+# scanner keeps only the head of the stream for it.
+_SMART_SCAN_HEAD = 2000
+
+DEFAULT_LOOKBACK = 256
+REDACTION_CHAR = '*'
+
+# Characters every secret-shaped builtin rule (keys, tokens, JWTs, entropy
+# blobs) is made of. A trailing run of them may still grow into a match.
+_OPEN_TOKEN_RE = re.compile(r'[A-Za-z0-9_/+=.\-]+\Z')
+
+
+class ChunkedScanner:
+    """Incremental ``DLPDetector.scan`` over a sequence of text chunks."""
+
+    def __init__(
+        self,
+        detector: DLPDetector,
+        *,
+        overlap: int = DEFAULT_OVERLAP,
+        window: int = DEFAULT_WINDOW,
+    ) -> None:
+        if overlap < 20:
+            # Snippets carry ±20 chars of context.
+            raise ValueError('overlap must be at least 20 chars')
+        if window <= 0:
+            raise ValueError('window must be positive')
+        self._detector = detector
+        self._overlap = overlap
+        self._window = window
+
+        self._buf = ''               # retained text, starting at _buf_offset
+        self._buf_offset = 0
+        self._parts: list[str] = []  # fed but not yet joined into _buf
+        self._parts_len = 0
+        self._committed = 0          # matches starting before this are final
+        self._last_end: dict[str, int] = {}
+        self._matches: list[DLPMatch] = []
+
+        self._sha = hashlib.sha256()
+        self._length = 0
+        self._head = ''
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self._sha.update(chunk.encode('utf-8'))
+        self._length += len(chunk)
+        if len(self._head) < _SMART_SCAN_HEAD:
+            self._head += chunk[:_SMART_SCAN_HEAD - len(self._head)]
+        if not self._detector.enabled:
+            return
+        self._parts.append(chunk)
+        self._parts_len += len(chunk)
+        pending = len(self._buf) + self._parts_len - (self._committed - self._buf_offset)
+        if pending >= self._window + self._overlap:
+            self._scan_window(final=False)
+
+    def _scan_window(self, *, final: bool) -> None:
+        if self._parts:
+            self._buf += ''.join(self._parts)
+            self._parts.clear()
+            self._parts_len = 0
+        buf = self._buf
+        start = self._committed - self._buf_offset
+        limit = len(buf) if final else len(buf) - self._overlap
+        if limit <= start:
+            return
+
+        for m in self._detector.collect_matches(buf):
+            if not start <= m.offset_start < limit:
+                continue
+            abs_start = m.offset_start + self._buf_offset
+            # Per-rule non-overlap, as finditer on the joined text would do:
+            # a window that starts mid-token must not re-find its tail.
+            if abs_start < self._last_end.get(m.rule_id, 0):
+                continue
+            m.snippet = self._detector._make_snippet(buf, m.offset_start, m.offset_end)
+            m.offset_start = abs_start
+            m.offset_end += self._buf_offset
+            self._last_end[m.rule_id] = m.offset_end
+            self._matches.append(m)
+
+        self._committed = self._buf_offset + limit
+        drop = max(0, limit - self._overlap)
+        self._buf = buf[drop:]
+        self._buf_offset += drop
+
+    def finish(
+        self,
+        user_lang: str = 'en',
+        *,
+        user_id=None,
+        max_matches_per_rule: Optional[int] = None,
+        smart_scan: bool = True,
+    ) -> DLPScanResult:
+        """Scan the tail and return the result; arguments as for ``scan``."""
+        result = DLPScanResult()
+        if not self._length:
+            return result
+        result.text_length = self._length
+        result.text_sha256 = self._sha.hexdigest()
+        if not self._detector.enabled:
+            return result
+
+        self._scan_window(final=True)
+        self._detector.resolve_matches(
+            result, self._matches, None,
+            max_matches_per_rule=max_matches_per_rule,
+        )
+        if smart_scan and self._detector.needs_smart_scan(result):
+            verdict = self._detector.llm_classify(
+                self._head, user_lang=user_lang, user_id=user_id,
+            )
+            self._detector.apply_verdict(result, verdict)
+        return result
+
+
+def scan_chunks(
+    detector: DLPDetector,
+    chunks: Iterable[str],
+    user_lang: str = 'en',
+    *,
+    user_id=None,
+    max_matches_per_rule: Optional[int] = None,
+    smart_scan: bool = True,
+    overlap: int = DEFAULT_OVERLAP,
+    window: int = DEFAULT_WINDOW,
+) -> DLPScanResult:
+    """Drain ``chunks`` through a ``ChunkedScanner`` and return the result."""
+    scanner = ChunkedScanner(detector, overlap=overlap, window=window)
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.finish(
+        user_lang,
+        user_id=user_id,
+        max_matches_per_rule=max_matches_per_rule,
+        smart_scan=smart_scan,
+    )
+
+
+class EgressRedactor:
+    """
+    Masks DLP matches in streamed model output before it is emitted.
+
+    Every match of the detector's active rules is replaced by
+    ``REDACTION_CHAR`` of the same length, so offsets in the emitted text line
+    up with the original output. No smart scan runs on egress.
+    """
+
+    def __init__(
+        self,
+        detector: DLPDetector,
+        *,
+        lookback: int = DEFAULT_LOOKBACK,
+        context: int = 64,
+        max_hold: Optional[int] = None,
+    ) -> None:
+        self._detector = detector
+        self._lookback = lookback
+        self._context_len = context
+        self._max_hold = max_hold if max_hold is not None else 4 * lookback
+
+        self._context = ''      # raw tail of already-emitted text (look-behind)
+        self._pending = ''      # received, not yet emitted (raw)
+        self._mask: list[bool] = []   # per char of _pending: redact on release
+        self._emitted = 0       # chars emitted so far (absolute offset of _pending)
+        self._matches: dict[tuple[str, int], DLPMatch] = {}
+        self._raw_spans: list[list[int]] = []  # absolute [start, end) emitted unmasked
+        self._sha = hashlib.sha256()  # of the raw (unredacted) output
+
+    @property
+    def enabled(self) -> bool:
+        return self._detector.enabled
+
+    def push(self, chunk: str) -> str:
+        """Add ``chunk``; return the prefix that is now safe to emit."""
+        if not self._detector.enabled:
+            return chunk
+        if not chunk:
+            return ''
+        self._sha.update(chunk.encode('utf-8'))
+        self._pending += chunk
+        self._mask.extend([False] * len(chunk))
+        if len(self._pending) <= self._lookback:
+            return ''
+        return self._release(final=False)
+
+    def flush(self) -> str:
+        """End of stream: redact and release everything still held."""
+        if not self._pending:
+            return ''
+        return self._release(final=True)
+
+    def _release(self, *, final: bool) -> str:
+        # Held text stays raw and redactions are only recorded in ``_mask``:
+        # masking a token in place would hide it from the next rescan once
+        # more of it has arrived.
+        pending = self._pending
+        mask = self._mask
+        base = len(self._context)
+        size = len(pending)
+        hold_from = size if final else size - self._lookback
+        force = final or size >= self._max_hold
+        if not force:
+            open_token = _OPEN_TOKEN_RE.search(pending)
+            if open_token is not None:
+                hold_from = min(hold_from, open_token.start())
+
+        for m in self._detector.collect_matches(self._context + pending):
+            start = m.offset_start - base
+            end = m.offset_end - base
+            if end <= 0:
+                continue  # lies in already-emitted context
+            if end >= size and not force:
+                # Touches the end of what we have — the token may still grow.
+                # Hold it back whole.
+                hold_from = min(hold_from, max(start, 0))
+                continue
+            for i in range(max(start, 0), min(end, size)):
+                mask[i] = True
+            m.offset_start += self._emitted - base
+            m.offset_end += self._emitted - base
+            key = (m.rule_id, m.offset_start)
+            known = self._matches.get(key)
+            if known is None:
+                self._matches[key] = m
+            elif m.offset_end > known.offset_end:
+                # Released early under ``max_hold`` and has grown since.
+                known.offset_end = m.offset_end
+
+        raw = pending[:hold_from]
+        out = ''.join(
+            REDACTION_CHAR if masked else ch for ch, masked in zip(raw, mask)
+        )
+        for i, masked in enumerate(mask[:hold_from]):
+            if masked:
+                continue
+            pos = self._emitted + i
+            if self._raw_spans and self._raw_spans[-1][1] == pos:
+                self._raw_spans[-1][1] = pos + 1
+            else:
+                self._raw_spans.append([pos, pos + 1])
+        self._pending = pending[hold_from:]
+        del mask[:hold_from]
+        self._emitted += hold_from
+        context = self._context + raw
+        keep = self._context_len
+        if not final and _OPEN_TOKEN_RE.match(self._pending[:1]):
+            # A token cut open by a forced release keeps its released head in
+            # context, so the match it grows into is still found whole and
+            # ``leaked()`` can report what went out unmasked.
+            cut = _OPEN_TOKEN_RE.search(context)
+            if cut is not None:
+                keep = max(keep, min(len(cut.group(0)), 4 * self._max_hold))
+        self._context = context[-keep:]
+        return out
+
+    def result(self) -> DLPScanResult:
+        """Matches redacted so far. Snippets are fully masked (no raw output)."""
+        result = DLPScanResult(
+            text_length=self._emitted + len(self._pending),
+            text_sha256=self._sha.hexdigest(),
+        )
+        if not self._matches:
+            return result
+        self._detector.resolve_matches(result, list(self._matches.values()), None)
+        for m in result.matches:
+            m.snippet = REDACTION_CHAR * (m.offset_end - m.offset_start)
+        return result
+
+    def leaked(self) -> list[dict]:
+        """Parts of matches that reached the client unmasked.
+
+        Only possible when a token outgrew ``max_hold`` and was released
+        before it matched. One ``{rule_id, offset_start, offset_end}`` per
+        unmasked stretch, absolute offsets into the output.
+        """
+        out = []
+        for m in self._matches.values():
+            for lo, hi in self._raw_spans:
+                if hi <= m.offset_start:
+                    continue
+                if lo >= m.offset_end:
+                    break
+                out.append({
+                    'rule_id': m.rule_id,
+                    'offset_start': max(lo, m.offset_start),
+                    'offset_end': min(hi, m.offset_end),
+                })
+        return out
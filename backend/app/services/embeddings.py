@@ -0,0 +1,135 @@
+"""
+Text embedders for semantic search.
+
+An embedder turns a batch of strings into an ``(n, dim)`` float32 matrix of
+unit-length rows, so cosine similarity is a plain dot product. Two
+implementations, picked by ``EMBEDDINGS_PROVIDER``:
+
+* ``openrouter`` — the ``/embeddings`` endpoint with ``EMBEDDINGS_MODEL``.
+* ``hashing`` — a local feature-hashing vectoriser over the search
+  analyser's terms plus character trigrams. No network, deterministic, good
+  enough for "roughly these words" recall and for offline tests.
+
+Vectors from different embedders live in different spaces; the vector index
+keys everything by :attr:`Embedder.name` so switching provider never mixes
+them.
+"""
+from __future__ import annotations
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+import requests
+from flask import current_app
+
+from app.services import text_search
+from app.services.openrouter_service import OpenRouterService
+
+
+class EmbeddingError(RuntimeError):
+    """The embedding backend failed; the caller decides whether to retry."""
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class Embedder(ABC):
+    name = ''
+    dim = 0
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Unit-normalised ``float32`` rows, one per text."""
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of terms (weight 1) and character trigrams of
+    each term (weight 0.5), with sublinear term frequency."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+
+    def _slot(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        return value % self.dim, (1.0 if value >> 63 else -1.0)
+
+    def _features(self, text: str) -> dict[str, float]:
+        counts: dict[str, float] = {}
+        for term in text_search.terms(text):
+            counts[term] = counts.get(term, 0.0) + 1.0
+            padded = f'#{term}#'
+            for i in range(len(padded) - 2):
+                gram = '3:' + padded[i:i + 3]
+                counts[gram] = counts.get(gram, 0.0) + 0.5
+        return counts
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text or '').items():
+                slot, sign = self._slot(feature)
+                weight = 1.0 + np.log(count) if count >= 1 else count
+                matrix[row, slot] += sign * weight
+        return _unit_rows(matrix)
+
+
+class OpenRouterEmbedder(Embedder):
+    """``POST {BASE_URL}/embeddings`` — OpenAI-compatible request/response."""
+
+    # Inputs per request; longer texts are cut so one message can't blow the
+    # provider's token limit.
+    BATCH_SIZE = 64
+    MAX_CHARS = 8000
+
+    def __init__(self, model: str):
+        self.model = model
+        self.name = f'openrouter:{model}'
+        self.dim = 0  # known after the first response
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            batch = [(t or ' ')[:self.MAX_CHARS] for t in texts[start:start + self.BATCH_SIZE]]
+            try:
+                response = requests.post(
+                    f'{OpenRouterService.BASE_URL}/embeddings',
+                    headers=OpenRouterService.get_headers(),
+                    json={'model': self.model, 'input': batch},
+                    timeout=60,
+                )
+                response.raise_for_status()
+                data = sorted(response.json()['data'], key=lambda item: item['index'])
+            except (requests.RequestException, KeyError, TypeError, ValueError) as exc:
+                raise EmbeddingError(f'embedding request failed: {exc}') from exc
+            rows.extend(item['embedding'] for item in data)
+        matrix = np.asarray(rows, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise EmbeddingError('embedding response does not match the request')
+        self.dim = matrix.shape[1]
+        return _unit_rows(matrix)
+
+
+_embedders: dict[tuple, Embedder] = {}
+
+
+def get_embedder(config: Optional[dict] = None) -> Embedder:
+    """The embedder configured for the current app (one instance per
+    process and configuration)."""
+    config = config if config is not None else current_app.config
+    provider = config.get('EMBEDDINGS_PROVIDER', 'hashing')
+    key = (provider, config.get('EMBEDDINGS_MODEL'), config.get('EMBEDDINGS_DIM'))
+    if key not in _embedders:
+        if provider == 'openrouter':
+            _embedders[key] = OpenRouterEmbedder(config.get('EMBEDDINGS_MODEL'))
+        elif provider == 'hashing':
+            _embedders[key] = HashingEmbedder(int(config.get('EMBEDDINGS_DIM') or 512))
+        else:
+            raise ValueError(f'unknown EMBEDDINGS_PROVIDER: {provider}')
+    return _embedders[key]
@@ -0,0 +1,256 @@
+"""
+Streaming raw-row exports of ``usage_logs``, ``dlp_events`` and ``audit_logs``.
+
+Finance pulls whole quarters of these collections, far more than the
+paginated JSON endpoints can materialise. :func:`stream` walks a server-side
+cursor in ``(created_at, _id)`` order with a bounded ``batch_size`` and yields
+encoded CSV or NDJSON chunks, optionally gzip-compressed, so a worker's memory
+stays flat however many rows go out.
+
+Every row starts with ``_id``. A client whose download broke off passes the
+last ``_id`` it received as ``after`` and the export resumes right after that
+row (keyset, not skip/limit, so resuming costs the same at row 10 and at row
+10 million).
+
+Only columns listed in a dataset's ``columns`` may be selected — raw DLP
+match text and other internals never leave through this path. ``usage_logs``
+rows older than the archive horizon live in ``usage_logs_archive``
+(app/models/usage_archive.py) and are not part of these exports.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Optional
+
+from bson import ObjectId
+
+from app.extensions import mongo
+
+FORMATS = ('csv', 'ndjson')
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 5000
+
+
+class ExportError(ValueError):
+    """Bad export parameters (unknown dataset, column, filter or cursor)."""
+
+
+@dataclass(frozen=True)
+class Dataset:
+    collection: str
+    # Selectable columns, in default output order; dotted paths are allowed.
+    columns: tuple[str, ...]
+    # Query arg -> (field, is_object_id) equality filters.
+    filters: dict
+
+
+DATASETS = {
+    'usage_logs': Dataset(
+        collection='usage_logs',
+        columns=(
+            'created_at', 'user_id', 'workspace_id', 'project_id', 'conversation_id',
+            'model', 'provider', 'feature', 'origin', 'prompt_tokens',
+            'completion_tokens', 'cached_tokens', 'cache_write_tokens',
+            'reasoning_tokens', 'total_tokens', 'cost_usd', 'upstream_cost_usd',
+            'is_streaming', 'finish_reason', 'generation_id',
+        ),
+        filters={
+            'workspace_id': ('workspace_id', True),
+            'project_id': ('project_id', True),
+            'user_id': ('user_id', True),
+            'model': ('model', False),
+        },
+    ),
+    'dlp_events': Dataset(
+        collection='dlp_events',
+        columns=(
+            'created_at', 'user_id', 'workspace_id', 'project_id', 'source',
+            'highest_action', 'was_sent', 'user_acknowledged', 'status',
+            'text_length', 'text_sha256', 'match_summaries', 'leaked_spans', 'reviewed_by',
+            'reviewed_at', 'review_note',
+        ),
+        filters={
+            'workspace_id': ('workspace_id', True),
+            'user_id': ('user_id', True),
+            'source': ('source', False),
+            'highest_action': ('highest_action', False),
+            'status': ('status', False),
+        },
+    ),
+    'audit_logs': Dataset(
+        collection='audit_logs',
+        columns=(
+            'created_at', 'action', 'admin_id', 'target_type', 'target_id',
+            'ip_address', 'details',
+        ),
+        filters={
+            'action': ('action', False),
+            'admin_id': ('admin_id', True),
+            'target_id': ('target_id', True),
+        },
+    ),
+}
+
+
+def _oid(value: str, name: str) -> ObjectId:
+    if not ObjectId.is_valid(value or ''):
+        raise ExportError(f'{name} must be an ObjectId')
+    return ObjectId(value)
+
+
+def _cell(value):
+    """JSON-safe scalar for one exported field."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _cell(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_cell(v) for v in value]
+    return value
+
+
+def _get_path(doc: dict, path: str):
+    for part in path.split('.'):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def resolve_columns(dataset: Dataset, requested: Optional[str]) -> list[str]:
+    """``_id`` plus the requested (comma-separated) or default columns."""
+    if not requested:
+        return ['_id', *dataset.columns]
+    columns = [c.strip() for c in requested.split(',') if c.strip() and c.strip() != '_id']
+    unknown = sorted(set(columns) - set(dataset.columns))
+    if unknown:
+        raise ExportError(f'unknown column(s): {", ".join(unknown)}')
+    return ['_id', *dict.fromkeys(columns)]
+
+
+def build_query(dataset: Dataset, *, start: Optional[datetime] = None,
+                end: Optional[datetime] = None, after: Optional[str] = None,
+                filters: Optional[dict] = None) -> dict:
+    """Mongo filter for one export (range, equality filters, resume cursor)."""
+    clauses = []
+    if start or end:
+        created = {}
+        if start:
+            created['$gte'] = start
+        if end:
+            created['$lt'] = end
+        clauses.append({'created_at': created})
+    for arg, value in (filters or {}).items():
+        if value in (None, ''):
+            continue
+        if arg not in dataset.filters:
+            raise ExportError(f'unknown filter: {arg}')
+        field, is_oid = dataset.filters[arg]
+        clauses.append({field: _oid(value, arg) if is_oid else value})
+    if after:
+        after_id = _oid(after, 'after')
+        last = mongo.db[dataset.collection].find_one({'_id': after_id}, {'created_at': 1})
+        if last is None:
+            raise ExportError('after does not name an exported row')
+        # Keyset on (created_at, _id): strictly after the last delivered row.
+        clauses.append({'$or': [
+            {'created_at': {'$gt': last.get('created_at')}},
+            {'created_at': last.get('created_at'), '_id': {'$gt': after_id}},
+        ]})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+
+def _rows(dataset: Dataset, query: dict, columns: list[str], batch_size: int,
+          limit: Optional[int]) -> Iterator[dict]:
+    projection = {c: 1 for c in columns}
+    cursor = (
+        mongo.db[dataset.collection]
+        .find(query, projection)
+        .sort([('created_at', 1), ('_id', 1)])
+        .batch_size(batch_size)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        for doc in cursor:
+            yield {c: _cell(_get_path(doc, c)) for c in columns}
+    finally:
+        cursor.close()
+
+
+def _encode_csv(rows: Iterator[dict], columns: list[str], batch_size: int) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([
+            json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else
+            ('' if v is None else v)
+            for v in (row[c] for c in columns)
+        ])
+        pending += 1
+        if pending >= batch_size:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    yield buf.getvalue()
+
+
+def _encode_ndjson(rows: Iterator[dict], batch_size: int) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False, separators=(',', ':')))
+        if len(lines) >= batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        # Sync-flush per batch so the client sees progress, not one final blob.
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(dataset_name: str, *, fmt: str = 'csv', columns: Optional[str] = None,
+           start: Optional[datetime] = None, end: Optional[datetime] = None,
+           after: Optional[str] = None, filters: Optional[dict] = None,
+           batch_size: int = DEFAULT_BATCH_SIZE, limit: Optional[int] = None,
+           gzip: bool = False) -> Iterator[bytes]:
+    """Validate the export parameters and return a lazy byte iterator.
+
+    Validation (and the ``after`` lookup) happens before the first chunk so
+    the caller can still answer 400; the rows themselves are only read as
+    the iterator is consumed.
+    """
+    dataset = DATASETS.get(dataset_name)
+    if dataset is None:
+        raise ExportError(f'unknown dataset: {dataset_name}')
+    if fmt not in FORMATS:
+        raise ExportError(f"format must be one of {', '.join(FORMATS)}")
+    if limit is not None and limit < 1:
+        raise ExportError('limit must be positive')
+    batch_size = max(1, min(MAX_BATCH_SIZE, int(batch_size or DEFAULT_BATCH_SIZE)))
+    cols = resolve_columns(dataset, columns)
+    query = build_query(dataset, start=start, end=end, after=after, filters=filters)
+
+    rows = _rows(dataset, query, cols, batch_size, limit)
+    text = _encode_csv(rows, cols, batch_size) if fmt == 'csv' else _encode_ndjson(rows, batch_size)
+    chunks = (chunk.encode('utf-8') for chunk in text if chunk)
+    return _gzip(chunks) if gzip else chunks
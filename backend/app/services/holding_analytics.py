@@ -4,6 +4,12 @@ Single source of truth for the cross-company aggregations consumed by both
 the CEO panel (`/api/admin/companies*`, `/api/admin/users-overview`) and the
 platform-operator panel (`/api/platform/companies*`, `/api/platform/users-overview`).
 
+Usage comes from the usage rollups and membership / conversation figures from
+the materialised views, both via `holding_views` (the views are refreshed by
+the scheduler), so a page view reads a handful of small summary docs instead
+of scanning `usage_logs` / `conversations`. Every payload carries
+`refreshed_at` — the time the count views were last built.
+
 Pure data layer — returns JSON-serialisable dicts (uses `serialize_doc` for the
 ObjectId/datetime conversion). No request/decorator concerns.
 """
@@ -16,6 +22,7 @@ from bson import ObjectId
 from app.extensions import mongo
 from app.models.credit_ledger import CreditLedgerModel
 from app.models.user import VALID_USER_ROLES
+from app.services import holding_views
 from app.utils.helpers import serialize_doc
 
 
@@ -27,54 +34,64 @@ def _empty_totals(days: int = 30) -> dict:
     }
 
 
+def _usage_block(row: dict) -> dict:
+    return {
+        'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
+        'tokens':   int(row.get('tokens', 0) or 0),
+        'calls':    int(row.get('calls', 0) or 0),
+    }
+
+
+def _daily_series(match: dict, days: int) -> list:
+    """One row per UTC day of the window, zero-filled, chronological."""
+    daily_raw = {row['_id']: row for row in holding_views.usage(match, 'day', days)}
+    return [
+        {'date': d, **_usage_block(daily_raw.get(d, {}))}
+        for d in (
+            (datetime.utcnow() - timedelta(days=days - i - 1)).strftime('%Y-%m-%d')
+            for i in range(days)
+        )
+    ]
+
+
+def _by_role(match: dict, days: int) -> dict:
+    by_role = {'admin': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
+               'manager': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
+               'user':    {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0}}
+    for row in holding_views.usage_by_role(match, days):
+        role = (row.get('_id') or 'user').lower()
+        if role not in by_role:
+            role = 'user'
+        by_role[role] = {**_usage_block(row), 'users': int(row.get('users', 0) or 0)}
+    return by_role
+
+
+def _lifetime_spend(match: dict) -> float:
+    rows = holding_views.usage(match)
+    return float(rows[0]['cost_usd']) if rows else 0.0
+
+
 def list_companies(days: int = 30) -> dict:
     """Return aggregated stats for every team workspace."""
-    cutoff = datetime.utcnow() - timedelta(days=days)
+    meta = holding_views.load_meta()
     workspaces = list(mongo.db.workspaces.find({'type': 'team'}).sort('created_at', -1))
     if not workspaces:
-        return {'companies': [], 'totals': _empty_totals(days), 'days': days}
+        return {
+            'companies': [], 'totals': _empty_totals(days), 'days': days,
+            'refreshed_at': holding_views.freshness(meta),
+        }
 
     wids = [w['_id'] for w in workspaces]
-
-    member_counts = {}
-    for row in mongo.db.workspace_members.aggregate([
-        {'$match': {'workspace_id': {'$in': wids}, 'status': 'active'}},
-        {'$group': {'_id': '$workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        member_counts[row['_id']] = row['count']
-
-    project_counts = {}
-    for row in mongo.db.projects.aggregate([
-        {'$match': {'workspace_id': {'$in': wids}, 'archived': {'$ne': True}}},
-        {'$group': {'_id': '$workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        project_counts[row['_id']] = row['count']
-
-    conv_counts = {}
-    for row in mongo.db.conversations.aggregate([
-        {'$lookup': {'from': 'projects', 'localField': 'project_id', 'foreignField': '_id', 'as': 'p'}},
-        {'$unwind': {'path': '$p', 'preserveNullAndEmptyArrays': False}},
-        {'$match': {'p.workspace_id': {'$in': wids}}},
-        {'$group': {'_id': '$p.workspace_id', 'count': {'$sum': 1}}},
-    ]):
-        conv_counts[row['_id']] = row['count']
-
-    usage = {}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': {'$in': wids}, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$workspace_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ]):
-        usage[row['_id']] = row
+    stats = holding_views.company_stats(meta, wids)
+    usage = {
+        row['_id']: row
+        for row in holding_views.usage({'workspace_id': {'$in': wids}}, 'workspace_id', days)
+    }
 
     out = []
     for w in workspaces:
         wid = w['_id']
-        u = usage.get(wid, {})
+        s = stats.get(wid, {})
         out.append({
             '_id': str(wid),
             'name': w.get('name'),
@@ -84,28 +101,27 @@ def list_companies(days: int = 30) -> dict:
             'owner_id': str(w.get('owner_id')) if w.get('owner_id') else None,
             'plan_tier': w.get('plan_tier'),
             'credits_balance_usd': float(w.get('credits_balance_usd', 0) or 0),
-            'member_count': member_counts.get(wid, 0),
-            'project_count': project_counts.get(wid, 0),
-            'conversation_count': conv_counts.get(wid, 0),
-            f'usage_{days}d': {
-                'cost_usd': round(float(u.get('cost_usd', 0) or 0), 4),
-                'tokens':   int(u.get('tokens', 0) or 0),
-                'calls':    int(u.get('calls', 0) or 0),
-            },
+            'member_count': s.get('member_count', 0),
+            'project_count': s.get('project_count', 0),
+            'conversation_count': s.get('conversation_count', 0),
+            f'usage_{days}d': _usage_block(usage.get(wid, {})),
         })
 
     totals = {
         'companies': len(workspaces),
-        'members':   sum(member_counts.values()),
-        'projects':  sum(project_counts.values()),
-        'conversations': sum(conv_counts.values()),
+        'members':   sum(r['member_count'] for r in out),
+        'projects':  sum(r['project_count'] for r in out),
+        'conversations': sum(r['conversation_count'] for r in out),
         f'cost_{days}d':   round(sum(float(v.get('cost_usd', 0) or 0) for v in usage.values()), 4),
         f'tokens_{days}d': sum(int(v.get('tokens', 0) or 0) for v in usage.values()),
         f'calls_{days}d':  sum(int(v.get('calls', 0) or 0) for v in usage.values()),
         'credits_balance_usd': round(sum(float(w.get('credits_balance_usd', 0) or 0) for w in workspaces), 2),
     }
 
-    return {'companies': serialize_doc(out), 'totals': totals, 'days': days}
+    return {
+        'companies': serialize_doc(out), 'totals': totals, 'days': days,
+        'refreshed_at': holding_views.freshness(meta),
+    }
 
 
 def company_detail(wid, days: int = 30):
@@ -117,51 +133,33 @@ def company_detail(wid, days: int = 30):
     else:
         ws_id = wid
 
-    cutoff = datetime.utcnow() - timedelta(days=days)
     workspace = mongo.db.workspaces.find_one({'_id': ws_id})
     if not workspace:
         return None
+    meta = holding_views.load_meta()
 
     projects = list(mongo.db.projects.find({'workspace_id': ws_id}))
     project_ids = [p['_id'] for p in projects]
     project_usage = {}
     if project_ids:
-        for row in mongo.db.usage_logs.aggregate([
-            {'$match': {'project_id': {'$in': project_ids}, 'created_at': {'$gte': cutoff}}},
-            {'$group': {
-                '_id': '$project_id',
-                'cost_usd': {'$sum': '$cost_usd'},
-                'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-                'calls':    {'$sum': 1},
-            }},
-        ]):
-            project_usage[row['_id']] = row
+        project_usage = {
+            row['_id']: row
+            for row in holding_views.usage({'project_id': {'$in': project_ids}}, 'project_id', days)
+        }
 
     project_rows = []
     for p in projects:
-        u = project_usage.get(p['_id'], {})
         project_rows.append({
             '_id': str(p['_id']),
             'name': p.get('name'),
             'archived': bool(p.get('archived')),
             'pinned': bool(p.get('pinned')),
-            'cost_usd': round(float(u.get('cost_usd', 0) or 0), 4),
-            'tokens': int(u.get('tokens', 0) or 0),
-            'calls': int(u.get('calls', 0) or 0),
+            **_usage_block(project_usage.get(p['_id'], {})),
         })
     project_rows.sort(key=lambda r: r['cost_usd'], reverse=True)
 
     top_users = []
-    user_rollup = list(mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$user_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 10},
-    ]))
+    user_rollup = holding_views.usage({'workspace_id': ws_id}, 'user_id', days, limit=10)
     if user_rollup:
         uids = [r['_id'] for r in user_rollup if r.get('_id')]
         users = {u['_id']: u for u in mongo.db.users.find(
@@ -179,82 +177,17 @@ def company_detail(wid, days: int = 30):
                 'calls': int(r.get('calls', 0) or 0),
             })
 
-    top_models = []
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$model',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 8},
-    ]):
-        top_models.append({
+    top_models = [
+        {
             'model': row['_id'],
             'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
             'calls': int(row.get('calls', 0) or 0),
-        })
-
-    by_role = {'admin': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
-               'manager': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
-               'user':    {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0}}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$lookup': {'from': 'users', 'localField': 'user_id', 'foreignField': '_id', 'as': 'u'}},
-        {'$unwind': {'path': '$u', 'preserveNullAndEmptyArrays': True}},
-        {'$group': {
-            '_id': {'role': '$u.role', 'user_id': '$user_id'},
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-        {'$group': {
-            '_id': '$_id.role',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': '$tokens'},
-            'calls':    {'$sum': '$calls'},
-            'users':    {'$sum': 1},
-        }},
-    ]):
-        role = (row.get('_id') or 'user').lower()
-        if role not in by_role:
-            role = 'user'
-        by_role[role] = {
-            'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
-            'tokens':   int(row.get('tokens', 0) or 0),
-            'calls':    int(row.get('calls', 0) or 0),
-            'users':    int(row.get('users', 0) or 0),
         }
-
-    daily_raw = {}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ]):
-        daily_raw[row['_id']] = row
-    daily = []
-    for i in range(days):
-        d = (datetime.utcnow() - timedelta(days=days - i - 1)).strftime('%Y-%m-%d')
-        r = daily_raw.get(d, {})
-        daily.append({
-            'date': d,
-            'cost_usd': round(float(r.get('cost_usd', 0) or 0), 4),
-            'tokens':   int(r.get('tokens', 0) or 0),
-            'calls':    int(r.get('calls', 0) or 0),
-        })
+        for row in holding_views.usage({'workspace_id': ws_id}, 'model', days, limit=8)
+    ]
 
     lifetime_topups = float(CreditLedgerModel.sum_credits(ws_id))
-    lifetime_spend_rows = list(mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': ws_id}},
-        {'$group': {'_id': None, 'total': {'$sum': '$cost_usd'}}},
-    ]))
-    lifetime_spend = float(lifetime_spend_rows[0]['total']) if lifetime_spend_rows else 0.0
+    lifetime_spend = _lifetime_spend({'workspace_id': ws_id})
     credits_block = {
         'lifetime_topups_usd': round(lifetime_topups, 4),
         'lifetime_spend_usd':  round(lifetime_spend, 4),
@@ -287,27 +220,27 @@ def company_detail(wid, days: int = 30):
             },
         })
 
-    member_count = mongo.db.workspace_members.count_documents({'workspace_id': ws_id, 'status': 'active'})
+    stats = holding_views.company_stats(meta, [ws_id]).get(ws_id, {})
 
     return {
         'workspace': serialize_doc(workspace),
         'days': days,
-        'member_count': member_count,
+        'member_count': stats.get('member_count', 0),
         'project_count': len([p for p in projects if not p.get('archived')]),
         'projects': project_rows,
         'top_users': top_users,
         'top_models': top_models,
-        'by_role': by_role,
-        'daily': daily,
+        'by_role': _by_role({'workspace_id': ws_id}, days),
+        'daily': _daily_series({'workspace_id': ws_id}, days),
         'credits': credits_block,
         'recent_ledger': serialize_doc(recent_ledger),
+        'refreshed_at': holding_views.freshness(meta),
     }
 
 
 def users_overview(days: int = 30, page: int = 1, limit: int = 50,
                    search: str = '', role: str = '') -> dict:
     """Holding-wide per-user usage rollup. Raises ``ValueError`` for bad role."""
-    cutoff = datetime.utcnow() - timedelta(days=days)
     page = max(1, int(page))
     limit = max(1, min(200, int(limit)))
     skip = (page - 1) * limit
@@ -326,31 +259,20 @@ def users_overview(days: int = 30, page: int = 1, limit: int = 50,
             {'profile.display_name': {'$regex': esc, '$options': 'i'}},
         ]
 
+    meta = holding_views.load_meta()
     matched_user_ids = [u['_id'] for u in mongo.db.users.find(user_query, {'_id': 1})]
     if not matched_user_ids:
         return {
             'users': [], 'total': 0, 'page': page, 'limit': limit, 'days': days,
             'totals': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
+            'refreshed_at': holding_views.freshness(meta),
         }
 
-    usage_by_uid = {}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'user_id': {'$in': matched_user_ids}, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$user_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ]):
-        usage_by_uid[row['_id']] = row
-
-    ws_counts = {}
-    for row in mongo.db.workspace_members.aggregate([
-        {'$match': {'user_id': {'$in': matched_user_ids}, 'status': 'active'}},
-        {'$group': {'_id': '$user_id', 'count': {'$sum': 1}}},
-    ]):
-        ws_counts[row['_id']] = row['count']
+    usage_by_uid = {
+        row['_id']: row
+        for row in holding_views.usage({'user_id': {'$in': matched_user_ids}}, 'user_id', days)
+    }
+    ws_counts = holding_views.user_workspace_counts(meta, matched_user_ids)
 
     users_full = list(mongo.db.users.find(
         {'_id': {'$in': matched_user_ids}},
@@ -359,7 +281,6 @@ def users_overview(days: int = 30, page: int = 1, limit: int = 50,
 
     rows = []
     for u in users_full:
-        usage = usage_by_uid.get(u['_id'], {})
         rows.append({
             '_id': str(u['_id']),
             'email': u.get('email'),
@@ -369,9 +290,7 @@ def users_overview(days: int = 30, page: int = 1, limit: int = 50,
             'last_active': (u.get('usage') or {}).get('last_active'),
             'created_at': u.get('created_at'),
             'workspaces_count': ws_counts.get(u['_id'], 0),
-            'cost_usd': round(float(usage.get('cost_usd', 0) or 0), 4),
-            'tokens':   int(usage.get('tokens', 0) or 0),
-            'calls':    int(usage.get('calls', 0) or 0),
+            **_usage_block(usage_by_uid.get(u['_id'], {})),
         })
 
     rows.sort(key=lambda r: r['cost_usd'], reverse=True)
@@ -392,6 +311,7 @@ def users_overview(days: int = 30, page: int = 1, limit: int = 50,
         'limit': limit,
         'days': days,
         'totals': totals,
+        'refreshed_at': holding_views.freshness(meta),
     }
 
 
@@ -399,12 +319,8 @@ def holding_overview(days: int = 30) -> dict:
     """Holding-wide rollup: counts + per-window cost/calls/tokens, daily series, top companies/models, holding-credits."""
     from app.models.platform_settings import PlatformSettingsModel
 
-    cutoff = datetime.utcnow() - timedelta(days=days)
-
-    workspaces_count = mongo.db.workspaces.count_documents({})
-    projects_count = mongo.db.projects.count_documents({})
-    users_count = mongo.db.users.count_documents({})
-    conversations_count = mongo.db.conversations.count_documents({})
+    meta = holding_views.load_meta()
+    counts = holding_views.counts(meta)
 
     ceo = None
     ceo_doc = mongo.db.users.find_one(
@@ -418,54 +334,13 @@ def holding_overview(days: int = 30) -> dict:
             'display_name': (ceo_doc.get('profile') or {}).get('display_name'),
         }
 
-    totals_row = next(iter(mongo.db.usage_logs.aggregate([
-        {'$match': {'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': None,
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ])), None)
-    totals = {
-        'cost_usd': round(float((totals_row or {}).get('cost_usd', 0) or 0), 4),
-        'tokens':   int((totals_row or {}).get('tokens', 0) or 0),
-        'calls':    int((totals_row or {}).get('calls', 0) or 0),
-    }
-
-    daily_raw = {}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-    ]):
-        daily_raw[row['_id']] = row
-    daily = []
-    for i in range(days):
-        d = (datetime.utcnow() - timedelta(days=days - i - 1)).strftime('%Y-%m-%d')
-        r = daily_raw.get(d, {})
-        daily.append({
-            'date': d,
-            'cost_usd': round(float(r.get('cost_usd', 0) or 0), 4),
-            'tokens':   int(r.get('tokens', 0) or 0),
-            'calls':    int(r.get('calls', 0) or 0),
-        })
+    totals_rows = holding_views.usage({}, None, days)
+    totals = _usage_block(totals_rows[0] if totals_rows else {})
 
     top_companies = []
-    company_rollup = list(mongo.db.usage_logs.aggregate([
-        {'$match': {'workspace_id': {'$ne': None}, 'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$workspace_id',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 8},
-    ]))
+    company_rollup = holding_views.usage(
+        {'workspace_id': {'$ne': None}}, 'workspace_id', days, limit=8,
+    )
     if company_rollup:
         wids = [r['_id'] for r in company_rollup if r.get('_id')]
         ws_map = {w['_id']: w for w in mongo.db.workspaces.find(
@@ -481,60 +356,18 @@ def holding_overview(days: int = 30) -> dict:
                 'calls': int(r.get('calls', 0) or 0),
             })
 
-    top_models = []
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'created_at': {'$gte': cutoff}}},
-        {'$group': {
-            '_id': '$model',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'calls':    {'$sum': 1},
-        }},
-        {'$sort': {'cost_usd': -1}},
-        {'$limit': 8},
-    ]):
-        top_models.append({
+    top_models = [
+        {
             'model': row['_id'],
             'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
             'calls': int(row.get('calls', 0) or 0),
-        })
-
-    by_role_doc = {'admin': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
-                   'manager': {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0},
-                   'user':    {'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0}}
-    for row in mongo.db.usage_logs.aggregate([
-        {'$match': {'created_at': {'$gte': cutoff}}},
-        {'$lookup': {'from': 'users', 'localField': 'user_id', 'foreignField': '_id', 'as': 'u'}},
-        {'$unwind': {'path': '$u', 'preserveNullAndEmptyArrays': True}},
-        {'$group': {
-            '_id': {'role': '$u.role', 'user_id': '$user_id'},
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': {'$add': ['$prompt_tokens', '$completion_tokens']}},
-            'calls':    {'$sum': 1},
-        }},
-        {'$group': {
-            '_id': '$_id.role',
-            'cost_usd': {'$sum': '$cost_usd'},
-            'tokens':   {'$sum': '$tokens'},
-            'calls':    {'$sum': '$calls'},
-            'users':    {'$sum': 1},
-        }},
-    ]):
-        role = (row.get('_id') or 'user').lower()
-        if role not in by_role_doc:
-            role = 'user'
-        by_role_doc[role] = {
-            'cost_usd': round(float(row.get('cost_usd', 0) or 0), 4),
-            'tokens':   int(row.get('tokens', 0) or 0),
-            'calls':    int(row.get('calls', 0) or 0),
-            'users':    int(row.get('users', 0) or 0),
         }
+        for row in holding_views.usage({}, 'model', days, limit=8)
+    ]
 
     settings_doc = PlatformSettingsModel.get()
     holding_topups = float((settings_doc or {}).get('holding_credits_topups_usd') or 0)
-    holding_spend_rows = list(mongo.db.usage_logs.aggregate([
-        {'$group': {'_id': None, 'total': {'$sum': '$cost_usd'}}},
-    ]))
-    holding_lifetime_spend = float(holding_spend_rows[0]['total']) if holding_spend_rows else 0.0
+    holding_lifetime_spend = _lifetime_spend({})
     holding_credits = {
         'lifetime_topups_usd': round(holding_topups, 4),
         'lifetime_spend_usd':  round(holding_lifetime_spend, 4),
@@ -542,18 +375,19 @@ def holding_overview(days: int = 30) -> dict:
     }
 
     return {
-        'workspaces_count': workspaces_count,
-        'projects_count': projects_count,
-        'users_count': users_count,
-        'conversations_count': conversations_count,
+        'workspaces_count': counts.get('workspaces', 0),
+        'projects_count': counts.get('projects', 0),
+        'users_count': counts.get('users', 0),
+        'conversations_count': counts.get('conversations', 0),
         'ceo': ceo,
         'days': days,
         'totals': totals,
-        'daily': daily,
+        'daily': _daily_series({}, days),
         'top_companies': top_companies,
         'top_models': top_models,
-        'by_role': by_role_doc,
+        'by_role': _by_role({}, days),
         'holding_credits': holding_credits,
+        'refreshed_at': holding_views.freshness(meta),
     }
 
 
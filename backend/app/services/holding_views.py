@@ -0,0 +1,324 @@
+"""Materialised views behind the holding analytics panels.
+
+``holding_analytics`` used to run a dozen ``$group`` pipelines over raw
+``usage_logs``, ``conversations`` (with a ``$lookup`` to projects),
+``workspace_members`` and ``projects`` on every page view. Usage now comes
+from the ``usage_rollups`` day buckets (:func:`usage` goes through
+``UsageRollupModel.aggregate``, which keeps them exact and falls back to a
+raw scan until the rollups are built). :func:`refresh` folds the rest into
+small summary collections with ``$merge``:
+
+  holding_company_stats  one doc per workspace: member / project /
+                         conversation counts
+  holding_user_stats     one doc per user: active workspace memberships
+  holding_view_meta      ``_id='holding'``: refresh lease, ``refreshed_at``,
+                         ``high_water_mark``, ``full_refreshed_at`` and the
+                         holding-wide document counts
+
+The scheduler job (``scheduler.jobs.holding_views``) refreshes every few
+minutes; reads never refresh inline. A refresh is incremental: only the
+workspaces and users with membership / project / conversation rows written
+since the last run's ``high_water_mark`` (``updated_at``, or ``_id`` for rows
+without one) are recounted and merged. Hard deletes leave no such trace, so
+every ``_FULL_EVERY`` the views are rebuilt from scratch. :func:`load_meta` returns whatever was
+last built, and until the first build the count readers
+(:func:`company_stats`, :func:`user_workspace_counts`, :func:`counts`) compute
+the same figures live for just the ids asked for. Payloads carry
+``refreshed_at`` (``None`` before the first build).
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.extensions import mongo
+from app.models.usage_rollup import UsageRollupModel
+
+logger = logging.getLogger(__name__)
+
+COMPANY_STATS = 'holding_company_stats'
+USER_STATS = 'holding_user_stats'
+META = 'holding_view_meta'
+
+META_ID = 'holding'
+_LEASE = timedelta(minutes=15)
+_FULL_EVERY = timedelta(hours=6)
+# Rows stamped just before the previous run's mark may not have been visible
+# to it yet; rescan a little overlap.
+_SKEW = timedelta(minutes=1)
+_COUNTED = ('workspaces', 'projects', 'users', 'conversations')
+
+
+def create_indexes() -> None:
+    mongo.db[COMPANY_STATS].create_index('refreshed_at')
+    mongo.db[USER_STATS].create_index('refreshed_at')
+    # High-water-mark scans of the incremental refresh.
+    mongo.db.workspace_members.create_index('updated_at', sparse=True)
+    mongo.db.projects.create_index('updated_at')
+    mongo.db.conversations.create_index('updated_at')
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+def _acquire(now: datetime) -> Optional[dict]:
+    """Take the refresh lease. Returns the previous meta doc (``{}`` on first
+    run) or ``None`` while another refresh holds the lease."""
+    try:
+        meta = mongo.db[META].find_one_and_update(
+            {'_id': META_ID, '$or': [{'lease_until': None}, {'lease_until': {'$lt': now}}]},
+            {'$set': {'lease_until': now + _LEASE}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+    except DuplicateKeyError:
+        return None
+    return meta or {}
+
+
+def _company_pipeline(workspace_ids: Optional[list] = None) -> list:
+    def tagged(m=0, p=0, c=0) -> dict:
+        return {'m': {'$literal': m}, 'p': {'$literal': p}, 'c': {'$literal': c}}
+
+    def scoped(match: dict, field: str = 'workspace_id') -> dict:
+        if workspace_ids is not None:
+            match = {**match, field: {'$in': workspace_ids}}
+        return {'$match': match}
+
+    return [
+        scoped({'status': 'active'}),
+        {'$project': {'workspace_id': 1, **tagged(m=1)}},
+        {'$unionWith': {'coll': 'projects', 'pipeline': [
+            scoped({'archived': {'$ne': True}}),
+            {'$project': {'workspace_id': 1, **tagged(p=1)}},
+        ]}},
+        {'$unionWith': {'coll': 'conversations', 'pipeline': [
+            {'$match': {'project_id': {'$ne': None}}},
+            {'$lookup': {'from': 'projects', 'localField': 'project_id',
+                         'foreignField': '_id', 'as': 'p'}},
+            {'$unwind': '$p'},
+            {'$project': {'workspace_id': '$p.workspace_id', **tagged(c=1)}},
+            *([scoped({})] if workspace_ids is not None else []),
+        ]}},
+        {'$match': {'workspace_id': {'$ne': None}}},
+        {'$group': {
+            '_id': '$workspace_id',
+            'member_count': {'$sum': '$m'},
+            'project_count': {'$sum': '$p'},
+            'conversation_count': {'$sum': '$c'},
+        }},
+    ]
+
+
+def _user_pipeline(user_ids: Optional[list] = None) -> list:
+    match = {'status': 'active', 'user_id': {'$ne': None}}
+    if user_ids is not None:
+        match['user_id'] = {'$in': user_ids}
+    return [
+        {'$match': match},
+        {'$group': {'_id': '$user_id', 'workspaces_count': {'$sum': 1}}},
+    ]
+
+
+def _changed_since(since: datetime) -> dict:
+    """Filter for rows written since ``since``: stamped ``updated_at``, or
+    inserted (``_id`` time) when a collection doesn't stamp every write."""
+    return {'$or': [
+        {'updated_at': {'$gte': since}},
+        {'_id': {'$gte': ObjectId.from_datetime(since)}},
+    ]}
+
+
+def _dirty(since: datetime) -> tuple[list, list]:
+    """Workspace ids and user ids whose counts may have changed since
+    ``since``."""
+    changed = _changed_since(since)
+    members = mongo.db.workspace_members
+    workspace_ids = set(members.distinct('workspace_id', changed))
+    workspace_ids.update(mongo.db.projects.distinct('workspace_id', changed))
+    project_ids = mongo.db.conversations.distinct('project_id', {
+        'project_id': {'$ne': None}, 'updated_at': {'$gte': since},
+    })
+    if project_ids:
+        workspace_ids.update(mongo.db.projects.distinct(
+            'workspace_id', {'_id': {'$in': project_ids}},
+        ))
+    workspace_ids.discard(None)
+    user_ids = [u for u in members.distinct('user_id', changed) if u is not None]
+    return list(workspace_ids), user_ids
+
+
+def _merge_view(pipeline: list, into: str, now: datetime, keys: Optional[list]) -> None:
+    """``$merge`` a count pipeline into a view, then drop the rows it was
+    expected to rewrite but didn't (nothing left to count). ``keys=None``
+    rebuilds the whole view."""
+    list(mongo.db.workspace_members.aggregate(pipeline + [
+        {'$addFields': {'refreshed_at': now}},
+        {'$merge': {'into': into, 'on': '_id',
+                    'whenMatched': 'replace', 'whenNotMatched': 'insert'}},
+    ], allowDiskUse=True))
+    stale: dict = {'refreshed_at': {'$lt': now}}
+    if keys is not None:
+        stale['_id'] = {'$in': keys}
+    mongo.db[into].delete_many(stale)
+
+
+def _refresh_companies(now: datetime, workspace_ids: Optional[list] = None) -> None:
+    _merge_view(
+        _company_pipeline(workspace_ids) + [{'$addFields': {'workspace_id': '$_id'}}],
+        COMPANY_STATS, now, workspace_ids,
+    )
+
+
+def _refresh_users(now: datetime, user_ids: Optional[list] = None) -> None:
+    _merge_view(_user_pipeline(user_ids), USER_STATS, now, user_ids)
+
+
+def refresh(full: bool = False) -> Optional[dict]:
+    """Bring the count views up to date. Returns ``{'refreshed_at',
+    'full'}``, or ``None`` when another refresh holds the lease.
+
+    Incremental from the last run's high-water mark unless ``full`` is set,
+    the views were never built, or the last full rebuild is older than
+    ``_FULL_EVERY``.
+    """
+    now = datetime.utcnow()
+    # BSON datetimes are millisecond precision; the stale-doc sweeps compare
+    # against ``now``, so it has to survive the round trip unchanged.
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    meta = _acquire(now)
+    if meta is None:
+        return None
+
+    mark = meta.get('high_water_mark')
+    last_full = meta.get('full_refreshed_at')
+    full = full or not _built(meta) or not mark or not last_full \
+        or now - last_full >= _FULL_EVERY
+    try:
+        if full:
+            _refresh_companies(now)
+            _refresh_users(now)
+        else:
+            workspace_ids, user_ids = _dirty(mark - _SKEW)
+            if workspace_ids:
+                _refresh_companies(now, workspace_ids)
+            if user_ids:
+                _refresh_users(now, user_ids)
+        totals = {name: mongo.db[name].count_documents({}) for name in _COUNTED}
+    except Exception:
+        mongo.db[META].update_one({'_id': META_ID}, {'$unset': {'lease_until': ''}})
+        raise
+
+    done = {'refreshed_at': now, 'high_water_mark': now, 'counts': totals}
+    if full:
+        done['full_refreshed_at'] = now
+    mongo.db[META].update_one(
+        {'_id': META_ID},
+        {'$set': done, '$unset': {'lease_until': ''}},
+    )
+    logger.info('holding views refreshed (%s)', 'full' if full else 'incremental')
+    return {'refreshed_at': now, 'full': full}
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def load_meta() -> dict:
+    """The meta doc as last written by :func:`refresh` (``{}`` before the
+    first build). Never refreshes — that is the scheduler's job."""
+    return mongo.db[META].find_one({'_id': META_ID}) or {}
+
+
+def _built(meta: dict) -> bool:
+    return bool(meta.get('refreshed_at'))
+
+
+def freshness(meta: dict) -> Optional[str]:
+    refreshed_at = meta.get('refreshed_at')
+    return refreshed_at.isoformat() if refreshed_at else None
+
+
+def company_stats(meta: dict, workspace_ids: list) -> dict:
+    """``{workspace_id: {member_count, project_count, conversation_count}}``."""
+    if _built(meta):
+        rows = mongo.db[COMPANY_STATS].find({'_id': {'$in': workspace_ids}})
+    else:
+        rows = mongo.db.workspace_members.aggregate(_company_pipeline(workspace_ids))
+    return {row['_id']: row for row in rows}
+
+
+def user_workspace_counts(meta: dict, user_ids: list) -> dict:
+    """``{user_id: active workspace memberships}``."""
+    if _built(meta):
+        rows = mongo.db[USER_STATS].find({'_id': {'$in': user_ids}})
+    else:
+        rows = mongo.db.workspace_members.aggregate(_user_pipeline(user_ids))
+    return {row['_id']: row.get('workspaces_count', 0) for row in rows}
+
+
+def counts(meta: dict) -> dict:
+    """Holding-wide document counts (workspaces, projects, users, conversations)."""
+    if _built(meta):
+        return meta.get('counts') or {}
+    return {name: mongo.db[name].estimated_document_count() for name in _COUNTED}
+
+
+def window_start(days: int) -> datetime:
+    """Start (UTC midnight) of a ``days``-long window ending today (inclusive)."""
+    start = datetime.utcnow() - timedelta(days=max(1, days) - 1)
+    return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def usage(match: dict, group_by: Optional[str] = None, days: Optional[int] = None,
+          limit: Optional[int] = None) -> list:
+    """Sum cost_usd / tokens / calls over the usage rollups.
+
+    ``group_by`` is a rollup dimension (``workspace_id``, ``user_id``,
+    ``project_id``, ``model``), ``'day'`` (UTC date string) or ``None`` for
+    one total row. ``days=None`` covers all history. Rows come top spenders
+    first; ``limit`` keeps that many.
+    """
+    rows = UsageRollupModel.aggregate(
+        match, group_by=group_by,
+        start=window_start(days) if days is not None else None,
+    )
+    if limit:
+        rows = rows[:limit]
+    return [
+        {
+            '_id': row['_id'],
+            'cost_usd': row['total_cost'],
+            'tokens': row['total_tokens'],
+            'calls': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def usage_by_role(match: dict, days: int) -> list:
+    """Per user-role totals plus the number of distinct users in each."""
+    per_user = usage(match, 'user_id', days)
+    roles = {
+        u['_id']: u.get('role')
+        for u in mongo.db.users.find(
+            {'_id': {'$in': [row['_id'] for row in per_user if row['_id'] is not None]}},
+            {'role': 1},
+        )
+    }
+    by_role: dict = {}
+    for row in per_user:
+        role = roles.get(row['_id'])
+        acc = by_role.setdefault(role, {
+            '_id': role, 'cost_usd': 0.0, 'tokens': 0, 'calls': 0, 'users': 0,
+        })
+        acc['cost_usd'] += row['cost_usd']
+        acc['tokens'] += row['tokens']
+        acc['calls'] += row['calls']
+        acc['users'] += 1
+    return list(by_role.values())
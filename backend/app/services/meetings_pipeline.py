@@ -19,7 +19,7 @@ import logging
 import threading
 import traceback
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from app.models.meeting import MEETING_STATUS, MeetingModel
 from app.models.meeting_series import MeetingSeriesModel
@@ -28,7 +28,13 @@ from app.models.meeting_transcript import MeetingTranscriptModel
 from app.services import meeting_glossary
 from app.services import summary_service
 from app.services import transcription_service
-from app.services.dlp_gate import DLPBlockedError, gate as dlp_gate
+from app.services.dlp_gate import (
+    DLPBlockedError,
+    DLPGateItem,
+    gate as dlp_gate,
+    gate_chunks as dlp_gate_chunks,
+    gate_many as dlp_gate_many,
+)
 from app.services.summary_service import EMAIL_TONE_CASUAL, EMAIL_TONE_FORMAL
 
 logger = logging.getLogger(__name__)
@@ -49,9 +55,9 @@ _cancel_events: dict[str, threading.Event] = {}
 _cancel_lock = threading.Lock()
 
 
-# The 7 summary artifacts produced from a single LLM call. Each is scanned
-# independently so DLP event records carry per-artifact attribution — useful
-# when v2 attaches workspace_id and the events surface in the admin DLP view.
+# The 7 summary artifacts produced from a single LLM call. The prompt is
+# gated once per artifact; the event log folds the identical texts into one
+# row (see ``DLPEventModel.create_many``), and a block names the artifact.
 _SUMMARY_ARTIFACTS = (
     'exec_summary',
     'action_items',
@@ -479,46 +485,102 @@ def _scan_dlp(
     *,
     meeting_id: str,
     owner_id,
-    text: str,
+    workspace_id=None,
+    text: Optional[str] = None,
+    chunks: Optional[Iterable[str]] = None,
     phase: str,
     artifact: Optional[str] = None,
 ) -> None:
     """Run the DLP gate at a meetings-pipeline boundary.
 
-    Personal-scope v1 carries ``workspace_id=None`` → the gate short-circuits
-    server-side (see ``services/dlp_gate.py`` ``if not workspace_id: return``).
-    We still wire the call for v2 forward-compat: once workspace_id is
-    attached to meetings the same chokepoint will produce events without a
-    second code change.
+    Pass either ``text`` or ``chunks``; the latter is scanned incrementally
+    (``dlp_gate.gate_chunks``) so long transcripts are never re-joined.
+
+    ``workspace_id`` is the meeting's workspace (``_meeting_workspace_id``);
+    its DLP policy applies. Without one the gate short-circuits server-side
+    (see ``services/dlp_gate.py`` ``if not workspace_id: return``).
 
     On block / require_confirm the underlying ``DLPBlockedError`` is
     re-raised as ``_DLPBlocked`` so ``run_pipeline`` can record a friendly
     reason on the meeting and stop the run cleanly.
     """
-    if not text or not owner_id:
+    if (not text and chunks is None) or not owner_id:
         return
     source_ref: dict = {'meeting_id': meeting_id, 'phase': phase}
     if artifact is not None:
         source_ref['artifact'] = artifact
     try:
-        dlp_gate(
+        if chunks is not None:
+            dlp_gate_chunks(
+                chunks=chunks,
+                user_id=owner_id,
+                workspace_id=workspace_id,
+                project_id=None,
+                source='meeting',
+                source_ref=source_ref,
+            )
+        else:
+            dlp_gate(
+                text=text,
+                user_id=owner_id,
+                workspace_id=workspace_id,
+                project_id=None,
+                source='meeting',
+                source_ref=source_ref,
+            )
+    except DLPBlockedError as exc:
+        _raise_dlp_blocked(exc, artifact or phase)
+
+
+def _scan_dlp_artifacts(*, meeting_id: str, owner_id, workspace_id, text: str) -> None:
+    """DLP-gate the summarizer prompt once per summary artifact.
+
+    One LLM call produces all artifacts from the same input, so the batch
+    gate scans the text once; each artifact still gets its own event row.
+    A block names the first blocking artifact.
+    """
+    if not text or not owner_id:
+        return
+    items = [
+        DLPGateItem(
             text=text,
+            source_ref={'meeting_id': meeting_id, 'phase': 'summary_input',
+                        'artifact': artifact},
+        )
+        for artifact in _SUMMARY_ARTIFACTS
+    ]
+    try:
+        dlp_gate_many(
+            items,
             user_id=owner_id,
-            workspace_id=None,
+            workspace_id=workspace_id,
             project_id=None,
             source='meeting',
-            source_ref=source_ref,
         )
     except DLPBlockedError as exc:
-        # Block is non-overridable; require_confirm can't be confirmed from a
-        # background worker — both map to a hard stop here.
-        rule_names = ', '.join(
-            sorted({(m.get('rule_name') or m.get('rule_id') or '?') for m in exc.matches})
-        )
-        scope = artifact or phase
-        raise _DLPBlocked(
-            f"Blocked by Content Safety ({scope}): {rule_names or exc.code}"
-        ) from exc
+        scope = (exc.source_ref or {}).get('artifact') or 'summary_input'
+        _raise_dlp_blocked(exc, scope)
+
+
+def _meeting_workspace_id(meeting: dict):
+    """Workspace whose DLP policy governs ``meeting``, stamped at upload.
+
+    Meetings uploaded before the stamp have none and are not gated: the
+    owner's current workspace may not be the one the audio was uploaded
+    under, and its policy would misattribute the events.
+    """
+    return meeting.get('workspace_id')
+
+
+def _raise_dlp_blocked(exc: DLPBlockedError, scope: str) -> None:
+    # Block is non-overridable; require_confirm can't be confirmed from a
+    # background worker — both map to a hard stop here.
+    rule_names = ', '.join(
+        sorted({(m.get('rule_name') or m.get('rule_id') or '?') for m in exc.matches})
+    )
+    raise _DLPBlocked(
+        f"Blocked by Content Safety ({scope}): {rule_names or exc.code}"
+    ) from exc
 
 
 # ---------------------------------------------------------------------------
@@ -566,13 +628,13 @@ def run_pipeline(meeting_id: str) -> None:
         if not words:
             raise RuntimeError("transcript persisted but words_json is empty")
 
-        # DLP gate — scan the freshly-transcribed text. Personal-scope v1 is a
-        # no-op (workspace_id=None), but the call is wired for v2 forward-compat
-        # so transcripts surface in the admin DLP view once workspace_id lands.
+        # DLP gate — scan the freshly-transcribed text under the meeting's
+        # workspace policy.
         _scan_dlp(
             meeting_id=meeting_id,
             owner_id=meeting.get('owner_id'),
-            text=result.plain_text or '',
+            workspace_id=_meeting_workspace_id(meeting),
+            chunks=transcription_service.iter_text(result.words or []),
             phase='transcript',
         )
         _check_cancel(cancel_ev)
@@ -593,16 +655,11 @@ def run_pipeline(meeting_id: str) -> None:
 
         # DLP gate — the diarized prompt is the user-authored material going
         # outbound to the summarizer LLM. One LLM call produces all 7 artifacts
-        # from the same input, but we scan per-artifact so the DLP event log
-        # carries per-artifact attribution.
-        for artifact in _SUMMARY_ARTIFACTS:
-            _scan_dlp(
-                meeting_id=meeting_id,
-                owner_id=owner_id,
-                text=prompt,
-                phase='summary_input',
-                artifact=artifact,
-            )
+        # from the same input; the batch gate scans it once.
+        _scan_dlp_artifacts(
+            meeting_id=meeting_id, owner_id=owner_id,
+            workspace_id=_meeting_workspace_id(meeting), text=prompt,
+        )
         _check_cancel(cancel_ev)
 
         data = summary_service.summarize(
@@ -682,14 +739,10 @@ def regenerate_summary(meeting_id: str) -> str:
         # DLP gate — per-artifact scan over the diarized prompt. Mirrors
         # ``run_pipeline``; transcript scan is skipped because regeneration
         # never re-uploads or re-transcribes audio.
-        for artifact in _SUMMARY_ARTIFACTS:
-            _scan_dlp(
-                meeting_id=meeting_id,
-                owner_id=owner_id,
-                text=prompt,
-                phase='summary_input',
-                artifact=artifact,
-            )
+        _scan_dlp_artifacts(
+            meeting_id=meeting_id, owner_id=owner_id,
+            workspace_id=_meeting_workspace_id(meeting), text=prompt,
+        )
         _check_cancel(cancel_ev)
 
         data = summary_service.summarize(
@@ -347,6 +347,10 @@ class OpenRouterService:
         Returns:
             If stream=False: dict with response
             If stream=True: Generator yielding chunks
+
+        Calls attributed to a workspace / project whose monthly budget is
+        used up get a code-402 error (one error chunk when streaming) without
+        reaching OpenRouter.
         """
         # Deprecation check — best-effort, never raises.
         try:
@@ -359,6 +363,22 @@ class OpenRouterService:
         except Exception:
             pass
 
+        # Budget pre-flight — point reads on the month-to-date counters.
+        exceeded = OpenRouterService._budget_exceeded(workspace_id, project_id)
+        if exceeded:
+            error = {'error': {
+                'message': (
+                    f"{exceeded['scope'].capitalize()} monthly budget of "
+                    f"${exceeded['budget_usd']:.2f} reached "
+                    f"(${exceeded['spend_usd']:.2f} spent this month)"
+                ),
+                'code': 402,
+                'budget': exceeded,
+            }}
+            if stream:
+                return iter([error])
+            return error
+
         # Build messages list
         full_messages = []
 
@@ -396,6 +416,19 @@ class OpenRouterService:
                 workspace_id=workspace_id, project_id=project_id, origin=origin,
             )
 
+    @staticmethod
+    def _budget_exceeded(workspace_id, project_id) -> Optional[Dict]:
+        """Exhausted workspace / project budget, if any. Fails open: a counter
+        read error must not take chat down."""
+        if not workspace_id and not project_id:
+            return None
+        try:
+            from app.models.budget_counter import BudgetCounterModel
+            return BudgetCounterModel.check(workspace_id, project_id)
+        except Exception as e:
+            logger.warning('budget pre-flight failed: %s', e)
+            return None
+
     @staticmethod
     def _sync_completion(
         payload: Dict,
@@ -0,0 +1,217 @@
+"""
+Semantic search over a user's messages and knowledge items.
+
+Write paths call :func:`enqueue` (cheap: a queue put) and a daemon worker
+embeds the queued documents in batches and appends them to the user's
+vector shards (``app/models/vector_index.py``). Deletes drop vectors right
+away. Everything is off unless ``SEMANTIC_SEARCH_ENABLED`` is set; NumPy
+and the embedder are only imported once it is, so a deployment without
+semantic search pays nothing at import or write time.
+
+Branch copies of a message are not embedded — they repeat their original,
+and results are grouped by conversation anyway. Queue overflow and failed
+embedding calls are logged and dropped; ``scripts/backfill_semantic_index.py``
+rebuilds the index from scratch.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from bson import ObjectId
+from flask import current_app
+
+from app.extensions import mongo
+from app.utils import field_compression
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('message', 'knowledge')
+QUEUE_SIZE = 10000
+BATCH_SIZE = 64
+
+_queue: 'queue.Queue[tuple[str, ObjectId]]' = queue.Queue(maxsize=QUEUE_SIZE)
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def _app():
+    try:
+        return current_app._get_current_object()
+    except RuntimeError:
+        return None
+
+
+def enabled(app=None) -> bool:
+    app = app or _app()
+    return bool(app and app.config.get('SEMANTIC_SEARCH_ENABLED'))
+
+
+def enqueue(kind: str, doc_id) -> None:
+    """Queue a message / knowledge item for (re-)embedding. Never raises."""
+    app = _app()
+    if not enabled(app):
+        return
+    try:
+        _queue.put_nowait((kind, ObjectId(doc_id) if isinstance(doc_id, str) else doc_id))
+    except queue.Full:
+        logger.warning('semantic index queue full; dropped %s %s', kind, doc_id)
+        return
+    if app.config.get('SEMANTIC_INDEX_WORKER', True):
+        _ensure_worker(app)
+
+
+def _ensure_worker(app) -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=_run, args=(app,), name='semantic-index', daemon=True)
+        _worker.start()
+
+
+def _take_batch(block: bool) -> list:
+    batch = []
+    try:
+        batch.append(_queue.get(block=block))
+        while len(batch) < BATCH_SIZE:
+            batch.append(_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _run(app) -> None:
+    while True:
+        batch = _take_batch(block=True)
+        try:
+            with app.app_context():
+                index_batch(batch)
+        except Exception as exc:
+            logger.warning('semantic indexing failed for %d items: %s', len(batch), exc)
+
+
+def drain() -> int:
+    """Index everything queued, in the calling thread (scripts, tests)."""
+    done = 0
+    while True:
+        batch = _take_batch(block=False)
+        if not batch:
+            return done
+        index_batch(batch)
+        done += len(batch)
+
+
+def _documents(items: Iterable[tuple[str, ObjectId]]) -> list[dict]:
+    """``[{'id', 'kind', 'user_id', 'conversation_id', 'text'}]`` for the
+    queued ids that still exist and have text worth embedding."""
+    ids = defaultdict(set)
+    for kind, doc_id in items:
+        ids[kind].add(doc_id)
+    docs = []
+    if ids['message']:
+        messages = list(mongo.db['messages'].find(
+            {'_id': {'$in': list(ids['message'])}, 'is_error': {'$ne': True},
+             'copied_from': None},
+            {'conversation_id': 1, 'content': 1},
+        ))
+        owners = {
+            c['_id']: c.get('user_id') for c in mongo.db['conversations'].find(
+                {'_id': {'$in': list({m['conversation_id'] for m in messages})}}, {'user_id': 1},
+            )
+        }
+        for m in messages:
+            text = field_compression.decode(m.get('content')) or ''
+            if text.strip() and owners.get(m['conversation_id']):
+                docs.append({'id': m['_id'], 'kind': 'message', 'user_id': owners[m['conversation_id']],
+                             'conversation_id': m['conversation_id'], 'text': text})
+    if ids['knowledge']:
+        for item in mongo.db['knowledge_items'].find(
+                {'_id': {'$in': list(ids['knowledge'])}},
+                {'user_id': 1, 'title': 1, 'content': 1, 'notes': 1}):
+            text = '\n'.join(filter(None, (item.get('title'), item.get('content'), item.get('notes'))))
+            if text.strip():
+                docs.append({'id': item['_id'], 'kind': 'knowledge', 'user_id': item['user_id'],
+                             'conversation_id': None, 'text': text})
+    return docs
+
+
+def index_batch(items: list[tuple[str, ObjectId]]) -> int:
+    """Embed ``items`` and replace their vectors. Returns vectors written."""
+    from app.models.vector_index import VectorIndexModel
+    from app.services.embeddings import get_embedder
+
+    if not items:
+        return 0
+    VectorIndexModel.remove(doc_id for _, doc_id in items)
+    docs = _documents(items)
+    if not docs:
+        return 0
+    embedder = get_embedder()
+    vectors = embedder.embed([d['text'] for d in docs])
+    by_user = defaultdict(list)
+    for row, doc in enumerate(docs):
+        by_user[doc['user_id']].append(row)
+    written = 0
+    for user_id, rows in by_user.items():
+        written += VectorIndexModel.add(user_id, embedder.name, [docs[r] for r in rows], vectors[rows])
+    return written
+
+
+def remove(doc_ids: Iterable) -> None:
+    """Drop vectors for deleted messages / knowledge items. Never raises."""
+    if not enabled():
+        return
+    try:
+        from app.models.vector_index import VectorIndexModel
+        VectorIndexModel.remove(doc_ids)
+    except Exception as exc:
+        logger.warning('semantic index removal failed: %s', exc)
+
+
+def remove_conversations(conversation_ids: Iterable) -> None:
+    if not enabled():
+        return
+    try:
+        from app.models.vector_index import VectorIndexModel
+        VectorIndexModel.remove_conversations(conversation_ids)
+    except Exception as exc:
+        logger.warning('semantic index removal failed: %s', exc)
+
+
+def rebuild(batch_size: int = 256) -> int:
+    """Re-embed every message and knowledge item from scratch."""
+    from app.models.vector_index import VectorIndexModel
+
+    VectorIndexModel.clear()
+    written, batch = 0, []
+    sources = (
+        ('message', mongo.db['messages'].find(
+            {'is_error': {'$ne': True}, 'copied_from': None}, {'_id': 1}).sort('_id', 1)),
+        ('knowledge', mongo.db['knowledge_items'].find({}, {'_id': 1}).sort('_id', 1)),
+    )
+    for kind, cursor in sources:
+        for doc in cursor:
+            batch.append((kind, doc['_id']))
+            if len(batch) >= batch_size:
+                written += index_batch(batch)
+                batch = []
+    if batch:
+        written += index_batch(batch)
+    return written
+
+
+def search(user_id, text: str, limit: int = 20, kinds: Optional[set] = None) -> list[dict]:
+    """Best-first ``[{'id', 'kind', 'conversation_id', 'score'}]``."""
+    from app.models.vector_index import VectorIndexModel
+    from app.services.embeddings import get_embedder
+
+    embedder = get_embedder()
+    query = embedder.embed([text])[0]
+    return VectorIndexModel.search(
+        user_id, embedder.name, query, limit=limit, kinds=kinds,
+        ivf_threshold=int(current_app.config.get('SEMANTIC_IVF_THRESHOLD') or 0),
+    )
@@ -0,0 +1,202 @@
+"""
+Text analysis and ranking for the message search index.
+
+Pure functions only — storage lives in ``app/models/message_search.py``.
+
+Analysis is the same for indexed text and for queries, so whatever a query
+is typed with matches what was written:
+
+* Unicode NFKC (folds Arabic presentation forms), then lower-case.
+* Persian/Arabic unification: Arabic yeh / alef maksura -> Persian yeh,
+  Arabic kaf -> Persian kaf, teh marbuta / heh-with-yeh -> heh, hamza
+  carriers -> their bare letter, Persian and Arabic-Indic digits -> ASCII.
+* Harakat, superscript alef and tatweel are dropped, and a ZWNJ inside a
+  word joins its halves, so ``می‌خواهم`` and ``میخواهم`` are one term.
+* Latin words go through a light English suffix stemmer; Mongo ships no
+  Persian stemmer and neither do we — prefix queries cover inflections.
+
+Queries: bare words are ranked with BM25, ``"quoted phrases"`` must appear
+in order, ``word*`` matches any term starting with ``word``.
+"""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+_CHAR_MAP = str.maketrans({
+    'ي': 'ی',  # ARABIC YEH -> FARSI YEH
+    'ى': 'ی',  # ALEF MAKSURA
+    'ئ': 'ی',  # YEH WITH HAMZA ABOVE
+    'ك': 'ک',  # ARABIC KAF -> KEHEH
+    'ة': 'ه',  # TEH MARBUTA -> HEH
+    'ۀ': 'ه',  # HEH WITH YEH ABOVE
+    'أ': 'ا',  # ALEF WITH HAMZA ABOVE
+    'إ': 'ا',  # ALEF WITH HAMZA BELOW
+    'آ': 'ا',  # ALEF WITH MADDA ABOVE
+    'ٱ': 'ا',  # ALEF WASLA
+    'ؤ': 'و',  # WAW WITH HAMZA ABOVE
+    **{chr(0x06f0 + i): str(i) for i in range(10)},  # Persian digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+})
+# Harakat, superscript alef, tatweel and the zero-width joiners.
+_DROP_RE = re.compile('[\u064b-\u065f\u0670\u0640\u200c\u200d\u00ad]')
+# A word, with the marks that may sit inside one; offsets are taken on the
+# raw text so snippets can highlight what the user actually wrote.
+_WORD_RE = re.compile('[\\w\u064b-\u065f\u0670\u0640\u200c\u200d]+')
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+_VOWELS = set('aeiouy')
+
+# BM25 parameters (the usual defaults).
+K1 = 1.2
+B = 0.75
+MAX_TERM_LENGTH = 64
+
+
+def normalize(text: str) -> str:
+    """Case-fold and unify Persian/Arabic spelling variants."""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return _DROP_RE.sub('', text.translate(_CHAR_MAP))
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(c in _VOWELS for c in stem)
+
+
+def stem(term: str) -> str:
+    """Light English suffix stripping (plurals, -ed/-ing, a few derivational
+    endings). Non-Latin and short terms are returned unchanged."""
+    if len(term) <= 3 or not term.isascii() or not term.isalpha():
+        return term
+    if term.endswith('sses'):
+        term = term[:-2]
+    elif term.endswith('ies') and len(term) > 4:
+        term = term[:-3] + 'y'
+    elif term.endswith('s') and not term.endswith(('ss', 'us', 'is')):
+        term = term[:-1]
+
+    for suffix in ('ing', 'ed'):
+        if term.endswith(suffix) and _has_vowel(term[:-len(suffix)]) and len(term) - len(suffix) >= 3:
+            term = term[:-len(suffix)]
+            if len(term) > 3 and term[-1] == term[-2] and term[-1] not in 'lsz':
+                term = term[:-1]
+            elif term.endswith(('at', 'bl', 'iz')):
+                term += 'e'
+            break
+
+    for suffix, replacement, keep in (('ational', 'ate', 3), ('ization', 'ize', 3),
+                                      ('fulness', 'ful', 3), ('iveness', 'ive', 3),
+                                      ('ness', '', 3), ('ly', '', 4)):
+        if term.endswith(suffix) and len(term) - len(suffix) >= keep:
+            return term[:-len(suffix)] + replacement
+    return term
+
+
+def analyze(text: str) -> list[tuple[str, int, int]]:
+    """``[(term, start, end), ...]`` for every word in ``text``; ``start`` /
+    ``end`` are offsets into ``text`` itself."""
+    tokens = []
+    for match in _WORD_RE.finditer(text or ''):
+        word = normalize(match.group())
+        if not word or len(word) > MAX_TERM_LENGTH:
+            continue
+        tokens.append((stem(word), match.start(), match.end()))
+    return tokens
+
+
+def terms(text: str) -> list[str]:
+    return [term for term, _, _ in analyze(text)]
+
+
+@dataclass
+class Query:
+    terms: list[str] = field(default_factory=list)
+    prefixes: list[str] = field(default_factory=list)
+    phrases: list[list[str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.prefixes or self.phrases)
+
+
+def parse_query(raw: str) -> Query:
+    """Split a search box string into terms, ``prefix*`` and ``"phrases"``."""
+    query = Query()
+    for phrase in _PHRASE_RE.findall(raw or ''):
+        words = terms(phrase)
+        if len(words) > 1:
+            query.phrases.append(words)
+        elif words:
+            query.terms.extend(words)
+    rest = _PHRASE_RE.sub(' ', raw or '')
+    for chunk in rest.split():
+        if chunk.endswith('*'):
+            # Prefixes are matched unstemmed: "configur*" must not become
+            # "configur" -> something shorter.
+            prefix = normalize(chunk.rstrip('*'))
+            prefix = ''.join(_WORD_RE.findall(prefix))
+            if prefix:
+                query.prefixes.append(prefix)
+            continue
+        query.terms.extend(terms(chunk))
+    query.terms = list(dict.fromkeys(query.terms))
+    return query
+
+
+def idf(doc_count: int, doc_freq: int) -> float:
+    """BM25 idf, floored at a small positive value so very common terms
+    still count a little."""
+    return max(math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5)), 0.01)
+
+
+def bm25(tf: int, doc_len: int, avg_len: float, term_idf: float) -> float:
+    norm = K1 * (1 - B + B * doc_len / avg_len) if avg_len else K1
+    return term_idf * tf * (K1 + 1) / (tf + norm)
+
+
+def has_phrase(positions: list[list[int]]) -> bool:
+    """Whether some position ``p`` has word ``i`` of the phrase at ``p + i``
+    for every ``i``; ``positions[i]`` lists where word ``i`` occurs."""
+    if not positions or any(not p for p in positions):
+        return False
+    rest = [set(p) for p in positions[1:]]
+    return any(all(start + i + 1 in later for i, later in enumerate(rest)) for start in positions[0])
+
+
+def snippet(text: str, query: Query, width: int = 160) -> dict:
+    """A window of ``text`` around the densest run of matches.
+
+    Returns ``{'text', 'highlights'}`` where ``highlights`` are
+    ``[start, end]`` offsets into the snippet text; the client wraps them,
+    so no markup is ever built from message content here.
+    """
+    text = text or ''
+    wanted = set(query.terms) | {w for phrase in query.phrases for w in phrase}
+    hits = [
+        (start, end) for term, start, end in analyze(text)
+        if term in wanted or any(term.startswith(p) or normalize(text[start:end]).startswith(p)
+                                 for p in query.prefixes)
+    ]
+    if len(text) <= width:
+        return {'text': text, 'highlights': [[s, e] for s, e in hits]}
+    if not hits:
+        return {'text': text[:width].rstrip() + '…', 'highlights': []}
+
+    # Slide over the hits and keep the window that covers the most.
+    best_start, best_count = hits[0][0], 0
+    for i, (start, _) in enumerate(hits):
+        count = sum(1 for s, e in hits[i:] if e <= start + width)
+        if count > best_count:
+            best_start, best_count = start, count
+    begin = max(0, min(best_start - width // 4, len(text) - width))
+    # Don't cut a word in half at the left edge.
+    while 0 < begin < best_start and not text[begin - 1].isspace():
+        begin += 1
+    end = min(len(text), begin + width)
+    prefix = '…' if begin > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    shift = len(prefix) - begin
+    return {
+        'text': prefix + text[begin:end] + suffix,
+        'highlights': [[s + shift, e + shift] for s, e in hits if s >= begin and e <= end],
+    }
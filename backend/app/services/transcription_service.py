@@ -12,7 +12,7 @@ import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from flask import current_app
 
@@ -31,6 +31,13 @@ class TranscriptionResult:
     language_code: str
 
 
+def iter_text(words: list[dict]) -> Iterator[str]:
+    """Yield the text pieces that make up ``TranscriptionResult.plain_text``."""
+    for word in words:
+        if word.get('type') in _WORD_TYPES_FOR_TEXT:
+            yield word.get('text', '') or ''
+
+
 def _resolve_api_key() -> str:
     """Pick the key from Flask config first (test/runtime override), then env."""
     try:
@@ -20,7 +20,7 @@ from app.models.generated_video import GeneratedVideoModel
 from app.models.user import UserModel
 from app.models.knowledge_item import KnowledgeItemModel
 from app.services.openrouter_service import OpenRouterService
-from app.services.dlp_gate import gate as dlp_gate
+from app.services.dlp_gate import DLPGateItem, gate_many as dlp_gate_many
 
 _BRAND_BRIEF_CHAR_LIMIT = 8000
 
@@ -802,6 +802,7 @@ class WorkflowService:
                 or 'en'
             )[:2].lower()
 
+        items: list[DLPGateItem] = []
         for n in nodes:
             n_type = n.get('type')
             n_data = n.get('data', {}) or {}
@@ -830,21 +831,14 @@ class WorkflowService:
                 _scan_text = n_data.get(field) or ''
                 if not _scan_text:
                     continue
-                dlp_gate(
+                items.append(DLPGateItem(
                     text=_scan_text,
-                    user_id=user_id,
-                    workspace_id=workflow_workspace_id,
-                    project_id=workflow_project_id,
-                    source='workflow',
                     source_ref={
                         'workflow_id': workflow_id,
                         'node_id': n.get('id'),
                         'field': field,
                     },
-                    confirmed=dlp_confirmed,
-                    dlp_confirm_token=dlp_confirm_token,
-                    user_lang=user_lang,
-                )
+                ))
 
             # P0.6 — brand-brief from knowledge folder is concatenated into
             # the aiAgent system prompt later in execute_node(). Scan it here
@@ -888,33 +882,40 @@ class WorkflowService:
                             brief_text = '\n\n'.join(brief_parts)
                             if len(brief_text) > _BRAND_BRIEF_CHAR_LIMIT:
                                 brief_text = brief_text[:_BRAND_BRIEF_CHAR_LIMIT]
-                            dlp_gate(
+                            items.append(DLPGateItem(
                                 text=brief_text,
-                                user_id=user_id,
-                                workspace_id=workflow_workspace_id,
-                                project_id=workflow_project_id,
-                                source='workflow',
                                 source_ref={
                                     'workflow_id': workflow_id,
                                     'node_id': n.get('id'),
                                     'knowledge_folder_id': str(kf_id),
                                     'kind': 'brand_brief',
                                 },
-                                confirmed=dlp_confirmed,
-                                dlp_confirm_token=dlp_confirm_token,
-                                user_lang=user_lang,
-                            )
+                            ))
                     except Exception as scan_err:
-                        # Don't fail open silently — if the scan itself crashes
-                        # (e.g. Mongo blip) we log and let the request continue;
-                        # the static-text scan above already covered the user
-                        # prompt template. Operators see this via standard logs.
+                        # Don't fail open silently — if loading the brief
+                        # crashes (e.g. Mongo blip) we log and let the request
+                        # continue; the static-text scan already covers the
+                        # user prompt template. Operators see this via
+                        # standard logs.
                         import logging as _log
                         _log.getLogger(__name__).warning(
                             'brand-brief DLP pre-scan failed (workflow=%s node=%s folder=%s): %s',
                             workflow_id, n.get('id'), kf_id, scan_err,
                         )
 
+        # One batch for the whole workflow: identical texts scanned once,
+        # smart-scan calls overlapped, events written in one insert_many.
+        dlp_gate_many(
+            items,
+            user_id=user_id,
+            workspace_id=workflow_workspace_id,
+            project_id=workflow_project_id,
+            source='workflow',
+            confirmed=dlp_confirmed,
+            dlp_confirm_token=dlp_confirm_token,
+            user_lang=user_lang,
+        )
+
     @classmethod
     def execute_workflow(cls, workflow_id, user_id, execution_mode='full', start_node_id=None, dlp_confirmed=False, dlp_confirm_token=None):
         """
@@ -1312,11 +1313,12 @@ class WorkflowService:
                 raise ValueError("Unauthorized access to workflow")
             # Bypass WorkflowRunModel.get_by_workflow (which user_id-filters)
             # so editors who didn't create the workflow still see runs.
-            runs = list(
+            runs = [
+                WorkflowRunModel.inflate(run) for run in
                 WorkflowRunModel._get_collection().find(
                     {'workflow_id': ObjectId(workflow_id)}
                 ).sort('started_at', -1)
-            )
+            ]
             return runs
 
         # Personal workflow: creator-only (legacy semantics).
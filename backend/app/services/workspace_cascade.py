@@ -32,6 +32,8 @@ from bson import ObjectId
 from pymongo.errors import OperationFailure
 
 from app.extensions import mongo
+from app.models.message_search import MessageSearchModel
+from app.services import semantic_search
 
 _logger = logging.getLogger(__name__)
 
@@ -43,8 +45,12 @@ _WORKSPACE_SCOPED = [
     'knowledge_folders',
     'llm_configs',
     'dlp_events',
+    'dlp_stats_daily',
     'credit_ledger',
     'usage_logs',
+    'usage_rollups',
+    'budget_counters',
+    'holding_company_stats',
     'project_group_access',
     'group_members',
     'groups',
@@ -132,6 +138,12 @@ def cascade_delete(workspace_id) -> dict:
             if res.deleted_count:
                 counts[coll] = counts.get(coll, 0) + res.deleted_count
 
+        # Archived usage rows live inside shared columnar chunks.
+        from app.models.usage_archive import UsageArchiveModel
+        removed = UsageArchiveModel.purge_workspace(wid_obj, session=session)
+        if removed:
+            counts['usage_logs_archive'] = removed
+
         if project_oids:
             for coll in _PROJECT_SCOPED:
                 res = mongo.db[coll].delete_many(
@@ -155,6 +167,10 @@ def cascade_delete(workspace_id) -> dict:
     try:
         with mongo.cx.start_session() as session:
             session.with_transaction(lambda s: _run(session=s))
+            # The message search index is derived data; drop it once the
+            # messages are gone for good.
+            MessageSearchModel.remove_conversations(conv_oids)
+            semantic_search.remove_conversations(conv_oids)
             return counts
     except OperationFailure as exc:
         _logger.warning(
@@ -169,4 +185,6 @@ def cascade_delete(workspace_id) -> dict:
     # Non-atomic fallback.
     counts.clear()
     _run(session=None)
+    MessageSearchModel.remove_conversations(conv_oids)
+    semantic_search.remove_conversations(conv_oids)
     return counts
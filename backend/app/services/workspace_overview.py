@@ -0,0 +1,191 @@
+"""
+Workspace overview payload — concurrent fan-out plus a short-TTL cache.
+
+``GET /api/workspaces/<wid>/overview`` needs eight independent reads (spend,
+seats, top projects, audit trail, groups, daily usage, message count, project
+count). Run one after another they add up to the sum of their latencies;
+:func:`get` fans them out on a small bounded pool so the page costs roughly the
+slowest one, then caches the assembled payload per workspace for
+``_TTL_SECONDS``.
+
+The payload holds nothing caller-specific, so every member of a workspace
+shares one cache entry and one ETag. Membership and billing mutators call
+:func:`invalidate` so seat counts and balances never lag behind an edit made
+in the same process; other drift (new usage rows, audit entries) is bounded
+by the TTL.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable
+
+from bson import ObjectId
+
+from app.models.audit_log import AuditLogModel
+from app.models.group import GroupModel
+from app.models.project import ProjectModel
+from app.models.usage_log import UsageLogModel
+from app.models.workspace_member import WorkspaceMemberModel
+from app.utils.helpers import serialize_doc
+
+# Eight reads per overview; a second concurrent overview shares the pool
+# rather than doubling the load on Mongo.
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ws-overview')
+_TTL_SECONDS = 30
+_CACHE_MAX = 500
+
+# wid -> (expires_at, etag, payload)
+_CACHE: "OrderedDict[str, tuple[float, str, dict]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+# Bumped by every invalidation so a build that raced one is not cached.
+_generation = 0
+
+
+def invalidate(workspace_id: Any = None) -> None:
+    """Drop one workspace's cached overview, or all of them when id is None."""
+    global _generation
+    with _CACHE_LOCK:
+        _generation += 1
+        if workspace_id is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(str(workspace_id), None)
+
+
+def _month_start_utc() -> datetime:
+    now = datetime.utcnow()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _etag(payload: dict) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()[:20]
+
+
+def _top_projects(wid: str, month_start: datetime) -> list:
+    project_rows = UsageLogModel.aggregate_project_spend(wid, start=month_start)[:5]
+    pid_objs = [ObjectId(r['project_id']) for r in project_rows if r.get('project_id')]
+    project_map = {}
+    if pid_objs:
+        for p in ProjectModel.get_collection().find({'_id': {'$in': pid_objs}}):
+            project_map[str(p['_id'])] = p
+    top_projects = []
+    for r in project_rows:
+        pid = r.get('project_id')
+        proj = project_map.get(pid) if pid else None
+        if not proj:
+            continue
+        top_projects.append({
+            'project_id': pid,
+            'name': proj.get('name'),
+            'color': proj.get('color'),
+            'pinned': bool(proj.get('pinned')),
+            'total_cost': r.get('total_cost', 0),
+            'message_count': r.get('count', 0),
+        })
+    return top_projects
+
+
+def _recent_activity(wid_obj: ObjectId) -> list:
+    cursor = AuditLogModel.get_collection().find({
+        '$or': [
+            {'details.workspace_id': str(wid_obj)},
+            {'details.workspace_id': wid_obj},
+            {'target_id': wid_obj, 'target_type': 'workspace'},
+        ]
+    }).sort('created_at', -1).limit(5)
+    return [serialize_doc(a) for a in cursor]
+
+
+def _queries(wid: str) -> dict[str, Callable[[], Any]]:
+    wid_obj = ObjectId(wid)
+    month_start = _month_start_utc()
+    return {
+        'spend_mtd': lambda: UsageLogModel.aggregate_workspace_spend(wid, start=month_start),
+        'seats_used': lambda: WorkspaceMemberModel.get_collection().count_documents({
+            'workspace_id': wid_obj, 'status': 'active',
+        }),
+        'top_projects': lambda: _top_projects(wid, month_start),
+        'recent_activity': lambda: _recent_activity(wid_obj),
+        'groups': lambda: [serialize_doc(g) for g in GroupModel.find_by_workspace(wid)[:5]],
+        'usage_30d': lambda: UsageLogModel.aggregate_daily(wid, days=30),
+        'messages_mtd': lambda: UsageLogModel.total_messages_this_month(wid),
+        'active_projects': lambda: ProjectModel.count_by_workspace(wid, archived=False),
+    }
+
+
+def _run_concurrently(queries: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    from flask import current_app, has_app_context
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def _in_context(fn):
+        if app is None:
+            return fn()
+        with app.app_context():
+            return fn()
+
+    futures = {name: _POOL.submit(_in_context, fn) for name, fn in queries.items()}
+    # .result() re-raises the first failure in the request thread, so a
+    # broken query still surfaces as a 500 rather than a partial payload.
+    return {name: future.result() for name, future in futures.items()}
+
+
+def build(wid: str, ws: dict) -> dict:
+    """Assemble the overview payload for ``ws`` (uncached)."""
+    results = _run_concurrently(_queries(wid))
+    renews_at = ws.get('renews_at')
+    billing = {
+        'plan_tier': ws.get('plan_tier') or ws.get('plan') or 'free',
+        'credits_balance_usd': float(ws.get('credits_balance_usd') or 0),
+        'spend_mtd_usd': float(results['spend_mtd'] or 0),
+        'seats_used': results['seats_used'],
+        'seats_total': int(ws.get('seats_total') or 0),
+        'budget_mtd_usd': float(ws.get('budget_mtd_usd') or 0),
+        'renews_at': renews_at.isoformat() if isinstance(renews_at, datetime) else renews_at,
+        'sso_enforced': bool(ws.get('sso_enforced')),
+        'scim_enabled': bool(ws.get('scim_enabled')),
+        'domain': ws.get('domain'),
+    }
+    return {
+        'workspace': serialize_doc(ws),
+        'billing': billing,
+        'top_projects': results['top_projects'],
+        'recent_activity': results['recent_activity'],
+        'groups': results['groups'],
+        'usage_30d': results['usage_30d'],
+        'stats': {
+            'messages_mtd': results['messages_mtd'],
+            'active_projects': results['active_projects'],
+            'members_active': results['seats_used'],
+        },
+    }
+
+
+def get(wid: str, ws: dict) -> tuple[dict, str]:
+    """Return ``(payload, etag)`` for the workspace, from cache when fresh."""
+    key = str(wid)
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None and entry[0] > now:
+            _CACHE.move_to_end(key)
+            return entry[2], entry[1]
+        generation = _generation
+
+    payload = build(key, ws)
+    etag = _etag(payload)
+    with _CACHE_LOCK:
+        if generation != _generation:
+            return payload, etag
+        _CACHE.pop(key, None)
+        while len(_CACHE) >= _CACHE_MAX:
+            _CACHE.popitem(last=False)
+        _CACHE[key] = (now + _TTL_SECONDS, etag, payload)
+    return payload, etag
@@ -0,0 +1,40 @@
+"""
+Streamed file downloads shared by the export endpoints.
+
+An export body is a generator. :func:`attachment` wraps it in a response
+that keeps the request context alive while it runs, is never stored by a
+cache and is passed through nginx unbuffered, so the first chunk reaches the
+client as soon as it is written.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from flask import Response, stream_with_context
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """ISO date from a ``from``/``to`` query parameter; ``None`` when it is
+    empty. Raises ``ValueError`` on anything else."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'invalid date: {value}')
+
+
+def attachment(body: Iterable, filename: str, mimetype: str,
+               headers: Optional[dict] = None) -> Response:
+    """Streaming response that downloads ``body`` as ``filename``."""
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',
+            **(headers or {}),
+        },
+    )
@@ -0,0 +1,262 @@
+"""
+Transparent compression of large document fields.
+
+With ``FIELD_COMPRESSION`` on, :func:`pack` replaces every listed field whose
+UTF-8 (or, for dicts and lists, JSON) encoding is at least
+``FIELD_COMPRESSION_MIN_BYTES`` with a zlib-compressed :class:`bson.Binary`
+and flags it in a ``compressed`` map next to it::
+
+    {'content': Binary(b'x\\x9c...', 0x80), 'compressed': {'content': 'zlib'},
+     'search_terms': 'distinct words of the content'}
+
+Fields are dotted paths (``node_results.2.text``); the flag sits beside the
+field (``node_results.2.compressed.text``). Readers call :func:`inflate`,
+which decodes only the paths the query actually fetched. Packed values are
+recognised by their Binary subtype, so a projection that leaves the flag out
+still decodes; the flag is for queries (the backfill, and finding rows to
+convert back when the feature is turned off).
+
+A compressed string is invisible to a Mongo text index. Models with one pass
+``search_field``: a packed row then carries the field's distinct words there,
+uncompressed, and the text index covers both fields.
+"""
+from __future__ import annotations
+
+import re
+import time
+import zlib
+from typing import Callable, Iterable, Optional
+
+from bson import Binary, json_util
+from flask import current_app
+
+CODEC = 'zlib'
+FLAG = 'compressed'
+# Binary subtypes (user-defined range) of packed values.
+TEXT_SUBTYPE = 0x80
+JSON_SUBTYPE = 0x81
+
+_WORD = re.compile(r'\w+')
+
+
+def enabled() -> bool:
+    return bool(current_app.config.get('FIELD_COMPRESSION', False))
+
+
+def _settings() -> tuple[int, int]:
+    config = current_app.config
+    return (int(config.get('FIELD_COMPRESSION_MIN_BYTES') or 0),
+            int(config.get('FIELD_COMPRESSION_LEVEL') or 6))
+
+
+def encode(value, min_bytes: int = 0, level: int = 6) -> Optional[Binary]:
+    """Packed form of ``value``, or ``None`` when it is not text/JSON, is
+    shorter than ``min_bytes`` or doesn't shrink."""
+    if isinstance(value, str):
+        raw, subtype = value.encode('utf-8'), TEXT_SUBTYPE
+    elif isinstance(value, (dict, list)):
+        raw, subtype = json_util.dumps(value).encode('utf-8'), JSON_SUBTYPE
+    else:
+        return None
+    if len(raw) < min_bytes:
+        return None
+    packed = zlib.compress(raw, level)
+    if len(packed) >= len(raw):
+        return None
+    return Binary(packed, subtype)
+
+
+def is_packed(value) -> bool:
+    return isinstance(value, Binary) and value.subtype in (TEXT_SUBTYPE, JSON_SUBTYPE)
+
+
+def decode(value):
+    """``value`` unpacked; anything that isn't a packed value is returned
+    as is."""
+    if not is_packed(value):
+        return value
+    raw = zlib.decompress(value)
+    if value.subtype == TEXT_SUBTYPE:
+        return raw.decode('utf-8')
+    return json_util.loads(raw)
+
+
+def search_terms(text: str) -> str:
+    """Distinct words of ``text`` in first-seen order — what a text index
+    needs from it."""
+    return ' '.join(dict.fromkeys(word.casefold() for word in _WORD.findall(text)))
+
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+
+def _split(path: str) -> tuple[str, str]:
+    parent, _, leaf = path.rpartition('.')
+    return parent, leaf
+
+
+def _flag_path(path: str) -> str:
+    parent, leaf = _split(path)
+    return f'{parent}.{FLAG}.{leaf}' if parent else f'{FLAG}.{leaf}'
+
+
+def _holder(doc, parent: str):
+    """The dict that holds the leaf of a path under ``parent``, or None."""
+    node = doc
+    for part in parent.split('.') if parent else ():
+        if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        elif isinstance(node, dict):
+            node = node.get(part)
+        else:
+            return None
+    return node if isinstance(node, dict) else None
+
+
+# ---------------------------------------------------------------------------
+# Documents and updates
+# ---------------------------------------------------------------------------
+
+def pack(doc: dict, paths: Iterable[str], search_field: Optional[str] = None) -> dict:
+    """Compress ``doc``'s large ``paths`` in place (a no-op while the
+    feature is off) and return it."""
+    if not enabled():
+        return doc
+    min_bytes, level = _settings()
+    for path in paths:
+        parent, leaf = _split(path)
+        holder = _holder(doc, parent)
+        if holder is None or leaf not in holder:
+            continue
+        value = holder[leaf]
+        packed = encode(value, min_bytes, level)
+        if packed is None:
+            continue
+        holder[leaf] = packed
+        holder.setdefault(FLAG, {})[leaf] = CODEC
+        if search_field and isinstance(value, str):
+            doc[search_field] = search_terms(value)
+    return doc
+
+
+def inflate(doc: Optional[dict], paths: Iterable[str],
+            search_field: Optional[str] = None) -> Optional[dict]:
+    """Decode ``doc``'s packed ``paths`` in place and drop the bookkeeping
+    fields. Paths the query didn't fetch are skipped."""
+    if not doc:
+        return doc
+    for path in paths:
+        parent, leaf = _split(path)
+        holder = _holder(doc, parent)
+        if holder is None:
+            continue
+        if leaf in holder:
+            holder[leaf] = decode(holder[leaf])
+        flags = holder.get(FLAG)
+        if isinstance(flags, dict):
+            flags.pop(leaf, None)
+            if not flags:
+                del holder[FLAG]
+    if search_field:
+        doc.pop(search_field, None)
+    return doc
+
+
+def pack_update(update: dict, paths: Iterable[str], search_field: Optional[str] = None) -> dict:
+    """Rewrite an update document in place so each ``$set`` of one of
+    ``paths`` stores (and flags) the packed form when it qualifies, and
+    clears a stale flag when it doesn't. Returns ``update``."""
+    sets = update.get('$set')
+    if not sets:
+        return update
+    on = enabled()
+    min_bytes, level = _settings() if on else (0, 6)
+    extra, unset = {}, {}
+    for path in paths:
+        if path not in sets:
+            continue
+        value = sets[path]
+        packed = encode(value, min_bytes, level) if on else None
+        if packed is None:
+            unset[_flag_path(path)] = ''
+            if search_field:
+                unset[search_field] = ''
+            continue
+        sets[path] = packed
+        extra[_flag_path(path)] = CODEC
+        if search_field and isinstance(value, str):
+            extra[search_field] = search_terms(value)
+    sets.update(extra)
+    if unset:
+        update['$unset'] = {**update.get('$unset', {}), **unset}
+    return update
+
+
+def repack(doc: dict, paths: Iterable[str], search_field: Optional[str] = None,
+           compress: bool = True, min_bytes: int = 0, level: int = 6) -> Optional[dict]:
+    """Update that converts a stored ``doc`` to the packed (``compress``)
+    or plain form, or ``None`` when it already is. Ignores the feature
+    switch — it is for the backfill."""
+    sets, unset = {}, {}
+    for path in paths:
+        parent, leaf = _split(path)
+        holder = _holder(doc, parent)
+        if holder is None or leaf not in holder:
+            continue
+        value = holder[leaf]
+        if compress and not is_packed(value):
+            packed = encode(value, min_bytes, level)
+            if packed is None:
+                continue
+            sets[path], sets[_flag_path(path)] = packed, CODEC
+            if search_field and isinstance(value, str):
+                sets[search_field] = search_terms(value)
+        elif not compress and is_packed(value):
+            sets[path] = decode(value)
+            unset[_flag_path(path)] = ''
+            if search_field:
+                unset[search_field] = ''
+    update = {}
+    if sets:
+        update['$set'] = sets
+    if unset:
+        update['$unset'] = unset
+    return update or None
+
+
+def convert(collection, paths: Callable[[dict], list], search_field: Optional[str] = None,
+            compress: bool = True, batch_size: int = 200, max_batches: Optional[int] = None,
+            pause: float = 0.0, after=None, log: Callable[[str], None] = lambda _: None) -> dict:
+    """Walk ``collection`` in ``_id`` order from ``after`` and :func:`repack`
+    every row; ``paths(doc)`` names a row's fields. Safe to re-run: rows
+    already in the target form are skipped."""
+    min_bytes, level = _settings()
+    stats = {'scanned': 0, 'converted': 0, 'last_id': after}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        query = {'_id': {'$gt': stats['last_id']}} if stats['last_id'] is not None else {}
+        docs = list(collection.find(query).sort('_id', 1).limit(batch_size))
+        if not docs:
+            break
+        for doc in docs:
+            fields = paths(doc)
+            update = repack(doc, fields, search_field, compress, min_bytes, level)
+            if not update:
+                continue
+            # Only if the row still holds what was read: a write since then
+            # wins, and the next run picks the row up again.
+            guard = {'_id': doc['_id']}
+            for path in fields:
+                if path in update['$set']:
+                    parent, leaf = _split(path)
+                    guard[path] = _holder(doc, parent)[leaf]
+            stats['converted'] += collection.update_one(guard, update).modified_count
+        stats['scanned'] += len(docs)
+        stats['last_id'] = docs[-1]['_id']
+        batches += 1
+        log(f"batch {batches}: scanned {stats['scanned']}, converted {stats['converted']}, "
+            f"last _id {stats['last_id']}")
+        if pause:
+            time.sleep(pause)
+    return stats
@@ -0,0 +1,140 @@
+"""
+Conditional GET (weak ETag / 304) for hot, poll-heavy GET endpoints.
+
+A route opts in with :func:`conditional`, placed under its auth decorators::
+
+    @bp.route('', methods=['GET'])
+    @jwt_required()
+    @active_user_required
+    @conditional(_folders_stamp, cache_body=True)
+    def get_folders(): ...
+
+The *stamp* function gets the view's arguments and returns a cheap version
+of everything the response depends on — usually :func:`watermark` of the
+caller's rows, or a cache timestamp. The ETag hashes the endpoint, the
+caller (unless ``per_user=False``), the query string and the stamp, so a
+matching ``If-None-Match`` is answered with a bare 304 without running the
+view at all. A stamp of ``None`` means "can't tell" and the view runs as
+usual (use it when the view would refuse the request, so the refusal still
+happens).
+
+With ``cache_body=True`` the serialised 200 body is also kept in a
+per-worker LRU keyed by that ETag, so a client without a cached copy is
+served without re-querying or re-serialising. Entries never go stale — a
+changed stamp is a different key — they just age out.
+
+Watermarks assume writers set ``updated_at``; the ETag also rolls over every
+``ttl`` seconds so a write that slipped past one (clock skew between
+workers, two writes in one millisecond) is picked up within that window.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, request
+from flask_jwt_extended import get_current_user
+
+from app.extensions import mongo
+
+DEFAULT_TTL = 300
+# Per-worker body cache bounds.
+CACHE_MAX_ENTRIES = 1024
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Bodies above this are not cached (they would evict everything else).
+CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+# etag -> (body, mimetype)
+_bodies: 'OrderedDict[str, tuple[bytes, str]]' = OrderedDict()
+_bodies_bytes = 0
+_lock = threading.Lock()
+
+
+def clear() -> None:
+    """Drop every cached body (tests that drop the collections)."""
+    global _bodies_bytes
+    with _lock:
+        _bodies.clear()
+        _bodies_bytes = 0
+
+
+def _cached(etag: str) -> Optional[tuple[bytes, str]]:
+    with _lock:
+        entry = _bodies.get(etag)
+        if entry is not None:
+            _bodies.move_to_end(etag)
+        return entry
+
+
+def _store(etag: str, body: bytes, mimetype: str) -> None:
+    global _bodies_bytes
+    if len(body) > CACHE_MAX_ENTRY_BYTES:
+        return
+    with _lock:
+        if etag in _bodies:
+            return
+        _bodies[etag] = (body, mimetype)
+        _bodies_bytes += len(body)
+        while len(_bodies) > CACHE_MAX_ENTRIES or _bodies_bytes > CACHE_MAX_BYTES:
+            _, (old, _) = _bodies.popitem(last=False)
+            _bodies_bytes -= len(old)
+
+
+def watermark(collection: str, query: dict, field: str = 'updated_at') -> tuple:
+    """``(count, newest field)`` of the documents matching ``query`` — two
+    indexed reads that change whenever a matching row is added, removed or
+    touched."""
+    col = mongo.db[collection]
+    newest = col.find_one(query, {field: 1}, sort=[(field, -1)])
+    return col.count_documents(query), newest.get(field) if newest else None
+
+
+def _etag(per_user: bool, version, ttl: int) -> str:
+    parts = [
+        request.endpoint,
+        str(get_current_user()['_id']) if per_user else '',
+        sorted(request.args.items(multi=True)),
+        int(time.time() // ttl) if ttl else 0,
+        version,
+    ]
+    body = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()[:20]
+
+
+def _tag(response, etag: str):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional(stamp: Callable, per_user: bool = True, cache_body: bool = False,
+                ttl: int = DEFAULT_TTL):
+    """Answer ``If-None-Match`` with 304 from ``stamp`` alone; see the
+    module docstring."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            version = stamp(*args, **kwargs)
+            if version is None:
+                return fn(*args, **kwargs)
+            etag = _etag(per_user, version, ttl)
+            if request.if_none_match.contains_weak(etag):
+                return _tag(current_app.response_class(status=304), etag)
+            if cache_body:
+                hit = _cached(etag)
+                if hit is not None:
+                    return _tag(current_app.response_class(hit[0], mimetype=hit[1]), etag)
+
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if cache_body:
+                _store(etag, response.get_data(), response.mimetype)
+            return _tag(response, etag)
+        return wrapper
+    return decorator
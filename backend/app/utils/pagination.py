@@ -0,0 +1,153 @@
+"""
+Keyset (cursor) pagination.
+
+``skip``/``limit`` paging walks and throws away every earlier row, so page 500
+costs 500 pages of index scan, and the list endpoints ran a
+``count_documents`` next to every page on top of that. A cursor instead
+carries the sort-key values of the last row served — ``_id`` always last, as
+the tiebreaker — and the next page is a range query that starts right after
+that row on the same compound index.
+
+Tokens are opaque to clients: urlsafe base64 of a small JSON document that
+also names the sort fields, so a cursor minted for one ordering is rejected
+for another instead of silently skipping rows.
+
+List endpoints keep their ``page`` parameter. Passing ``cursor`` (empty for
+the first page) switches to keyset mode; every response carries
+``next_cursor`` so clients can move over at any point. Totals are only
+counted in page mode or when ``count=true`` is asked for.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+
+class CursorError(ValueError):
+    """Malformed cursor, or one minted for a different sort order."""
+
+
+def sort_spec(field: str, direction: int = -1) -> list[tuple[str, int]]:
+    """``[(field, direction), ('_id', direction)]`` — the tiebreaker keeps the
+    order total, which keyset paging needs."""
+    if field == '_id':
+        return [('_id', direction)]
+    return [(field, direction), ('_id', direction)]
+
+
+def _get_path(doc: dict, path: str):
+    for part in path.split('.'):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _encode_value(value):
+    if isinstance(value, ObjectId):
+        return {'$o': str(value)}
+    if isinstance(value, datetime):
+        return {'$d': value.isoformat()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise CursorError(f'cannot page on a {type(value).__name__} sort key')
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if '$o' in value and ObjectId.is_valid(value['$o']):
+            return ObjectId(value['$o'])
+        if '$d' in value:
+            return datetime.fromisoformat(value['$d'])
+        raise CursorError('invalid cursor')
+    return value
+
+
+def encode_cursor(doc: dict, sort: list[tuple[str, int]]) -> str:
+    """Cursor pointing just after ``doc`` in ``sort`` order."""
+    payload = {
+        's': [f'{field}:{direction}' for field, direction in sort],
+        'v': [_encode_value(_get_path(doc, field)) for field, _ in sort],
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str, sort: list[tuple[str, int]]) -> list:
+    """Sort-key values stored in ``token``; raises :class:`CursorError`."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload['v']]
+        fields = payload['s']
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise CursorError('invalid cursor') from exc
+    if fields != [f'{field}:{direction}' for field, direction in sort] or len(values) != len(sort):
+        raise CursorError('cursor does not match this listing')
+    return values
+
+
+def _beyond(field: str, direction: int, value) -> Optional[dict]:
+    """Rows strictly past ``value`` on one key, following Mongo's ordering
+    (null/missing sorts before every other value)."""
+    if direction > 0:
+        return {field: {'$ne': None}} if value is None else {field: {'$gt': value}}
+    if value is None:
+        return None
+    return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
+
+def after(sort: list[tuple[str, int]], values: list) -> dict:
+    """Filter for the rows that come after ``values`` in ``sort`` order."""
+    branches = []
+    for index, (field, direction) in enumerate(sort):
+        clause = _beyond(field, direction, values[index])
+        if clause is None:
+            continue
+        prefix = {f: values[i] for i, (f, _) in enumerate(sort[:index])}
+        branches.append({**prefix, **clause})
+    if not branches:
+        # Nothing sorts after the last possible row.
+        return {'_id': {'$in': []}}
+    return branches[0] if len(branches) == 1 else {'$or': branches}
+
+
+def apply_cursor(query: dict, sort: list[tuple[str, int]], cursor: Optional[str]) -> dict:
+    """``query`` narrowed to the rows after ``cursor`` (unchanged without one)."""
+    if not cursor:
+        return query
+    extra = after(sort, decode_cursor(cursor, sort))
+    if not query:
+        return extra
+    return {'$and': [query, extra]}
+
+
+def next_page(docs: list, limit: int, sort: list[tuple[str, int]]) -> tuple[list, Optional[str]]:
+    """Trim a ``limit + 1`` fetch to one page and mint the next cursor
+    (``None`` on the last page)."""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], sort)
+
+
+def cursor_arg(args) -> Optional[str]:
+    """``''`` when the request is in cursor mode but on its first page,
+    the token on later pages, ``None`` in page-number mode."""
+    if 'cursor' not in args:
+        return None
+    return args.get('cursor') or ''
+
+
+def wants_total(args, cursor: Optional[str]) -> bool:
+    """Whether to count: always in page mode, on request (``count=true``)
+    in cursor mode."""
+    raw = args.get('count')
+    if raw is None:
+        return cursor is None
+    return raw.lower() == 'true'
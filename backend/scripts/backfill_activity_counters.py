@@ -0,0 +1,50 @@
+"""
+Rebuild the ``activity_daily`` counters behind the admin analytics.
+
+Run once after deploying the counters — the admin timeseries keep grouping
+raw ``messages`` / ``conversations`` / ``users`` until a rebuild has marked
+the counters ready — and again after bulk imports that bypass the models.
+Idempotent: every counter in the rebuilt range is replaced.
+
+Usage:
+    cd backend
+    python scripts/backfill_activity_counters.py             # all history
+    python scripts/backfill_activity_counters.py --days 30   # last 30 days only
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.models.activity_counter import ActivityCounterModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_activity_counters] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rebuild admin activity counters.')
+    parser.add_argument('--days', type=int, default=0,
+                        help='only rebuild the last N days (default: everything)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.days and not ActivityCounterModel.is_ready():
+            log('counters were never fully built — run without --days first')
+            sys.exit(1)
+        since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+        written = ActivityCounterModel.rebuild(since=since)
+        log(f'wrote {written} counters' + (f' (last {args.days} days)' if since else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Rebuild the ``dlp_stats_daily`` rollups from raw ``dlp_events``.
+
+Run once after deploying the rollups, and any time the counters are suspected
+to have drifted (rollup writes are best-effort next to event writes).
+Idempotent: every bucket in the rebuilt range is replaced.
+
+Usage:
+    cd backend
+    python scripts/backfill_dlp_stats.py              # all history
+    python scripts/backfill_dlp_stats.py --days 30    # last 30 days only
+    python scripts/backfill_dlp_stats.py --verify     # rebuild, then compare
+                                                      # with raw aggregation
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.models.dlp_event import DLPEventModel  # noqa: E402
+from app.models.dlp_stats import DLPStatsModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_dlp_stats] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rebuild DLP stats rollups.')
+    parser.add_argument('--days', type=int, default=0,
+                        help='only rebuild the last N days (default: everything)')
+    parser.add_argument('--verify', action='store_true',
+                        help='compare global rollup totals with raw events afterwards')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+        written = DLPStatsModel.rebuild(since=since)
+        log(f'wrote {written} day buckets' + (f' (last {args.days} days)' if since else ''))
+
+        if args.verify:
+            # Whole history by default, so both sides see the same events;
+            # with --days the first (partial) UTC day can legitimately differ.
+            days = args.days or 36500
+            rolled = DLPStatsModel.global_stats(days=days)
+            raw = DLPEventModel.aggregate_global_stats(days=days)
+            for key in ('by_severity', 'by_source', 'by_action'):
+                status = 'ok' if rolled[key] == raw[key] else 'MISMATCH'
+                log(f'{key}: {status}')
+            log(f"total: rollups={rolled['total']} raw={raw['total']}")
+
+
+if __name__ == '__main__':
+    main()
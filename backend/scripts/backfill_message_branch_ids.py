@@ -0,0 +1,58 @@
+"""
+Stamp ``branch_id: 'main'`` on messages written before conversation branching.
+
+Until this has completed, every read of the main branch has to match
+``branch_id`` as ``{'$in': ['main', None]}``; afterwards it is an exact match
+on the ``(conversation_id, branch_id, created_at, seq, _id)`` index. Works in
+``_id`` batches and checkpoints after each one, so it can run against a live
+database, be interrupted, and be re-run to resume. Idempotent.
+
+Usage:
+    cd backend
+    python scripts/backfill_message_branch_ids.py                    # run to completion
+    python scripts/backfill_message_branch_ids.py --max-batches 50   # a slice, resume later
+    python scripts/backfill_message_branch_ids.py --pause 0.2        # go easy on the primary
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.models.message import MessageModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_message_branch_ids] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Backfill branch_id on legacy messages.')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--max-batches', type=int, default=0,
+                        help='stop after N batches (default: run to completion)')
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = MessageModel.backfill_branch_ids(
+            batch_size=args.batch_size,
+            max_batches=args.max_batches or None,
+            pause=args.pause,
+        )
+        log(f"stamped {result['updated']} messages in {result['batches']} batches")
+        if result['complete']:
+            log('complete — main-branch reads now match branch_id exactly')
+        else:
+            log('not complete yet — run again to resume')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Build the per-user message search index from the ``messages`` collection.
+
+Run once after deploying the index — ``/conversations/search/messages``
+keeps using Mongo ``$text`` until a rebuild has marked the index ready — and
+again after bulk imports that bypass ``MessageModel``. Idempotent: the index
+is dropped and rebuilt from scratch.
+
+Usage:
+    cd backend
+    python scripts/backfill_message_search.py
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.models.message_search import MessageSearchModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_message_search] {msg}')
+
+
+def main() -> None:
+    app = create_app()
+    with app.app_context():
+        indexed = MessageSearchModel.rebuild()
+        log(f'indexed {indexed} messages')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Stamp ``seq`` on messages written without one and retire ``seq_counter``.
+
+Message positions now come from a per-process hybrid logical clock
+(``app/models/message.py``: ``_tick``) instead of a ``$inc`` on the
+conversation document. Rows from before that — error rows, and anything
+older than P1.29 — have no ``seq``; this stamps them with ``LEGACY_SEQ``
+(-1), which sorts them exactly where a missing ``seq`` already did, and
+finally drops the unused ``conversations.seq_counter``. Existing ``seq``
+values are left alone. Works in ``_id`` batches and checkpoints after each
+one, so it can run against a live database, be interrupted, and be re-run to
+resume. Idempotent.
+
+Usage:
+    cd backend
+    python scripts/backfill_message_seq.py                    # run to completion
+    python scripts/backfill_message_seq.py --max-batches 50   # a slice, resume later
+    python scripts/backfill_message_seq.py --pause 0.2        # go easy on the primary
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.models.message import MessageModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_message_seq] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Backfill seq on legacy messages.')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--max-batches', type=int, default=0,
+                        help='stop after N batches (default: run to completion)')
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = MessageModel.backfill_seq(
+            batch_size=args.batch_size,
+            max_batches=args.max_batches or None,
+            pause=args.pause,
+        )
+        log(f"stamped {result['updated']} messages in {result['batches']} batches")
+        if result['complete']:
+            log('complete — conversations.seq_counter dropped')
+        else:
+            log('not complete yet — run again to resume')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Rebuild the semantic search vectors from ``messages`` and ``knowledge_items``.
+
+Run once after enabling semantic search (``SEMANTIC_SEARCH_ENABLED=true``),
+after switching ``EMBEDDINGS_PROVIDER`` / ``EMBEDDINGS_MODEL``, and whenever
+the background indexer dropped work (queue overflow, provider outage).
+Idempotent: all vectors are dropped and re-embedded. With the openrouter
+provider this re-embeds every document — mind the bill on large databases.
+
+Usage:
+    cd backend
+    SEMANTIC_SEARCH_ENABLED=true python scripts/backfill_semantic_index.py
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.services import semantic_search  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_semantic_index] {msg}')
+
+
+def main() -> None:
+    app = create_app()
+    with app.app_context():
+        if not semantic_search.enabled():
+            log('SEMANTIC_SEARCH_ENABLED is not set — nothing to do')
+            sys.exit(1)
+        written = semantic_search.rebuild()
+        log(f'embedded {written} documents')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Rebuild the ``usage_rollups`` hourly / daily buckets from raw ``usage_logs``.
+
+Run once after deploying the rollups — spend reads keep scanning raw rows
+until a full rebuild has marked the rollups ready — and again after any bulk
+edit of ``usage_logs`` (backdating seeds, workspace backfills) or if the
+counters are suspected to have drifted (rollup writes are best-effort next to
+usage writes). Idempotent: every bucket in the rebuilt range is replaced.
+
+Usage:
+    cd backend
+    python scripts/backfill_usage_rollups.py              # all history
+    python scripts/backfill_usage_rollups.py --days 30    # last 30 days only
+    python scripts/backfill_usage_rollups.py --verify     # rebuild, then compare
+                                                          # with a raw scan
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.extensions import mongo  # noqa: E402
+from app.models.usage_log import UsageLogModel  # noqa: E402
+from app.models.usage_rollup import UsageRollupModel  # noqa: E402
+
+
+def log(msg: str) -> None:
+    print(f'[backfill_usage_rollups] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rebuild usage rollups.')
+    parser.add_argument('--days', type=int, default=0,
+                        help='only rebuild the last N days (default: everything)')
+    parser.add_argument('--verify', action='store_true',
+                        help='compare per-workspace rollup totals with raw usage_logs afterwards')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.days and not UsageRollupModel.is_ready():
+            log('rollups were never fully built — run without --days first')
+            sys.exit(1)
+        since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+        written = UsageRollupModel.rebuild(since=since)
+        log(f'wrote {written} buckets' + (f' (last {args.days} days)' if since else ''))
+
+        if args.verify:
+            mismatches = 0
+            raw = mongo.db[UsageLogModel.collection_name].aggregate([
+                {'$group': {
+                    '_id': '$workspace_id',
+                    'cost': {'$sum': '$cost_usd'},
+                    'count': {'$sum': 1},
+                }},
+            ])
+            for row in raw:
+                rolled = UsageRollupModel.aggregate({'workspace_id': row['_id']})
+                cost = rolled[0]['total_cost'] if rolled else 0.0
+                count = rolled[0]['count'] if rolled else 0
+                if count != row['count'] or abs(cost - (row['cost'] or 0)) > 1e-6:
+                    mismatches += 1
+                    log(f"MISMATCH workspace={row['_id']}: rollups={count}/{cost:.6f} "
+                        f"raw={row['count']}/{(row['cost'] or 0):.6f}")
+            log('verify: ok' if not mismatches else f'verify: {mismatches} mismatching workspaces')
+
+
+if __name__ == '__main__':
+    main()
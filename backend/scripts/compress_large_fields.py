@@ -0,0 +1,92 @@
+"""
+Compress (or, with ``--decompress``, restore) large stored text fields.
+
+With ``FIELD_COMPRESSION`` on, new message content, meeting transcripts and
+workflow text outputs of at least ``FIELD_COMPRESSION_MIN_BYTES`` are stored
+zlib-compressed (``app/utils/field_compression.py``). This converts rows
+written before the switch — or, with ``--decompress``, turns every row back
+into plain fields before the switch is turned off. Compressed messages get a
+``search_terms`` field so the messages text index still finds them.
+
+Walks each collection in ``_id`` order in batches and logs the last ``_id``
+after each one; ``--after`` resumes from it. A row written to between the read
+and the update is left for the next run. Idempotent.
+
+Usage:
+    cd backend
+    python scripts/compress_large_fields.py                          # everything
+    python scripts/compress_large_fields.py --collection messages --pause 0.2
+    python scripts/compress_large_fields.py --collection messages --after 65f0...
+    python scripts/compress_large_fields.py --decompress             # back to plain
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(ROOT, '.env'), override=True)
+sys.path.insert(0, ROOT)
+
+from bson import ObjectId  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.models.meeting_transcript import MeetingTranscriptModel  # noqa: E402
+from app.models.message import MessageModel  # noqa: E402
+from app.models.workflow_run import WorkflowRunModel  # noqa: E402
+from app.utils import field_compression  # noqa: E402
+
+# name -> (collection getter, paths of a doc, search field)
+TARGETS = {
+    'messages': (MessageModel.get_collection,
+                 lambda doc: MessageModel.COMPRESSED_FIELDS, MessageModel.SEARCH_FIELD),
+    'meeting_transcripts': (MeetingTranscriptModel.get_collection,
+                            lambda doc: MeetingTranscriptModel.COMPRESSED_FIELDS, None),
+    'workflow_runs': (WorkflowRunModel._get_collection, WorkflowRunModel.compressed_paths, None),
+}
+
+
+def log(msg: str) -> None:
+    print(f'[compress_large_fields] {msg}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compress or restore large stored text fields.')
+    parser.add_argument('--collection', choices=sorted(TARGETS) + ['all'], default='all')
+    parser.add_argument('--decompress', action='store_true',
+                        help='restore plain fields instead of compressing')
+    parser.add_argument('--after', help='resume after this _id (single collection only)')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--max-batches', type=int, default=0,
+                        help='stop after N batches per collection (default: run to completion)')
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help='seconds to sleep between batches')
+    args = parser.parse_args()
+    if args.after and args.collection == 'all':
+        parser.error('--after needs --collection')
+    after = args.after
+    if after and ObjectId.is_valid(after):
+        after = ObjectId(after)
+
+    names = sorted(TARGETS) if args.collection == 'all' else [args.collection]
+    app = create_app()
+    with app.app_context():
+        for name in names:
+            collection, paths, search_field = TARGETS[name]
+            log(f"{name}: {'decompressing' if args.decompress else 'compressing'}")
+            stats = field_compression.convert(
+                collection(), paths, search_field,
+                compress=not args.decompress,
+                batch_size=args.batch_size,
+                max_batches=args.max_batches or None,
+                pause=args.pause,
+                after=after,
+                log=lambda msg, name=name: log(f'{name}: {msg}'),
+            )
+            log(f"{name}: converted {stats['converted']} of {stats['scanned']} rows "
+                f"(last _id {stats['last_id']})")
+
+
+if __name__ == '__main__':
+    main()
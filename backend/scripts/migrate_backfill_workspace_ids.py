@@ -177,6 +177,9 @@ def run(dry_run: bool, limit: int):
     else:
         total_written = updated_via_conv + updated_via_user
         print(f"  Total rows updated:            {total_written}")
+        if total_written:
+            print()
+            print("Rows changed scope — rerun scripts/backfill_usage_rollups.py.")
 
 
 def main():
@@ -39,6 +39,8 @@ from app.models.group_member import GroupMemberModel  # noqa: E402
 from app.models.project_group_access import ProjectGroupAccessModel  # noqa: E402
 from app.models.credit_ledger import CreditLedgerModel  # noqa: E402
 from app.models.usage_log import UsageLogModel  # noqa: E402
+from app.models.budget_counter import BudgetCounterModel  # noqa: E402
+from app.models.usage_rollup import UsageRollupModel  # noqa: E402
 from app.models.audit_log import AuditLogModel  # noqa: E402
 from app.models.conversation import ConversationModel  # noqa: E402
 from app.models.message import MessageModel  # noqa: E402
@@ -488,6 +490,15 @@ def seed_usage_logs(ws, users_by_email, projects_by_slug) -> int:
             )
             total += 1
     log(f'  -> {total} usage_logs rows')
+    # Rows were backdated after insert — re-bucket this workspace's rollups
+    # over the seeded range (other workspaces may be taking live writes) and
+    # resync the month-to-date budget counters.
+    UsageRollupModel.rebuild(
+        since=datetime.utcnow() - timedelta(days=30), workspace_id=ws['_id'],
+    )
+    if not UsageRollupModel.is_ready():
+        log('  (usage rollups not built yet — run scripts/backfill_usage_rollups.py)')
+    BudgetCounterModel.reconcile()
     return total
 
 
@@ -538,6 +549,8 @@ def wipe_demo():
         mongo.db['workspace_invites'].delete_many({'workspace_id': wid})
         mongo.db[CreditLedgerModel.collection_name].delete_many({'workspace_id': wid})
         mongo.db[UsageLogModel.get_collection().name].delete_many({'workspace_id': wid})
+        mongo.db[UsageRollupModel.collection_name].delete_many({'workspace_id': wid})
+        mongo.db[BudgetCounterModel.collection_name].delete_many({'workspace_id': wid})
         mongo.db[AuditLogModel.get_collection().name].delete_many({'details.workspace_id': str(wid)})
         mongo.db[WorkspaceModel.collection_name].delete_one({'_id': wid})
 
@@ -49,10 +49,13 @@ from app.models.conversation import ConversationModel  # noqa: E402
 from app.models.message import MessageModel  # noqa: E402
 from app.models.credit_ledger import CreditLedgerModel  # noqa: E402
 from app.models.usage_log import UsageLogModel  # noqa: E402
+from app.models.budget_counter import BudgetCounterModel  # noqa: E402
+from app.models.usage_rollup import UsageRollupModel  # noqa: E402
 from app.models.knowledge_folder import KnowledgeFolderModel  # noqa: E402
 from app.models.knowledge_item import KnowledgeItemModel  # noqa: E402
 from app.models.llm_config import LLMConfigModel  # noqa: E402
 from app.models.dlp_event import DLPEventModel  # noqa: E402
+from app.models.dlp_stats import DLPStatsModel  # noqa: E402
 from app.models.workflow import WorkflowModel  # noqa: E402
 from app.models.workflow_run import WorkflowRunModel  # noqa: E402
 from app.models.routine import RoutineModel  # noqa: E402
@@ -343,6 +346,15 @@ def seed_usage_logs(ws, users, projects, days: int = 30) -> int:
                 total += 1
             except Exception:
                 pass
+    # Rows were backdated after insert — re-bucket this workspace's rollups
+    # over the seeded range (other workspaces may be taking live writes) and
+    # resync the month-to-date budget counters.
+    UsageRollupModel.rebuild(
+        since=datetime.utcnow() - timedelta(days=days), workspace_id=ws['_id'],
+    )
+    if not UsageRollupModel.is_ready():
+        log('  (usage rollups not built yet — run scripts/backfill_usage_rollups.py)')
+    BudgetCounterModel.reconcile()
     return total
 
 
@@ -601,6 +613,7 @@ def seed_dlp_events(ws, manager, employees_users, projects):
         return 0
     actors = employees_users + [manager]
     count = 0
+    since = datetime.utcnow() - timedelta(days=15)
     for day in range(14):
         for _ in range(random.randint(0, 3)):
             sample = random.choice(DLP_RULE_SAMPLES)
@@ -643,6 +656,9 @@ def seed_dlp_events(ws, manager, employees_users, projects):
                 count += 1
             except Exception:
                 pass
+    # create() counted every event into today's stats bucket; recount the
+    # backdated days from the rows.
+    DLPStatsModel.rebuild(since=since)
     return count
 
 
@@ -1279,12 +1295,14 @@ def wipe_holding():
         mongo.db['audit_logs'].delete_many({'target_id': {'$in': [str(w) for w in workspace_ids]}})
         mongo.db['credit_ledger'].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db['usage_logs'].delete_many({'workspace_id': {'$in': workspace_ids}})
+        mongo.db['usage_rollups'].delete_many({'workspace_id': {'$in': workspace_ids}})
         # Workspace-scoped extension data
         mongo.db['knowledge_items'].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db['knowledge_folders'].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db['llm_configs'].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db['workflows'].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db['dlp_events'].delete_many({'workspace_id': {'$in': workspace_ids}})
+        mongo.db[DLPStatsModel.collection_name].delete_many({'workspace_id': {'$in': workspace_ids}})
         mongo.db[WorkspaceModel.collection_name].delete_many({'_id': {'$in': workspace_ids}})
 
     # Demo users + their personal workspaces
@@ -1332,7 +1350,14 @@ def wipe_holding():
             mongo.db['debate_messages'].delete_many({'session_id': {'$in': debate_ids}})
             mongo.db['debate_sessions'].delete_many({'_id': {'$in': debate_ids}})
 
+        # Demo users' events outside the holding workspaces: drop them and
+        # recount the days they were in.
+        oldest = mongo.db['dlp_events'].find_one(
+            {'user_id': {'$in': demo_user_ids}}, {'created_at': 1}, sort=[('created_at', 1)],
+        )
         mongo.db['dlp_events'].delete_many({'user_id': {'$in': demo_user_ids}})
+        if oldest and oldest.get('created_at'):
+            DLPStatsModel.rebuild(since=oldest['created_at'])
 
         # Personal workspaces (type='personal' with owner_id matching)
         personal_ws = list(mongo.db[WorkspaceModel.collection_name].find({
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Regenerate ``tests/services/data/dlp_golden.json`` from the DLP corpus.
+
+Run after an intentional change to the rule catalog or the scan engine, then
+review the diff of the golden file before committing it — every changed entry
+is a detection change ``tests/services/test_dlp_bench.py`` would have flagged.
+
+Usage:
+    cd backend
+    python scripts/update_dlp_golden.py           # rewrite the golden file
+    python scripts/update_dlp_golden.py --check   # exit 1 if it is stale
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.dlp_service import DLPDetector  # noqa: E402
+from tests.services.dlp_corpus import (  # noqa: E402
+    BENCH_POLICY, GOLDEN_PATH, full_corpus, snapshot,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--check', action='store_true',
+                        help='report stale entries without writing')
+    args = parser.parse_args()
+
+    detector = DLPDetector(BENCH_POLICY)
+    golden = {name: snapshot(detector, text) for name, text in sorted(full_corpus().items())}
+    current = json.loads(GOLDEN_PATH.read_text(encoding='utf-8')) if GOLDEN_PATH.exists() else {}
+
+    changed = sorted(
+        name for name in set(golden) | set(current)
+        if golden.get(name) != current.get(name)
+    )
+    for name in changed:
+        print(f'  {"removed" if name not in golden else "changed"}: {name}')
+    if args.check:
+        print(f'{len(changed)} stale entr{"y" if len(changed) == 1 else "ies"}')
+        return 1 if changed else 0
+
+    GOLDEN_PATH.write_text(
+        json.dumps(golden, indent=2, sort_keys=True) + '\n', encoding='utf-8',
+    )
+    print(f'wrote {GOLDEN_PATH} ({len(golden)} cases, {len(changed)} changed)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -73,6 +73,26 @@ def db(app):
         for collection_name in mongo.db.list_collection_names():
             mongo.db[collection_name].delete_many({})
 
+        # Compiled DLP detectors are cached per workspace id in-process.
+        from app.services.dlp_service import invalidate_detector_cache
+        invalidate_detector_cache()
+        # The usage-rollup ready marker is cached in-process too.
+        from app.models.usage_rollup import invalidate_ready_cache
+        invalidate_ready_cache()
+        from app.models.activity_counter import invalidate_ready_cache as invalidate_activity_cache
+        invalidate_activity_cache()
+        from app.models.usage_archive import invalidate_horizon_cache
+        invalidate_horizon_cache()
+        from app.models.message import invalidate_branch_backfill_cache
+        invalidate_branch_backfill_cache()
+        from app.models.message_search import invalidate_ready_cache as invalidate_search_cache
+        invalidate_search_cache()
+        # So is the assembled workspace overview.
+        from app.services.workspace_overview import invalidate
+        invalidate()
+        from app.utils import http_cache
+        http_cache.clear()
+
         yield mongo.db
 
 
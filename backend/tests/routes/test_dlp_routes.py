@@ -426,6 +426,22 @@ class TestDLPPolicy:
         assert policy2['sensitivity'] == 'strict'
         assert len(policy2['custom_patterns']) == 1
 
+    def test_put_policy_drops_cached_overview(self, app, db, client, test_user, auth_headers,
+                                              monkeypatch):
+        from app.services import workspace_overview
+        ws = _create_team_ws(client, auth_headers, name='OverviewPolicyWS')
+        wid = ws['_id']
+        dropped = []
+        monkeypatch.setattr(workspace_overview, 'invalidate', dropped.append)
+
+        r = client.put(f'/api/workspaces/{wid}/dlp/policy', json={'enabled': True},
+                       headers=auth_headers)
+        assert r.status_code == 200
+        assert [str(w) for w in dropped] == [wid]
+        stored = db['workspaces'].find_one({'_id': ObjectId(wid)})
+        assert stored['settings']['dlp']['enabled'] is True
+        assert stored['dlp_policy_version'] and stored['updated_at']
+
     def test_put_policy_rejects_invalid_regex(self, app, db, client, test_user, auth_headers):
         ws = _create_team_ws(client, auth_headers, name='InvalidRegexWS')
         wid = ws['_id']
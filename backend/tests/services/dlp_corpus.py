@@ -0,0 +1,199 @@
+"""
+Deterministic DLP benchmark / regression corpus.
+
+Two halves:
+  - synthetic cases generated from a fixed seed, one per size class
+    (short chat, long paste, log dump, Persian text, base64 blob,
+    high-entropy tokens);
+  - redacted-real cases under ``data/dlp_corpus/*.txt`` — shapes lifted from
+    real pastes with every value replaced.
+
+Secret-looking literals never appear verbatim in the repo (GitHub push
+protection scans sources, not runtime values): the ``.txt`` files use
+``{{NAME}}`` placeholders that are expanded from ``PLACEHOLDERS`` below,
+where each value is assembled by concatenation.
+
+Used by ``test_dlp_bench.py`` and ``scripts/update_dlp_golden.py``.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import random
+import re
+import string
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent / 'data'
+CORPUS_DIR = DATA_DIR / 'dlp_corpus'
+GOLDEN_PATH = DATA_DIR / 'dlp_golden.json'
+
+# Policy the golden file and the speed thresholds are recorded under.
+BENCH_POLICY = {
+    'enabled': True,
+    'sensitivity': 'strict',
+    'internal_hostname_suffixes': ['.corp.internal'],
+}
+
+PLACEHOLDERS: dict[str, str] = {
+    'AWS_KEY': 'AKIA' + 'IOSFODNN7EXAMPLE',
+    'AWS_SECRET': 'wJalrXUtnFEMI' + '/K7MDENG/bPxRfiCYEXAMPLEKEY',
+    'ANTHROPIC_KEY': 'sk-ant-api03-' + 'AbCdEfGhIjKlMnOpQrStUvWxYz0123456789ABCDEFGHIJ',
+    'OPENAI_KEY': 'sk-proj-' + 'abc123defGHIJKLmnopQRSTUVwxyz1234567890',
+    'GITHUB_PAT': 'ghp_' + 'ABCDEFGHIJKLMNOPQRSTUVWXYZ12345678',
+    'GOOGLE_KEY': 'AIza' + 'SyABCDEFGHIJKLMNOPQRSTUVWXYZ1234567',
+    'SLACK_TOKEN': 'xoxb-' + '123456789012-123456789012-ABCDEFGHIJKLMNOP',
+    'STRIPE_KEY': 'sk_' + 'live_ABCDEFGHIJKLMNOPQRSTUV1234',
+    'PEM_HEADER': '-----BEGIN ' + 'RSA PRIVATE KEY-----',
+    'JWT': (
+        'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9'
+        '.eyJzdWIiOiIxMjM0NTY3ODkwIiwibmFtZSI6IkpvaG4gRG9lIn0'
+        '.SflKxwRJSMeKKF2QT4fwpMeJf36POk6yJV_adQssw5c'
+    ),
+}
+
+_PLACEHOLDER_RE = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+# Size classes, by chars.
+SIZE_CLASSES: dict[str, int] = {
+    'short_chat': 200,
+    'long_paste': 20_000,
+    'log_dump': 100_000,
+    'persian': 20_000,
+    'base64_blob': 64_000,
+    'high_entropy': 10_000,
+}
+
+_WORDS = [
+    'the', 'meeting', 'budget', 'deploy', 'server', 'review', 'plan', 'please',
+    'customer', 'invoice', 'release', 'notes', 'draft', 'team', 'roadmap',
+]
+_PERSIAN_WORDS = [
+    'جلسه', 'بودجه', 'گزارش', 'مشتری', 'پروژه', 'تیم', 'برنامه', 'لطفا',
+    'فردا', 'ارسال', 'نتیجه', 'قرارداد', 'شماره', 'تماس', 'ایمیل',
+]
+
+
+def _prose(rng: random.Random, words: list[str], size: int) -> str:
+    out, length = [], 0
+    while length < size:
+        w = rng.choice(words)
+        out.append(w)
+        length += len(w) + 1
+        if rng.random() < 0.08:
+            out[-1] += '.'
+    return ' '.join(out)[:size]
+
+
+def _sprinkle(rng: random.Random, text: str, needles: list[str], count: int) -> str:
+    """Insert ``count`` needles at word boundaries."""
+    parts = text.split(' ')
+    for _ in range(count):
+        parts.insert(rng.randrange(len(parts) + 1), rng.choice(needles))
+    return ' '.join(parts)
+
+
+def _short_chat(rng: random.Random, size: int) -> str:
+    base = _prose(rng, _WORDS, size)
+    return _sprinkle(rng, base, ['user@example.com', '+1 650 253 0000'], 1)
+
+
+def _long_paste(rng: random.Random, size: int) -> str:
+    base = _prose(rng, _WORDS, size)
+    needles = [
+        PLACEHOLDERS['AWS_KEY'], PLACEHOLDERS['OPENAI_KEY'], PLACEHOLDERS['GITHUB_PAT'],
+        'jane.doe@example.com', '4111 1111 1111 1111', '123-45-6789', '10.0.0.12',
+        'GB82WEST12345698765432',
+    ]
+    return _sprinkle(rng, base, needles, 12)
+
+
+def _log_dump(rng: random.Random, size: int) -> str:
+    lines, length, i = [], 0, 0
+    while length < size:
+        line = (
+            f'2026-01-{i % 28 + 1:02d}T10:{i % 60:02d}:00Z 10.0.{i % 250}.{i % 200} '
+            f'user{i % 97}@corp.example GET /api/v1/items/{i * 7919} 200 {rng.randint(1, 900)}ms'
+        )
+        lines.append(line)
+        length += len(line) + 1
+        i += 1
+    return '\n'.join(lines)[:size]
+
+
+def _persian(rng: random.Random, size: int) -> str:
+    base = _prose(rng, _PERSIAN_WORDS, size)
+    return _sprinkle(rng, base, ['۰۰۷۶۲۲۹۶۴۵', '0076229645', 'ali@example.ir'], 6)
+
+
+def _base64_blob(rng: random.Random, size: int) -> str:
+    raw = bytes(rng.getrandbits(8) for _ in range(size * 3 // 4))
+    encoded = base64.b64encode(raw).decode('ascii')
+    lines = [encoded[i:i + 76] for i in range(0, len(encoded), 76)]
+    return '\n'.join(lines)[:size]
+
+
+def _high_entropy(rng: random.Random, size: int) -> str:
+    alphabet = string.ascii_letters + string.digits + '_-'
+    tokens, length = [], 0
+    while length < size:
+        tok = ''.join(rng.choices(alphabet, k=rng.randint(16, 64)))
+        tokens.append(f'token={tok}')
+        length += len(tokens[-1]) + 1
+    return '\n'.join(tokens)[:size]
+
+
+_GENERATORS = {
+    'short_chat': _short_chat,
+    'long_paste': _long_paste,
+    'log_dump': _log_dump,
+    'persian': _persian,
+    'base64_blob': _base64_blob,
+    'high_entropy': _high_entropy,
+}
+
+
+def expand_placeholders(text: str) -> str:
+    return _PLACEHOLDER_RE.sub(lambda m: PLACEHOLDERS[m.group(1)], text)
+
+
+def synthetic_corpus(seed: int = 20260101) -> dict[str, str]:
+    """``{size_class: text}`` — identical on every run for a given seed."""
+    return {
+        name: gen(random.Random(f'{seed}:{name}'), SIZE_CLASSES[name])
+        for name, gen in _GENERATORS.items()
+    }
+
+
+def real_corpus() -> dict[str, str]:
+    """``{'real/<stem>': text}`` from the redacted samples on disk."""
+    return {
+        f'real/{path.stem}': expand_placeholders(path.read_text(encoding='utf-8'))
+        for path in sorted(CORPUS_DIR.glob('*.txt'))
+    }
+
+
+def full_corpus() -> dict[str, str]:
+    return {**synthetic_corpus(), **real_corpus()}
+
+
+def snapshot(detector, text: str) -> dict:
+    """Compact, diffable summary: per-rule hit count + digest of the offsets."""
+    result = detector.scan(text, smart_scan=False)
+    offsets: dict[str, list] = {}
+    for m in result.matches:
+        offsets.setdefault(m.rule_id, []).append((m.offset_start, m.offset_end))
+    return {
+        'text_sha256': result.text_sha256,
+        'highest_action': result.highest_action,
+        'rules': {
+            rule_id: {
+                'count': len(spans),
+                'digest': hashlib.sha256(
+                    json.dumps(sorted(spans)).encode('utf-8')
+                ).hexdigest()[:16],
+            }
+            for rule_id, spans in sorted(offsets.items())
+        },
+    }
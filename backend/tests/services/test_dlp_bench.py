@@ -0,0 +1,115 @@
+"""
+DLP scanner benchmark and corpus regression suite.
+
+Two guards for changes to the rule catalog or the scan engine:
+  - detection: the match set for every corpus case must equal the golden
+    file ``data/dlp_golden.json`` (per rule: hit count + digest of the
+    offsets; plus highest action);
+  - speed: p99 latency per size class and throughput (MB/s) must stay
+    inside the thresholds below.
+
+Regenerate the golden file after an intentional detection change:
+    python scripts/update_dlp_golden.py
+
+The speed tests are marked ``slow`` and deselected by the default
+``-m "not slow"`` in pytest.ini; run them with
+    python -m pytest tests/services/test_dlp_bench.py -m slow -s
+(``-s`` prints the measured table). Thresholds are ~5x the numbers measured
+on a dev laptop so runner noise does not flake them; slower runners can
+scale them with ``DLP_BENCH_SLACK=2``. Pure-Python — no Flask app, no MongoDB.
+"""
+import json
+import os
+import time
+
+import pytest
+
+from app.services.dlp_service import DLPDetector
+from tests.services.dlp_corpus import BENCH_POLICY, GOLDEN_PATH, full_corpus, snapshot
+
+
+CORPUS = full_corpus()
+
+# Per-case p99 latency ceiling (ms). ``real/*`` cases share one ceiling.
+P99_MS = {
+    "short_chat": 5,
+    "long_paste": 150,
+    "log_dump": 600,
+    "persian": 120,
+    "base64_blob": 400,
+    "high_entropy": 80,
+    "real": 20,
+}
+MIN_MB_PER_S = 0.2
+
+SLACK = float(os.environ.get("DLP_BENCH_SLACK", "1"))
+
+
+@pytest.fixture(scope="module")
+def detector() -> DLPDetector:
+    return DLPDetector(BENCH_POLICY)
+
+
+def _load_golden() -> dict:
+    if not GOLDEN_PATH.exists():
+        return {}
+    return json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Detection — golden match sets
+# ---------------------------------------------------------------------------
+
+def test_golden_file_covers_corpus() -> None:
+    assert sorted(_load_golden()) == sorted(CORPUS)
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_golden_matches(detector: DLPDetector, name: str) -> None:
+    got = snapshot(detector, CORPUS[name])
+
+    expected = _load_golden().get(name)
+    assert expected is not None, f"{name} missing from golden file — regenerate it"
+    assert got["text_sha256"] == expected["text_sha256"], (
+        f"corpus case {name} changed — regenerate the golden file"
+    )
+    changed = {
+        rule_id: (expected["rules"].get(rule_id), got["rules"].get(rule_id))
+        for rule_id in set(expected["rules"]) | set(got["rules"])
+        if expected["rules"].get(rule_id) != got["rules"].get(rule_id)
+    }
+    assert not changed, f"{name}: match set changed (expected, got): {changed}"
+    assert got["highest_action"] == expected["highest_action"]
+
+
+# ---------------------------------------------------------------------------
+# Speed — p99 latency and throughput per size class
+# ---------------------------------------------------------------------------
+
+def _measure(detector: DLPDetector, text: str) -> tuple[float, float, float]:
+    """Return ``(p50_ms, p99_ms, mb_per_s)`` over enough runs for ~1 MB."""
+    detector.scan(text, smart_scan=False)  # warm-up
+    runs = max(5, min(100, 1_000_000 // max(1, len(text))))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        detector.scan(text, smart_scan=False)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    mb_per_s = len(text.encode("utf-8")) / p50 / 1e6
+    return p50 * 1000, p99 * 1000, mb_per_s
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_scan_speed(detector: DLPDetector, name: str) -> None:
+    text = CORPUS[name]
+    p50_ms, p99_ms, mb_per_s = _measure(detector, text)
+    print(f"\n{name:<24} {len(text):>8} chars  p50 {p50_ms:8.2f} ms  "
+          f"p99 {p99_ms:8.2f} ms  {mb_per_s:6.2f} MB/s")
+
+    ceiling = P99_MS["real" if name.startswith("real/") else name] * SLACK
+    assert p99_ms < ceiling, f"{name}: p99 {p99_ms:.1f} ms over {ceiling:.0f} ms"
+    assert mb_per_s > MIN_MB_PER_S / SLACK, f"{name}: {mb_per_s:.2f} MB/s too slow"
@@ -625,3 +625,245 @@ def test_smart_scan_synthetic_match_carries_llm_source(monkeypatch) -> None:
     assert smart.description == "mentions codename"
     assert smart.snippet == ""
     assert smart.category == "restricted"
+
+
+def test_llm_cache_is_safe_under_concurrent_access(monkeypatch) -> None:
+    """Smart scans run on thread pools; get / set / evict must not race."""
+    import threading
+    from app.services import dlp_service
+
+    monkeypatch.setattr(dlp_service, "_LLM_CACHE_MAX", 16)
+    dlp_service._LLM_CACHE.clear()
+    errors: list[BaseException] = []
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        try:
+            for _ in range(3000):
+                key = f"k{rng.randint(0, 40)}"
+                if rng.random() < 0.5:
+                    dlp_service._llm_cache_set(key, {"category": "ok"})
+                else:
+                    dlp_service._llm_cache_get(key)
+        except BaseException as exc:  # pragma: no cover - failure path
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(dlp_service._LLM_CACHE) <= 16
+    dlp_service._LLM_CACHE.clear()
+
+
+# ---------------------------------------------------------------------------
+# Per-workspace compiled detector cache
+# ---------------------------------------------------------------------------
+
+class _FakeWorkspaces:
+    """Minimal stand-in for the workspaces collection — counts reads."""
+
+    def __init__(self, doc: dict) -> None:
+        self.doc = doc
+        self.reads = 0
+
+    def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.doc if query.get('_id') == self.doc['_id'] else None
+
+
+@pytest.fixture
+def fake_workspace(monkeypatch):
+    from bson import ObjectId
+    from app.models.workspace import WorkspaceModel
+    from app.services import dlp_service
+
+    dlp_service.invalidate_detector_cache()
+    fake = _FakeWorkspaces({
+        '_id': ObjectId(),
+        'settings': {'dlp': {'enabled': True, 'sensitivity': 'strict',
+                             'internal_hostname_suffixes': ['corp.local']}},
+    })
+    monkeypatch.setattr(WorkspaceModel, 'get_collection', staticmethod(lambda: fake))
+    yield fake
+    dlp_service.invalidate_detector_cache()
+
+
+def test_for_workspace_reuses_detector_without_db_reads(fake_workspace) -> None:
+    wid = str(fake_workspace.doc['_id'])
+    first = DLPDetector.for_workspace(wid)
+    second = DLPDetector.for_workspace(wid)
+    assert first is second
+    assert fake_workspace.reads == 1
+    assert any(m.rule_id == "internal_hostname" for m in first.scan("ping db.corp.local").matches)
+
+
+def test_for_workspace_keeps_compiled_detector_when_version_unchanged(fake_workspace, monkeypatch) -> None:
+    from app.services import dlp_service
+
+    wid = str(fake_workspace.doc['_id'])
+    first = DLPDetector.for_workspace(wid)
+    monkeypatch.setattr(dlp_service, '_DETECTOR_RECHECK_SECONDS', 0)
+    again = DLPDetector.for_workspace(wid)
+    assert again is first
+    assert fake_workspace.reads == 2
+
+
+def test_for_workspace_recompiles_on_policy_version_change(fake_workspace, monkeypatch) -> None:
+    from app.services import dlp_service
+
+    wid = str(fake_workspace.doc['_id'])
+    first = DLPDetector.for_workspace(wid)
+    monkeypatch.setattr(dlp_service, '_DETECTOR_RECHECK_SECONDS', 0)
+    fake_workspace.doc['settings']['dlp'] = {'enabled': False}
+    fresh = DLPDetector.for_workspace(wid)
+    assert fresh is not first
+    assert fresh.enabled is False
+
+
+def test_invalidate_detector_cache_forces_reload(fake_workspace) -> None:
+    from app.services.dlp_service import invalidate_detector_cache
+
+    wid = str(fake_workspace.doc['_id'])
+    first = DLPDetector.for_workspace(wid)
+    invalidate_detector_cache(wid)
+    assert DLPDetector.for_workspace(wid) is not first
+    assert fake_workspace.reads == 2
+
+
+def test_dlp_policy_version_is_order_independent() -> None:
+    from app.services.dlp_service import dlp_policy_version
+
+    a = dlp_policy_version({'enabled': True, 'sensitivity': 'strict'})
+    b = dlp_policy_version({'sensitivity': 'strict', 'enabled': True})
+    assert a == b
+    assert a != dlp_policy_version({'enabled': False})
+    assert dlp_policy_version(None) == dlp_policy_version({})
+
+
+# ---------------------------------------------------------------------------
+# Overlap resolution + cap-and-summarise
+# ---------------------------------------------------------------------------
+
+def _legacy_dedup(matches):
+    """Pairwise reference implementation of the overlap resolver."""
+    from app.services.dlp_service import SEVERITY_RANK
+
+    ordered = sorted(matches, key=lambda m: (m.offset_start, -SEVERITY_RANK.get(m.severity, 0)))
+    kept = []
+    for cand in ordered:
+        cand_rank = SEVERITY_RANK.get(cand.severity, 0)
+        new_kept, placed, overlapped = [], False, False
+        for k in kept:
+            if cand.offset_start < k.offset_end and cand.offset_end > k.offset_start:
+                overlapped = True
+                if cand_rank > SEVERITY_RANK.get(k.severity, 0):
+                    continue
+                new_kept.append(k)
+                placed = True
+            else:
+                new_kept.append(k)
+        if not overlapped or not placed:
+            new_kept.append(cand)
+        kept = new_kept
+    return kept
+
+
+def test_dedup_sweep_matches_pairwise_reference() -> None:
+    from app.services.dlp_service import DLPMatch
+
+    rng = random.Random(99)
+    severities = ["low", "medium", "high", "critical"]
+    for _ in range(300):
+        matches = []
+        for i in range(rng.randint(0, 40)):
+            start = rng.randint(0, 200)
+            end = start + rng.choice([0, 1, 3, 8, 20, 60])
+            matches.append(DLPMatch(
+                rule_id=f"r{i}", rule_name="r", severity=rng.choice(severities),
+                action="warn", snippet="", offset_start=start, offset_end=end,
+            ))
+        got = DLPDetector._dedup_overlapping(list(matches))
+        want = _legacy_dedup(list(matches))
+        assert [id(m) for m in got] == [id(m) for m in want]
+
+
+def test_dedup_scales_to_thousands_of_matches() -> None:
+    text = " ".join(f"user{i}@example.com 10.0.{i % 250}.{i % 200}" for i in range(5000))
+    detector = make_detector()
+    start = time.perf_counter()
+    result = detector.scan(text)
+    elapsed = time.perf_counter() - start
+    assert sum(1 for m in result.matches if m.rule_id == "email") == 5000
+    assert elapsed < 5, f"scan of {len(text)} chars took {elapsed:.2f}s"
+
+
+def test_max_matches_per_rule_caps_and_summarises() -> None:
+    text = " ".join(f"user{i}@example.com" for i in range(40))
+    result = make_detector().scan(text, max_matches_per_rule=5)
+    emails = [m for m in result.matches if m.rule_id == "email"]
+    assert len(emails) == 5
+    assert all(m.snippet for m in emails)
+    assert emails[0].offset_start == 0
+    assert result.highest_action == "warn"
+    summary = next(s for s in result.summaries if s.rule_id == "email")
+    assert summary.total == 40
+    assert summary.omitted == 35
+    assert result.to_dict()["summaries"][0]["rule_id"] == "email"
+
+
+def test_capped_collection_stops_materialising_matches() -> None:
+    text = " ".join(f"user{i}@example.com" for i in range(2000))
+    detector = make_detector()
+    overflow: dict[str, list[tuple[int, int]]] = {}
+    collected = detector.collect_matches(text, limit_per_rule=10, overflow=overflow)
+    assert len([m for m in collected if m.rule_id == "email"]) == 10
+    assert len(overflow["email"]) == 1990
+
+    result = detector.scan(text, max_matches_per_rule=5)
+    summary = next(s for s in result.summaries if s.rule_id == "email")
+    assert summary.total == 2000
+    assert summary.omitted == 1995
+
+
+def test_capped_collection_bounds_custom_patterns() -> None:
+    detector = make_detector({
+        "custom_patterns": [{"id": "c1", "name": "Ticket", "regex": r"TCK-\d+",
+                             "severity": "high", "action": "block"}],
+    })
+    text = " ".join(f"TCK-{i}" for i in range(100))
+    assert len(detector.collect_matches(text, limit_per_rule=4)) == 4
+    result = detector.scan(text, max_matches_per_rule=3)
+    assert [s.total for s in result.summaries if s.rule_id == "c1"] == [100]
+
+
+def test_capped_overflow_counted_after_overlap_dedup() -> None:
+    detector = make_detector({
+        "custom_patterns": [{"id": "c1", "name": "Vault user", "regex": r"\w+@vault\.example\.com",
+                             "severity": "high", "action": "block"}],
+    })
+    # Email hits past the collection limit overlap the high-severity custom
+    # rule too; only the plain ones may count. The first 20 email hits (all
+    # collection keeps at cap 5) are shadowed, so the rule is left with
+    # overflow hits only.
+    shadowed = [f"user{i}@vault.example.com" for i in range(30)]
+    plain = [f"user{i}@example.com" for i in range(12)]
+    result = detector.scan(" ".join(shadowed + plain), max_matches_per_rule=5)
+
+    totals = {s.rule_id: s.total for s in result.summaries}
+    assert totals == {"c1": 30, "email": 12}
+    emails = [m for m in result.matches if m.rule_id == "email"]
+    assert len(emails) == 5
+    start = len(" ".join(shadowed))
+    assert all(m.offset_start > start and m.snippet for m in emails)
+    assert result.highest_action == "block"
+
+
+def test_uncapped_scan_has_no_summaries() -> None:
+    text = " ".join(f"user{i}@example.com" for i in range(40))
+    result = make_detector().scan(text)
+    assert len(result.matches) == 40
+    assert result.summaries == []
+    assert "summaries" not in result.to_dict()
@@ -0,0 +1,67 @@
+"""
+Tests for the message search text analysis in app/services/text_search.py.
+Pure-Python — no Flask app, no MongoDB.
+"""
+from app.services import text_search
+
+
+class TestNormalize:
+    def test_arabic_letters_fold_to_persian(self):
+        # Arabic yeh/kaf vs Persian yeh/keheh.
+        assert text_search.normalize('كتاب علي') == text_search.normalize('کتاب علی')
+        assert text_search.normalize('مدرسة') == 'مدرسه'
+
+    def test_diacritics_tatweel_and_zwnj_dropped(self):
+        assert text_search.normalize('عَلِیّ') == 'علی'
+        assert text_search.normalize('کـــتاب') == 'کتاب'
+        assert text_search.terms('می‌خواهم') == text_search.terms('میخواهم')
+
+    def test_digits_folded(self):
+        assert text_search.terms('۱۲۳ ١٢٣') == ['123', '123']
+
+
+class TestStem:
+    def test_english_inflections_share_a_stem(self):
+        for group in (['run', 'running', 'runs'], ['create', 'created', 'creating', 'creates'],
+                      ['query', 'queries'], ['quick', 'quickly']):
+            assert len({text_search.stem(w) for w in group}) == 1, group
+
+    def test_short_and_non_latin_terms_untouched(self):
+        assert text_search.stem('is') == 'is'
+        assert text_search.stem('کتابها') == 'کتابها'
+
+
+class TestQuery:
+    def test_parse_phrases_prefixes_and_terms(self):
+        q = text_search.parse_query('"running tests" config* Hello hello')
+        assert q.phrases == [['run', 'test']]
+        assert q.prefixes == ['config']
+        assert q.terms == ['hello']
+
+    def test_empty_query_is_falsy(self):
+        assert not text_search.parse_query('  "" * ')
+
+    def test_has_phrase(self):
+        assert text_search.has_phrase([[0, 5], [6]])
+        assert not text_search.has_phrase([[0, 5], [2]])
+        assert not text_search.has_phrase([[0], []])
+
+    def test_bm25_prefers_rare_terms_and_short_docs(self):
+        rare, common = text_search.idf(100, 2), text_search.idf(100, 80)
+        assert rare > common > 0
+        assert text_search.bm25(1, 5, 10, rare) > text_search.bm25(1, 40, 10, rare)
+
+
+class TestSnippet:
+    def test_highlights_point_at_the_matches(self):
+        text = 'x ' * 200 + 'we kept Running the suite ' + 'y ' * 200
+        result = text_search.snippet(text, text_search.parse_query('run'))
+        assert len(result['text']) <= 162
+        [[start, end]] = result['highlights']
+        assert result['text'][start:end] == 'Running'
+
+    def test_persian_highlight_on_original_spelling(self):
+        text = 'این كتاب خوبی است'
+        result = text_search.snippet(text, text_search.parse_query('کتاب'))
+        [[start, end]] = result['highlights']
+        assert text[start:end] == 'كتاب'
@@ -0,0 +1,64 @@
+"""
+Tests for the NumPy vector search in app/services/vector_search.py and the
+hashing embedder. Pure-Python — no Flask app, no MongoDB.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app.services.embeddings import HashingEmbedder  # noqa: E402
+from app.services.vector_search import VectorMatrix  # noqa: E402
+
+
+def _unit_rows(rng, n, dim):
+    m = rng.standard_normal((n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+class TestVectorMatrix:
+    def test_exact_search_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        data = _unit_rows(rng, 500, 32)
+        index = VectorMatrix(data)
+        assert index.matrix.dtype == np.float16
+        query = data[17] + 0.01 * rng.standard_normal(32)
+        hits = index.search(query, 5)
+        expected = np.argsort(-(data @ (query / np.linalg.norm(query))))[:5]
+        assert [row for row, _ in hits] == list(expected)
+        assert hits[0][0] == 17
+
+    def test_mask_limits_rows(self):
+        rng = np.random.default_rng(2)
+        data = _unit_rows(rng, 50, 8)
+        mask = np.zeros(50, dtype=bool)
+        mask[10:20] = True
+        hits = VectorMatrix(data).search(data[3], 50, mask=mask)
+        assert sorted(row for row, _ in hits) == list(range(10, 20))
+
+    def test_ivf_finds_near_duplicates(self):
+        rng = np.random.default_rng(3)
+        centres = _unit_rows(rng, 20, 64)
+        data = np.repeat(centres, 100, axis=0) + 0.05 * rng.standard_normal((2000, 64))
+        data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+        index = VectorMatrix(data, ivf_threshold=1000, nprobe=4)
+        assert index.centroids is not None
+        found = sum(index.search(data[i], 1)[0][0] == i for i in range(0, 2000, 50))
+        assert found >= 36  # of 40
+
+    def test_empty(self):
+        assert VectorMatrix(np.zeros((0, 4), dtype=np.float32)).search(np.ones(4), 3) == []
+
+
+class TestHashingEmbedder:
+    def test_rows_are_unit_and_related_texts_score_higher(self):
+        emb = HashingEmbedder(256)
+        vectors = emb.embed([
+            'deploying the backend to kubernetes',
+            'how do we deploy the backend service',
+            'a recipe for lemon cake',
+            '',
+        ])
+        assert vectors.shape == (4, 256)
+        assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, atol=1e-5)
+        assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+        assert not vectors[3].any()
@@ -0,0 +1,111 @@
+"""Tests for /api/admin/exports — streaming CSV / NDJSON raw-row exports."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+def _usage_rows(db, n, start=datetime(2026, 1, 1), workspace_id=None):
+    docs = [{
+        '_id': ObjectId(),
+        'created_at': start + timedelta(hours=i),
+        'user_id': ObjectId(),
+        'workspace_id': workspace_id,
+        'model': 'openai/gpt-5.2',
+        'prompt_tokens': i,
+        'cost_usd': 0.01 * i,
+        'tokens': {'prompt': i},
+    } for i in range(n)]
+    db['usage_logs'].insert_many(docs)
+    return docs
+
+
+def _get(client, headers, path, **params):
+    return client.get(f'/api/admin/exports/{path}', headers=headers, query_string=params)
+
+
+class TestExportGuard:
+    def test_non_admin_403(self, db, client, auth_headers):
+        assert _get(client, auth_headers, 'usage_logs').status_code == 403
+
+    def test_unknown_dataset_404(self, db, client, admin_headers):
+        assert _get(client, admin_headers, 'users').status_code == 404
+
+    def test_unknown_column_400(self, db, client, admin_headers):
+        r = _get(client, admin_headers, 'usage_logs', columns='cost_usd,password_hash')
+        assert r.status_code == 400
+        assert 'password_hash' in r.get_json()['error']
+
+
+class TestUsageExport:
+    def test_csv_range_and_columns(self, db, client, admin_headers):
+        docs = _usage_rows(db, 10)
+        r = _get(client, admin_headers, 'usage_logs', columns='cost_usd,prompt_tokens',
+                 **{'from': '2026-01-01T02:00:00', 'to': '2026-01-01T05:00:00'})
+        assert r.status_code == 200
+        assert r.mimetype == 'text/csv'
+        rows = list(csv.reader(io.StringIO(r.get_data(as_text=True))))
+        assert rows[0] == ['_id', 'cost_usd', 'prompt_tokens']
+        assert [row[0] for row in rows[1:]] == [str(d['_id']) for d in docs[2:5]]
+        assert rows[1][2] == '2'
+
+    def test_ndjson_resumes_after_last_id(self, db, client, admin_headers):
+        docs = _usage_rows(db, 7)
+        # Two rows share a timestamp: the keyset must break the tie on _id.
+        db['usage_logs'].update_one({'_id': docs[4]['_id']},
+                                    {'$set': {'created_at': docs[3]['created_at']}})
+
+        seen = []
+        after = None
+        while True:
+            params = {'format': 'ndjson', 'limit': 3, 'batch_size': 2}
+            if after:
+                params['after'] = after
+            lines = _get(client, admin_headers, 'usage_logs', **params).get_data(as_text=True).splitlines()
+            if not lines:
+                break
+            rows = [json.loads(line) for line in lines]
+            seen.extend(row['_id'] for row in rows)
+            after = rows[-1]['_id']
+        assert seen == [str(d['_id']) for d in docs]
+
+    def test_gzip_and_filters(self, db, client, admin_headers):
+        ws = ObjectId()
+        _usage_rows(db, 3, workspace_id=ws)
+        _usage_rows(db, 2)
+        r = _get(client, {**admin_headers, 'Accept-Encoding': 'gzip'}, 'usage_logs',
+                 format='ndjson', workspace_id=str(ws))
+        assert r.headers['Content-Encoding'] == 'gzip'
+        lines = gzip.decompress(r.get_data()).decode().splitlines()
+        assert len(lines) == 3
+        assert {json.loads(line)['workspace_id'] for line in lines} == {str(ws)}
+
+    def test_bad_cursor_400(self, db, client, admin_headers):
+        assert _get(client, admin_headers, 'usage_logs', after='nope').status_code == 400
+        assert _get(client, admin_headers, 'usage_logs', after=str(ObjectId())).status_code == 400
+
+
+class TestOtherDatasets:
+    def test_dlp_events_never_export_matches(self, db, client, admin_headers):
+        db['dlp_events'].insert_one({
+            'created_at': datetime(2026, 1, 1), 'source': 'chat', 'highest_action': 'mask',
+            'matches': [{'rule_id': 'email', 'preview': 'a***@x.com'}],
+        })
+        assert _get(client, admin_headers, 'dlp_events', columns='matches').status_code == 400
+        rows = list(csv.DictReader(io.StringIO(
+            _get(client, admin_headers, 'dlp_events').get_data(as_text=True))))
+        assert rows[0]['highest_action'] == 'mask'
+        assert 'matches' not in rows[0]
+
+    def test_audit_logs_nested_details_as_json(self, db, client, admin_headers):
+        db['audit_logs'].insert_one({
+            'created_at': datetime(2026, 1, 1), 'action': 'user.ban',
+            'details': {'reason': 'spam'},
+        })
+        rows = list(csv.DictReader(io.StringIO(
+            _get(client, admin_headers, 'audit_logs', action='user.ban').get_data(as_text=True))))
+        assert json.loads(rows[0]['details']) == {'reason': 'spam'}
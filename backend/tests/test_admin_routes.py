@@ -273,6 +273,18 @@ class TestAnalytics:
         assert len(ts['messages']) == 5
         assert len(ts['users']) == 5
 
+    def test_timeseries_reads_counters(self, app, db, client, admin_headers):
+        from app.models.activity_counter import ActivityCounterModel
+        ActivityCounterModel.rebuild()
+        conv = ConversationModel.create(ObjectId(), 'quick:x')
+        MessageModel.create_assistant_message(conv['_id'], 'hi', model_id='openai/gpt-5.2')
+        r = client.get('/api/admin/analytics/timeseries?days=2', headers=admin_headers)
+        ts = r.get_json()['timeseries']
+        assert ts['messages'][-1]['value'] == 1
+        assert ts['conversations'][-1]['value'] == 1
+        assert ts['users'][-1]['value'] == 1  # the admin
+        assert ts['popular_models'] == [{'model': 'openai/gpt-5.2', 'count': 1}]
+
 
 # ---------------------------------------------------------------------------
 # Audit logs
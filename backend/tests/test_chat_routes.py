@@ -130,6 +130,26 @@ class TestMessagesList:
         assert r.status_code == 200
         assert len(r.get_json()['messages']) == 1
 
+    def test_cursor_pages_in_reading_order_without_count(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            cfg = _mk_config(test_user['_id'])
+            conv = _mk_conv(test_user['_id'], cfg['_id'])
+            for i in range(7):
+                MessageModel.create(conv['_id'], 'user', f'm{i}', branch_id='main')
+        seen, cursor = [], ''
+        while cursor is not None:
+            r = client.get(f"/api/chat/{conv['_id']}/messages",
+                           query_string={'cursor': cursor, 'limit': 3}, headers=auth_headers)
+            body = r.get_json()
+            assert body['total'] is None
+            seen += [m['content'] for m in body['messages']]
+            cursor = body['next_cursor']
+        assert seen == [f'm{i}' for i in range(7)]
+
+        r = client.get(f"/api/chat/{conv['_id']}/messages",
+                       query_string={'cursor': 'bogus'}, headers=auth_headers)
+        assert r.status_code == 400
+
 
 class TestMessageDelete:
     def test_missing_message_404(self, client, auth_headers):
@@ -0,0 +1,91 @@
+"""Tests for app/routes/chat_stream.py — optimistic DLP verdicts settle on every exit."""
+
+from unittest.mock import patch
+
+import pytest
+from bson import ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.llm_config import LLMConfigModel
+from app.services.dlp_gate import DLPBlockedError
+
+
+class _Pending:
+    """Stand-in for ``PendingDLPGate`` whose verdict is still in flight."""
+
+    def __init__(self, block: bool) -> None:
+        self.block = block
+        self.calls = []
+
+    @property
+    def pending(self) -> bool:
+        return not self.calls
+
+    def resolve(self, *, sent_upstream=False):
+        self.calls.append(sent_upstream)
+        if self.block:
+            raise DLPBlockedError('dlp_blocked', [])
+        return None
+
+
+def _mk_config(uid):
+    return LLMConfigModel.create(
+        name='Cfg', model_id='openai/gpt-4', model_name='GPT-4',
+        owner_id=uid, visibility='private',
+    )
+
+
+def _stream(client, auth_headers, pending, body, chat_completion):
+    with patch('app.routes.chat_stream.dlp_gate_optimistic', return_value=pending), \
+            patch('app.routes.chat_stream.OpenRouterService.chat_completion',
+                  side_effect=chat_completion):
+        r = client.post('/api/chat/stream', json=body, headers=auth_headers)
+        return r.get_data(as_text=True)
+
+
+class TestOptimisticVerdictSettles:
+    @pytest.fixture
+    def cfg(self, app, db, test_user):
+        with app.app_context():
+            return _mk_config(test_user['_id'])
+
+    def test_conversation_not_found(self, db, client, auth_headers, cfg):
+        pending = _Pending(block=False)
+        out = _stream(client, auth_headers, pending, {
+            'message': 'hello', 'config_id': str(cfg['_id']),
+            'conversation_id': str(ObjectId()),
+        }, chat_completion=AssertionError)
+        assert 'Conversation not found' in out
+        assert pending.calls == [False]
+
+    def test_upstream_exception_still_persists_block(self, db, client, auth_headers, cfg):
+        pending = _Pending(block=True)
+
+        def boom(**kwargs):
+            raise RuntimeError('upstream down')
+
+        out = _stream(client, auth_headers, pending, {
+            'message': 'hello', 'config_id': str(cfg['_id']),
+        }, chat_completion=boom)
+        assert 'upstream down' in out
+        assert pending.calls == [True]
+        # The block discards the messages saved ahead of the verdict.
+        assert db['messages'].count_documents({}) == 0
+
+    def test_client_disconnect(self, app, db, client, auth_headers, cfg):
+        pending = _Pending(block=True)
+
+        def never_reached(**kwargs):
+            raise AssertionError('generator closed before upstream call')
+
+        with patch('app.routes.chat_stream.dlp_gate_optimistic', return_value=pending), \
+                patch('app.routes.chat_stream.OpenRouterService.chat_completion',
+                      side_effect=never_reached):
+            r = client.post('/api/chat/stream', json={
+                'message': 'hello', 'config_id': str(cfg['_id']),
+            }, headers=auth_headers, buffered=False)
+            chunks = r.response
+            next(iter(chunks))       # conversation_created
+            r.close()                # client goes away
+        assert pending.calls == [False]
+        assert ConversationModel.get_collection().count_documents({}) == 1
@@ -41,6 +41,25 @@ class TestList:
         assert data['total'] >= 1
         assert 'has_more' in data
 
+    def test_cursor_walk_matches_page_numbers(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            for i in range(5):
+                _mk_conv(test_user['_id'], title=f'c{i}')
+        by_page = []
+        for page in (1, 2, 3):
+            r = client.get(f'/api/conversations?page={page}&limit=2', headers=auth_headers)
+            by_page += [c['_id'] for c in r.get_json()['conversations']]
+
+        by_cursor, cursor = [], ''
+        while cursor is not None:
+            r = client.get('/api/conversations', query_string={'cursor': cursor, 'limit': 2},
+                           headers=auth_headers)
+            body = r.get_json()
+            assert body['total'] is None
+            by_cursor += [c['_id'] for c in body['conversations']]
+            cursor = body['next_cursor']
+        assert by_cursor == by_page and len(set(by_cursor)) == 5
+
     def test_total_respects_project_filter(self, app, db, client, test_user, auth_headers):
         """Bucket-D fix: ``count_by_user`` previously ignored ``project_id``,
         so ``total`` and ``has_more`` reflected the GLOBAL count even when
@@ -271,6 +290,116 @@ class TestDelete:
             assert ConversationModel.find_by_id(c['_id']) is not None
 
 
+class TestBulk:
+    @pytest.fixture(autouse=True)
+    def _no_worker(self, app, monkeypatch):
+        # Purge jobs run in the test thread via run_pending().
+        monkeypatch.setitem(app.config, 'CONVERSATION_PURGE_WORKER', False)
+        monkeypatch.setitem(app.config, 'CONVERSATION_PURGE_BATCH_SIZE', 2)
+        monkeypatch.setitem(app.config, 'CONVERSATION_PURGE_PAUSE', 0)
+
+    def test_delete_hands_messages_to_purge_job(self, app, db, client, test_user, auth_headers):
+        from app.services import conversation_purge
+        with app.app_context():
+            a, b = _mk_conv(test_user['_id']), _mk_conv(test_user['_id'])
+            other = _mk_conv(ObjectId())
+            for conv in (a, b, other):
+                for i in range(3):
+                    MessageModel.create(conv['_id'], 'user', f'm{i}', branch_id='main')
+        r = client.post('/api/conversations/bulk/delete', headers=auth_headers, json={
+            'conversation_ids': [str(a['_id']), str(b['_id']), str(other['_id'])]})
+        assert r.status_code == 202
+        data = r.get_json()
+        assert data['deleted'] == 2
+        assert data['skipped'] == [{'id': str(other['_id']), 'reason': 'not_found'}]
+        assert data['job']['status'] == 'pending' and data['job']['total'] == 6
+        with app.app_context():
+            assert ConversationModel.find_by_id(a['_id']) is None
+            assert conversation_purge.run_pending() == 1
+            assert MessageModel.count_by_conversation(a['_id']) == 0
+            assert MessageModel.count_by_conversation(other['_id']) == 3
+
+        job = client.get(f"/api/conversations/bulk/jobs/{data['job']['id']}",
+                         headers=auth_headers).get_json()['job']
+        assert job['status'] == 'done' and job['deleted'] == 6 and job['progress'] == 1.0
+
+    def test_long_conversation_delete_is_deferred(self, app, db, client, test_user,
+                                                  auth_headers, monkeypatch):
+        monkeypatch.setitem(app.config, 'CONVERSATION_PURGE_INLINE_LIMIT', 1)
+        with app.app_context():
+            c = _mk_conv(test_user['_id'])
+            MessageModel.create(c['_id'], 'user', 'a', branch_id='main')
+            MessageModel.create(c['_id'], 'assistant', 'b', branch_id='main')
+        r = client.delete(f"/api/conversations/{c['_id']}", headers=auth_headers)
+        assert r.status_code == 202
+        assert r.get_json()['job']['total'] == 2
+        with app.app_context():
+            assert ConversationModel.find_by_id(c['_id']) is None
+
+    def test_failed_purge_is_retried_with_backoff(self, app, db, monkeypatch):
+        from app.models.purge_job import PurgeJobModel
+        from app.services import conversation_purge
+        monkeypatch.setattr(conversation_purge, 'MAX_ATTEMPTS', 2)
+
+        def boom(job):
+            raise RuntimeError('primary stepped down')
+        monkeypatch.setattr(conversation_purge, 'purge', boom)
+        with app.app_context():
+            job = conversation_purge.start(ObjectId(), [ObjectId()])
+            assert conversation_purge.run_pending() == 1
+            stored = PurgeJobModel.get_collection().find_one({'_id': job['_id']})
+            assert stored['status'] == 'pending' and stored['attempts'] == 1
+            assert stored['error'] == 'primary stepped down'
+            # Not due yet, so nothing is claimed.
+            assert conversation_purge.run_pending() == 0
+
+            PurgeJobModel.get_collection().update_one(
+                {'_id': job['_id']}, {'$set': {'retry_at': stored['created_at']}})
+            assert conversation_purge.run_pending() == 1
+            stored = PurgeJobModel.get_collection().find_one({'_id': job['_id']})
+            assert stored['status'] == 'failed' and stored['attempts'] == 2
+
+    def test_archive_and_move(self, app, db, client, test_user, auth_headers):
+        from app.models.folder import FolderModel
+        with app.app_context():
+            convs = [_mk_conv(test_user['_id']) for _ in range(3)]
+            folder = FolderModel.create(test_user['_id'], 'F')
+            foreign = FolderModel.create(ObjectId(), 'X')
+        ids = [str(c['_id']) for c in convs]
+        r = client.post('/api/conversations/bulk/archive', headers=auth_headers,
+                        json={'conversation_ids': ids})
+        assert r.get_json()['updated'] == 3
+        r = client.post('/api/conversations/bulk/move', headers=auth_headers,
+                        json={'conversation_ids': ids[:2], 'folder_id': str(folder['_id'])})
+        assert r.get_json()['updated'] == 2
+        with app.app_context():
+            docs = {str(c['_id']): c for c in mongo.db['conversations'].find()}
+        assert all(d['is_archived'] for d in docs.values())
+        assert docs[ids[0]]['folder_id'] == folder['_id'] and docs[ids[2]].get('folder_id') is None
+
+        r = client.post('/api/conversations/bulk/move', headers=auth_headers,
+                        json={'conversation_ids': ids, 'folder_id': str(foreign['_id'])})
+        assert r.status_code == 404
+        r = client.post('/api/conversations/bulk/move', headers=auth_headers,
+                        json={'conversation_ids': ids, 'project_id': str(ObjectId())})
+        assert r.status_code == 403
+
+    def test_project_acl_and_validation(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            locked = ConversationModel.create(test_user['_id'], str(ObjectId()),
+                                              project_id=str(ObjectId()))
+        r = client.post('/api/conversations/bulk/archive', headers=auth_headers,
+                        json={'conversation_ids': [str(locked['_id'])]})
+        assert r.get_json() == {'updated': 0, 'is_archived': True,
+                                'skipped': [{'id': str(locked['_id']), 'reason': 'forbidden'}]}
+        for body in ({}, {'conversation_ids': []}, {'conversation_ids': ['nope']}):
+            r = client.post('/api/conversations/bulk/delete', headers=auth_headers, json=body)
+            assert r.status_code == 400
+        r = client.post('/api/conversations/bulk/move', headers=auth_headers,
+                        json={'conversation_ids': [str(locked['_id'])]})
+        assert r.status_code == 400
+
+
 # ---------------------------------------------------------------------------
 # Archive + search
 # ---------------------------------------------------------------------------
@@ -306,6 +435,23 @@ class TestSearch:
         assert r.status_code == 200
         assert r.get_json()['total'] == 0
 
+    def test_message_search_uses_index_with_snippets(self, app, db, client, test_user, auth_headers):
+        from app.models.message_search import MessageSearchModel
+        with app.app_context():
+            c = _mk_conv(test_user['_id'], title='Ops')
+            hit = MessageModel.create(c['_id'], 'user', 'how do I restart the Worker pool?')
+            archived = _mk_conv(test_user['_id'])
+            MessageModel.create(archived['_id'], 'user', 'restart the worker')
+            ConversationModel.update(archived['_id'], {'is_archived': True})
+            MessageSearchModel.rebuild()
+        r = client.get('/api/conversations/search/messages?q=worker', headers=auth_headers)
+        assert r.status_code == 200
+        [result] = r.get_json()['results']
+        assert result['_id'] == str(hit['_id'])
+        assert result['conversation_title'] == 'Ops'
+        [[start, end]] = result['snippet']['highlights']
+        assert result['snippet']['text'][start:end] == 'Worker'
+
 
 # ---------------------------------------------------------------------------
 # Export
@@ -340,6 +486,93 @@ class TestExport:
         assert r.mimetype == 'text/markdown'
         assert '# سلام' in r.data.decode('utf-8')
 
+    def test_json_export_streams_full_branch(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            c = _mk_conv(test_user['_id'])
+            for i in range(450):  # more than one cursor batch
+                MessageModel.create(c['_id'], 'user' if i % 2 == 0 else 'assistant',
+                                    f'm{i}', branch_id='main')
+        r = client.get(f"/api/conversations/{c['_id']}/export?format=json",
+                       headers=auth_headers)
+        assert r.is_streamed
+        assert r.headers['Cache-Control'] == 'no-store'
+        data = json.loads(r.get_data())
+        assert [m['content'] for m in data['messages']] == [f'm{i}' for i in range(450)]
+
+    def test_json_export_empty(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            c = _mk_conv(test_user['_id'])
+        r = client.get(f"/api/conversations/{c['_id']}/export?format=json",
+                       headers=auth_headers)
+        assert json.loads(r.get_data())['messages'] == []
+
+    def test_ndjson_export(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            c = _mk_conv(test_user['_id'], title='سلام')
+            MessageModel.create(c['_id'], 'user', 'hi', branch_id='main')
+            MessageModel.create(c['_id'], 'assistant', 'hello', branch_id='main')
+        r = client.get(f"/api/conversations/{c['_id']}/export?format=ndjson",
+                       headers=auth_headers)
+        assert r.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+        assert lines[0]['type'] == 'conversation'
+        assert lines[0]['title'] == 'سلام'
+        assert [(l['type'], l['content']) for l in lines[1:]] == [
+            ('message', 'hi'), ('message', 'hello')]
+
+
+class TestBulkExport:
+    def _zip(self, r):
+        import io
+        import zipfile
+        assert r.status_code == 200
+        assert r.mimetype == 'application/zip'
+        return zipfile.ZipFile(io.BytesIO(r.get_data()))
+
+    def test_folder_bundle(self, app, db, client, test_user, auth_headers):
+        folder = ObjectId()
+        with app.app_context():
+            a = ConversationModel.create(test_user['_id'], str(ObjectId()), title='A', folder_id=folder)
+            ConversationModel.create(test_user['_id'], str(ObjectId()), title='B')
+            ConversationModel.create(ObjectId(), str(ObjectId()), title='C', folder_id=folder)
+            MessageModel.create(a['_id'], 'user', 'in folder', branch_id='main')
+        r = client.get(f'/api/conversations/export?folder_id={folder}&format=ndjson',
+                       headers=auth_headers)
+        archive = self._zip(r)
+        assert archive.testzip() is None
+        manifest = json.loads(archive.read('manifest.json'))
+        assert [c['id'] for c in manifest['conversations']] == [str(a['_id'])]
+        body = archive.read(manifest['conversations'][0]['file']).decode()
+        assert json.loads(body.splitlines()[1])['content'] == 'in folder'
+
+    def test_date_range_and_project_acl(self, app, db, client, test_user, auth_headers):
+        from datetime import datetime
+        with app.app_context():
+            old = _mk_conv(test_user['_id'], title='old')
+            new = _mk_conv(test_user['_id'], title='new')
+            lost = _mk_conv(test_user['_id'], title='lost')
+        col = mongo.db['conversations']
+        col.update_one({'_id': old['_id']}, {'$set': {'created_at': datetime(2025, 1, 1)}})
+        col.update_one({'_id': new['_id']}, {'$set': {'created_at': datetime(2026, 3, 1)}})
+        # Project the user can no longer see: never bundled.
+        col.update_one({'_id': lost['_id']}, {'$set': {'created_at': datetime(2026, 3, 2),
+                                                       'project_id': ObjectId()}})
+        r = client.get('/api/conversations/export?from=2026-01-01&format=json',
+                       headers=auth_headers)
+        names = self._zip(r).namelist()
+        assert names == [n for n in names if str(new['_id']) in n or n == 'manifest.json']
+        assert len(names) == 2
+
+    def test_bad_params(self, client, auth_headers):
+        assert client.get('/api/conversations/export?format=pdf',
+                          headers=auth_headers).status_code == 400
+        assert client.get('/api/conversations/export?folder_id=x',
+                          headers=auth_headers).status_code == 400
+        assert client.get('/api/conversations/export?from=yesterday',
+                          headers=auth_headers).status_code == 400
+        assert client.get(f'/api/conversations/export?project_id={ObjectId()}',
+                          headers=auth_headers).status_code == 403
+
 
 # ---------------------------------------------------------------------------
 # Branches
@@ -372,6 +605,9 @@ class TestBranches:
         assert r.status_code == 201
         body = r.get_json()
         assert body['active_branch'] == body['branch_id']
+        # Copy-on-write: the branch shares the prefix instead of copying it.
+        assert [m['_id'] for m in body['messages']] == [str(m['_id'])]
+        assert db['messages'].count_documents({'conversation_id': c['_id']}) == 1
 
     def test_create_branch_conv_not_found(self, client, auth_headers):
         r = client.post(
@@ -467,9 +703,15 @@ class TestBranches:
     def test_branch_to_new_success(self, app, db, client, test_user, auth_headers):
         with app.app_context():
             c = _mk_conv(test_user['_id'])
-            m = MessageModel.create(c['_id'], 'user', 'hi', branch_id='main')
-        r = client.post(f"/api/conversations/{c['_id']}/branch-to-new/{m['_id']}",
+            sent = [MessageModel.create(c['_id'], role, text, branch_id='main')
+                    for role, text in (('user', 'hi'), ('assistant', 'hello'), ('user', 'more'))]
+            MessageModel.create(c['_id'], 'assistant', 'not copied', branch_id='main')
+        r = client.post(f"/api/conversations/{c['_id']}/branch-to-new/{sent[-1]['_id']}",
                         json={}, headers=auth_headers)
         assert r.status_code == 201
         body = r.get_json()
-        assert body['message_count'] >= 1
+        assert body['message_count'] == 3
+        with app.app_context():
+            copies = MessageModel.find_by_conversation(body['conversation_id'])
+        assert [m['content'] for m in copies] == ['hi', 'hello', 'more']
+        assert [m['copied_from'] for m in copies] == [m['_id'] for m in sent]
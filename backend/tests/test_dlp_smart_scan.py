@@ -61,10 +61,13 @@ def _make_policy(
 
 
 @pytest.fixture(autouse=True)
-def _clear_llm_cache():
-    """Isolate each test from the module-level Smart-scan cache."""
+def _clear_llm_cache(monkeypatch):
+    """Isolate each test from the module-level Smart-scan cache and keep the
+    shared Mongo verdict cache out of the picture."""
     from app.services import dlp_service
     dlp_service._LLM_CACHE.clear()
+    monkeypatch.setattr(dlp_service, '_shared_cache_get', lambda key: None)
+    monkeypatch.setattr(dlp_service, '_shared_cache_set', lambda key, verdict: None)
     yield
     dlp_service._LLM_CACHE.clear()
 
@@ -367,3 +370,78 @@ class TestValidateLLMClassifier:
         assert payload is None
         assert err is not None
         assert '4000' in err
+
+
+# ---------------------------------------------------------------------------
+# Shared (Mongo-backed) verdict cache behind the in-process LRU
+# ---------------------------------------------------------------------------
+
+class TestSharedVerdictCache:
+    def test_shared_hit_skips_llm_and_backfills_lru(self, monkeypatch):
+        from app.services import dlp_service
+        from app.services.dlp_service import DLPDetector
+
+        shared: dict = {}
+        monkeypatch.setattr(dlp_service, '_shared_cache_get', shared.get)
+        monkeypatch.setattr(dlp_service, '_shared_cache_set', shared.__setitem__)
+
+        calls: list = []
+
+        def fake_completion(payload, **kwargs):
+            calls.append(payload)
+            return _llm_response('confidential', 'has an email')
+
+        monkeypatch.setattr(
+            'app.services.openrouter_service.OpenRouterService._sync_completion',
+            fake_completion,
+        )
+
+        detector = DLPDetector(_make_policy(llm_enabled=True))
+        text = 'please forward this to the finance team today'
+        first = detector.llm_classify(text)
+        assert len(calls) == 1
+        assert list(shared.values()) == [first]
+
+        # Another worker: empty LRU, populated shared cache → no LLM call.
+        dlp_service._LLM_CACHE.clear()
+        second = detector.llm_classify(text)
+        assert second == first
+        assert len(calls) == 1
+        assert len(dlp_service._LLM_CACHE) == 1
+
+    def test_cache_key_separates_lang_and_policy(self, monkeypatch):
+        from app.services import dlp_service
+        from app.services.dlp_service import DLPDetector
+
+        shared: dict = {}
+        monkeypatch.setattr(dlp_service, '_shared_cache_get', shared.get)
+        monkeypatch.setattr(dlp_service, '_shared_cache_set', shared.__setitem__)
+        monkeypatch.setattr(
+            'app.services.openrouter_service.OpenRouterService._sync_completion',
+            lambda payload, **kwargs: _llm_response(),
+        )
+
+        text = 'please forward this to the finance team today'
+        DLPDetector(_make_policy(llm_enabled=True)).llm_classify(text, user_lang='en')
+        DLPDetector(_make_policy(llm_enabled=True)).llm_classify(text, user_lang='fa')
+        DLPDetector(_make_policy(llm_enabled=True, guidance='codenames')).llm_classify(text)
+
+        assert len(shared) == 3
+        text_hashes = {key.split(':')[0] for key in shared}
+        assert len(text_hashes) == 1
+
+    def test_shared_cache_failure_is_a_miss(self, monkeypatch):
+        from app.models.dlp_verdict_cache import DLPVerdictCacheModel
+        from app.services import dlp_service
+
+        monkeypatch.undo()
+        dlp_service._LLM_CACHE.clear()
+
+        def down(*args, **kwargs):
+            raise RuntimeError('mongo unavailable')
+
+        monkeypatch.setattr(DLPVerdictCacheModel, 'get', staticmethod(down))
+        monkeypatch.setattr(DLPVerdictCacheModel, 'set', staticmethod(down))
+        assert dlp_service._shared_cache_get('x:y:en') is None
+        dlp_service._shared_cache_set('x:y:en', {'category': 'public', 'reason': ''})
+
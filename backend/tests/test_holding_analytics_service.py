@@ -344,3 +344,133 @@ class TestHoldingOverview:
         assert out['holding_credits']['lifetime_topups_usd'] == 123.45
         assert out['holding_credits']['lifetime_spend_usd'] == 20.0
         assert out['holding_credits']['remaining_usd'] == 103.45
+
+
+# ---------------------------------------------------------------------------
+# Materialised views (holding_views)
+# ---------------------------------------------------------------------------
+
+class TestMaterialisedViews:
+    def test_payloads_carry_refreshed_at(self, app, db):
+        from app.services import holding_views
+        assert holding_analytics.holding_overview()['refreshed_at'] is None
+        holding_views.refresh()
+        for out in (
+            holding_analytics.list_companies(),
+            holding_analytics.users_overview(),
+            holding_analytics.holding_overview(),
+        ):
+            assert out['refreshed_at'] is not None
+
+    def test_reads_never_build_views_inline(self, app, db):
+        from app.services import holding_views
+        owner = _mk_user(db, 'lazy@gmail.com', role='manager')
+        ws = _mk_team_ws(db, 'LazyCo', owner['_id'])
+        _mk_member(db, ws['_id'], owner['_id'], role='owner')
+
+        # Never built: counts are computed live, nothing is written.
+        out = holding_analytics.list_companies()
+        assert out['companies'][0]['member_count'] == 1
+        live_users = holding_analytics.users_overview()['users']
+        live_counts = holding_analytics.holding_overview()
+        assert mongo.db[holding_views.COMPANY_STATS].count_documents({}) == 0
+        assert holding_views.load_meta() == {}
+
+        # Built: the views agree with the live figures ...
+        holding_views.refresh()
+        assert holding_analytics.users_overview()['users'] == live_users
+        built_counts = holding_analytics.holding_overview()
+        for key in ('workspaces_count', 'projects_count', 'users_count', 'conversations_count'):
+            assert built_counts[key] == live_counts[key]
+        # ... and stale counts are served until the next refresh.
+        u2 = _mk_user(db, 'late@gmail.com')
+        _mk_member(db, ws['_id'], u2['_id'])
+        assert holding_analytics.list_companies()['companies'][0]['member_count'] == 1
+        holding_views.refresh()
+        assert holding_analytics.list_companies()['companies'][0]['member_count'] == 2
+
+    def test_usage_reads_follow_the_rollups(self, app, db):
+        from app.models.usage_rollup import UsageRollupModel
+        from app.services import holding_views
+        u = _mk_user(db, 'mv@gmail.com')
+        _mk_usage(db, user_id=u['_id'], cost=1.0)
+        _mk_usage(db, user_id=u['_id'], cost=5.0,
+                  created_at=datetime.utcnow() - timedelta(days=3))
+        holding_views.refresh()
+        assert holding_analytics.holding_overview()['totals']['cost_usd'] == 6.0
+
+        UsageRollupModel.rebuild()
+        _mk_usage(db, user_id=u['_id'], cost=2.0)   # behind the rollups' back
+        UsageRollupModel.rebuild(since=datetime.utcnow())
+        out = holding_analytics.holding_overview(days=2)
+        assert out['totals']['cost_usd'] == 3.0
+        assert holding_analytics.holding_overview()['totals']['cost_usd'] == 8.0
+        assert out['by_role']['user']['users'] == 1
+
+    def test_company_counts_follow_membership_changes(self, app, db):
+        from app.services import holding_views
+        owner = _mk_user(db, 'cc@gmail.com', role='manager')
+        ws = _mk_team_ws(db, 'CountCo', owner['_id'])
+        _mk_member(db, ws['_id'], owner['_id'], role='owner')
+        p = _mk_project(db, ws['_id'], name='Only')
+        _mk_conversation(db, p['_id'], owner['_id'])
+        holding_views.refresh()
+        stats = mongo.db[holding_views.COMPANY_STATS].find_one({'_id': ws['_id']})
+        assert (stats['member_count'], stats['project_count'], stats['conversation_count']) == (1, 1, 1)
+
+        # Hard deletes leave no high-water-mark trace; the periodic full
+        # rebuild picks them up.
+        mongo.db.workspace_members.delete_many({'workspace_id': ws['_id']})
+        mongo.db.projects.delete_many({'workspace_id': ws['_id']})
+        assert holding_views.refresh(full=True)['full'] is True
+        assert mongo.db[holding_views.COMPANY_STATS].find_one({'_id': ws['_id']}) is None
+
+    def test_incremental_refresh_recounts_only_changed_rows(self, app, db, monkeypatch):
+        from app.services import holding_views
+        owner = _mk_user(db, 'inc@gmail.com', role='manager')
+        busy = _mk_team_ws(db, 'BusyCo', owner['_id'])
+        quiet = _mk_team_ws(db, 'QuietCo', owner['_id'])
+        for ws in (busy, quiet):
+            _mk_member(db, ws['_id'], owner['_id'], role='owner')
+        project = _mk_project(db, busy['_id'])
+        assert holding_views.refresh()['full'] is True
+        quiet_before = mongo.db[holding_views.COMPANY_STATS].find_one({'_id': quiet['_id']})
+
+        # Writes after the mark; the setup rows above are older.
+        monkeypatch.setattr(holding_views, '_SKEW', timedelta(0))
+        mark = datetime.utcnow() + timedelta(seconds=5)
+        mongo.db[holding_views.META].update_one(
+            {'_id': holding_views.META_ID}, {'$set': {'high_water_mark': mark}})
+        later = mark + timedelta(seconds=1)
+        u2 = _mk_user(db, 'inc2@gmail.com')
+        _mk_member(db, busy['_id'], u2['_id'])
+        mongo.db.workspace_members.update_one(
+            {'user_id': u2['_id']}, {'$set': {'updated_at': later}})
+        conv = _mk_conversation(db, project['_id'], owner['_id'])
+        mongo.db.conversations.update_one({'_id': conv['_id']}, {'$set': {'updated_at': later}})
+        result = holding_views.refresh()
+        assert result['full'] is False
+
+        busy_stats = mongo.db[holding_views.COMPANY_STATS].find_one({'_id': busy['_id']})
+        assert (busy_stats['member_count'], busy_stats['conversation_count']) == (2, 1)
+        assert busy_stats['refreshed_at'] == result['refreshed_at']
+        quiet_after = mongo.db[holding_views.COMPANY_STATS].find_one({'_id': quiet['_id']})
+        assert quiet_after == quiet_before  # not recounted
+        # Personal workspace + BusyCo.
+        assert mongo.db[holding_views.USER_STATS].find_one({'_id': u2['_id']})['workspaces_count'] == 2
+        assert holding_views.load_meta()['high_water_mark'] == result['refreshed_at']
+
+    def test_full_rebuild_is_periodic(self, app, db, monkeypatch):
+        from app.services import holding_views
+        assert holding_views.refresh()['full'] is True
+        assert holding_views.refresh()['full'] is False
+        monkeypatch.setattr(holding_views, '_FULL_EVERY', timedelta(0))
+        assert holding_views.refresh()['full'] is True
+
+    def test_refresh_lease_blocks_concurrent_run(self, app, db):
+        from app.services import holding_views
+        mongo.db[holding_views.META].insert_one({
+            '_id': holding_views.META_ID,
+            'lease_until': datetime.utcnow() + timedelta(minutes=5),
+        })
+        assert holding_views.refresh() is None
@@ -32,6 +32,20 @@ class TestList:
         assert data['has_more'] is True
         assert data['total_pages'] == 2
 
+    def test_cursor_mode(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            for _ in range(3):
+                KnowledgeItemModel.create(test_user['_id'], 'chat',
+                                          str(ObjectId()), str(ObjectId()))
+        first = client.get('/api/knowledge/list?cursor=&limit=2', headers=auth_headers).get_json()
+        assert first['total'] is None and first['has_more'] is True
+        second = client.get('/api/knowledge/list', headers=auth_headers,
+                            query_string={'cursor': first['next_cursor'], 'limit': 2,
+                                          'count': 'true'}).get_json()
+        assert second['total'] == 3 and second['next_cursor'] is None
+        ids = [i['_id'] for i in first['items'] + second['items']]
+        assert len(set(ids)) == 3
+
     def test_tag_filter(self, app, db, client, test_user, auth_headers):
         with app.app_context():
             KnowledgeItemModel.create(test_user['_id'], 'chat',
@@ -1,13 +1,14 @@
 """
-DLP gate plumbing — v1 is personal-scope (no workspace_id), so the gate is a
-no-op. This test asserts the call shape (source='meeting') would route through
-the same chokepoint if a workspace_id were ever attached.
+DLP gate plumbing — meetings are gated under their workspace's DLP policy
+(stamped at upload, falling back to the owner's active workspace). Without a
+workspace the gate is a no-op.
 """
 from __future__ import annotations
 
 from unittest.mock import patch
 
 import pytest
+from bson import ObjectId
 
 
 @pytest.fixture(autouse=True)
@@ -68,3 +69,73 @@ class TestDLPBlockedErrorShape:
         body = format_blocked_response(err)
         assert body['code'] == 'dlp_blocked'
         assert body['matches'][0]['rule_id'] == 'r1'
+
+
+class TestMeetingWorkspacePolicy:
+    AWS_KEY = 'AKIA' + 'IOSFODNN7EXAMPLE'
+
+    @pytest.fixture
+    def workspace(self, app, db):
+        ws, owner = ObjectId(), ObjectId()
+        db['workspaces'].insert_one({
+            '_id': ws, 'name': 'W',
+            'settings': {'dlp': {'enabled': True, 'sensitivity': 'strict'}},
+        })
+        db['users'].insert_one({'_id': owner, 'email': 'o@example.com',
+                                'active_workspace_id': ws})
+        return ws, owner
+
+    def _meeting(self, owner, **data):
+        from app.models.meeting import MeetingModel
+        meeting_id = MeetingModel.create(str(owner), {
+            'original_filename': 'a.m4a', 'audio_path': '/tmp/a.m4a', **data,
+        })
+        return MeetingModel.find_by_id(meeting_id)
+
+    def test_blocking_rule_fires_on_summary_artifact(self, app, db, workspace):
+        from app.services import meetings_pipeline
+        ws, owner = workspace
+        with app.app_context():
+            meeting = self._meeting(owner, workspace_id=ws)
+            with pytest.raises(meetings_pipeline._DLPBlocked) as exc:
+                meetings_pipeline._scan_dlp_artifacts(
+                    meeting_id=meeting['_id'], owner_id=owner,
+                    workspace_id=meetings_pipeline._meeting_workspace_id(meeting),
+                    text=f'Speaker 1: the deploy key is {self.AWS_KEY}',
+                )
+        assert 'exec_summary' in str(exc.value)
+        # One prompt, scanned once; every artifact keeps its own event.
+        events = list(db['dlp_events'].find({'source': 'meeting'}))
+        assert len(events) == len(meetings_pipeline._SUMMARY_ARTIFACTS)
+        assert {e['source_ref']['artifact'] for e in events} == set(
+            meetings_pipeline._SUMMARY_ARTIFACTS)
+        assert all(e['workspace_id'] == ws and e['highest_action'] == 'block'
+                   for e in events)
+
+    def test_transcript_chunks_use_meeting_workspace(self, app, db, workspace):
+        from app.services import meetings_pipeline
+        ws, owner = workspace
+        with app.app_context():
+            meeting = self._meeting(owner, workspace_id=ws)
+            meetings_pipeline._scan_dlp(
+                meeting_id=meeting['_id'], owner_id=owner,
+                workspace_id=meetings_pipeline._meeting_workspace_id(meeting),
+                chunks=iter(['reach me at ', 'someone@example.com', ' later']),
+                phase='transcript',
+            )
+        event = db['dlp_events'].find_one({'source': 'meeting'})
+        assert event['workspace_id'] == ws
+        assert event['source_ref']['phase'] == 'transcript'
+
+    def test_legacy_meeting_without_workspace_is_not_gated(self, app, db, workspace):
+        from app.services import meetings_pipeline
+        _, owner = workspace
+        with app.app_context():
+            meeting = self._meeting(owner)
+            assert meetings_pipeline._meeting_workspace_id(meeting) is None
+            meetings_pipeline._scan_dlp_artifacts(
+                meeting_id=meeting['_id'], owner_id=owner,
+                workspace_id=meetings_pipeline._meeting_workspace_id(meeting),
+                text=f'Speaker 1: the deploy key is {self.AWS_KEY}',
+            )
+        assert db['dlp_events'].count_documents({}) == 0
@@ -0,0 +1,83 @@
+"""Tests for app/models/activity_counter.py — daily admin activity counters."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.activity_counter import ActivityCounterModel
+from app.models.conversation import ConversationModel
+from app.models.message import MessageModel
+from app.models.user import UserModel
+
+
+@pytest.fixture
+def activity(db):
+    user = UserModel.create(email='counter@gmail.com', password='Pw123!@#')
+    conv = ConversationModel.create(user['_id'], 'quick:x')
+    MessageModel.create_user_message(conv['_id'], 'hi')
+    MessageModel.create_assistant_message(conv['_id'], 'hello', model_id='openai/gpt-5.2')
+    MessageModel.create_assistant_message(conv['_id'], 'again', model_id='openai/gpt-5.2')
+    MessageModel.create_error_message(conv['_id'], 'boom', model_id='google/gemini')
+    return conv
+
+
+def _today():
+    return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+class TestCounters:
+    def test_creates_are_counted(self, db, activity):
+        day = db['activity_daily'].find_one({'_id': f'day:{_today()}'})
+        assert (day['messages'], day['conversations'], day['signups']) == (4, 1, 1)
+
+    def test_rebuild_matches_incremental(self, db, activity):
+        incremental = {d['_id']: d for d in db['activity_daily'].find()}
+        ActivityCounterModel.rebuild()
+        rebuilt = {d['_id']: d for d in db['activity_daily'].find() if d['_id'] != 'meta:ready'}
+        assert rebuilt == incremental
+
+    def test_reads_fall_back_to_raw_until_ready(self, db, activity):
+        db['messages'].insert_one({'conversation_id': activity['_id'], 'created_at': datetime.utcnow()})
+        assert ActivityCounterModel.daily('messages', 3)[_today()] == 5
+
+        ActivityCounterModel.rebuild()
+        # Rows written behind the model's back are not seen until the next rebuild.
+        db['messages'].insert_one({'conversation_id': activity['_id'], 'created_at': datetime.utcnow()})
+        assert ActivityCounterModel.daily('messages', 3)[_today()] == 5
+
+    def test_rebuild_skips_branch_copies(self, db, activity):
+        source = MessageModel.find_by_conversation(activity['_id'])[1]
+        db['messages'].insert_one(MessageModel._branch_copy(source, 'alt'))
+        before = {d['_id']: d for d in db['activity_daily'].find()}
+        ActivityCounterModel.rebuild()
+        after = {d['_id']: d for d in db['activity_daily'].find() if d['_id'] != 'meta:ready'}
+        assert after == before
+        assert ActivityCounterModel.daily('messages', 1)[_today()] == 4
+
+    def test_ready_flag_is_cached(self, db, activity, monkeypatch):
+        ActivityCounterModel.rebuild()
+        calls = []
+        real = ActivityCounterModel.get_collection
+
+        def counting():
+            calls.append(1)
+            return real()
+        monkeypatch.setattr(ActivityCounterModel, 'get_collection', staticmethod(counting))
+        for _ in range(3):
+            assert ActivityCounterModel.is_ready()
+        assert calls == []
+
+    def test_top_models_window(self, db, activity):
+        old = datetime.utcnow() - timedelta(days=10)
+        ActivityCounterModel.record('messages', old, model='anthropic/claude-x')
+        ActivityCounterModel.rebuild(since=datetime.utcnow())
+        assert ActivityCounterModel.top_models(7) == [
+            {'model': 'openai/gpt-5.2', 'count': 2},
+            {'model': 'google/gemini', 'count': 1},
+        ]
+        assert {'model': 'anthropic/claude-x', 'count': 1} in ActivityCounterModel.top_models(30)
+
+    def test_invalid_metric(self, db):
+        with pytest.raises(ValueError):
+            ActivityCounterModel.daily('logins', 7)
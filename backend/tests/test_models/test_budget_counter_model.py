@@ -0,0 +1,123 @@
+"""Tests for app/models/budget_counter.py — month-to-date spend counters."""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.models.budget_counter import BudgetCounterModel, _shift_month
+from app.models.usage_log import UsageLogModel
+from app.models.usage_rollup import UsageRollupModel
+
+
+@pytest.fixture
+def scope(db):
+    ws, project = ObjectId(), ObjectId()
+    db['workspaces'].insert_one({'_id': ws, 'name': 'W', 'budget_mtd_usd': 0.0})
+    db['projects'].insert_one({'_id': project, 'workspace_id': ws, 'name': 'P'})
+    return ws, project
+
+
+def _log(ws, project=None, cost=1.0):
+    return UsageLogModel.create(
+        user_id=ObjectId(), workspace_id=ws, project_id=project,
+        model='openai/gpt-5.2', prompt_tokens=10, completion_tokens=5, cost_usd=cost,
+    )
+
+
+class TestMonthArithmetic:
+    def test_shift_month_crosses_years(self):
+        assert _shift_month('2026-01', -1) == '2025-12'
+        assert _shift_month('2026-11', 3) == '2027-02'
+
+
+class TestRecordAndSpend:
+    def test_create_bumps_workspace_and_project(self, app, scope):
+        ws, project = scope
+        _log(ws, project, cost=0.25)
+        _log(ws, project, cost=0.5)
+        _log(ws, cost=1.0)
+        assert BudgetCounterModel.spend('workspace', ws) == pytest.approx(1.75)
+        assert BudgetCounterModel.spend('project', project) == pytest.approx(0.75)
+        assert BudgetCounterModel.spend('project', str(project)) == pytest.approx(0.75)
+
+    def test_months_roll_over_by_key(self, app, db, scope):
+        ws, _ = scope
+        BudgetCounterModel.record({
+            'workspace_id': ws, 'cost_usd': 3.0, 'created_at': datetime(2026, 1, 31, 23, 59),
+        })
+        BudgetCounterModel.record({
+            'workspace_id': ws, 'cost_usd': 1.0, 'created_at': datetime(2026, 2, 1, 0, 1),
+        })
+        assert BudgetCounterModel.spend('workspace', ws, now=datetime(2026, 1, 15)) == 3.0
+        assert BudgetCounterModel.spend('workspace', ws, now=datetime(2026, 2, 15)) == 1.0
+        assert BudgetCounterModel.spend('workspace', ws, now=datetime(2026, 3, 1)) == 0.0
+
+    def test_zero_cost_and_unattributed_rows_are_skipped(self, app, db):
+        BudgetCounterModel.record({'workspace_id': ObjectId(), 'cost_usd': 0})
+        BudgetCounterModel.record({'cost_usd': 2.0})
+        assert db['budget_counters'].count_documents({}) == 0
+
+
+class TestCheck:
+    def test_no_budget_never_blocks(self, app, scope):
+        ws, project = scope
+        _log(ws, project, cost=100.0)
+        assert BudgetCounterModel.check(ws, project) is None
+
+    def test_workspace_budget(self, app, db, scope):
+        ws, _ = scope
+        db['workspaces'].update_one({'_id': ws}, {'$set': {'budget_mtd_usd': 2.0}})
+        _log(ws, cost=1.5)
+        assert BudgetCounterModel.check(ws) is None
+        _log(ws, cost=0.5)
+        exceeded = BudgetCounterModel.check(str(ws))
+        assert exceeded == {
+            'scope': 'workspace', 'owner_id': str(ws),
+            'budget_usd': 2.0, 'spend_usd': pytest.approx(2.0),
+        }
+
+    def test_project_budget(self, app, db, scope):
+        ws, project = scope
+        db['projects'].update_one({'_id': project}, {'$set': {'budget_mtd_usd': 1.0}})
+        _log(ws, cost=5.0)
+        assert BudgetCounterModel.check(ws, project) is None
+        _log(ws, project, cost=1.0)
+        assert BudgetCounterModel.check(ws, project)['scope'] == 'project'
+        # Other projects in the workspace are unaffected.
+        assert BudgetCounterModel.check(ws, ObjectId()) is None
+
+
+class TestReconcile:
+    def test_corrects_drift_from_usage_logs(self, app, db, scope):
+        ws, project = scope
+        _log(ws, project, cost=1.0)
+        # Rows written behind the model's back (scripts, imports).
+        db['usage_logs'].insert_one({
+            'workspace_id': ws, 'project_id': project, 'cost_usd': 2.0,
+            'created_at': datetime.utcnow(),
+        })
+        UsageRollupModel.rebuild()
+        assert BudgetCounterModel.spend('workspace', ws) == pytest.approx(1.0)
+
+        result = BudgetCounterModel.reconcile()
+        assert result['corrected'] == 2
+        assert BudgetCounterModel.spend('workspace', ws) == pytest.approx(3.0)
+        assert BudgetCounterModel.spend('project', project) == pytest.approx(3.0)
+        counter = db['budget_counters'].find_one({'scope': 'project'})
+        assert counter['workspace_id'] == ws
+
+        # Already in sync — nothing to write.
+        assert BudgetCounterModel.reconcile()['corrected'] == 0
+
+    def test_zeroes_counters_without_usage_and_prunes_old_months(self, app, db, scope):
+        ws, _ = scope
+        now = datetime.utcnow()
+        BudgetCounterModel.record({'workspace_id': ws, 'cost_usd': 4.0, 'created_at': now})
+        BudgetCounterModel.record({
+            'workspace_id': ws, 'cost_usd': 9.0,
+            'created_at': datetime(now.year - 1, now.month, 1),
+        })
+        result = BudgetCounterModel.reconcile(now=now)
+        assert result['pruned'] == 1
+        assert BudgetCounterModel.spend('workspace', ws, now=now) == 0.0
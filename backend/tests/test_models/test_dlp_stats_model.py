@@ -0,0 +1,144 @@
+"""Tests for app/models/dlp_stats.py — rollups fed by DLPEventModel writes."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.dlp_event import DLPEventModel
+from app.models.dlp_stats import DLPStatsModel, _escape_key, _unescape_key
+
+
+def _event(ws, user, *, sha, source='chat', action='warn', matches=None):
+    return DLPEventModel.create(
+        user_id=user,
+        workspace_id=ws,
+        project_id=None,
+        source=source,
+        source_ref={},
+        matches=matches if matches is not None else [
+            {'rule_id': 'email', 'severity': 'medium'},
+        ],
+        highest_action=action,
+        was_sent=True,
+        text_sha256=sha,
+        text_length=10,
+    )
+
+
+class TestKeys:
+    @pytest.mark.parametrize('key', ['email', 'custom:a.b', '$where', '100%.x', 'a%2Eb'])
+    def test_escape_roundtrip(self, key):
+        escaped = _escape_key(key)
+        assert '.' not in escaped
+        assert not escaped.startswith('$')
+        assert _unescape_key(escaped) == key
+
+    def test_increments_count_events_and_matches(self):
+        inc = DLPStatsModel._increments({
+            'source': 'chat', 'highest_action': 'block', 'user_id': 'u1',
+            'matches': [
+                {'rule_id': 'email', 'severity': 'medium'},
+                {'rule_id': 'email', 'severity': 'medium'},
+                {'rule_id': 'aws_access_key', 'severity': 'critical'},
+            ],
+        })
+        assert inc['total'] == 1
+        assert inc['by_source.chat'] == 1
+        assert inc['by_action.block'] == 1
+        assert inc['by_rule.email'] == 2
+        assert inc['by_severity.critical'] == 1
+
+
+class TestRollups:
+    def test_create_updates_workspace_stats(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        _event(ws, user, sha='a')
+        _event(ws, user, sha='b', source='workflow', action='block', matches=[
+            {'rule_id': 'aws_access_key', 'severity': 'critical'},
+        ])
+        stats = DLPStatsModel.workspace_stats(ws, days=7)
+        raw = DLPEventModel.aggregate_workspace_stats(ws, days=7)
+        for key in ('total', 'by_severity', 'by_source', 'daily'):
+            assert stats[key] == raw[key]
+        assert stats['total'] == 2
+        assert stats['by_source']['workflow'] == 1
+
+    def test_dedup_merge_does_not_double_count(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        _event(ws, user, sha='same')
+        _event(ws, user, sha='same', action='block')
+        stats = DLPStatsModel.global_stats(days=7)
+        assert stats['total'] == 1
+        assert stats['by_action'] == {'block': 1, 'require_confirm': 0, 'warn': 0}
+
+    def test_create_many_updates_rollups(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        DLPEventModel.create_many([
+            dict(user_id=user, workspace_id=ws, project_id=None, source='meeting',
+                 source_ref={'artifact': a}, matches=[{'rule_id': 'email', 'severity': 'medium'}],
+                 highest_action='warn', was_sent=True, text_sha256=a, text_length=1)
+            for a in ('one', 'two')
+        ])
+        assert DLPStatsModel.workspace_stats(ws)['by_source']['meeting'] == 2
+
+    def test_create_many_keeps_one_row_per_source_ref(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+
+        def item(sha, action, artifact):
+            return dict(user_id=user, workspace_id=ws, project_id=None, source='meeting',
+                        source_ref={'artifact': artifact},
+                        matches=[{'rule_id': 'email', 'severity': 'medium'}],
+                        highest_action=action, was_sent=False, text_sha256=sha,
+                        text_length=1)
+
+        out = DLPEventModel.create_many([
+            item('x', 'warn', 'one'), item('x', 'block', 'two'),
+            item('x', 'block', 'one'), item('y', 'warn', 'three'),
+        ])
+        # Same text, different items: own rows. A repeated item folds.
+        assert out[0] is out[2] and out[0]['highest_action'] == 'block'
+        assert len({doc['_id'] for doc in out}) == 3
+        assert [doc['source_ref']['artifact'] for doc in out] == ['one', 'two', 'one', 'three']
+
+        # A retry over the same item merges into its existing row.
+        again = DLPEventModel.create_many([item('x', 'warn', 'two'), item('x', 'warn', 'four')])
+        assert again[0]['_id'] == out[1]['_id']
+        assert again[1]['source_ref'] == {'artifact': 'four'}
+        assert DLPStatsModel.workspace_stats(ws)['by_source']['meeting'] == 4
+        assert DLPStatsModel.global_stats(days=7)['by_action']['block'] == 2
+
+    def test_rebuild_matches_incremental(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        for i in range(5):
+            _event(ws, user, sha=str(i))
+        before = DLPStatsModel.global_stats(days=7)
+        DLPStatsModel.get_collection().delete_many({})
+        assert DLPStatsModel.rebuild() == 1
+        assert DLPStatsModel.global_stats(days=7) == before
+
+    def test_rebuild_replaces_buckets_in_place(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        doc = _event(ws, user, sha='moved')
+        backdated = datetime.utcnow() - timedelta(days=3)
+        db['dlp_events'].update_one({'_id': doc['_id']}, {'$set': {'created_at': backdated}})
+        old_day = (datetime.utcnow() - timedelta(days=40)).strftime('%Y-%m-%d')
+        DLPStatsModel.get_collection().insert_one({
+            '_id': f'{ws}:{old_day}', 'workspace_id': ws, 'day': old_day, 'total': 9,
+        })
+
+        assert DLPStatsModel.rebuild(since=datetime.utcnow() - timedelta(days=7)) == 1
+        days = {b['day']: b['total'] for b in DLPStatsModel.get_collection().find()}
+        # Today's bucket had no events left and is gone; the one before
+        # ``since`` is untouched.
+        assert days == {backdated.strftime('%Y-%m-%d'): 1, old_day: 9}
+
+    def test_window_excludes_old_buckets(self, app, db):
+        ws, user = ObjectId(), ObjectId()
+        _event(ws, user, sha='new')
+        old_day = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d')
+        DLPStatsModel.get_collection().insert_one({
+            '_id': f'{ws}:{old_day}', 'workspace_id': ws, 'day': old_day, 'total': 9,
+        })
+        assert DLPStatsModel.workspace_stats(ws, days=7)['total'] == 1
+        assert DLPStatsModel.workspace_stats(ws, days=60)['total'] == 10
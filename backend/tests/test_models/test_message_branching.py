@@ -0,0 +1,243 @@
+"""Tests for copy-on-write branches in app/models/message.py."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.message import MessageModel
+
+
+def _conversation(db):
+    return ConversationModel.create(ObjectId(), str(ObjectId()), title='T')
+
+
+def _say(conv, content, branch_id='main'):
+    return MessageModel.create(conv['_id'], 'user', content, branch_id=branch_id)
+
+
+def _fork(conv, message, branch_id):
+    ConversationModel.add_branch(conv['_id'], {
+        'id': branch_id,
+        'parent_branch': message.get('branch_id', 'main'),
+        'branch_point_message_id': str(message['_id']),
+        **MessageModel.fork_point(message),
+    })
+
+
+def _contents(conv, branch_id):
+    return [m['content'] for m in MessageModel.find_by_conversation(conv['_id'], branch_id=branch_id)]
+
+
+class TestLineage:
+    def test_branch_writes_nothing_and_reads_parent_prefix(self, db):
+        conv = _conversation(db)
+        msgs = [_say(conv, f'm{i}') for i in range(5)]
+        before = db['messages'].count_documents({})
+
+        _fork(conv, msgs[2], 'b1')
+        assert db['messages'].count_documents({}) == before
+        _say(conv, 'b1-a', 'b1')
+        _say(conv, 'm5')
+
+        assert _contents(conv, 'b1') == ['m0', 'm1', 'm2', 'b1-a']
+        assert _contents(conv, 'main') == ['m0', 'm1', 'm2', 'm3', 'm4', 'm5']
+        context = MessageModel.get_context_messages(conv['_id'], limit=2, branch_id='b1')
+        assert [m['content'] for m in context] == ['m2', 'b1-a']
+
+    def test_nested_branches_and_find_up_to(self, db):
+        conv = _conversation(db)
+        m0, m1 = _say(conv, 'm0'), _say(conv, 'm1')
+        _fork(conv, m0, 'b1')
+        b = _say(conv, 'b1-a', 'b1')
+        _fork(conv, b, 'b2')
+        _say(conv, 'b2-a', 'b2')
+
+        assert _contents(conv, 'b2') == ['m0', 'b1-a', 'b2-a']
+        upto = MessageModel.find_up_to(conv['_id'], b['_id'], 'b2')
+        assert [m['content'] for m in upto] == ['m0', 'b1-a']
+
+    def test_legacy_copied_branch_reads_as_before(self, db):
+        conv = _conversation(db)
+        m0 = _say(conv, 'm0')
+        ConversationModel.add_branch(conv['_id'], {'id': 'old', 'parent_branch': 'main'})
+        MessageModel.copy_to_branch(m0, 'old')
+        _say(conv, 'old-a', 'old')
+        # Legacy main rows carry no branch_id at all.
+        db['messages'].insert_one({
+            'conversation_id': conv['_id'], 'role': 'user', 'content': 'bare',
+            'created_at': datetime.utcnow() + timedelta(seconds=1),
+        })
+
+        assert _contents(conv, 'old') == ['m0', 'old-a']
+        assert _contents(conv, 'main') == ['m0', 'bare']
+
+
+class TestCopyOnWrite:
+    def test_edit_inherited_message_copies_into_branch(self, db):
+        conv = _conversation(db)
+        m0, m1 = _say(conv, 'm0'), _say(conv, 'm1')
+        _fork(conv, m1, 'b1')
+        _say(conv, 'b1-a', 'b1')
+
+        own = MessageModel.claim_for_write(conv['_id'], m0, 'b1')
+        assert own['_id'] != m0['_id'] and own['branch_id'] == 'b1'
+        MessageModel.update_content(own['_id'], 'b1-edited')
+
+        assert _contents(conv, 'b1') == ['b1-edited', 'm1', 'b1-a']
+        assert _contents(conv, 'main') == ['m0', 'm1']
+        assert ConversationModel.get_branch(conv['_id'], 'b1').get('fork_at') is None
+
+    def test_parent_truncation_keeps_child_prefix(self, db):
+        conv = _conversation(db)
+        m0, m1, m2 = _say(conv, 'm0'), _say(conv, 'm1'), _say(conv, 'm2')
+        _fork(conv, m2, 'b1')
+        _fork(conv, m0, 'b0')
+
+        MessageModel.delete_after_message(conv['_id'], m0['_id'], branch_id='main')
+
+        assert _contents(conv, 'main') == ['m0']
+        assert _contents(conv, 'b1') == ['m0', 'm1', 'm2']
+        # b0 forked at the surviving message and keeps sharing it.
+        assert ConversationModel.get_branch(conv['_id'], 'b0').get('fork_at') is not None
+        assert _contents(conv, 'b0') == ['m0']
+
+    def test_truncating_inside_inherited_prefix(self, db):
+        conv = _conversation(db)
+        m0, m1 = _say(conv, 'm0'), _say(conv, 'm1')
+        _fork(conv, m1, 'b1')
+        _say(conv, 'b1-a', 'b1')
+
+        MessageModel.delete_after_message(conv['_id'], m0['_id'], branch_id='b1')
+
+        assert _contents(conv, 'b1') == ['m0']
+        assert _contents(conv, 'main') == ['m0', 'm1']
+
+    def test_deleting_parent_branch_keeps_child(self, db):
+        conv = _conversation(db)
+        m0 = _say(conv, 'm0')
+        _fork(conv, m0, 'b1')
+        b = _say(conv, 'b1-a', 'b1')
+        _fork(conv, b, 'b2')
+
+        MessageModel.delete_by_branch(conv['_id'], 'b1')
+        ConversationModel.remove_branch(conv['_id'], 'b1')
+
+        assert _contents(conv, 'b2') == ['m0', 'b1-a']
+
+
+def _legacy(db, conv, content, seconds):
+    db['messages'].insert_one({
+        'conversation_id': conv['_id'], 'role': 'user', 'content': content,
+        'created_at': datetime.utcnow() + timedelta(seconds=seconds),
+    })
+
+
+def _nodes(plan):
+    nodes = [plan] if plan.get('stage') else []
+    for key in ('inputStage', 'queryPlan'):
+        if isinstance(plan.get(key), dict):
+            nodes += _nodes(plan[key])
+    for child in plan.get('inputStages') or []:
+        nodes += _nodes(child)
+    return nodes
+
+
+class TestBranchIdBackfill:
+    def test_backfill_is_resumable_and_simplifies_main_query(self, db):
+        conv = _conversation(db)
+        for i in range(5):
+            _legacy(db, conv, f'old{i}', i)
+        _say(conv, 'new')
+        assert MessageModel._own_clause('main') == {'branch_id': {'$in': ['main', None]}}
+
+        partial = MessageModel.backfill_branch_ids(batch_size=2, max_batches=1)
+        assert partial == {'updated': 2, 'batches': 1, 'complete': False}
+        assert db['messages'].count_documents({'branch_id': None}) == 3
+
+        rest = MessageModel.backfill_branch_ids(batch_size=2)
+        assert rest['updated'] == 3 and rest['complete']
+        assert db['messages'].count_documents({'branch_id': None}) == 0
+        assert MessageModel._own_clause('main') == {'branch_id': 'main'}
+        assert _contents(conv, 'main') == ['old0', 'new', 'old1', 'old2', 'old3', 'old4']
+        assert MessageModel.backfill_branch_ids()['updated'] == 0
+
+    def test_writes_always_name_a_branch(self, db):
+        conv = _conversation(db)
+        msg = MessageModel.create(conv['_id'], 'user', 'x', branch_id=None)
+        err = MessageModel.create_error_message(conv['_id'], 'boom', branch_id=None)
+        assert msg['branch_id'] == 'main' and err['branch_id'] == 'main'
+        assert db['messages'].count_documents({'branch_id': None}) == 0
+
+    def test_main_branch_read_uses_index_without_sort(self, db):
+        conv = _conversation(db)
+        for i in range(3):
+            _say(conv, f'm{i}')
+        MessageModel.backfill_branch_ids()
+        MessageModel.create_indexes()
+        query = MessageModel._lineage_query(conv['_id'], 'main')
+        try:
+            plan = db['messages'].find(query).sort(MessageModel.SORT).explain()
+        except (AttributeError, NotImplementedError):
+            pytest.skip('explain() needs a real MongoDB')
+        nodes = _nodes(plan['queryPlanner']['winningPlan'])
+        stages = [node['stage'] for node in nodes]
+        assert 'SORT' not in stages and 'OR' not in stages
+        # One scan of the (conversation_id, branch_id, created_at, seq) index,
+        # with every predicate answered by its bounds.
+        scans = [node for node in nodes if node['stage'] == 'IXSCAN']
+        assert len(scans) == 1
+        assert list(scans[0]['keyPattern'])[:4] == [
+            'conversation_id', 'branch_id', 'created_at', 'seq',
+        ]
+        assert all('filter' not in node for node in nodes if node['stage'] == 'FETCH')
+
+
+class TestSequence:
+    def test_same_millisecond_writes_keep_insertion_order(self, db, monkeypatch):
+        from app.models import message as message_module
+        conv = _conversation(db)
+        now = message_module.time.time_ns()
+        monkeypatch.setattr(message_module.time, 'time_ns', lambda: now)
+        msgs = [_say(conv, f'm{i}') for i in range(3)]
+        msgs.append(MessageModel.create_error_message(conv['_id'], 'boom'))
+        assert len({m['created_at'] for m in msgs}) == 1
+        assert [m['seq'] for m in msgs] == sorted({m['seq'] for m in msgs})
+        assert _contents(conv, 'main') == ['m0', 'm1', 'm2', '']
+        # No per-message round trip on the conversation document.
+        assert 'seq_counter' not in db['conversations'].find_one({'_id': conv['_id']})
+
+    def test_clock_stepping_back_never_reorders(self, db, monkeypatch):
+        from app.models import message as message_module
+        conv = _conversation(db)
+        base = message_module.time.time_ns()
+        times = iter([base, base - 5_000_000_000, base + 1_000_000])
+        monkeypatch.setattr(message_module.time, 'time_ns', lambda: next(times))
+        msgs = [_say(conv, f'm{i}') for i in range(3)]
+        positions = [message_module._order(MessageModel._position(m)) for m in msgs]
+        assert positions == sorted(positions) and len(set(positions)) == 3
+        assert _contents(conv, 'main') == ['m0', 'm1', 'm2']
+
+    def test_backfill_seq_keeps_order(self, db):
+        conv = _conversation(db)
+        at = datetime(2025, 1, 1, 12, 0, 0)
+        db['messages'].insert_many([
+            {'conversation_id': conv['_id'], 'role': 'user', 'content': 'a',
+             'branch_id': 'main', 'created_at': at, 'seq': 2},
+            {'conversation_id': conv['_id'], 'role': 'assistant', 'content': 'err',
+             'branch_id': 'main', 'created_at': at},
+            {'conversation_id': conv['_id'], 'role': 'user', 'content': 'b',
+             'branch_id': 'main', 'created_at': at, 'seq': 3},
+        ])
+        db['conversations'].update_one({'_id': conv['_id']}, {'$set': {'seq_counter': 3}})
+        _say(conv, 'new')
+        before = _contents(conv, 'main')
+        assert before == ['err', 'a', 'b', 'new']
+
+        assert MessageModel.backfill_seq(batch_size=1, max_batches=1)['complete'] is False
+        result = MessageModel.backfill_seq()
+        assert result['complete']
+        assert db['messages'].count_documents({'seq': None}) == 0
+        assert _contents(conv, 'main') == before
+        assert 'seq_counter' not in db['conversations'].find_one({'_id': conv['_id']})
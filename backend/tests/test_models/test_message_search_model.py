@@ -0,0 +1,74 @@
+"""Tests for app/models/message_search.py — the per-user message index."""
+
+from bson import ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.message import MessageModel
+from app.models.message_search import MessageSearchModel
+
+
+def _conversation(user_id):
+    return ConversationModel.create(user_id, str(ObjectId()), title='T')
+
+
+def _ids(hits):
+    return [h['message_id'] for h in hits]
+
+
+class TestIndexing:
+    def test_writes_feed_the_index_and_ranking(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        short = MessageModel.create(conv['_id'], 'user', 'deploy the backend')
+        long_ = MessageModel.create(conv['_id'], 'user', 'we talked about many things ' * 5 + 'deploy')
+        MessageModel.create(conv['_id'], 'user', 'nothing relevant here')
+        # Another user's messages never show up.
+        MessageModel.create(_conversation(ObjectId())['_id'], 'user', 'deploy deploy')
+
+        assert _ids(MessageSearchModel.search(user, 'deploying')) == [short['_id'], long_['_id']]
+        assert _ids(MessageSearchModel.search(user, 'deplo*')) == [short['_id'], long_['_id']]
+
+    def test_phrase_must_match_in_order(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        hit = MessageModel.create(conv['_id'], 'user', 'please restart the server now')
+        MessageModel.create(conv['_id'], 'user', 'the server will restart')
+        assert _ids(MessageSearchModel.search(user, '"restart the server"')) == [hit['_id']]
+
+    def test_persian_variants_match(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        hit = MessageModel.create(conv['_id'], 'user', 'این كتاب‌ها را می‌خواهم')
+        assert _ids(MessageSearchModel.search(user, 'کتابها')) == [hit['_id']]
+        assert _ids(MessageSearchModel.search(user, 'میخواهم')) == [hit['_id']]
+
+    def test_edit_and_delete_keep_index_in_step(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        msg = MessageModel.create(conv['_id'], 'user', 'alpha')
+        MessageModel.update_with_edit_history(msg['_id'], 'beta', [])
+        assert MessageSearchModel.search(user, 'alpha') == []
+        assert _ids(MessageSearchModel.search(user, 'beta')) == [msg['_id']]
+
+        MessageModel.delete_by_conversation(conv['_id'])
+        assert MessageSearchModel.search(user, 'beta') == []
+        assert db['message_search_docs'].count_documents({}) == 0
+        assert db['message_search_stats'].find_one({'_id': user})['docs'] == 0
+
+    def test_branch_copies_return_once(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        msg = MessageModel.create(conv['_id'], 'user', 'gamma')
+        MessageModel.copy_to_branch(msg, 'b1')
+        assert len(MessageSearchModel.search(user, 'gamma')) == 1
+
+    def test_rebuild_marks_ready(self, db):
+        user = ObjectId()
+        conv = _conversation(user)
+        db['messages'].insert_one({
+            'conversation_id': conv['_id'], 'role': 'user', 'content': 'imported row',
+        })
+        assert not MessageSearchModel.is_ready()
+        assert MessageSearchModel.rebuild() == 1
+        assert MessageSearchModel.is_ready()
+        assert len(MessageSearchModel.search(user, 'imported')) == 1
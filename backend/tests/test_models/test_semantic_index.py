@@ -0,0 +1,94 @@
+"""Tests for semantic search: app/services/semantic_search.py and
+app/models/vector_index.py (hashing embedder, no network)."""
+
+import pytest
+from bson import ObjectId
+
+pytest.importorskip('numpy')
+
+from app.models.conversation import ConversationModel  # noqa: E402
+from app.models.knowledge_item import KnowledgeItemModel  # noqa: E402
+from app.models.message import MessageModel  # noqa: E402
+from app.models.vector_index import VectorIndexModel, invalidate_cache  # noqa: E402
+from app.services import semantic_search  # noqa: E402
+
+
+@pytest.fixture
+def semantic(app, db):
+    # No worker thread: the tests index queued documents with drain().
+    app.config.update(SEMANTIC_SEARCH_ENABLED=True, SEMANTIC_INDEX_WORKER=False,
+                      EMBEDDINGS_PROVIDER='hashing', EMBEDDINGS_DIM=256)
+    invalidate_cache()
+    yield
+    semantic_search.drain()
+    app.config.update(SEMANTIC_SEARCH_ENABLED=False, SEMANTIC_INDEX_WORKER=True)
+    invalidate_cache()
+
+
+def _ids(hits):
+    return [h['id'] for h in hits]
+
+
+class TestIndexing:
+    def test_writes_are_queued_then_searchable(self, db, semantic):
+        user = ObjectId()
+        conv = ConversationModel.create(user, str(ObjectId()), title='T')
+        deploy = MessageModel.create(conv['_id'], 'user', 'deploying the backend to kubernetes')
+        MessageModel.create(conv['_id'], 'user', 'a recipe for lemon cake')
+        assert VectorIndexModel.get_collection().count_documents({}) == 0
+
+        assert semantic_search.drain() == 2
+        shard = VectorIndexModel.get_collection().find_one({'user_id': user})
+        assert shard['count'] == 2 and len(shard['items'][0]['v']) == 256 * 2  # float16
+
+        hits = semantic_search.search(user, 'how to deploy the backend', limit=1)
+        assert _ids(hits) == [deploy['_id']]
+        assert semantic_search.search(ObjectId(), 'deploy') == []
+
+    def test_edit_and_delete_update_vectors(self, db, semantic):
+        user = ObjectId()
+        conv = ConversationModel.create(user, str(ObjectId()), title='T')
+        msg = MessageModel.create(conv['_id'], 'user', 'lemon cake')
+        semantic_search.drain()
+        MessageModel.update_with_edit_history(msg['_id'], 'kubernetes cluster', [])
+        semantic_search.drain()
+        shard = VectorIndexModel.get_collection().find_one({'user_id': user})
+        assert shard['count'] == 1
+
+        MessageModel.delete(msg['_id'])
+        assert semantic_search.search(user, 'kubernetes') == []
+        assert VectorIndexModel.get_collection().find_one({'user_id': user})['count'] == 0
+
+    def test_knowledge_items_and_kind_filter(self, db, semantic):
+        user = ObjectId()
+        item = KnowledgeItemModel.create(str(user), 'chat', content='postgres replication lag', title='DB')
+        conv = ConversationModel.create(user, str(ObjectId()), title='T')
+        MessageModel.create(conv['_id'], 'user', 'postgres replication')
+        semantic_search.drain()
+        hits = semantic_search.search(user, 'replication', kinds={'knowledge'})
+        assert _ids(hits) == [item['_id']]
+
+    def test_rebuild(self, db, semantic):
+        user = ObjectId()
+        conv = ConversationModel.create(user, str(ObjectId()), title='T')
+        db['messages'].insert_one({'conversation_id': conv['_id'], 'role': 'user', 'content': 'imported'})
+        assert semantic_search.rebuild() == 1
+
+
+class TestRoute:
+    def test_disabled_503(self, client, auth_headers):
+        r = client.get('/api/conversations/search/semantic?q=x', headers=auth_headers)
+        assert r.status_code == 503
+
+    def test_best_hit_per_conversation(self, app, db, client, test_user, auth_headers, semantic):
+        with app.app_context():
+            conv = ConversationModel.create(test_user['_id'], str(ObjectId()), title='Infra')
+            MessageModel.create(conv['_id'], 'user', 'deploy the backend')
+            MessageModel.create(conv['_id'], 'assistant', 'to deploy the backend run make deploy')
+            other = ConversationModel.create(ObjectId(), str(ObjectId()), title='Not mine')
+            MessageModel.create(other['_id'], 'user', 'deploy the backend')
+            semantic_search.drain()
+        r = client.get('/api/conversations/search/semantic?q=deploy%20backend', headers=auth_headers)
+        assert r.status_code == 200
+        [hit] = r.get_json()['results']
+        assert hit['conversation_title'] == 'Infra' and hit['kind'] == 'message'
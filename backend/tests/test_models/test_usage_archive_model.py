@@ -0,0 +1,125 @@
+"""Tests for app/models/usage_archive.py — archiving must not change any read."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models import usage_archive
+from app.models.usage_archive import UsageArchiveModel
+from app.models.usage_log import UsageLogModel
+from app.models.usage_rollup import UsageRollupModel
+from app.services.workspace_cascade import cascade_delete
+
+
+T0 = datetime(2026, 1, 1)
+NOW = datetime(2026, 4, 10)
+
+
+@pytest.fixture
+def seeded(db):
+    rng = random.Random(11)
+    ws, other_ws = ObjectId(), ObjectId()
+    users = [ObjectId() for _ in range(3)]
+    rows = []
+    for _ in range(400):
+        prompt, completion = rng.randint(0, 900), rng.randint(0, 300)
+        model = rng.choice(['openai/gpt-5.2', 'anthropic/claude-x'])
+        rows.append({
+            'user_id': rng.choice(users),
+            'workspace_id': rng.choice([ws, other_ws]),
+            'model': model, 'model_id': model,
+            'feature': rng.choice(['chat', None]),
+            'prompt_tokens': prompt, 'completion_tokens': completion,
+            'cost_usd': round(rng.random() / 10, 6),
+            'response_usage': {'prompt_tokens': prompt, 'raw': 'x' * 200},
+            'created_at': T0 + timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+        })
+    # Rows inside the partial edge hours of the windowed reads below: only
+    # row-level data can answer those.
+    for created_at in (datetime(2026, 1, 20, 7, 30), datetime(2026, 2, 3, 16, 10)):
+        rows.append({**rows[0], 'workspace_id': ws, 'created_at': created_at})
+    db['usage_logs'].insert_many(rows)
+    UsageRollupModel.rebuild()
+    return ws, users
+
+
+def _reads(ws, users):
+    edge = (datetime(2026, 1, 20, 7, 13), datetime(2026, 2, 3, 16, 41))
+    return {
+        'by_model': UsageLogModel.aggregate_by('model', from_=edge[0], to=edge[1]),
+        'by_day': UsageLogModel.aggregate_daily(ws, start=edge[0], end=edge[1]),
+        'spend': UsageLogModel.aggregate_workspace_spend(ws, start=edge[0], end=edge[1]),
+        'by_user': UsageLogModel.aggregate_user_spend(ws),
+        'total': UsageLogModel.get_user_total_cost(users[0]),
+        'open': UsageLogModel.aggregate_by('feature'),
+    }
+
+
+def _normalise(value):
+    if isinstance(value, float):
+        return pytest.approx(value)
+    if isinstance(value, dict):
+        return {k: _normalise(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return sorted((_normalise(v) for v in value), key=repr)
+    return value
+
+
+class TestArchive:
+    def test_moves_old_months_without_changing_reads(self, db, seeded):
+        ws, users = seeded
+        before = _reads(ws, users)
+
+        result = UsageArchiveModel.archive(keep_months=1, now=NOW)
+        assert result['months'] == ['2026-01', '2026-02']
+        assert result['horizon'] == datetime(2026, 3, 1)
+        assert db['usage_logs'].count_documents({'created_at': {'$lt': datetime(2026, 3, 1)}}) == 0
+        archived = sum(c['count'] for c in db['usage_logs_archive'].find({'count': {'$exists': True}}))
+        assert archived == result['archived'] > 0
+        assert archived + db['usage_logs'].count_documents({}) == 402
+
+        assert _normalise(_reads(ws, users)) == _normalise(before)
+        # A full rebuild stops at the horizon instead of wiping the folded months.
+        UsageRollupModel.rebuild()
+        assert _normalise(_reads(ws, users)) == _normalise(before)
+
+    def test_chunks_are_columnar_and_drop_response_usage(self, db, seeded):
+        UsageArchiveModel.archive(keep_months=1, now=NOW)
+        chunk = db['usage_logs_archive'].find_one({'month': '2026-01'})
+        rows = UsageArchiveModel.unpack(chunk)
+        assert len(rows) == chunk['count']
+        assert set(rows[0]) == set(usage_archive.ARCHIVED_FIELDS)
+        assert isinstance(rows[0]['_id'], ObjectId)
+        assert chunk['ts_min'] <= rows[0]['created_at'] <= chunk['ts_max']
+
+    def test_idempotent_and_picks_up_late_rows(self, db, seeded):
+        UsageArchiveModel.archive(keep_months=1, now=NOW)
+        assert UsageArchiveModel.archive(keep_months=1, now=NOW)['archived'] == 0
+
+        ws, users = seeded
+        UsageLogModel.create(user_id=users[0], workspace_id=ws, model='openai/gpt-5.2',
+                             cost_usd=5.0)
+        db['usage_logs'].update_one({'cost_usd': 5.0},
+                                    {'$set': {'created_at': datetime(2026, 1, 5, 10, 30)}})
+        late = UsageArchiveModel.archive(keep_months=1, now=NOW)
+        assert late['archived'] == 1
+
+    def test_skipped_until_rollups_ready(self, db, seeded):
+        db['usage_rollups'].delete_one({'_id': 'meta:ready'})
+        from app.models.usage_rollup import invalidate_ready_cache
+        invalidate_ready_cache()
+        assert UsageArchiveModel.archive(keep_months=1, now=NOW)['archived'] == 0
+        assert db['usage_logs'].count_documents({}) == 402
+
+
+class TestCascade:
+    def test_workspace_delete_purges_archived_rows(self, db, seeded):
+        ws, _ = seeded
+        UsageArchiveModel.archive(keep_months=1, now=NOW)
+        counts = cascade_delete(ws)
+        assert counts['usage_logs_archive'] > 0
+        for chunk in db['usage_logs_archive'].find({'count': {'$exists': True}}):
+            assert ws not in chunk['workspace_ids']
+            assert all(row['workspace_id'] != ws for row in UsageArchiveModel.unpack(chunk))
@@ -0,0 +1,189 @@
+"""Tests for app/models/usage_rollup.py — rollup reads must equal raw scans."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.usage_log import UsageLogModel
+from app.models.usage_rollup import UsageRollupModel, invalidate_ready_cache
+
+
+T0 = datetime(2026, 3, 10, 0, 0)
+
+
+def _insert_raw(db, rng, ws, users, projects, created_at):
+    prompt, completion = rng.randint(0, 900), rng.randint(0, 300)
+    model = rng.choice(['openai/gpt-5.2', 'anthropic/claude-x', 'google/gemini'])
+    db['usage_logs'].insert_one({
+        'user_id': rng.choice(users),
+        'workspace_id': ws,
+        'project_id': rng.choice(projects),
+        'model': model,
+        'model_id': model,
+        'feature': rng.choice(['chat', 'meeting', None]),
+        'origin': rng.choice(['web', 'workflow']),
+        'prompt_tokens': prompt,
+        'completion_tokens': completion,
+        'cost_usd': round(rng.random() / 10, 6),
+        'created_at': created_at,
+    })
+
+
+def _raw_and_rolled(call):
+    """Run ``call`` once on the raw-scan path and once on the rollup path."""
+    col = UsageRollupModel.get_collection()
+    marker = col.find_one({'_id': 'meta:ready'})
+    col.delete_one({'_id': 'meta:ready'})
+    invalidate_ready_cache()
+    raw = call()
+    col.insert_one(marker)
+    invalidate_ready_cache()
+    return raw, call()
+
+
+def _normalise(rows):
+    if isinstance(rows, (int, float)):
+        return pytest.approx(rows)
+    return sorted(
+        (tuple(sorted((k, pytest.approx(v) if isinstance(v, float) else v)
+                      for k, v in row.items())) for row in rows),
+        key=repr,
+    )
+
+
+@pytest.fixture
+def seeded(db):
+    rng = random.Random(7)
+    ws, other_ws = ObjectId(), ObjectId()
+    users = [ObjectId() for _ in range(3)]
+    projects = [ObjectId(), ObjectId(), None]
+    for _ in range(300):
+        created_at = T0 + timedelta(minutes=rng.randint(0, 6 * 24 * 60))
+        _insert_raw(db, rng, rng.choice([ws, ws, other_ws]), users, projects, created_at)
+    UsageRollupModel.rebuild()
+    return ws, users
+
+
+class TestPlan:
+    def test_open_window_uses_day_buckets_only(self):
+        rollup, raw = UsageRollupModel._plan(None, None)
+        assert rollup == [{'granularity': 'day'}]
+        assert raw == []
+
+    def test_short_window_is_raw(self):
+        start = T0 + timedelta(minutes=10)
+        rollup, raw = UsageRollupModel._plan(start, start + timedelta(minutes=70))
+        assert rollup == []
+        assert raw == [{'created_at': {'$gte': start, '$lte': start + timedelta(minutes=70)}}]
+
+    def test_ragged_window_splits_days_hours_and_edges(self):
+        start = T0 + timedelta(hours=5, minutes=30)
+        end = T0 + timedelta(days=3, hours=2, minutes=15)
+        rollup, raw = UsageRollupModel._plan(start, end)
+        assert {'granularity': 'day', 'ts': {'$gte': T0 + timedelta(days=1),
+                                              '$lt': T0 + timedelta(days=3)}} in rollup
+        assert {'granularity': 'hour', 'ts': {'$gte': T0 + timedelta(hours=6),
+                                               '$lt': T0 + timedelta(days=1)}} in rollup
+        assert {'granularity': 'hour', 'ts': {'$gte': T0 + timedelta(days=3),
+                                               '$lt': T0 + timedelta(days=3, hours=2)}} in rollup
+        assert raw == [
+            {'created_at': {'$gte': start, '$lt': T0 + timedelta(hours=6)}},
+            {'created_at': {'$gte': T0 + timedelta(days=3, hours=2), '$lte': end}},
+        ]
+
+
+class TestRollupsMatchRaw:
+    WINDOWS = [
+        (None, None),
+        (T0 + timedelta(hours=5, minutes=30), T0 + timedelta(days=3, hours=2, minutes=15)),
+        (T0 + timedelta(days=1), T0 + timedelta(days=2)),
+        (T0 + timedelta(hours=13, minutes=1), T0 + timedelta(hours=13, minutes=59)),
+        (T0 + timedelta(days=2, seconds=1), None),
+    ]
+
+    @pytest.mark.parametrize('start,end', WINDOWS)
+    def test_workspace_aggregations(self, app, seeded, start, end):
+        ws, _ = seeded
+        for fn in (
+            UsageLogModel.aggregate_workspace_spend,
+            UsageLogModel.aggregate_user_spend,
+            UsageLogModel.aggregate_project_spend,
+            UsageLogModel.aggregate_model_spend,
+        ):
+            raw, rolled = _raw_and_rolled(lambda: fn(ws, start=start, end=end))
+            assert _normalise(rolled) == _normalise(raw), fn.__name__
+        raw, rolled = _raw_and_rolled(lambda: UsageLogModel.aggregate_daily(ws, start=start, end=end))
+        assert [r['date'] for r in rolled] == [r['date'] for r in raw]
+        assert _normalise(rolled) == _normalise(raw)
+
+    @pytest.mark.parametrize('group_by', ['feature', 'model', 'user', 'day'])
+    @pytest.mark.parametrize('start,end', WINDOWS[:3])
+    def test_aggregate_by(self, app, seeded, group_by, start, end):
+        _, users = seeded
+        for user_id in (None, users[0]):
+            raw, rolled = _raw_and_rolled(lambda: UsageLogModel.aggregate_by(
+                group_by, user_id=user_id, from_=start, to=end,
+            ))
+            assert _normalise(rolled) == _normalise(raw)
+
+    def test_create_updates_rollups_incrementally(self, app, seeded):
+        ws, users = seeded
+        for i in range(4):
+            UsageLogModel.create(
+                user_id=users[i % 2], workspace_id=ws, model='openai/gpt-5.2',
+                prompt_tokens=10, completion_tokens=5, cost_usd=0.01, feature='chat',
+            )
+        raw, rolled = _raw_and_rolled(lambda: UsageLogModel.total_messages_this_month(ws))
+        assert rolled == raw >= 4
+        raw, rolled = _raw_and_rolled(lambda: UsageLogModel.aggregate_user_spend(ws))
+        assert _normalise(rolled) == _normalise(raw)
+
+    def test_rebuild_since_is_idempotent(self, app, seeded):
+        ws, _ = seeded
+        before = UsageLogModel.aggregate_model_spend(ws)
+        UsageRollupModel.rebuild(since=T0 + timedelta(days=3, hours=4))
+        assert _normalise(UsageLogModel.aggregate_model_spend(ws)) == _normalise(before)
+
+    def test_reads_fall_back_to_raw_until_rebuilt(self, app, db):
+        ws = ObjectId()
+        _insert_raw(db, random.Random(1), ws, [ObjectId()], [None], T0)
+        assert UsageRollupModel.is_ready() is False
+        assert UsageLogModel.aggregate_user_spend(ws)[0]['count'] == 1
+
+    def test_ready_flag_is_cached_per_process(self, app, db, seeded):
+        assert UsageRollupModel.is_ready() is True
+        # The marker is never removed in production; a cached hit does not
+        # go back to Mongo.
+        db['usage_rollups'].delete_one({'_id': 'meta:ready'})
+        assert UsageRollupModel.is_ready() is True
+        invalidate_ready_cache()
+        assert UsageRollupModel.is_ready() is False
+
+
+class TestScopedRebuild:
+    def test_only_touches_one_workspace(self, app, db, seeded):
+        ws, _ = seeded
+        other = [r for r in db['usage_rollups'].find({'workspace_id': {'$ne': ws}})
+                 if r['_id'] != 'meta:ready']
+        # Backdate one of ``ws``'s rows behind the rollups' back.
+        row = db['usage_logs'].find_one({'workspace_id': ws})
+        db['usage_logs'].update_one(
+            {'_id': row['_id']}, {'$set': {'created_at': T0 - timedelta(days=1)}},
+        )
+
+        UsageRollupModel.rebuild(since=T0 - timedelta(days=1), workspace_id=ws)
+
+        after = [r for r in db['usage_rollups'].find({'workspace_id': {'$ne': ws}})
+                 if r['_id'] != 'meta:ready']
+        assert sorted(after, key=lambda r: r['_id']) == sorted(other, key=lambda r: r['_id'])
+        raw, rolled = _raw_and_rolled(lambda: UsageLogModel.aggregate_daily(ws))
+        assert _normalise(rolled) == _normalise(raw)
+
+    def test_does_not_mark_rollups_ready(self, app, db):
+        ws = ObjectId()
+        _insert_raw(db, random.Random(2), ws, [ObjectId()], [None], T0)
+        assert UsageRollupModel.rebuild(workspace_id=ws) == 2
+        assert db['usage_rollups'].find_one({'_id': 'meta:ready'}) is None
+        assert UsageRollupModel.is_ready() is False
@@ -274,3 +274,86 @@ class TestStreamUsageRecording:
 
         # _record_usage no-ops when response_usage is None
         assert _count_usage_logs(db) == 0
+
+
+# ---------------------------------------------------------------------------
+# (e) Budget pre-flight — exhausted budgets never reach OpenRouter
+# ---------------------------------------------------------------------------
+
+class TestBudgetPreflight:
+    @pytest.fixture
+    def over_budget(self, app, db, test_user):
+        ws = ObjectId()
+        db['workspaces'].insert_one({'_id': ws, 'name': 'W', 'budget_mtd_usd': 1.0})
+        with app.app_context():
+            from app.models.usage_log import UsageLogModel
+            UsageLogModel.create(user_id=test_user['_id'], workspace_id=ws, cost_usd=1.5)
+        return str(test_user['_id']), str(ws)
+
+    def test_sync_returns_402_without_calling_openrouter(self, app, db, over_budget):
+        user_id, wid = over_budget
+        with app.app_context():
+            from app.services.openrouter_service import OpenRouterService
+
+            with patch('requests.post') as post:
+                result = OpenRouterService.chat_completion(
+                    messages=[{'role': 'user', 'content': 'Hi'}],
+                    model='openai/gpt-test',
+                    user_id=user_id,
+                    workspace_id=wid,
+                )
+        post.assert_not_called()
+        assert result['error']['code'] == 402
+        assert result['error']['budget']['scope'] == 'workspace'
+        assert _count_usage_logs(db) == 1
+
+    def test_stream_yields_single_402_chunk(self, app, db, over_budget):
+        user_id, wid = over_budget
+        with app.app_context():
+            from app.services.openrouter_service import OpenRouterService
+
+            with patch('requests.post') as post:
+                chunks = list(OpenRouterService.chat_completion(
+                    messages=[{'role': 'user', 'content': 'Hi'}],
+                    model='stream/model',
+                    stream=True,
+                    user_id=user_id,
+                    workspace_id=wid,
+                ))
+        post.assert_not_called()
+        assert len(chunks) == 1
+        assert chunks[0]['error']['code'] == 402
+
+    def test_under_budget_calls_through(self, app, db, test_user):
+        ws = ObjectId()
+        db['workspaces'].insert_one({'_id': ws, 'name': 'W', 'budget_mtd_usd': 10.0})
+        with app.app_context():
+            from app.services.openrouter_service import OpenRouterService
+
+            mock_resp = _sync_response('openai/gpt-test', 10, 5, cost=0.5)
+            with patch('requests.post', return_value=mock_resp) as post:
+                result = OpenRouterService.chat_completion(
+                    messages=[{'role': 'user', 'content': 'Hi'}],
+                    model='openai/gpt-test',
+                    user_id=str(test_user['_id']),
+                    workspace_id=str(ws),
+                )
+        post.assert_called_once()
+        assert 'error' not in result
+
+    def test_counter_read_failure_fails_open(self, app, db, over_budget):
+        user_id, wid = over_budget
+        with app.app_context():
+            from app.services.openrouter_service import OpenRouterService
+
+            mock_resp = _sync_response('openai/gpt-test', 10, 5, cost=0.5)
+            with patch('app.models.budget_counter.BudgetCounterModel.check',
+                       side_effect=RuntimeError('mongo down')), \
+                    patch('requests.post', return_value=mock_resp) as post:
+                OpenRouterService.chat_completion(
+                    messages=[{'role': 'user', 'content': 'Hi'}],
+                    model='openai/gpt-test',
+                    user_id=user_id,
+                    workspace_id=wid,
+                )
+        post.assert_called_once()
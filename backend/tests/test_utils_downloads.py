@@ -0,0 +1,26 @@
+"""Tests for app/utils/downloads.py — streamed export responses."""
+
+from datetime import datetime
+
+import pytest
+
+from app.utils import downloads
+
+
+def test_parse_date():
+    assert downloads.parse_date('') is None
+    assert downloads.parse_date('2024-03-01') == datetime(2024, 3, 1)
+    with pytest.raises(ValueError, match='invalid date: soon'):
+        downloads.parse_date('soon')
+
+
+def test_attachment_headers(app):
+    with app.test_request_context():
+        response = downloads.attachment(iter(['a', 'b']), 'out.csv', 'text/csv',
+                                        headers={'Vary': 'Accept-Encoding'})
+        assert response.headers['Content-Disposition'] == 'attachment; filename="out.csv"'
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert response.headers['X-Accel-Buffering'] == 'no'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.mimetype == 'text/csv'
+        assert response.get_data() == b'ab'
@@ -0,0 +1,133 @@
+"""Tests for app/utils/field_compression.py and the models that use it."""
+
+import pytest
+from bson import Binary, ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.meeting_transcript import MeetingTranscriptModel
+from app.models.message import MessageModel
+from app.models.message_search import MessageSearchModel
+from app.models.workflow_run import WorkflowRunModel
+from app.utils import field_compression
+
+LONG = 'the quarterly deployment report covers rollout and rollback steps. ' * 40
+
+
+@pytest.fixture
+def compressing(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'FIELD_COMPRESSION', True)
+    monkeypatch.setitem(app.config, 'FIELD_COMPRESSION_MIN_BYTES', 512)
+
+
+def _message(user_id, content):
+    conv = ConversationModel.create(user_id, str(ObjectId()), title='T')
+    return MessageModel.create(conv['_id'], 'assistant', content)
+
+
+class TestCodec:
+    def test_round_trips(self):
+        words = [{'text': 'سلام', 'start': 0.5, 'speaker_id': 's1'}] * 50
+        for value in (LONG, words, {'words': words}):
+            packed = field_compression.encode(value)
+            assert isinstance(packed, Binary) and len(packed) < len(str(value))
+            assert field_compression.decode(packed) == value
+
+    def test_leaves_small_and_other_values_alone(self):
+        assert field_compression.encode('short', min_bytes=512) is None
+        assert field_compression.encode(42) is None
+        assert field_compression.decode('plain') == 'plain'
+        assert field_compression.decode(Binary(b'raw', 0)) == Binary(b'raw', 0)
+
+
+class TestMessages:
+    def test_large_content_stored_packed_read_plain(self, db, compressing):
+        msg = _message(ObjectId(), LONG)
+        assert msg['content'] == LONG
+
+        stored = MessageModel.get_collection().find_one({'_id': msg['_id']})
+        assert field_compression.is_packed(stored['content'])
+        assert stored['compressed'] == {'content': 'zlib'}
+        assert 'rollback' in stored['search_terms'].split()
+
+        read = MessageModel.find_by_conversation(msg['conversation_id'])[0]
+        assert read['content'] == LONG
+        assert 'compressed' not in read and 'search_terms' not in read
+        assert MessageModel.find_by_id(msg['_id'])['content'] == LONG
+
+    def test_small_content_and_switch_off_stay_plain(self, app, db, compressing, monkeypatch):
+        small = _message(ObjectId(), 'hello')
+        monkeypatch.setitem(app.config, 'FIELD_COMPRESSION', False)
+        big = _message(ObjectId(), LONG)
+        for msg in (small, big):
+            stored = MessageModel.get_collection().find_one({'_id': msg['_id']})
+            assert isinstance(stored['content'], str)
+            assert 'compressed' not in stored
+
+    def test_rewrite_moves_flag_and_search_terms(self, db, compressing):
+        msg = _message(ObjectId(), 'draft')
+        MessageModel.update_content(msg['_id'], LONG)
+        stored = MessageModel.get_collection().find_one({'_id': msg['_id']})
+        assert stored['compressed'] == {'content': 'zlib'} and stored['search_terms']
+
+        MessageModel.update_content(msg['_id'], 'final')
+        stored = MessageModel.get_collection().find_one({'_id': msg['_id']})
+        assert stored['content'] == 'final'
+        assert not stored.get('compressed') and 'search_terms' not in stored
+
+    def test_search_index_and_branch_copy(self, db, compressing):
+        user = ObjectId()
+        msg = _message(user, LONG)
+        assert [h['message_id'] for h in MessageSearchModel.search(user, 'rollback')] == [msg['_id']]
+
+        stored = MessageModel.get_collection().find_one({'_id': msg['_id']})
+        copy = MessageModel._branch_copy(stored, 'alt')
+        assert copy['compressed'] == {'content': 'zlib'}
+        assert copy['search_terms'] == stored['search_terms']
+
+
+class TestTranscriptsAndRuns:
+    def test_transcript_round_trip(self, db, compressing):
+        words = [{'text': f'w{i}', 'start': i, 'end': i + 1, 'speaker_id': 's1'} for i in range(200)]
+        MeetingTranscriptModel.create('m-1', {'raw_json': {'words': words}, 'plain_text': LONG,
+                                              'words_json': words})
+        stored = MeetingTranscriptModel.get_collection().find_one({'_id': 'm-1'})
+        assert set(stored['compressed']) == {'raw_json', 'plain_text', 'words_json'}
+
+        read = MeetingTranscriptModel.find_by_meeting('m-1')
+        assert read['plain_text'] == LONG and read['words_json'] == words
+        assert read['raw_json'] == {'words': words}
+
+        MeetingTranscriptModel.update('m-1', {'plain_text': 'edited'})
+        stored = MeetingTranscriptModel.get_collection().find_one({'_id': 'm-1'})
+        assert stored['plain_text'] == 'edited'
+        assert set(stored['compressed']) == {'raw_json', 'words_json'}
+
+    def test_workflow_node_text(self, db, compressing):
+        run_id = WorkflowRunModel.create(str(ObjectId()), str(ObjectId()), 'full')
+        WorkflowRunModel.update_node_result(run_id, 'n1', {'status': 'done', 'text': LONG})
+        stored = WorkflowRunModel._get_collection().find_one({'_id': ObjectId(run_id)})
+        assert field_compression.is_packed(stored['node_results'][0]['text'])
+
+        WorkflowRunModel.update_node_result(run_id, 'n1', {'text': LONG + 'more'})
+        node = WorkflowRunModel.get_node_result(run_id, 'n1')
+        assert node['text'] == LONG + 'more'
+        assert 'compressed' not in node
+
+
+class TestConvert:
+    def test_compress_then_restore(self, app, db, compressing, monkeypatch):
+        monkeypatch.setitem(app.config, 'FIELD_COMPRESSION', False)
+        msgs = [_message(ObjectId(), LONG), _message(ObjectId(), 'tiny')]
+        col = MessageModel.get_collection()
+        paths = lambda doc: MessageModel.COMPRESSED_FIELDS  # noqa: E731
+
+        stats = field_compression.convert(col, paths, MessageModel.SEARCH_FIELD, batch_size=1)
+        assert stats == {'scanned': 2, 'converted': 1, 'last_id': msgs[1]['_id']}
+        assert field_compression.is_packed(col.find_one({'_id': msgs[0]['_id']})['content'])
+        # Re-running finds nothing left to do.
+        assert field_compression.convert(col, paths, MessageModel.SEARCH_FIELD)['converted'] == 0
+
+        field_compression.convert(col, paths, MessageModel.SEARCH_FIELD, compress=False)
+        restored = col.find_one({'_id': msgs[0]['_id']})
+        assert restored['content'] == LONG
+        assert not restored.get('compressed') and 'search_terms' not in restored
@@ -0,0 +1,92 @@
+"""Tests for app/utils/http_cache.py — conditional GETs on the polled lists."""
+
+from bson import ObjectId
+
+from app.models.conversation import ConversationModel
+from app.models.folder import FolderModel
+from app.routes import folders as folders_routes
+from app.utils import http_cache
+
+
+def _revalidate(client, url, headers, response):
+    return client.get(url, headers={**headers, 'If-None-Match': response.headers['ETag']})
+
+
+class TestConditional:
+    def test_304_until_a_write(self, app, db, client, test_user, auth_headers):
+        first = client.get('/api/folders', headers=auth_headers)
+        assert first.status_code == 200
+        assert first.headers['ETag'].startswith('W/')
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+
+        again = _revalidate(client, '/api/folders', auth_headers, first)
+        assert again.status_code == 304
+        assert again.data == b''
+        assert again.headers['ETag'] == first.headers['ETag']
+
+        with app.app_context():
+            FolderModel.create(str(test_user['_id']), 'Box')
+        changed = _revalidate(client, '/api/folders', auth_headers, first)
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != first.headers['ETag']
+        assert len(changed.get_json()['folders']) == 1
+
+    def test_query_string_is_part_of_the_tag(self, client, test_user, auth_headers):
+        plain = client.get('/api/conversations', headers=auth_headers)
+        archived = client.get('/api/conversations?archived=true', headers=auth_headers)
+        assert plain.headers['ETag'] != archived.headers['ETag']
+        assert _revalidate(client, '/api/conversations?archived=true',
+                           auth_headers, plain).status_code == 200
+
+    def test_refused_request_still_refused(self, client, test_user, auth_headers):
+        url = f'/api/folders?project_id={ObjectId()}'
+        r = client.get(url, headers={**auth_headers, 'If-None-Match': '*'})
+        assert r.status_code == 403
+        assert 'ETag' not in r.headers
+
+    def test_cached_body_skips_the_view(self, app, db, client, test_user, auth_headers, monkeypatch):
+        with app.app_context():
+            FolderModel.create(str(test_user['_id']), 'Box')
+        first = client.get('/api/folders', headers=auth_headers)
+
+        def boom(*args, **kwargs):
+            raise AssertionError('view ran')
+        monkeypatch.setattr(folders_routes.FolderModel, 'find_all_by_user', boom)
+        second = client.get('/api/folders', headers=auth_headers)
+        assert second.status_code == 200
+        assert second.get_json() == first.get_json()
+        assert second.headers['ETag'] == first.headers['ETag']
+
+    def test_folder_delete_moves_conversation_list_tag(self, app, db, client, test_user, auth_headers):
+        with app.app_context():
+            folder = FolderModel.create(test_user['_id'], 'P')
+            ConversationModel.create(str(test_user['_id']), None, title='x',
+                                     folder_id=str(folder['_id']))
+        first = client.get('/api/conversations', headers=auth_headers)
+        client.delete(f"/api/folders/{folder['_id']}", headers=auth_headers)
+        assert _revalidate(client, '/api/conversations', auth_headers, first).status_code == 200
+
+    def test_quick_models(self, client, test_user, auth_headers):
+        first = client.get('/api/models/quick-models', headers=auth_headers)
+        assert first.status_code == 200
+        assert _revalidate(client, '/api/models/quick-models', auth_headers, first).status_code == 304
+
+
+class TestBodyCache:
+    def test_evicts_oldest_past_byte_budget(self, monkeypatch):
+        http_cache.clear()
+        monkeypatch.setattr(http_cache, 'CACHE_MAX_BYTES', 10)
+        http_cache._store('a', b'12345', 'text/plain')
+        http_cache._store('b', b'12345', 'text/plain')
+        http_cache._cached('a')  # a is now most recent
+        http_cache._store('c', b'12345', 'text/plain')
+        assert http_cache._cached('b') is None
+        assert http_cache._cached('a') is not None
+        assert http_cache._cached('c') is not None
+        http_cache.clear()
+
+    def test_skips_oversized_bodies(self, monkeypatch):
+        http_cache.clear()
+        monkeypatch.setattr(http_cache, 'CACHE_MAX_ENTRY_BYTES', 4)
+        http_cache._store('a', b'12345', 'text/plain')
+        assert http_cache._cached('a') is None
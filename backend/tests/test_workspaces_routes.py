@@ -345,6 +345,43 @@ class TestWorkspaceOverview:
         # Defaults: at least the creator counts as active member.
         assert billing['seats_used'] >= 1
 
+    def test_etag_answers_unchanged_poll_with_304(self, app, db, client, test_user, auth_headers):
+        wid = _create_team_ws(client, auth_headers, name='Etag WS')['_id']
+
+        r = client.get(f'/api/workspaces/{wid}/overview', headers=auth_headers)
+        etag = r.headers['ETag']
+        assert etag.startswith('W/"')
+
+        r = client.get(f'/api/workspaces/{wid}/overview',
+                       headers={**auth_headers, 'If-None-Match': etag})
+        assert r.status_code == 304
+        assert r.get_data() == b''
+        assert r.headers['ETag'] == etag
+
+    def test_membership_and_billing_changes_invalidate(self, app, db, client, test_user, auth_headers):
+        from app.models.workspace import WorkspaceModel
+        from app.models.workspace_member import WorkspaceMemberModel
+
+        wid = _create_team_ws(client, auth_headers, name='Invalidate WS')['_id']
+        first = client.get(f'/api/workspaces/{wid}/overview', headers=auth_headers)
+        etag = first.headers['ETag']
+
+        other = _make_user(app, 'overview-member@gmail.com')
+        with app.app_context():
+            WorkspaceMemberModel.add(wid, other['_id'], role='viewer')
+        r = client.get(f'/api/workspaces/{wid}/overview',
+                       headers={**auth_headers, 'If-None-Match': etag})
+        assert r.status_code == 200
+        assert r.get_json()['billing']['seats_used'] == first.get_json()['billing']['seats_used'] + 1
+
+        etag = r.headers['ETag']
+        with app.app_context():
+            WorkspaceModel.update(wid, {'credits_balance_usd': 25.0})
+        r = client.get(f'/api/workspaces/{wid}/overview',
+                       headers={**auth_headers, 'If-None-Match': etag})
+        assert r.status_code == 200
+        assert r.get_json()['billing']['credits_balance_usd'] == 25.0
+
 
 # ---------------------------------------------------------------------------
 # TestWorkspaceBilling
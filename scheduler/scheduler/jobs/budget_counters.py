@@ -0,0 +1,21 @@
+import logging
+
+from scheduler.flask_ctx import flask_app
+
+logger = logging.getLogger(__name__)
+
+
+async def run_reconcile():
+    """Drift correction for the month-to-date budget counters.
+
+    Registered as 'scheduler.jobs.budget_counters:run_reconcile'. Resets the
+    current month's workspace / project counters to the spend recorded in
+    usage_logs (read through the usage rollups) and prunes old months.
+    """
+    try:
+        with flask_app.app_context():
+            from app.models.budget_counter import BudgetCounterModel
+            result = BudgetCounterModel.reconcile()
+        logger.info('budget counters reconciled: %s', result)
+    except Exception as exc:
+        logger.exception('budget counter reconcile failed: %s', exc)
@@ -0,0 +1,23 @@
+import logging
+
+from scheduler.flask_ctx import flask_app
+
+logger = logging.getLogger(__name__)
+
+
+async def run_purge():
+    """Run queued conversation purge jobs.
+
+    Registered as 'scheduler.jobs.conversation_purge:run_purge'. The backend's
+    purge worker only starts once a request queues a job, so this picks up
+    jobs left behind by a restart, jobs queued with the worker switched off
+    and failed attempts whose backoff has passed.
+    """
+    try:
+        with flask_app.app_context():
+            from app.services.conversation_purge import run_pending
+            done = run_pending()
+        if done:
+            logger.info('conversation purge: ran %d jobs', done)
+    except Exception as exc:
+        logger.exception('conversation purge failed: %s', exc)
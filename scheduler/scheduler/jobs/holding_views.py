@@ -0,0 +1,30 @@
+import logging
+
+from scheduler.flask_ctx import flask_app
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh():
+    with flask_app.app_context():
+        from app.services.holding_views import refresh
+        return refresh()
+
+
+async def run_refresh():
+    """Refresh the materialised holding analytics count views.
+
+    Registered as 'scheduler.jobs.holding_views:run_refresh' (import-string
+    form, see model_refresh). Usage figures are read from the usage rollups,
+    so this only recounts members / projects / conversations, and only for
+    the workspaces and users written since the last run (a full rebuild
+    every few hours) — cheap enough to run every few minutes.
+    """
+    try:
+        result = _refresh()
+        if result is None:
+            logger.info('holding views refresh skipped: another refresh holds the lease')
+        else:
+            logger.info('holding views refresh: %s', result)
+    except Exception as exc:
+        logger.exception('holding views refresh failed: %s', exc)
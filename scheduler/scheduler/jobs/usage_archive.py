@@ -0,0 +1,22 @@
+import logging
+
+from scheduler.flask_ctx import flask_app
+
+logger = logging.getLogger(__name__)
+
+
+async def run_archive():
+    """Move usage_logs months past the hot window into the cold archive.
+
+    Registered as 'scheduler.jobs.usage_archive:run_archive'. Folds each
+    month into the usage rollups, then packs its rows into compressed
+    columnar chunks in usage_logs_archive. Idempotent; a no-op until the
+    rollups have been backfilled.
+    """
+    try:
+        with flask_app.app_context():
+            from app.models.usage_archive import UsageArchiveModel
+            result = UsageArchiveModel.archive()
+        logger.info('usage archive: %s', result)
+    except Exception as exc:
+        logger.exception('usage archive failed: %s', exc)
@@ -197,6 +197,55 @@ def build_app(scheduler: AsyncIOScheduler) -> web.Application:
         )
         log.info('registered model_refresh_hourly job')
 
+        # Materialised holding analytics (backend app.services.holding_views).
+        scheduler.add_job(
+            'scheduler.jobs.holding_views:run_refresh',
+            trigger=CronTrigger.from_crontab('*/5 * * * *'),
+            id='holding_views_refresh',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=120,
+        )
+        log.info('registered holding_views refresh job')
+
+        # Budget counter drift correction (backend app.models.budget_counter).
+        scheduler.add_job(
+            'scheduler.jobs.budget_counters:run_reconcile',
+            trigger=CronTrigger.from_crontab('*/15 * * * *'),
+            id='budget_counters_reconcile',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=300,
+        )
+        log.info('registered budget_counters_reconcile job')
+
+        # Cold archive of old usage_logs months (backend app.models.usage_archive).
+        scheduler.add_job(
+            'scheduler.jobs.usage_archive:run_archive',
+            trigger=CronTrigger.from_crontab('30 3 * * *'),
+            id='usage_archive_nightly',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=3600,
+        )
+        log.info('registered usage_archive_nightly job')
+
+        # Queued conversation purges (backend app.services.conversation_purge):
+        # jobs orphaned by a restart and retries whose backoff has passed.
+        scheduler.add_job(
+            'scheduler.jobs.conversation_purge:run_purge',
+            trigger=CronTrigger.from_crontab('* * * * *'),
+            id='conversation_purge',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=60,
+        )
+        log.info('registered conversation_purge job')
+
         _app['_tick_task'] = asyncio.create_task(_tick_loop(scheduler))
 
     async def _on_cleanup(_app):
@@ -46,6 +46,23 @@ def patch_flask_ctx(monkeypatch):
     yield fake
 
 
+@pytest.fixture
+def fake_backend_module(monkeypatch):
+    """Factory: ``fake_backend_module('app.services.x', attr=value, ...)``
+    installs a stub module in ``sys.modules`` for the duration of the test
+    and returns it. Jobs must import from the full dotted path
+    (``from app.services.x import y``) for the stub to be picked up.
+    """
+    def _install(mod_name: str, **attrs):
+        mod = types.ModuleType(mod_name)
+        for k, v in attrs.items():
+            setattr(mod, k, v)
+        monkeypatch.setitem(sys.modules, mod_name, mod)
+        return mod
+
+    return _install
+
+
 @pytest.fixture
 def fake_app_models(monkeypatch):
     """Inject minimal stubs for the `app.*` modules scheduler imports.
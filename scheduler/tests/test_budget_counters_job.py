@@ -0,0 +1,26 @@
+"""budget_counters job — thin wrapper over backend `BudgetCounterModel.reconcile`."""
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def budget_counter_model(fake_backend_module):
+    model = MagicMock(name='BudgetCounterModel')
+    model.reconcile.return_value = {'month': '2026-01', 'corrected': 0, 'pruned': 0}
+    fake_backend_module('app.models.budget_counter', BudgetCounterModel=model)
+    return model
+
+
+@pytest.mark.asyncio
+async def test_run_reconcile(budget_counter_model):
+    from scheduler.jobs import budget_counters as job
+    await job.run_reconcile()
+    budget_counter_model.reconcile.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_errors_are_swallowed(budget_counter_model):
+    budget_counter_model.reconcile.side_effect = RuntimeError('mongo down')
+    from scheduler.jobs import budget_counters as job
+    await job.run_reconcile()  # must not raise into APScheduler
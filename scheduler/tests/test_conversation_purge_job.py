@@ -0,0 +1,25 @@
+"""conversation_purge job — thin wrapper over backend `conversation_purge.run_pending`."""
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def run_pending(fake_backend_module):
+    run = MagicMock(name='run_pending', return_value=2)
+    fake_backend_module('app.services.conversation_purge', run_pending=run)
+    return run
+
+
+@pytest.mark.asyncio
+async def test_run_purge(run_pending):
+    from scheduler.jobs import conversation_purge as job
+    await job.run_purge()
+    run_pending.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_purge_errors_are_swallowed(run_pending):
+    run_pending.side_effect = RuntimeError('mongo down')
+    from scheduler.jobs import conversation_purge as job
+    await job.run_purge()  # must not raise into APScheduler
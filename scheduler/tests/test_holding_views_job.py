@@ -0,0 +1,26 @@
+"""holding_views job — thin wrapper over backend `holding_views.refresh`."""
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def fake_holding_views(fake_backend_module):
+    return fake_backend_module(
+        'app.services.holding_views',
+        refresh=MagicMock(return_value={'refreshed_at': None}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_refresh(fake_holding_views):
+    from scheduler.jobs import holding_views as job
+    await job.run_refresh()
+    fake_holding_views.refresh.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_refresh_errors_are_swallowed(fake_holding_views):
+    fake_holding_views.refresh.side_effect = RuntimeError('mongo down')
+    from scheduler.jobs import holding_views as job
+    await job.run_refresh()  # must not raise into APScheduler
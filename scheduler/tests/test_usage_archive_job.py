@@ -0,0 +1,26 @@
+"""usage_archive job — thin wrapper over backend `UsageArchiveModel.archive`."""
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def usage_archive_model(fake_backend_module):
+    model = MagicMock(name='UsageArchiveModel')
+    model.archive.return_value = {'horizon': None, 'months': [], 'archived': 0}
+    fake_backend_module('app.models.usage_archive', UsageArchiveModel=model)
+    return model
+
+
+@pytest.mark.asyncio
+async def test_run_archive(usage_archive_model):
+    from scheduler.jobs import usage_archive as job
+    await job.run_archive()
+    usage_archive_model.archive.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_archive_errors_are_swallowed(usage_archive_model):
+    usage_archive_model.archive.side_effect = RuntimeError('mongo down')
+    from scheduler.jobs import usage_archive as job
+    await job.run_archive()  # must not raise into APScheduler